@@ -22,8 +22,14 @@ class Cas:
     def get_current_entity(self):
         return self.current_entity
 
-    def login(self, account, password):
-        """login"""
+    def login(self, account, password, token_store=None):
+        """login
+
+        token_store: 可选的令牌缓存（get/put/delete），按 (服务器地址, 命名空间, 账户)
+        取出缓存令牌并通过 refresh 验证，验证成功则不再执行完整登录
+        """
+        if token_store is not None and self._login_from_store(account, token_store):
+            return True
         params = {'account': account, 'password': password}
         val = self.session.post('/api/v1/cas/session/login/', params)
         if val is None or val.get('error') is not None:
@@ -40,8 +46,29 @@ class Cas:
         self.session_token = value.get('sessionToken')
         self.current_entity = value.get('entity')
         logger.info('登录成功, 账户: %s, 实体: %s', account, self.current_entity)
+        if token_store is not None and self.session_token:
+            token_store.put(self._store_identity(account), self.session_token, self.current_entity)
         return self.session_token is not None
 
+    def _store_identity(self, account):
+        return (self.session.base_url, self.session.namespace, account)
+
+    def _login_from_store(self, account, token_store):
+        """使用缓存令牌登录"""
+        identity = self._store_identity(account)
+        cached = token_store.get(identity)
+        if not cached:
+            return False
+        if self.refresh(cached['token']):
+            token_store.put(identity, self.session_token, self.current_entity)
+            logger.info('使用缓存令牌登录成功, 账户: %s', account)
+            return True
+        logger.info('缓存令牌已失效, 重新登录, 账户: %s', account)
+        token_store.delete(identity)
+        self.session_token = None
+        self.session.bind_token(None)
+        return False
+
     def logout(self, session_token):
         """logout"""
         self.session.bind_token(session_token)
@@ -82,17 +82,22 @@ class MagicEntity:
         response = self.session.get(url)
         return self._handle_response(response, '查询', url, id_val=id_val)
 
-    def insert(self, param_val: Dict[str, Any]) -> Optional[Any]:
+    def insert(self, param_val: Dict[str, Any],
+               idempotency_key: Optional[str] = None) -> Optional[Any]:
         """Insert new entity.
         
         Args:
             param_val: Entity data dictionary
+            idempotency_key: Optional idempotency key for safe retries
             
         Returns:
             Created entity data on success, None on error
         """
         url = f'{self.base_url}s/'
-        response = self.session.post(url, param_val)
+        if idempotency_key:
+            response = self.session.post(url, param_val, idempotency_key=idempotency_key)
+        else:
+            response = self.session.post(url, param_val)
         return self._handle_response(response, '插入', url, param_val=param_val)
 
     def update(self, id_val: Union[str, int], param_val: Dict[str, Any]) -> Optional[Any]:
@@ -165,16 +165,23 @@ class MagicSession:
                 }
             }
 
-    def post(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def post(self, url: str, params: Dict[str, Any],
+             idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Make POST request.
         
         Args:
             url: Relative URL path
             params: Request body parameters
+            idempotency_key: Optional key sent as the Idempotency-Key header,
+                so a retried request is executed at most once by the server
             
         Returns:
             Response data as dictionary
         """
+        if idempotency_key:
+            headers = self.header()
+            headers['Idempotency-Key'] = idempotency_key
+            return self._request('post', url, json=params, headers=headers)
         return self._request('post', url, json=params)
 
     def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -10,16 +10,32 @@
 2. 持续测试：长时间运行，模拟真实业务场景
 3. 数据量限制：业务总数据量不超过1000万条
 4. 性能劣化跟踪：监控接口执行时间是否存在劣化
+5. 检查点：定期把指标历史和工作线程状态保存到 SQLite，中断后从检查点继续运行
+6. 实时指标：内嵌 HTTP 端点以 Prometheus 文本格式输出运行中的计数、耗时直方图、
+   会话刷新次数、错误率和进行中的操作数
+7. 客户端资源监控：定期采样负载进程的内存、文件描述符、套接字、线程和对象数，
+   发现持续增长时报警，便于区分客户端泄漏和服务器劣化
 """
 
 import json
 import logging
+import os
 import random
 import statistics
 import threading
 import time
 from datetime import datetime, timedelta
 
+from checkpoint_store import CheckpointStore
+from degradation_detector import DegradationMonitor, format_alert
+from latency_histogram import ALL_KEY, HistogramSet
+from load_processes import ERROR, LoadProcessGroup
+from metrics_endpoint import DEFAULT_METRICS_PORT, MetricsServer, MetricsWriter
+from resource_monitor import ResourceMonitor, format_trend
+from result_sink import open_sink, process_sink_path, summarize
+from streaming_stats import DecayedRate, RollingWindow, RunningStats
+from workload import Workload
+
 # 配置日志
 logging.basicConfig(
     level=logging.DEBUG,  # 改为DEBUG级别以获取更多信息
@@ -28,12 +44,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# 各实体支持的操作（stockin/stockout 不做更新：服务器端 API 问题）
+AGING_OPERATIONS = {
+    "partner": ("create", "read", "update", "delete", "list"),
+    "product": ("create", "read", "update", "delete", "list"),
+    "goods": ("create", "read", "update", "delete", "list"),
+    "stockin": ("create", "read", "delete", "list"),
+    "stockout": ("create", "read", "delete", "list"),
+}
+# 未配置负载模型时的操作权重：均匀选择实体，再均匀选择该实体的操作
+DEFAULT_AGING_OPERATIONS = {
+    f"{entity}.{action}": 1.0 / len(actions)
+    for entity, actions in AGING_OPERATIONS.items()
+    for action in actions
+}
+
+
+# 近期操作速率的半衰期（秒）
+RATE_HALF_LIFE = 300.0
+
+
 class AgingTestConfig:
     """老化测试配置"""
 
     def __init__(self, config=None):
         # 导入配置助手
-        from config_helper import get_aging_params
+        from config_helper import get_aging_params, get_workload_config
 
         # 获取老化测试配置
         aging_config = get_aging_params()
@@ -54,20 +90,78 @@ class AgingTestConfig:
         )  # 20%性能下降
         # 性能监控窗口大小（操作数）
         self.performance_window_size = 100
+        # 劣化检测：每个操作建立基线的样本数和报警需要的置信度
+        self.degradation_baseline_size = aging_config.get(
+            "degradation_baseline_size", 100
+        )
+        self.degradation_confidence = aging_config.get("degradation_confidence", 0.99)
         # 报告生成间隔（分钟）
         self.report_interval_minutes = aging_config.get("report_interval_minutes", 30)
+        # 更新合并窗口（秒），0 表示关闭，每次更新直接发送 PUT
+        self.write_coalesce_window = aging_config.get("write_coalesce_window", 0)
+        # 差量更新：只发送与最近读取版本不同的字段
+        self.diff_updates = aging_config.get("diff_updates", False)
+        # 幂等创建：创建重试携带同一幂等键，结果未知的重试前先按唯一字段查询确认，
+        # 避免超时重试产生重复数据（重试会多一次查询请求，默认关闭）
+        self.idempotent_creates = aging_config.get("idempotent_creates", False)
+        # 本地参数校验：create/update 发送前检查必填字段和类型，不合法的请求不发送
+        self.validate_payloads = aging_config.get("validate_payloads", False)
+        # 工作进程数，大于 1 时并发线程平均分配到多个进程中运行（绕开 GIL）
+        self.processes = aging_config.get("processes", 1)
+        # 结果汇文件（.jsonl/.csv/.db），为空时不写入；多进程模式下每个进程写入
+        # name.p{序号}.ext
+        self.result_sink = aging_config.get("result_sink", "")
+        # 结果汇中成功操作原始事件的抽样比例
+        self.result_sample_rate = aging_config.get("result_sample_rate", 0.01)
+        # 检查点文件（SQLite），为空时不保存；每个报告间隔保存一次，多进程模式下
+        # 各进程也按报告间隔上报工作线程状态
+        self.checkpoint_path = aging_config.get("checkpoint_path", "")
+        # 实时指标端点监听地址 "主机:端口"（GET /metrics），为空时不启动
+        self.metrics_address = aging_config.get("metrics_address", "")
+        # 客户端资源采样间隔（秒），0 表示关闭；多进程模式下每个工作进程分别采样
+        self.resource_sample_interval = aging_config.get(
+            "resource_sample_interval", 60
+        )
+        # 输出 tracemalloc 增长最多的分配位置数，0 表示不启用 tracemalloc（开销较大）
+        self.tracemalloc_top = aging_config.get("tracemalloc_top", 0)
+        # 资源采样时遍历整个堆统计对象数（gc.get_objects，堆大时开销明显）
+        self.resource_count_objects = aging_config.get("resource_count_objects", False)
+        # 负载模型（workload.Workload 的配置）：操作权重、思考时间、键分布和数据大小，
+        # 配置了 think_time 时代替 operation_interval
+        self.workload = get_workload_config().get("aging", {})
 
         # 保存原始配置引用（如果提供）
         self.config = config
 
+    def to_dict(self):
+        """转换为可以 JSON 序列化的字典（分布式模式下发送给负载代理）"""
+        return {k: v for k, v in vars(self).items() if k != "config"}
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 to_dict 的结果恢复配置，未包含的项使用本机配置"""
+        config = cls()
+        config.__dict__.update(data)
+        return config
+
 
 class AgingTestWorker:
     """老化测试工作线程"""
 
-    def __init__(self, worker_id: int, config: AgingTestConfig):
+    def __init__(self, worker_id: int, config: AgingTestConfig, result_sink=None):
         self.worker_id = worker_id
         self.config = config
-        self.results = []
+        # 每次操作的结果写入结果汇（result_sink.ResultSink），内存中只保留计数
+        self.result_sink = result_sink
+        self.operation_counts = {"total": 0, "successful": 0, "failed": 0}
+        # 按 "实体类型.操作类型" 的成功/失败次数
+        self.operations_by_key = {}
+        # 正在执行（含重试）的操作数，指标端点使用
+        self.in_flight = 0
+        self.duration_stats = RunningStats()
+        # 近期（指数衰减）的操作速率和失败速率
+        self.operation_rate = DecayedRate(RATE_HALF_LIFE)
+        self.failure_rate = DecayedRate(RATE_HALF_LIFE)
         self.running = False
         self.entity_cache = {
             "partner": [],
@@ -76,9 +170,17 @@ class AgingTestWorker:
             "stockin": [],
             "stockout": [],
         }
-        # 性能监控窗口
-        self.performance_window = []
+        # 按 "实体类型.操作类型" 检测耗时的持续上升
+        self.degradation_monitor = DegradationMonitor(
+            baseline_size=config.degradation_baseline_size,
+            min_confidence=config.degradation_confidence,
+            min_change_percent=config.performance_degradation_threshold,
+        )
+        # 性能监控窗口（最近 performance_window_size 次操作的耗时）
+        self.performance_window = RollingWindow(config.performance_window_size)
         self.baseline_performance = None
+        # 按 "实体类型.操作类型" 记录的耗时直方图
+        self.latency_histograms = HistogramSet()
         # 错误统计
         self.error_counts = {
             "total": 0,
@@ -100,6 +202,26 @@ class AgingTestWorker:
         # 重试配置
         self.max_retries = 3
         self.retry_delay = 1.0  # 秒
+        # 当前操作中各实体类型的创建请求（参数, 幂等键），重试时复用
+        self._pending_creates = {}
+        # 负载模型，配置了种子时每个工作线程使用 seed + 工作线程ID
+        seed = config.workload.get("seed")
+        self.workload = Workload(
+            config.workload,
+            default_operations=DEFAULT_AGING_OPERATIONS,
+            default_think_time=config.operation_interval,
+            seed=None if seed is None else seed + worker_id,
+        )
+        self.workload.validate(AGING_OPERATIONS)
+
+    # 幂等创建时用于确认创建结果的唯一字段（出入库单号由系统生成，只依赖幂等键）
+    IDEMPOTENT_LOOKUP_FIELDS = {
+        "partner": "name",
+        "product": "name",
+        "goods": "sku",
+        "stockin": None,
+        "stockout": None,
+    }
 
     def run(self, stop_event: threading.Event):
         """运行测试工作线程"""
@@ -154,32 +276,21 @@ class AgingTestWorker:
             self.stockin_sdk = StockinSDK(work_session)
             self.stockout_sdk = StockoutSDK(work_session)
 
+            self._configure_sdks()
+
             # 运行测试循环
             while self.running and not stop_event.is_set():
                 try:
-                    # 随机选择实体类型（现在测试所有五种实体）
-                    entity_types = [
-                        "partner",
-                        "product",
-                        "goods",
-                        "stockin",
-                        "stockout",
-                    ]
-                    entity_type = random.choice(entity_types)
-
-                    # 随机选择操作类型
-                    # 注意：对于stockin和stockout，跳过update操作（服务器端API问题）
-                    if entity_type in ["stockin", "stockout"]:
-                        operation_types = ["create", "read", "delete", "list"]
-                    else:
-                        operation_types = ["create", "read", "update", "delete", "list"]
-                    operation_type = random.choice(operation_types)
+                    # 按负载模型的权重选择实体类型和操作类型
+                    entity_type, operation_type = self.workload.choose_operation()
 
                     # 执行操作（带重试机制）
+                    self.in_flight = 1
                     start_time = time.time()
                     success = False
                     error = None
                     result = None
+                    self._pending_creates = {}
 
                     # 重试逻辑
                     for retry_count in range(self.max_retries + 1):
@@ -261,26 +372,31 @@ class AgingTestWorker:
                                 break
 
                     duration = time.time() - start_time
+                    self.in_flight = 0
 
                     # 记录结果
-                    self.results.append(
-                        {
-                            "operation_type": operation_type,
-                            "entity_type": entity_type,
-                            "success": success,
-                            "duration": duration,
-                            "error": error,
-                            "timestamp": datetime.now().isoformat(),
-                        }
+                    self._record_result(
+                        entity_type, operation_type, success, duration, error
                     )
 
-                    # 更新性能监控窗口
+                    # 启用更新合并时 update 只写入内存缓冲区，耗时单独记为
+                    # "实体.update_buffered"，不与未合并时的 update 耗时比较
+                    latency_key = f"{entity_type}.{operation_type}"
+                    buffered = self.config.write_coalesce_window > 0
+                    if operation_type == "update" and buffered:
+                        latency_key += "_buffered"
+                    self.latency_histograms.record(latency_key, duration)
+
+                    # 更新性能监控窗口，成功操作的耗时用于劣化检测
                     self._update_performance_window(duration)
+                    if success:
+                        self._detect_degradation(latency_key, duration)
 
-                    # 操作间隔
-                    time.sleep(self.config.operation_interval)
+                    # 操作间隔（思考时间）
+                    time.sleep(self.workload.think_time())
 
                 except Exception as e:
+                    self.in_flight = 0
                     logger.error(f"工作线程 {self.worker_id} 执行操作异常: {e}")
                     time.sleep(1.0)
 
@@ -289,6 +405,13 @@ class AgingTestWorker:
         finally:
             self.running = False
 
+            # 刷新合并缓冲区中尚未发送的更新
+            for sdk in self._updatable_sdks():
+                try:
+                    sdk.disable_write_buffer()
+                except Exception as e:
+                    logger.error(f"工作线程 {self.worker_id}: 刷新更新缓冲区失败 - {e}")
+
             # 关闭会话管理器
             if hasattr(self, "session_manager") and self.session_manager:
                 logger.info(f"工作线程 {self.worker_id}: 关闭会话管理器")
@@ -297,52 +420,178 @@ class AgingTestWorker:
 
             logger.info(f"工作线程 {self.worker_id} 停止")
 
+    def _record_result(
+        self,
+        entity_type: str,
+        operation_type: str,
+        success: bool,
+        duration: float,
+        error,
+    ):
+        """更新计数，并把结果写入结果汇"""
+        counts = self.operation_counts
+        counts["total"] += 1
+        counts["successful" if success else "failed"] += 1
+        key_counts = self.operations_by_key.setdefault(
+            f"{entity_type}.{operation_type}", {"successful": 0, "failed": 0}
+        )
+        key_counts["successful" if success else "failed"] += 1
+        self.operation_rate.mark()
+        if not success:
+            self.failure_rate.mark()
+        if duration > 0:
+            self.duration_stats.add(duration)
+        if self.result_sink is not None:
+            self.result_sink.record(
+                f"{entity_type}.{operation_type}",
+                success,
+                duration,
+                str(error) if error is not None else None,
+                worker_id=self.worker_id,
+            )
+
+    def _flush_recorder(self, entity_type: str):
+        """合并缓冲区刷新回调：记录实际发送更新的耗时（在刷新线程中调用）"""
+
+        def record(entity_id, duration, success):
+            if success:
+                self.latency_histograms.record(f"{entity_type}.update_flush", duration)
+
+        return record
+
+    def _configure_sdks(self):
+        """按配置启用 SDK 的可选功能"""
+        # 启用更新合并（stockin/stockout 不做更新，无需启用）；实际发送 PUT 的
+        # 耗时记为 "实体.update_flush"
+        if self.config.write_coalesce_window > 0:
+            for entity_type in ("partner", "product", "goods"):
+                self._entity_sdks()[entity_type].enable_write_buffer(
+                    window=self.config.write_coalesce_window,
+                    on_flush=self._flush_recorder(entity_type),
+                )
+        if self.config.diff_updates:
+            for sdk in self._updatable_sdks():
+                sdk.enable_diff_updates()
+        if self.config.idempotent_creates:
+            for entity_type, sdk in self._entity_sdks().items():
+                sdk.enable_idempotent_creates(
+                    lookup_field=self.IDEMPOTENT_LOOKUP_FIELDS[entity_type]
+                )
+        if self.config.validate_payloads:
+            for sdk in self._entity_sdks().values():
+                sdk.enable_payload_validation()
+
+    def _updatable_sdks(self):
+        """获取执行更新操作的SDK（初始化失败时可能不存在）"""
+        return [
+            sdk
+            for sdk in (
+                getattr(self, "partner_sdk", None),
+                getattr(self, "product_sdk", None),
+                getattr(self, "goods_sdk", None),
+            )
+            if sdk is not None
+        ]
+
+    def _entity_sdks(self):
+        """获取实体类型 -> SDK（初始化失败时可能不存在）"""
+        sdks = {
+            "partner": getattr(self, "partner_sdk", None),
+            "product": getattr(self, "product_sdk", None),
+            "goods": getattr(self, "goods_sdk", None),
+            "stockin": getattr(self, "stockin_sdk", None),
+            "stockout": getattr(self, "stockout_sdk", None),
+        }
+        return {k: sdk for k, sdk in sdks.items() if sdk is not None}
+
+    def _get_idempotency_statistics(self):
+        """汇总幂等创建统计"""
+        if not self.config.idempotent_creates:
+            return None
+
+        totals = {"deduplicated": 0, "resolved_by_lookup": 0, "resent": 0}
+        for sdk in self._entity_sdks().values():
+            for key in totals:
+                totals[key] += sdk.idempotency_stats[key]
+        return totals
+
+    def _create_request(self, entity_type: str, generate):
+        """获取本次操作的创建参数和幂等键，同一操作的重试复用同一份"""
+        from sdk.idempotency import new_idempotency_key
+
+        request = self._pending_creates.get(entity_type)
+        if request is None:
+            key = new_idempotency_key() if self.config.idempotent_creates else None
+            request = (generate(), key)
+            self._pending_creates[entity_type] = request
+        return request
+
+    def _get_write_buffer_statistics(self):
+        """汇总更新合并统计"""
+        buffers = [sdk.write_buffer for sdk in self._updatable_sdks() if sdk.write_buffer]
+        if not buffers:
+            return None
+
+        totals = {"updates_received": 0, "updates_coalesced": 0, "puts_sent": 0}
+        for buffer in buffers:
+            stats = buffer.get_stats()
+            for key in totals:
+                totals[key] += stats[key]
+        totals["coalesce_ratio"] = (
+            totals["updates_coalesced"] / totals["updates_received"]
+            if totals["updates_received"]
+            else 0.0
+        )
+        return totals
+
+    def _get_diff_update_statistics(self):
+        """汇总差量更新统计"""
+        if not self.config.diff_updates:
+            return None
+
+        totals = {"updates": 0, "skipped": 0, "fields_total": 0, "fields_sent": 0}
+        for sdk in self._updatable_sdks():
+            for key in totals:
+                totals[key] += sdk.diff_stats[key]
+        return totals
+
     def _update_performance_window(self, duration: float):
         """更新性能监控窗口"""
-        self.performance_window.append(duration)
-
-        # 保持窗口大小
-        if len(self.performance_window) > self.config.performance_window_size:
-            self.performance_window.pop(0)
+        self.performance_window.add(duration)
 
         # 设置基线性能（前100个操作的平均值）
         if self.baseline_performance is None and len(self.performance_window) >= 100:
-            self.baseline_performance = statistics.mean(self.performance_window)
+            self.baseline_performance = self.performance_window.mean
             logger.info(
                 f"工作线程 {self.worker_id} 基线性能: {self.baseline_performance:.3f}s"
             )
 
-    def check_performance_degradation(self):
-        """检查性能劣化"""
-        if self.baseline_performance is None or len(self.performance_window) < 10:
-            return None
-
-        current_performance = statistics.mean(self.performance_window)
-
-        # 计算性能变化百分比
-        if self.baseline_performance > 0:
-            degradation_percent = (
-                (current_performance - self.baseline_performance)
-                / self.baseline_performance
-                * 100
+    def _detect_degradation(self, key: str, duration: float):
+        alert = self.degradation_monitor.record(key, duration)
+        if alert:
+            logger.warning(
+                f"工作线程 {self.worker_id} 检测到性能劣化: {format_alert(alert)}"
             )
 
-            if degradation_percent > self.config.performance_degradation_threshold:
-                return degradation_percent
+    def check_performance_degradation(self):
+        """检查性能劣化：返回劣化最严重的操作的耗时上升百分比，没有劣化时返回 None
 
-        return None
+        每个操作分别检测（见 degradation_detector），报警详情见 degradation_alerts。
+        """
+        alerts = self.degradation_monitor.alerts()
+        return alerts[0]["change_percent"] if alerts else None
 
     def _create_entity(self, entity_type: str):
         """创建实体"""
         if entity_type == "partner":
-            data = self._generate_partner_data()
-            result = self.partner_sdk.create_partner(data)
+            data, key = self._create_request("partner", self._generate_partner_data)
+            result = self.partner_sdk.create_partner(data, idempotency_key=key)
         elif entity_type == "product":
-            data = self._generate_product_data()
-            result = self.product_sdk.create_product(data)
+            data, key = self._create_request("product", self._generate_product_data)
+            result = self.product_sdk.create_product(data, idempotency_key=key)
         elif entity_type == "goods":
-            data = self._generate_goods_data()
-            result = self.goods_sdk.create_goods(data)
+            data, key = self._create_request("goods", self._generate_goods_data)
+            result = self.goods_sdk.create_goods(data, idempotency_key=key)
         elif entity_type == "stockin":
             # 需要先有商品
             goods_info = self._get_or_create_goods()
@@ -350,8 +599,13 @@ class AgingTestWorker:
                 goods_id = str(goods_info.get("id", f"goods_{self.worker_id}"))
                 goods_sku = str(goods_info.get("sku", f"SKU_{self.worker_id:04d}"))
                 product_id = int(goods_info.get("product_id", 1))
-                data = self._generate_stockin_data(goods_id, goods_sku, product_id)
-                result = self.stockin_sdk.create_stockin(data)
+                data, key = self._create_request(
+                    "stockin",
+                    lambda: self._generate_stockin_data(
+                        goods_id, goods_sku, product_id
+                    ),
+                )
+                result = self.stockin_sdk.create_stockin(data, idempotency_key=key)
             else:
                 result = None
         elif entity_type == "stockout":
@@ -361,8 +615,13 @@ class AgingTestWorker:
                 goods_id = str(goods_info.get("id", f"goods_{self.worker_id}"))
                 goods_sku = str(goods_info.get("sku", f"SKU_{self.worker_id:04d}"))
                 product_id = int(goods_info.get("product_id", 1))
-                data = self._generate_stockout_data(goods_id, goods_sku, product_id)
-                result = self.stockout_sdk.create_stockout(data)
+                data, key = self._create_request(
+                    "stockout",
+                    lambda: self._generate_stockout_data(
+                        goods_id, goods_sku, product_id
+                    ),
+                )
+                result = self.stockout_sdk.create_stockout(data, idempotency_key=key)
             else:
                 result = None
         else:
@@ -380,7 +639,7 @@ class AgingTestWorker:
             # 如果没有缓存，先创建一个
             return self._create_entity(entity_type)
 
-        entity_id = random.choice(entity_ids)
+        entity_id = self.workload.choose_key(entity_ids, entity_type)
 
         if entity_type == "partner":
             return self.partner_sdk.query_partner(int(entity_id))
@@ -405,7 +664,7 @@ class AgingTestWorker:
                 return None
             entity_id = str(entity["id"])
         else:
-            entity_id = random.choice(entity_ids)
+            entity_id = self.workload.choose_key(entity_ids, entity_type)
 
         # 获取当前实体
         current_entity = self._read_entity(entity_type)
@@ -413,7 +672,7 @@ class AgingTestWorker:
             return None
 
         # 更新描述字段
-        current_entity["description"] = (
+        current_entity["description"] = self.workload.payload_text(
             f"老化测试更新_{self.worker_id}_{int(time.time())}"
         )
 
@@ -443,7 +702,7 @@ class AgingTestWorker:
             logger.debug(f"_delete_entity: {entity_type} 缓存为空")
             return None
 
-        entity_id = random.choice(entity_ids)
+        entity_id = self.workload.choose_key(entity_ids, entity_type)
         logger.debug(f"_delete_entity: 尝试删除 {entity_type} ID: {entity_id}")
 
         try:
@@ -500,7 +759,7 @@ class AgingTestWorker:
         goods_ids = self.entity_cache["goods"]
         if goods_ids:
             # 随机选择一个商品ID，并尝试获取其详细信息
-            goods_id = random.choice(goods_ids)
+            goods_id = self.workload.choose_key(goods_ids, "goods")
             try:
                 goods_info = self.goods_sdk.query_goods(int(goods_id))
                 if goods_info:
@@ -516,11 +775,11 @@ class AgingTestWorker:
         product_info = self._get_or_create_product()
 
         # 创建新商品
-        goods_data = self._generate_goods_data()
+        goods_data, key = self._create_request("goods", self._generate_goods_data)
         if product_info and "id" in product_info:
             goods_data["product"]["id"] = product_info["id"]
 
-        goods = self.goods_sdk.create_goods(goods_data)
+        goods = self.goods_sdk.create_goods(goods_data, idempotency_key=key)
         if goods and "id" in goods:
             goods_id = str(goods["id"])
             self.entity_cache["goods"].append(goods_id)
@@ -542,7 +801,7 @@ class AgingTestWorker:
         product_ids = self.entity_cache["product"]
         if product_ids:
             # 随机选择一个产品ID
-            product_id = random.choice(product_ids)
+            product_id = self.workload.choose_key(product_ids, "product")
             try:
                 product_info = self.product_sdk.query_product(int(product_id))
                 if product_info:
@@ -551,8 +810,10 @@ class AgingTestWorker:
                 pass
 
         # 创建新产品
-        product_data = self._generate_product_data()
-        product = self.product_sdk.create_product(product_data)
+        product_data, key = self._create_request(
+            "product", self._generate_product_data
+        )
+        product = self.product_sdk.create_product(product_data, idempotency_key=key)
         if product and "id" in product:
             product_id = str(product["id"])
             self.entity_cache["product"].append(product_id)
@@ -567,7 +828,9 @@ class AgingTestWorker:
             "name": f"老化测试合作伙伴_{self.worker_id}_{int(time.time())}",
             "telephone": f"138{random.randint(10000000, 99999999)}",
             "wechat": f"wechat_{self.worker_id}",
-            "description": f"老化测试合作伙伴描述_{self.worker_id}",
+            "description": self.workload.payload_text(
+                f"老化测试合作伙伴描述_{self.worker_id}"
+            ),
             "status": {"id": 3},
         }
 
@@ -577,7 +840,9 @@ class AgingTestWorker:
             "name": f"老化测试产品_{self.worker_id}_{int(time.time())}",
             "code": f"PROD_{self.worker_id:04d}",
             "price": round(random.uniform(10.0, 1000.0), 2),
-            "description": f"老化测试产品描述_{self.worker_id}",
+            "description": self.workload.payload_text(
+                f"老化测试产品描述_{self.worker_id}"
+            ),
             "status": {"id": 1},
         }
 
@@ -592,7 +857,9 @@ class AgingTestWorker:
             "sku": f"SKU_{self.worker_id:04d}_{timestamp}",
             "price": round(random.uniform(5.0, 500.0), 2),
             "count": random.randint(1, 1000),  # 注意：是count不是quantity
-            "description": f"老化测试商品描述_{self.worker_id}",
+            "description": self.workload.payload_text(
+                f"老化测试商品描述_{self.worker_id}"
+            ),
             "status": {"id": 1},
             "product": {"id": 1},  # 默认产品ID
             "shelf": [{"id": 1}],  # shelf应该是数组
@@ -677,15 +944,58 @@ class AgingTestWorker:
             "store": {"id": 1},  # 需要store字段
         }
 
+    def checkpoint(self):
+        """可以 JSON 序列化的工作线程状态：实体缓存、计数、耗时直方图和劣化检测基线
+
+        工作线程运行时也可以调用（复制列表和字典，不加锁）。
+        """
+        return {
+            "worker_id": self.worker_id,
+            "operation_counts": dict(self.operation_counts),
+            "operations_by_key": {
+                key: dict(counts)
+                for key, counts in list(self.operations_by_key.items())
+            },
+            "duration_stats": self.duration_stats.checkpoint(),
+            "error_counts": {
+                "total": self.error_counts["total"],
+                "by_entity": dict(self.error_counts["by_entity"]),
+                "by_operation": dict(self.error_counts["by_operation"]),
+            },
+            "entity_cache": {
+                entity_type: list(ids) for entity_type, ids in self.entity_cache.items()
+            },
+            "performance_window": self.performance_window.checkpoint(),
+            "baseline_performance": self.baseline_performance,
+            "latency_histograms": self.latency_histograms.to_dict(),
+            "degradation_monitor": self.degradation_monitor.checkpoint(),
+        }
+
+    def restore(self, state):
+        """从 checkpoint 的结果恢复（在 run 之前调用）"""
+        self.operation_counts = dict(state["operation_counts"])
+        self.operations_by_key = state.get("operations_by_key", {})
+        self.duration_stats.restore(state["duration_stats"])
+        self.error_counts = state["error_counts"]
+        for entity_type, ids in state["entity_cache"].items():
+            self.entity_cache[entity_type] = list(ids)
+        self.performance_window.restore(state["performance_window"])
+        self.baseline_performance = state["baseline_performance"]
+        self.latency_histograms = HistogramSet.from_dict(state["latency_histograms"])
+        self.degradation_monitor.restore(state["degradation_monitor"])
+        logger.info(
+            f"工作线程 {self.worker_id} 从检查点恢复: "
+            f"{self.operation_counts['total']} 次操作, "
+            f"{sum(len(ids) for ids in self.entity_cache.values())} 个实体"
+        )
+
     def get_statistics(self):
         """获取统计信息"""
-        if not self.results:
+        counts = self.operation_counts
+        if not counts["total"]:
             return {}
-
-        successful_results = [r for r in self.results if r["success"]]
-        failed_results = [r for r in self.results if not r["success"]]
-
-        durations = [r["duration"] for r in self.results if r["duration"] > 0]
+        durations = self.duration_stats
+        operation_rate = self.operation_rate.rate()
 
         # 计算性能劣化
         degradation_percent = self.check_performance_degradation()
@@ -695,47 +1005,143 @@ class AgingTestWorker:
 
         # 计算错误率
         total_errors = self.error_counts["total"]
-        error_rate = (
-            total_errors / len(self.results) * 100
-            if self.results and total_errors > 0
-            else 0
-        )
+        error_rate = total_errors / counts["total"] * 100
 
         return {
-            "total_operations": len(self.results),
-            "successful_operations": len(successful_results),
-            "failed_operations": len(failed_results),
-            "success_rate": (
-                len(successful_results) / len(self.results) * 100 if self.results else 0
+            "total_operations": counts["total"],
+            "successful_operations": counts["successful"],
+            "failed_operations": counts["failed"],
+            "success_rate": counts["successful"] / counts["total"] * 100,
+            "avg_duration": durations.mean,
+            "min_duration": durations.min or 0,
+            "max_duration": durations.max or 0,
+            "duration_stdev": durations.stdev,
+            "recent_operations_per_second": operation_rate,
+            "recent_error_rate": (
+                self.failure_rate.rate() / operation_rate * 100 if operation_rate else 0
+            ),
+            "latency_percentiles": self.latency_histograms.summary(),
+            "operations_by_key": {
+                key: dict(counts)
+                for key, counts in list(self.operations_by_key.items())
+            },
+            "in_flight": self.in_flight,
+            "session": (
+                dict(self.session_manager.auth_stats)
+                if getattr(self, "session_manager", None)
+                else None
             ),
-            "avg_duration": statistics.mean(durations) if durations else 0,
-            "min_duration": min(durations) if durations else 0,
-            "max_duration": max(durations) if durations else 0,
             "entity_counts": {
                 entity_type: len(ids) for entity_type, ids in self.entity_cache.items()
             },
             "total_entities": total_entities,
             "performance_degradation_percent": degradation_percent,
+            "degradation_alerts": self.degradation_monitor.alerts(),
             "baseline_performance": self.baseline_performance,
-            "current_performance": (
-                statistics.mean(self.performance_window)
-                if self.performance_window
-                else 0
-            ),
+            "current_performance": self.performance_window.mean,
             "error_statistics": {
                 "total_errors": total_errors,
                 "error_rate": error_rate,
                 "by_entity": self.error_counts["by_entity"],
                 "by_operation": self.error_counts["by_operation"],
             },
+            "write_buffer": self._get_write_buffer_statistics(),
+            "diff_updates": self._get_diff_update_statistics(),
+            "idempotency": self._get_idempotency_statistics(),
         }
 
 
+# 多进程模式下工作进程上报统计的间隔（秒）
+PROCESS_SNAPSHOT_INTERVAL = 10
+# 报告中保留的抽样错误事件数
+MAX_SINK_ERRORS = 1000
+
+
+def _run_aging_process(
+    channel, stop_event, config, worker_ids, snapshot_interval, worker_states=None
+):
+    """多进程（分布式）模式的工作进程（代理）入口：运行一组工作线程，定期上报统计、
+    耗时直方图和本进程的资源；启用检查点时按报告间隔上报工作线程状态，worker_states
+    为要恢复的工作线程状态列表"""
+    if isinstance(config, dict):
+        config = AgingTestConfig.from_dict(config)
+    if not channel.barrier():
+        return
+    sink = None
+    if config.result_sink:
+        sink = open_sink(
+            process_sink_path(config.result_sink, channel.index),
+            sample_rate=config.result_sample_rate,
+        )
+    workers = [AgingTestWorker(worker_id, config, sink) for worker_id in worker_ids]
+    states = {state["worker_id"]: state for state in worker_states or []}
+    for worker in workers:
+        if worker.worker_id in states:
+            worker.restore(states[worker.worker_id])
+    threads = [
+        threading.Thread(target=worker.run, args=(stop_event,), daemon=True)
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    monitor = None
+    if config.resource_sample_interval > 0:
+        monitor = ResourceMonitor(
+            config.resource_sample_interval,
+            config.tracemalloc_top,
+            count_objects=config.resource_count_objects,
+        ).start()
+
+    def snapshot():
+        histograms = HistogramSet()
+        for worker in workers:
+            histograms.merge(worker.latency_histograms)
+        channel.send(
+            "snapshot",
+            {
+                "statistics": {w.worker_id: w.get_statistics() for w in workers},
+                "histograms": histograms.to_dict(),
+                "resources": monitor.summary() if monitor else None,
+            },
+        )
+
+    def send_states():
+        if config.checkpoint_path:
+            channel.send("state", [worker.checkpoint() for worker in workers])
+
+    state_interval = config.report_interval_minutes * 60
+    last_state = time.monotonic()
+    while not stop_event.wait(snapshot_interval):
+        snapshot()
+        if time.monotonic() - last_state >= state_interval:
+            send_states()
+            last_state = time.monotonic()
+
+    # 等待工作线程刷新缓冲区、关闭会话后上报最终统计
+    for thread in threads:
+        thread.join(30)
+    if sink is not None:
+        sink.close()
+    if monitor is not None:
+        monitor.stop()
+    snapshot()
+    send_states()
+
+
 class AgingTestRunner:
     """老化测试运行器"""
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, coordinator=None, resume=False):
+        """初始化老化测试运行器
+
+        Args:
+            config: 老化测试配置
+            coordinator: 负载协调器（load_cluster.LoadCoordinator），指定时工作线程
+                平均分配到各负载代理运行，由调用方关闭
+            resume: 从 config.checkpoint_path 的检查点继续运行
+        """
         self.config = config or AgingTestConfig()
+        self.coordinator = coordinator
         self.workers = []
         self.stop_event = threading.Event()
         self.start_time = None
@@ -743,6 +1149,26 @@ class AgingTestRunner:
         self.data_limit_exceeded = False
         self.performance_degradation_detected = False
         self.stop_reason = None
+        # 所有工作线程合并后的耗时直方图（停止工作线程前更新）
+        self.latency_histograms = HistogramSet()
+        # 多进程模式：进程组和各进程最近一次上报的统计
+        self._process_group = None
+        self._process_snapshots = {}
+        # 单进程模式的结果汇，多进程模式下各进程写入自己的文件
+        self.result_sink = None
+        self._sink_paths = []
+        # 检查点：存储、是否恢复、各工作线程最近的状态（工作线程ID -> 状态）
+        self.resume = resume
+        self.checkpoint_store = None
+        self.resumed_from = None
+        self._worker_states = {}
+        # 实时指标端点；指标端点线程和主线程都会读取工作进程上报的统计
+        self.metrics_server = None
+        self._statistics_lock = threading.Lock()
+        # 客户端资源监控：本进程的监控和各工作进程最近上报的资源摘要（工作进程停止后
+        # 保留，用于报告）
+        self.resource_monitor = None
+        self._process_resources = {}
 
     def run(self):
         """运行老化测试"""
@@ -753,8 +1179,13 @@ class AgingTestRunner:
             f"最大数据量={self.config.max_data_count}万条"
         )
 
+        self._open_checkpoint()
+        self._start_metrics_server()
+        self._start_resource_monitor()
+
         try:
-            self.start_time = datetime.now()
+            if self.start_time is None:
+                self.start_time = datetime.now()
 
             # 启动工作线程
             self._start_workers(self.config.concurrent_threads)
@@ -769,6 +1200,9 @@ class AgingTestRunner:
                 # 打印状态
                 self._print_status(metrics)
 
+                # 保存检查点
+                self._save_checkpoint()
+
                 # 检查停止条件
                 if not self._check_continue_conditions():
                     break
@@ -785,22 +1219,273 @@ class AgingTestRunner:
         finally:
             # 停止测试
             self.stop()
+            if self.resource_monitor is not None:
+                self.resource_monitor.stop()
+            self._save_checkpoint()
 
             # 生成最终报告
             report = self._generate_report()
             self._save_report(report)
+            if self.result_sink is not None:
+                self.result_sink.close()
+            if self.checkpoint_store is not None:
+                self.checkpoint_store.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+                self.metrics_server = None
 
             logger.info("长期老化测试完成")
 
+    def _start_metrics_server(self):
+        """按配置启动实时指标端点，启动失败时记录日志，不影响测试"""
+        if not self.config.metrics_address:
+            return
+        from load_cluster import parse_address
+
+        try:
+            host, port = parse_address(
+                self.config.metrics_address, DEFAULT_METRICS_PORT
+            )
+            self.metrics_server = MetricsServer(self.collect_metrics, host, port)
+            self.metrics_server.start()
+        except (OSError, ValueError) as e:
+            logger.error(f"启动指标端点失败: {self.config.metrics_address} - {e}")
+            self.metrics_server = None
+
+    def _start_resource_monitor(self):
+        """按配置启动本进程的资源监控（多进程模式下工作进程各自采样并随统计上报）"""
+        if self.config.resource_sample_interval > 0:
+            self.resource_monitor = ResourceMonitor(
+                self.config.resource_sample_interval,
+                self.config.tracemalloc_top,
+                count_objects=self.config.resource_count_objects,
+            ).start()
+
+    def _client_resources(self):
+        """各负载进程的资源摘要：{"main" 或 "process-序号": ResourceMonitor.summary()}"""
+        resources = {}
+        if self.resource_monitor is not None:
+            resources["main"] = self.resource_monitor.summary()
+        for index, summary in sorted(list(self._process_resources.items())):
+            if summary:
+                resources[f"process-{index}"] = summary
+        return resources
+
+    def collect_metrics(self):
+        """当前指标（Prometheus 文本格式），在指标端点线程中调用"""
+        statistics_list = [
+            stats for _, stats in self._collect_worker_statistics() if stats
+        ]
+        if self.workers or self._process_snapshots:
+            histograms = self._merge_latency_histograms()
+        else:
+            histograms = self.latency_histograms
+
+        operations = {}
+        sessions = {"logins": 0, "refreshes": 0}
+        entities = {}
+        degradations = {}
+        operation_rate = failure_rate = 0.0
+        for stats in statistics_list:
+            for key, counts in stats.get("operations_by_key", {}).items():
+                merged = operations.setdefault(key, {"successful": 0, "failed": 0})
+                merged["successful"] += counts["successful"]
+                merged["failed"] += counts["failed"]
+            for name in sessions:
+                sessions[name] += (stats.get("session") or {}).get(name, 0)
+            for entity_type, count in stats.get("entity_counts", {}).items():
+                entities[entity_type] = entities.get(entity_type, 0) + count
+            for alert in stats.get("degradation_alerts", []):
+                degradations[alert["key"]] = max(
+                    degradations.get(alert["key"], 0.0), alert["change_percent"]
+                )
+            rate = stats.get("recent_operations_per_second", 0.0)
+            operation_rate += rate
+            failure_rate += rate * stats.get("recent_error_rate", 0.0) / 100
+
+        def by_key(values):
+            for key, value in sorted(values.items()):
+                entity_type, _, operation_type = key.partition(".")
+                yield {"entity": entity_type, "operation": operation_type}, value
+
+        writer = MetricsWriter("vmi_aging_")
+        elapsed = (
+            (datetime.now() - self.start_time).total_seconds() if self.start_time else 0
+        )
+        writer.gauge("elapsed_seconds", "已运行时间（秒）", elapsed)
+        writer.gauge("workers", "上报统计的工作线程数", len(statistics_list))
+        writer.counter(
+            "operations_total",
+            "完成的操作数（含重试）",
+            [
+                (dict(labels, result=result), counts[field])
+                for labels, counts in by_key(operations)
+                for result, field in (("success", "successful"), ("failure", "failed"))
+            ],
+        )
+        writer.gauge(
+            "in_flight_operations",
+            "正在执行的操作数",
+            sum(stats.get("in_flight", 0) for stats in statistics_list),
+        )
+        writer.gauge(
+            "recent_operations_per_second",
+            f"近期操作速率（半衰期 {RATE_HALF_LIFE:.0f} 秒）",
+            operation_rate,
+        )
+        writer.gauge(
+            "recent_error_rate_percent",
+            "近期失败操作的比例（百分比）",
+            failure_rate / operation_rate * 100 if operation_rate else 0.0,
+        )
+        writer.histogram(
+            "operation_duration_seconds",
+            "操作耗时（秒，含重试）",
+            by_key({key: histogram for key, histogram in histograms.items()}),
+        )
+        writer.counter("session_logins_total", "会话登录次数", sessions["logins"])
+        writer.counter(
+            "session_refreshes_total", "会话刷新次数", sessions["refreshes"]
+        )
+        writer.gauge(
+            "entities",
+            "缓存中的实体数",
+            [({"entity": name}, count) for name, count in sorted(entities.items())],
+        )
+        writer.gauge(
+            "degradation_change_percent",
+            "检测到劣化的操作的耗时上升（百分比）",
+            by_key(degradations),
+        )
+
+        resources = self._client_resources()
+        latest = {
+            name: summary["latest"]
+            for name, summary in resources.items()
+            if summary["latest"]
+        }
+        for name, field, help_text in (
+            ("client_rss_bytes", "rss_bytes", "负载进程的常驻内存（字节）"),
+            ("client_open_fds", "open_fds", "负载进程打开的文件描述符数"),
+            ("client_threads", "threads", "负载进程的线程数"),
+        ):
+            writer.gauge(
+                name,
+                help_text,
+                [
+                    ({"process": process}, sample[field])
+                    for process, sample in latest.items()
+                    if sample.get(field) is not None
+                ],
+            )
+        writer.gauge(
+            "client_sockets",
+            "负载进程的套接字数（按 TCP 状态）",
+            [
+                ({"process": process, "state": state}, count)
+                for process, sample in latest.items()
+                for state, count in sorted((sample.get("sockets") or {}).items())
+            ],
+        )
+        writer.gauge(
+            "client_growing_resources",
+            "负载进程中持续增长的资源序列数",
+            [
+                ({"process": process}, len(summary["leaks"]))
+                for process, summary in resources.items()
+            ],
+        )
+        return writer.render()
+
+    def _open_checkpoint(self):
+        """打开检查点存储，resume 时恢复运行状态
+
+        Raises:
+            ValueError: 检查点文件已有检查点但没有指定 resume（避免覆盖之前的运行）
+        """
+        if not self.config.checkpoint_path:
+            if self.resume:
+                logger.warning("未配置检查点文件，无法恢复，从头开始运行")
+            return
+        store = CheckpointStore(self.config.checkpoint_path)
+        if store.has_checkpoint() and not self.resume:
+            store.close()
+            raise ValueError(
+                f"检查点文件 {self.config.checkpoint_path} 已有检查点，"
+                "继续运行请指定 resume，重新开始请使用新的文件"
+            )
+        self.checkpoint_store = store
+        if self.resume:
+            self._restore_checkpoint()
+
+    def _restore_checkpoint(self):
+        """从检查点恢复指标历史、已运行时间和工作线程状态"""
+        checkpoint = self.checkpoint_store.load()
+        if checkpoint is None:
+            logger.warning(f"{self.config.checkpoint_path} 中没有检查点，从头开始运行")
+            return
+        run = checkpoint["run"]
+        # 已运行时间从检查点继续计算，检查点之后到中断前的运行时间不计入
+        self.start_time = datetime.now() - timedelta(seconds=run["elapsed_seconds"])
+        self.metrics_history = checkpoint["metrics_history"]
+        self._worker_states = {
+            state["worker_id"]: state for state in checkpoint["workers"]
+        }
+        self.resumed_from = run["checkpointed_at"]
+        unused = [
+            worker_id
+            for worker_id in self._worker_states
+            if worker_id >= self.config.concurrent_threads
+        ]
+        if unused:
+            logger.warning(f"并发线程数减少，工作线程 {unused} 的状态不会恢复")
+        logger.info(
+            f"从检查点恢复: {self.resumed_from}, "
+            f"已运行 {run['elapsed_seconds'] / 3600:.2f} 小时, "
+            f"{len(self._worker_states)} 个工作线程状态"
+        )
+
+    def _capture_worker_states(self):
+        """记录本进程中工作线程的状态（多进程模式下由工作进程上报）"""
+        for worker in self.workers:
+            self._worker_states[worker.worker_id] = worker.checkpoint()
+
+    def _save_checkpoint(self):
+        """保存检查点：运行状态、新增的指标历史和各工作线程状态"""
+        if self.checkpoint_store is None or self.start_time is None:
+            return
+        self._capture_worker_states()
+        self.checkpoint_store.save(
+            {
+                "elapsed_seconds": (datetime.now() - self.start_time).total_seconds(),
+                "stop_reason": self.stop_reason,
+                "config": self.config.to_dict(),
+            },
+            self.metrics_history,
+            list(self._worker_states.values()),
+        )
+
     def _start_workers(self, thread_count: int):
         """启动工作线程"""
         # 停止现有工作线程
         self._stop_workers()
 
+        if self.config.processes > 1 or self.coordinator is not None:
+            self._start_worker_processes(thread_count)
+            return
+
+        if self.config.result_sink and self.result_sink is None:
+            self.result_sink = open_sink(
+                self.config.result_sink, sample_rate=self.config.result_sample_rate
+            )
+            self._sink_paths = [self.config.result_sink]
+
         # 创建新的工作线程
         self.workers = []
         for i in range(thread_count):
-            worker = AgingTestWorker(i, self.config)
+            worker = AgingTestWorker(i, self.config, self.result_sink)
+            if i in self._worker_states:
+                worker.restore(self._worker_states[i])
             self.workers.append(worker)
 
         # 启动工作线程
@@ -812,12 +1497,106 @@ class AgingTestRunner:
 
         logger.info(f"启动 {thread_count} 个工作线程")
 
+    def _start_worker_processes(self, thread_count: int):
+        """启动工作进程（或负载代理），工作线程平均分配到各进程"""
+        if self.coordinator is not None:
+            group = self.coordinator
+            processes = min(group.wait_for_agents(), thread_count)
+            config = self.config.to_dict()
+        else:
+            group = LoadProcessGroup()
+            processes = min(self.config.processes, thread_count)
+            config = self.config
+        if processes < 1:
+            raise RuntimeError("没有已连接的负载代理")
+        if self.config.result_sink:
+            # 负载代理的结果汇写在代理主机上，报告只读取本机存在的文件
+            self._sink_paths = [
+                process_sink_path(self.config.result_sink, i) for i in range(processes)
+            ]
+        group.start(
+            _run_aging_process,
+            [
+                (
+                    config,
+                    worker_ids,
+                    PROCESS_SNAPSHOT_INTERVAL,
+                    [
+                        self._worker_states[worker_id]
+                        for worker_id in worker_ids
+                        if worker_id in self._worker_states
+                    ],
+                )
+                for worker_ids in (
+                    list(range(i, thread_count, processes)) for i in range(processes)
+                )
+            ],
+            name="AgingTest",
+        )
+        self._process_group = group
+        logger.info(f"启动 {processes} 个工作进程，共 {thread_count} 个工作线程")
+
+    def _stop_worker_processes(self):
+        """停止工作进程并接收最终统计
+
+        等待进程退出（最长 60 秒）期间不持有统计锁，只在处理每条消息时加锁，
+        指标端点和定期记录不会被阻塞
+        """
+        with self._statistics_lock:
+            group, self._process_group = self._process_group, None
+        if group is None:
+            return
+
+        def on_message(*message):
+            with self._statistics_lock:
+                self._on_process_message(*message)
+
+        group.stop(timeout=60, on_message=on_message)
+
+    def _on_process_message(self, kind, index, payload):
+        if kind == "snapshot":
+            # 经过 JSON 传输（负载代理）时工作线程ID变为字符串
+            payload["statistics"] = {
+                int(worker_id): stats
+                for worker_id, stats in payload["statistics"].items()
+            }
+            self._process_snapshots[index] = payload
+            self._process_resources[index] = payload.get("resources")
+        elif kind == "state":
+            for state in payload:
+                self._worker_states[state["worker_id"]] = state
+        elif kind == ERROR:
+            logger.error(f"工作进程 {index} 异常: {payload}")
+
+    def _collect_worker_statistics(self):
+        """获取各工作线程的统计：[(工作线程ID, 统计), ...]"""
+        with self._statistics_lock:
+            if self._process_group is not None:
+                for message in self._process_group.poll(timeout=0):
+                    self._on_process_message(*message)
+            snapshots = list(self._process_snapshots.values())
+        if snapshots:
+            return [
+                (worker_id, stats)
+                for snapshot in snapshots
+                for worker_id, stats in snapshot["statistics"].items()
+            ]
+        return [
+            (worker.worker_id, worker.get_statistics()) for worker in list(self.workers)
+        ]
+
     def _stop_workers(self):
         """停止工作线程"""
         self.stop_event.set()
-        time.sleep(2.0)  # 给线程时间停止
+        if self._process_group is not None:
+            self._stop_worker_processes()
+        else:
+            time.sleep(2.0)  # 给线程时间停止
+            if self.checkpoint_store is not None:
+                self._capture_worker_states()
         self.stop_event.clear()
         self.workers = []
+        self._process_snapshots = {}
         logger.info("工作线程已停止")
 
     def _record_metrics(self):
@@ -828,21 +1607,48 @@ class AgingTestRunner:
             "failed_operations": 0,
             "avg_duration": 0,
             "total_entities": 0,
-            "worker_count": len(self.workers),
+            # 各工作线程近期（指数衰减）操作速率之和（次/秒）
+            "recent_throughput": 0.0,
+            "worker_count": 0,
             "performance_degradation_detected": False,
             "data_limit_exceeded": False,
         }
 
         worker_durations = []
         performance_degradations = []
+        degradation_alerts = []
 
-        for worker in self.workers:
-            stats = worker.get_statistics()
+        worker_statistics = self._collect_worker_statistics()
+        total_stats["worker_count"] = len(worker_statistics)
+        for worker_id, stats in worker_statistics:
             if stats:
                 total_stats["total_operations"] += stats["total_operations"]
                 total_stats["successful_operations"] += stats["successful_operations"]
                 total_stats["failed_operations"] += stats["failed_operations"]
                 total_stats["total_entities"] += stats.get("total_entities", 0)
+                total_stats["recent_throughput"] += stats.get(
+                    "recent_operations_per_second", 0
+                )
+
+                # 汇总更新合并统计
+                write_buffer_stats = stats.get("write_buffer")
+                if write_buffer_stats:
+                    merged = total_stats.setdefault(
+                        "write_buffer",
+                        {"updates_received": 0, "updates_coalesced": 0, "puts_sent": 0},
+                    )
+                    for key in merged:
+                        merged[key] += write_buffer_stats[key]
+
+                # 汇总幂等创建统计
+                idempotency_stats = stats.get("idempotency")
+                if idempotency_stats:
+                    merged = total_stats.setdefault(
+                        "idempotency",
+                        {"deduplicated": 0, "resolved_by_lookup": 0, "resent": 0},
+                    )
+                    for key in merged:
+                        merged[key] += idempotency_stats[key]
 
                 if stats["avg_duration"] > 0:
                     worker_durations.append(stats["avg_duration"])
@@ -851,15 +1657,37 @@ class AgingTestRunner:
                 degradation_percent = stats.get("performance_degradation_percent")
                 if degradation_percent is not None:
                     performance_degradations.append(degradation_percent)
+                for alert in stats.get("degradation_alerts", []):
+                    degradation_alerts.append(dict(alert, worker_id=worker_id))
                     logger.warning(
-                        f"工作线程 {worker.worker_id} 检测到性能劣化: {degradation_percent:.1f}% "
-                        f"(基线: {stats.get('baseline_performance', 0):.3f}s, "
-                        f"当前: {stats.get('current_performance', 0):.3f}s)"
+                        f"工作线程 {worker_id} 性能劣化: {format_alert(alert)}"
                     )
 
         if worker_durations:
             total_stats["avg_duration"] = statistics.mean(worker_durations)
 
+        if self.workers or self._process_snapshots:
+            self.latency_histograms = self._merge_latency_histograms()
+        total_stats["latency_percentiles"] = self.latency_histograms.summary()
+
+        # 客户端资源：各负载进程最近一次采样和持续增长的资源
+        client_leaks = []
+        client_resources = self._client_resources()
+        if client_resources:
+            total_stats["client_resources"] = {
+                name: summary["latest"] for name, summary in client_resources.items()
+            }
+            client_leaks = [
+                dict(trend, process=name)
+                for name, summary in client_resources.items()
+                for trend in summary["leaks"]
+            ]
+            total_stats["client_resource_leaks"] = client_leaks
+            for trend in client_leaks:
+                logger.warning(
+                    f"客户端资源持续增长（{trend['process']}）: {format_trend(trend)}"
+                )
+
         if total_stats["total_operations"] > 0:
             total_stats["success_rate"] = (
                 total_stats["successful_operations"]
@@ -884,9 +1712,22 @@ class AgingTestRunner:
             avg_degradation = statistics.mean(performance_degradations)
             total_stats["performance_degradation_detected"] = True
             total_stats["avg_degradation_percent"] = avg_degradation
+            degradation_alerts.sort(key=lambda alert: -alert["change_percent"])
+            total_stats["degradation_alerts"] = degradation_alerts
             self.performance_degradation_detected = True
-            self.stop_reason = f"检测到性能劣化: 平均{avg_degradation:.1f}%"
-            logger.error(f"检测到性能劣化: 平均{avg_degradation:.1f}%")
+            worst = degradation_alerts[0] if degradation_alerts else None
+            self.stop_reason = (
+                f"检测到性能劣化: {worst['key']} 上升{worst['change_percent']:.1f}%"
+                f"（工作线程 {worst['worker_id']}，自 {worst['started_at']} 起）"
+                if worst
+                else f"检测到性能劣化: 平均{avg_degradation:.1f}%"
+            )
+            if client_leaks:
+                self.stop_reason += (
+                    f"；客户端资源同时持续增长（{client_leaks[0]['series']}），"
+                    "可能是客户端问题"
+                )
+            logger.error(self.stop_reason)
 
         if self.start_time:
             elapsed_minutes = (datetime.now() - self.start_time).total_seconds() / 60
@@ -902,6 +1743,15 @@ class AgingTestRunner:
         self.metrics_history.append(metrics)
         return metrics
 
+    def _merge_latency_histograms(self):
+        """合并所有工作线程（或工作进程上报）的耗时直方图"""
+        merged = HistogramSet()
+        for snapshot in list(self._process_snapshots.values()):
+            merged.merge(HistogramSet.from_dict(snapshot["histograms"]))
+        for worker in list(self.workers):
+            merged.merge(worker.latency_histograms)
+        return merged
+
     def _check_continue_conditions(self):
         """检查是否应该继续测试"""
         # 检查停止条件
@@ -928,6 +1778,7 @@ class AgingTestRunner:
             f"操作数: {m.get('total_operations', 0)}, "
             f"成功率: {m.get('success_rate', 0):.1f}%, "
             f"平均耗时: {m.get('avg_duration', 0):.3f}s, "
+            f"近期吞吐量: {m.get('recent_throughput', 0):.1f}次/秒, "
             f"数据量: {m.get('total_entities', 0)}/{self.config.max_data_count * 10000}"
         )
 
@@ -958,6 +1809,7 @@ class AgingTestRunner:
             if self.metrics_history
             else 0
         )
+        client_resources = self._client_resources()
 
         report = {
             "test_info": {
@@ -965,12 +1817,26 @@ class AgingTestRunner:
                 "end_time": end_time.isoformat(),
                 "total_duration_seconds": total_duration,
                 "total_duration_hours": total_duration / 3600,
+                # 从检查点恢复时为检查点时间，开始时间按已运行时间倒推
+                "resumed_from": self.resumed_from,
                 "config": {
                     "duration_hours": self.config.duration_hours,
                     "concurrent_threads": self.config.concurrent_threads,
                     "operation_interval": self.config.operation_interval,
                     "max_data_count": self.config.max_data_count,
                     "performance_degradation_threshold": self.config.performance_degradation_threshold,
+                    "degradation_baseline_size": self.config.degradation_baseline_size,
+                    "degradation_confidence": self.config.degradation_confidence,
+                    "write_coalesce_window": self.config.write_coalesce_window,
+                    "diff_updates": self.config.diff_updates,
+                    "idempotent_creates": self.config.idempotent_creates,
+                    "validate_payloads": self.config.validate_payloads,
+                    "processes": self.config.processes,
+                    "checkpoint_path": self.config.checkpoint_path,
+                    "resource_sample_interval": self.config.resource_sample_interval,
+                    "tracemalloc_top": self.config.tracemalloc_top,
+                    "resource_count_objects": self.config.resource_count_objects,
+                    "workload": self.config.workload,
                 },
             },
             "summary": {
@@ -985,14 +1851,59 @@ class AgingTestRunner:
                 "total_entities": total_entities,
                 "data_limit_exceeded": self.data_limit_exceeded,
                 "performance_degradation_detected": self.performance_degradation_detected,
+                "degradation_alerts": (
+                    self.metrics_history[-1]["metrics"].get("degradation_alerts", [])
+                    if self.metrics_history
+                    else []
+                ),
                 "stop_reason": self.stop_reason,
+                "latency_percentiles": self.latency_histograms.summary(),
+                "client_resource_leaks": [
+                    dict(trend, process=name)
+                    for name, summary in client_resources.items()
+                    for trend in summary["leaks"]
+                ],
             },
+            "latency_histograms": self.latency_histograms.to_dict(),
+            "client_resources": client_resources,
             "metrics_history": self.metrics_history,
             "analysis": self._analyze_metrics(),
         }
+        if self._sink_paths:
+            report["result_sink"] = self._read_result_sinks()
 
         return report
 
+    def _read_result_sinks(self):
+        """从结果汇读回各操作的汇总和抽样的错误事件（最多 MAX_SINK_ERRORS 条）"""
+        sinks = []
+        opened = []
+        try:
+            for path in self._sink_paths:
+                if self.result_sink is not None and path == self.result_sink.path:
+                    self.result_sink.flush()
+                    sinks.append(self.result_sink)
+                elif os.path.exists(path):
+                    opened.append(open_sink(path))
+                    sinks.append(opened[-1])
+            errors = []
+            for sink in sinks:
+                for event in sink.read_events(success=False):
+                    if len(errors) >= MAX_SINK_ERRORS:
+                        break
+                    errors.append(event)
+            return {
+                "paths": [sink.path for sink in sinks],
+                "summary": summarize(
+                    row for sink in sinks for row in sink.read_aggregates()
+                ),
+                "sampled_errors": errors,
+            }
+        finally:
+            # 只关闭这里为读取打开的结果汇，运行器自己的结果汇由 stop 关闭
+            for sink in opened:
+                sink.close()
+
     def _analyze_metrics(self):
         """分析指标"""
         if not self.metrics_history:
@@ -1074,6 +1985,14 @@ class AgingTestRunner:
                 "检测到性能劣化，建议检查数据库索引、查询优化和服务器资源"
             )
 
+        client_leaks = final_metrics.get("client_resource_leaks", [])
+        if client_leaks:
+            series = sorted({trend["series"] for trend in client_leaks})
+            recommendations.append(
+                f"测试客户端资源持续增长（{', '.join(series)}），耗时劣化可能来自客户端，"
+                "建议先排查未关闭的会话、线程和连接"
+            )
+
         if success_rate < 95:
             recommendations.append("系统稳定性需要提升，建议检查服务器资源和数据库性能")
 
@@ -1119,6 +2038,8 @@ class AgingTestRunner:
             test_info = report.get("test_info", {})
             f.write("测试信息:\n")
             f.write(f"  开始时间: {test_info.get('start_time', 'N/A')}\n")
+            if test_info.get("resumed_from"):
+                f.write(f"  从检查点恢复: {test_info['resumed_from']}\n")
             f.write(f"  结束时间: {test_info.get('end_time', 'N/A')}\n")
             f.write(f"  总时长: {test_info.get('total_duration_hours', 0):.2f} 小时\n")
             f.write(
@@ -1144,6 +2065,59 @@ class AgingTestRunner:
             )
             f.write(f"  停止原因: {summary.get('stop_reason', '正常完成')}\n\n")
 
+            # 劣化的操作
+            alerts = summary.get("degradation_alerts", [])
+            if alerts:
+                f.write("性能劣化的操作:\n")
+                for alert in alerts:
+                    f.write(
+                        f"  工作线程 {alert['worker_id']}: {format_alert(alert)}\n"
+                    )
+                f.write("\n")
+
+            # 耗时分位数
+            percentiles = summary.get("latency_percentiles", {})
+            if percentiles.get(ALL_KEY, {}).get("count"):
+                f.write("耗时分位数（秒）:\n")
+                f.write(
+                    f"  {'操作':<20} {'次数':>8} {'p50':>8} {'p90':>8} "
+                    f"{'p99':>8} {'p99.9':>8} {'最大':>8}\n"
+                )
+                for key, p in percentiles.items():
+                    f.write(
+                        f"  {key:<20} {p['count']:>8} {p['p50']:>8.3f} "
+                        f"{p['p90']:>8.3f} {p['p99']:>8.3f} {p['p99_9']:>8.3f} "
+                        f"{p['max']:>8.3f}\n"
+                    )
+                f.write("\n")
+
+            # 客户端资源
+            resources = report.get("client_resources", {})
+            if resources:
+                f.write("客户端资源:\n")
+                for name, resource in resources.items():
+                    sample = resource.get("latest") or {}
+                    rss = sample.get("rss_bytes")
+                    memory = f"{rss / 1024 / 1024:.1f} MB" if rss is not None else "N/A"
+                    sockets = sample.get("sockets") or {}
+                    sockets = ", ".join(f"{k}={v}" for k, v in sorted(sockets.items()))
+                    f.write(
+                        f"  {name}: 内存 {memory}, "
+                        f"文件描述符 {sample.get('open_fds', 'N/A')}, "
+                        f"线程 {sample.get('threads', 'N/A')}, "
+                        f"套接字 [{sockets}]\n"
+                    )
+                    for trend in resource.get("leaks", []):
+                        f.write(f"    持续增长: {format_trend(trend)}\n")
+                    for allocation in resource.get("top_allocations", [])[:5]:
+                        f.write(
+                            f"    分配增长: {allocation['location']} "
+                            f"{allocation['size_diff_bytes'] / 1024:+.1f} KB\n"
+                        )
+                if not summary.get("client_resource_leaks"):
+                    f.write("  未发现客户端资源持续增长\n")
+                f.write("\n")
+
             # 分析结果
             analysis = report.get("analysis", {})
             trend = analysis.get("trend_analysis", {})
@@ -1172,7 +2146,14 @@ class AgingTestRunner:
         """停止测试"""
         logger.info("停止老化测试")
         self.stop_event.set()
+        if self._process_group is not None:
+            # 等待工作进程退出并接收最终统计
+            self._stop_worker_processes()
+        if self.workers or self._process_snapshots:
+            self.latency_histograms = self._merge_latency_histograms()
         self._stop_workers()
+        if self.result_sink is not None:
+            self.result_sink.flush()
 
 
 def main():
@@ -1203,6 +2184,91 @@ def main():
         "--report-interval", type=int, default=30, help="报告生成间隔（分钟），默认30"
     )
 
+    parser.add_argument(
+        "--write-coalesce-window",
+        type=float,
+        default=0.0,
+        help="更新合并窗口（秒），同一实体窗口内的多次更新合并为一次PUT，默认0（关闭）",
+    )
+
+    parser.add_argument(
+        "--diff-updates",
+        action="store_true",
+        help="差量更新：只发送变化的字段，无变化时跳过请求",
+    )
+
+    parser.add_argument(
+        "--idempotent-creates",
+        action="store_true",
+        help="幂等创建：创建重试携带幂等键并先查询确认，避免重复数据，默认读取配置",
+    )
+
+    parser.add_argument(
+        "--validate-payloads",
+        action="store_true",
+        help="发送前本地校验创建/更新参数，不合法的请求不发送，默认读取配置",
+    )
+
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="工作进程数，大于1时并发线程分配到多个进程运行（绕开GIL），默认读取配置",
+    )
+
+    parser.add_argument(
+        "--listen",
+        default=None,
+        help=(
+            "分布式模式：协调器监听地址 主机:端口，工作线程分配到连接的负载代理；"
+            "监听非本机地址时需设置环境变量 VMI_CLUSTER_TOKEN"
+        ),
+    )
+    parser.add_argument(
+        "--agents", type=int, default=1, help="分布式模式等待连接的负载代理数，默认1"
+    )
+
+    parser.add_argument(
+        "--result-sink",
+        default=None,
+        help="结果汇文件（.jsonl/.csv/.db），按秒聚合写入每次操作的结果，默认读取配置",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="检查点文件（SQLite），每个报告间隔保存指标历史和工作线程状态，默认读取配置",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从检查点继续运行（保留已创建的数据、统计和性能基线）",
+    )
+
+    parser.add_argument(
+        "--metrics-address",
+        default=None,
+        help="实时指标端点监听地址 主机:端口（Prometheus 格式，GET /metrics），默认读取配置",
+    )
+
+    parser.add_argument(
+        "--resource-interval",
+        type=float,
+        default=None,
+        help="客户端资源采样间隔（秒），0表示关闭，默认读取配置",
+    )
+    parser.add_argument(
+        "--tracemalloc-top",
+        type=int,
+        default=None,
+        help="启用tracemalloc并报告增长最多的分配位置数（开销较大），默认读取配置",
+    )
+    parser.add_argument(
+        "--count-objects",
+        action="store_true",
+        help="资源采样时遍历整个堆统计对象数（开销较大），默认读取配置",
+    )
+
     args = parser.parse_args()
 
     config = AgingTestConfig()
@@ -1212,8 +2278,35 @@ def main():
     config.max_data_count = args.max_data
     config.performance_degradation_threshold = args.degradation_threshold
     config.report_interval_minutes = args.report_interval
+    config.write_coalesce_window = args.write_coalesce_window
+    config.diff_updates = args.diff_updates or config.diff_updates
+    config.idempotent_creates = args.idempotent_creates or config.idempotent_creates
+    config.validate_payloads = args.validate_payloads or config.validate_payloads
+    if args.processes is not None:
+        config.processes = args.processes
+    if args.result_sink is not None:
+        config.result_sink = args.result_sink
+    if args.checkpoint is not None:
+        config.checkpoint_path = args.checkpoint
+    if args.metrics_address is not None:
+        config.metrics_address = args.metrics_address
+    if args.resource_interval is not None:
+        config.resource_sample_interval = args.resource_interval
+    if args.tracemalloc_top is not None:
+        config.tracemalloc_top = args.tracemalloc_top
+    config.resource_count_objects = (
+        args.count_objects or config.resource_count_objects
+    )
+
+    if args.listen:
+        from load_cluster import LoadCoordinator, parse_address
+
+        host, port = parse_address(args.listen)
+        with LoadCoordinator(args.agents, host, port) as coordinator:
+            AgingTestRunner(config, coordinator, resume=args.resume).run()
+        return
 
-    runner = AgingTestRunner(config)
+    runner = AgingTestRunner(config, resume=args.resume)
     runner.run()
 
 
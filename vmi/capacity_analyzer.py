@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+容量分析 - 按负载曲线逐级施压，自动找出吞吐量拐点和最大可持续速率
+
+每级开环测试得到一个点（目标速率、实际吞吐量、响应时间分位数、错误率）。服务未
+饱和时吞吐量随目标速率线性增长、延迟基本不变；越过拐点（knee）后吞吐量不再增长，
+排队使延迟快速上升。从低到高检查每一级，第一个出现以下任一情况的级即为拐点：
+- 错误率超过 max_error_rate
+- 实际吞吐量低于目标速率的 min_efficiency
+- p99 超过基线（第一级）p99 的 latency_factor 倍（且超过 latency_floor）
+- 相对上一级，吞吐量增量不到速率增量的 min_scaling，同时 p99 上升
+
+拐点之前健康级的最大吞吐量即为最大可持续速率（RPS）。
+
+使用示例：
+    python capacity_analyzer.py --profile stairs --start-rate 5 --step-rate 5 \\
+        --step-count 10 --step-duration 30 --operations store product
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def step_metrics(result) -> Dict[str, Any]:
+    """从一级开环测试结果（ConcurrentTestResult）中提取容量分析需要的指标"""
+    percentiles = result.latency_percentiles
+    attempted = result.total_requests
+    return {
+        "test_name": result.test_name,
+        "offered_rate": result.target_rate,
+        "throughput": result.throughput,
+        "p50": percentiles["p50"],
+        "p99": percentiles["p99"],
+        "error_rate": (
+            (
+                result.failed_requests
+                + result.dropped_requests
+                + result.timed_out_requests
+            )
+            / attempted
+            if attempted
+            else 0.0
+        ),
+        "total_requests": attempted,
+    }
+
+
+def find_saturation_point(
+    steps: Sequence[Dict[str, Any]],
+    min_efficiency: float = 0.9,
+    latency_factor: float = 3.0,
+    latency_floor: float = 0.05,
+    max_error_rate: float = 0.01,
+    min_scaling: float = 0.5,
+) -> Dict[str, Any]:
+    """找出吞吐量拐点和最大可持续速率
+
+    Args:
+        steps: 各级指标（step_metrics 的结果），按目标速率从低到高分析
+        min_efficiency: 实际吞吐量至少达到目标速率的比例
+        latency_factor: p99 相对基线 p99 的最大倍数
+        latency_floor: p99 低于该值（秒）时不判定为延迟上升
+        max_error_rate: 最大错误率（失败和丢弃）
+        min_scaling: 吞吐量增量与速率增量之比的最小值
+
+    Returns:
+        分析结果：max_sustainable_rps、saturated、knee（拐点的级，未饱和时为
+        None）以及带 healthy/reasons 标记的各级指标
+    """
+    ordered = sorted(
+        (dict(step) for step in steps if step["total_requests"] > 0),
+        key=lambda step: step["offered_rate"],
+    )
+    if not ordered:
+        return {
+            "max_sustainable_rps": 0.0,
+            "saturated": False,
+            "knee": None,
+            "steps": [],
+        }
+
+    baseline_p99 = ordered[0]["p99"]
+    latency_limit = max(baseline_p99 * latency_factor, latency_floor)
+    knee = None
+    previous = None
+    max_sustainable = 0.0
+
+    for step in ordered:
+        reasons = []
+        if knee is not None:
+            reasons.append("超过拐点")
+        else:
+            if step["error_rate"] > max_error_rate:
+                reasons.append(f"错误率 {step['error_rate'] * 100:.1f}%")
+            if step["throughput"] < step["offered_rate"] * min_efficiency:
+                reasons.append(
+                    f"吞吐量 {step['throughput']:.1f} 低于目标速率 "
+                    f"{step['offered_rate']:g} 的 {min_efficiency * 100:.0f}%"
+                )
+            if step["p99"] > latency_limit:
+                reasons.append(
+                    f"p99 {step['p99'] * 1000:.1f}ms 超过 {latency_limit * 1000:.1f}ms"
+                )
+            if previous is not None:
+                offered_delta = step["offered_rate"] - previous["offered_rate"]
+                gain = step["throughput"] - previous["throughput"]
+                if (
+                    offered_delta > 0
+                    and gain < offered_delta * min_scaling
+                    and step["p99"] > previous["p99"]
+                ):
+                    reasons.append(
+                        f"吞吐量只增加 {gain:.1f}（速率增加 {offered_delta:g}），"
+                        f"p99 上升"
+                    )
+
+        step["healthy"] = not reasons
+        step["reasons"] = reasons
+        if reasons and knee is None:
+            knee = step
+        if step["healthy"]:
+            max_sustainable = max(max_sustainable, step["throughput"])
+            previous = step
+
+    return {
+        "max_sustainable_rps": max_sustainable,
+        "saturated": knee is not None,
+        "knee": knee,
+        "steps": ordered,
+    }
+
+
+def analyze_results(results: Sequence[Any], **thresholds: Any) -> Dict[str, Any]:
+    """分析 ConcurrentTestRunner.run_load_profile 的各级结果，参数同 find_saturation_point"""
+    return find_saturation_point([step_metrics(r) for r in results], **thresholds)
+
+
+def measure_capacity(
+    runner,
+    operations: Dict[str, Callable],
+    steps: Sequence[Tuple[float, float]],
+    thresholds: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """对每个操作按负载曲线施压并分析容量
+
+    Args:
+        runner: 并发测试运行器（concurrent_test_v2.ConcurrentTestRunner）
+        operations: {操作名: 测试函数}
+        steps: 分级速率 [(速率, 持续时间), ...]
+        thresholds: 传递给 find_saturation_point 的判定阈值
+        **kwargs: 传递给 run_load_profile 的参数
+
+    Returns:
+        容量报告：capacity_info 和每个操作的分析结果
+    """
+    report: Dict[str, Any] = {
+        "capacity_info": {
+            "steps": [list(step) for step in steps],
+            "max_workers": runner.max_workers,
+            "thresholds": thresholds or {},
+            "started_at": datetime.now().isoformat(),
+        },
+        "operations": {},
+    }
+    for name, test_func in operations.items():
+        logger.info(f"开始容量测试: {name}")
+        results = runner.run_load_profile(
+            test_func, f"capacity_{name}", steps, **kwargs
+        )
+        analysis = analyze_results(results, **(thresholds or {}))
+        report["operations"][name] = analysis
+        logger.info(
+            f"容量测试 {name}: 最大可持续速率 "
+            f"{analysis['max_sustainable_rps']:.1f} 请求/秒"
+            + (
+                f"，拐点 {analysis['knee']['offered_rate']:g} 请求/秒"
+                if analysis["saturated"]
+                else "，未达到拐点"
+            )
+        )
+    report["capacity_info"]["finished_at"] = datetime.now().isoformat()
+    return report
+
+
+def save_report(report: Dict[str, Any], prefix: str = "capacity_report") -> str:
+    """保存 JSON 报告和文本容量表，返回 JSON 文件名"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"{prefix}_{timestamp}.json"
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"容量报告已保存到: {report_file}")
+
+    summary_file = f"{prefix}_{timestamp}.txt"
+    with open(summary_file, "w", encoding="utf-8") as f:
+        f.write(format_capacity(report))
+    logger.info(f"容量表已保存到: {summary_file}")
+    return report_file
+
+
+def format_capacity(report: Dict[str, Any]) -> str:
+    """把容量报告格式化为文本表格"""
+    lines = ["=" * 60, "容量测试报告", "=" * 60]
+    for name, analysis in report["operations"].items():
+        knee = analysis["knee"]
+        lines.append(
+            f"{name}: 最大可持续速率 {analysis['max_sustainable_rps']:.1f} 请求/秒"
+            + (f"，拐点 {knee['offered_rate']:g} 请求/秒" if knee else "，未达到拐点")
+        )
+        lines.append(
+            f"  {'目标速率':>8} {'实际吞吐':>8} {'p50(ms)':>9} {'p99(ms)':>9} "
+            f"{'错误率':>6}  判定"
+        )
+        for step in analysis["steps"]:
+            verdict = "正常" if step["healthy"] else "; ".join(step["reasons"])
+            lines.append(
+                f"  {step['offered_rate']:>12g} {step['throughput']:>12.1f} "
+                f"{step['p50'] * 1000:>9.1f} {step['p99'] * 1000:>9.1f} "
+                f"{step['error_rate'] * 100:>8.1f}%  {verdict}"
+            )
+        lines.append("")
+    lines.append("=" * 60)
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    from concurrent_test_v2 import ConcurrentTestFactory, ConcurrentTestRunner
+    from load_schedule import LOAD_PROFILES, RAMP, SOAK, SPIKE, build_profile
+
+    operation_factories = {
+        "store": ConcurrentTestFactory.create_store_creation_test,
+        "product": ConcurrentTestFactory.create_product_creation_test,
+        "warehouse": ConcurrentTestFactory.create_warehouse_creation_test,
+        "mixed": ConcurrentTestFactory.create_mixed_operation_test,
+    }
+
+    parser = argparse.ArgumentParser(
+        description="容量测试：按负载曲线找出最大可持续速率"
+    )
+    parser.add_argument(
+        "--profile", choices=LOAD_PROFILES, default="stairs", help="负载曲线"
+    )
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=sorted(operation_factories),
+        default=["store", "product", "warehouse"],
+        help="测试的操作",
+    )
+    parser.add_argument("--start-rate", type=float, default=5.0, help="起始速率（次/秒）")
+    parser.add_argument(
+        "--rate", type=float, default=50.0, help="最高/突发/浸泡速率（次/秒）"
+    )
+    parser.add_argument(
+        "--step-rate", type=float, default=5.0, help="阶梯每级增加的速率（次/秒）"
+    )
+    parser.add_argument("--step-count", type=int, default=10, help="级数")
+    parser.add_argument(
+        "--step-duration", type=float, default=30.0, help="每级持续时间（秒）"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=600.0, help="突发/浸泡总时长（秒）"
+    )
+    parser.add_argument("--workers", type=int, default=50, help="工作线程数（会话数）")
+    parser.add_argument(
+        "--min-rps",
+        type=float,
+        default=None,
+        help="最大可持续速率低于该值时返回非零退出码（用于发布检查）",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if args.profile == RAMP:
+        steps = build_profile(
+            RAMP,
+            start_rate=args.start_rate,
+            end_rate=args.rate,
+            duration=args.step_duration * args.step_count,
+            step_count=args.step_count,
+        )
+    elif args.profile == SPIKE:
+        steps = build_profile(
+            SPIKE,
+            base_rate=args.start_rate,
+            spike_rate=args.rate,
+            duration=args.duration,
+            spike_duration=args.step_duration,
+        )
+    elif args.profile == SOAK:
+        steps = build_profile(
+            SOAK, rate=args.rate, duration=args.duration, window=args.step_duration
+        )
+    else:
+        steps = build_profile(
+            args.profile,
+            start_rate=args.start_rate,
+            step_rate=args.step_rate,
+            step_count=args.step_count,
+            step_duration=args.step_duration,
+        )
+
+    runner = ConcurrentTestRunner(max_workers=args.workers)
+    operations = {name: operation_factories[name]() for name in args.operations}
+    report = measure_capacity(runner, operations, steps)
+    save_report(report)
+    print(format_capacity(report))
+
+    if args.min_rps is not None:
+        below = [
+            name
+            for name, analysis in report["operations"].items()
+            if analysis["max_sustainable_rps"] < args.min_rps
+        ]
+        if below:
+            logger.error(f"最大可持续速率低于 {args.min_rps:g}: {', '.join(below)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+检查点存储 - 把长时间运行的老化测试状态定期保存到 SQLite，进程被杀或崩溃后从最近
+一次检查点继续运行
+
+保存的内容：
+- run_state：运行级状态（键值，值为 JSON），如已运行时间、配置、检查点时间
+- metrics_history：AgingTestRunner.metrics_history，每次保存只追加新增的记录
+- worker_state：各工作线程的状态（AgingTestWorker.checkpoint），包括实体缓存、
+  计数、耗时直方图和劣化检测基线，恢复后不需要重新创建数据和建立基线
+
+每次保存在一个事务中完成，崩溃时数据库保持上一次完整的检查点。
+
+使用示例：
+    store = CheckpointStore("aging_checkpoint.db")
+    store.save({"elapsed_seconds": 3600}, metrics_history, worker_states)
+    checkpoint = CheckpointStore("aging_checkpoint.db").load()
+    checkpoint["run"]["elapsed_seconds"]
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """SQLite 检查点存储（不加锁，由运行器线程使用）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS run_state (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS metrics_history (
+                seq INTEGER PRIMARY KEY, timestamp TEXT, elapsed_minutes REAL,
+                metrics TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS worker_state (
+                worker_id INTEGER PRIMARY KEY, updated_at TEXT, state TEXT NOT NULL
+            );
+            """
+        )
+
+    def has_checkpoint(self) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM run_state WHERE key = 'checkpointed_at'"
+        ).fetchone()
+        return row is not None
+
+    def save(
+        self,
+        run_state: Dict[str, Any],
+        metrics_history: List[Dict[str, Any]],
+        worker_states: List[Dict[str, Any]],
+    ) -> bool:
+        """保存检查点
+
+        Args:
+            run_state: 运行级状态（值可以 JSON 序列化）
+            metrics_history: 完整的指标历史，只写入尚未保存的记录
+            worker_states: 各工作线程的状态，需要包含 worker_id
+
+        Returns:
+            是否保存成功（失败时记录日志，不中断测试）
+        """
+        now = datetime.now().isoformat()
+        try:
+            with self._conn:
+                saved = self._conn.execute(
+                    "SELECT COUNT(*) FROM metrics_history"
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO metrics_history VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            seq,
+                            metrics.get("timestamp"),
+                            metrics.get("elapsed_minutes"),
+                            json.dumps(metrics, ensure_ascii=False),
+                        )
+                        for seq, metrics in enumerate(metrics_history)
+                        if seq >= saved
+                    ],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO worker_state VALUES (?, ?, ?)",
+                    [
+                        (state["worker_id"], now, json.dumps(state, ensure_ascii=False))
+                        for state in worker_states
+                    ],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO run_state VALUES (?, ?)",
+                    [
+                        (key, json.dumps(value, ensure_ascii=False))
+                        for key, value in dict(run_state, checkpointed_at=now).items()
+                    ],
+                )
+            return True
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"保存检查点失败: {self.path} - {e}")
+            return False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """读取最近一次检查点，没有检查点时返回 None
+
+        Returns:
+            {"run": 运行级状态, "metrics_history": [...], "workers": [...]}
+        """
+        if not self.has_checkpoint():
+            return None
+        run = {
+            key: json.loads(value)
+            for key, value in self._conn.execute("SELECT key, value FROM run_state")
+        }
+        metrics_history = [
+            json.loads(metrics)
+            for (metrics,) in self._conn.execute(
+                "SELECT metrics FROM metrics_history ORDER BY seq"
+            )
+        ]
+        workers = [
+            json.loads(state)
+            for (state,) in self._conn.execute(
+                "SELECT state FROM worker_state ORDER BY worker_id"
+            )
+        ]
+        return {"run": run, "metrics_history": metrics_history, "workers": workers}
+
+    def close(self):
+        self._conn.close()
@@ -5,15 +5,29 @@
 """
 
 import concurrent.futures
+import itertools
 import json
 import logging
+import os
 import random
 import threading
 import time
 import unittest
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from latency_histogram import LatencyHistogram
+from load_cluster import reference_of, resolve_reference
+from load_processes import ERROR, LoadProcessGroup
+from load_schedule import CONSTANT, POISSON, STEPPED, build_arrivals
+from metrics_endpoint import (
+    DEFAULT_METRICS_PORT,
+    MetricsServer,
+    MetricsWriter,
+    RequestMetrics,
+)
+from result_sink import open_sink, process_sink_path
 
 # 配置日志
 logging.basicConfig(
@@ -21,6 +35,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每个测试结果保留的错误详情上限，其余错误只计数（完整的抽样错误见结果汇）
+MAX_ERROR_DETAILS = 1000
+
 
 @dataclass
 class ConcurrentTestResult:
@@ -36,112 +53,175 @@ class ConcurrentTestResult:
     max_response_time: float
     throughput: float
     error_details: List[Dict[str, Any]]
+    # 会话池登录耗时，不计入响应时间和总时间
+    session_setup_time: float = 0.0
+    # closed_loop 或 open_loop；开环测试的响应时间从计划发送时间开始计算
+    mode: str = "closed_loop"
+    target_rate: float = 0.0
+    # 开环测试：未发送（积压超过上限或超时取消）和晚于计划时间开始执行的请求数
+    dropped_requests: int = 0
+    late_requests: int = 0
+    # 开环测试：等待超时时仍在执行的请求数，它们之后的结果不计入本次测试
+    timed_out_requests: int = 0
+    # 开环测试：测试函数本身的平均耗时（不含排队）和最大发送延迟
+    avg_service_time: float = 0.0
+    max_send_lag: float = 0.0
+    # 多进程测试的负载进程数
+    processes: int = 1
+    # 虚拟用户测试的并发用户数
+    virtual_users: int = 0
+    # 成功请求的响应时间直方图（开环测试为修正后的响应时间）
+    latency_histogram: LatencyHistogram = field(
+        default_factory=LatencyHistogram, repr=False
+    )
     timestamp: Optional[str] = None
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now().isoformat()
 
+    @property
+    def latency_percentiles(self) -> Dict[str, Any]:
+        """响应时间分位数 p50/p90/p99/p99.9（秒）"""
+        return self.latency_histogram.summary()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可以 pickle/JSON 序列化的字典（直方图序列化）"""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["latency_histogram"] = self.latency_histogram.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConcurrentTestResult":
+        data = dict(data)
+        data["latency_histogram"] = LatencyHistogram.from_dict(
+            data["latency_histogram"]
+        )
+        return cls(**data)
+
 
 class ConcurrentTestRunner:
     """基于会话管理器的并发测试运行器"""
 
-    def __init__(self, max_workers: int = 10):
+    def __init__(
+        self,
+        max_workers: int = 10,
+        session_pool=None,
+        session_pool_factory: Optional[Callable[[int], Any]] = None,
+        result_listener: Optional[Callable[[bool, float], None]] = None,
+        result_sink=None,
+    ):
+        """初始化并发测试运行器
+
+        Args:
+            max_workers: 工作线程数（多进程测试中为每个进程的工作线程数）
+            session_pool: 外部管理的会话池（session_pool.SessionPool），
+                默认每次测试按配置创建一个与工作线程数相同大小的会话池
+            session_pool_factory: 创建并登录会话池的函数 factory(size) 或其引用
+                "模块:函数"，代替按配置创建；多进程/分布式测试中在每个进程内调用
+            result_listener: 每个请求完成时的回调 listener(成功与否, 响应时间)
+            result_sink: 结果汇（result_sink.ResultSink），每个请求的结果按测试名称
+                写入，报告中的 result_sink 部分从中读回；由调用方关闭
+        """
         self.max_workers = max_workers
         self.results_lock = threading.Lock()
         self.results: List[ConcurrentTestResult] = []
-        self.session_managers = {}  # 线程ID -> 会话管理器映射
-
-    def _get_session_manager_for_thread(self, thread_id: int):
-        """为线程获取或创建会话管理器"""
-        if thread_id not in self.session_managers:
-            try:
-                from config_helper import get_credentials, get_server_url
-                from session_manager import SessionManager
-
-                server_url = get_server_url()
-                credentials = get_credentials()
-
-                # 为每个线程创建独立的会话管理器实例（不使用全局单例）
-                session_mgr = SessionManager(
-                    server_url=server_url,
-                    namespace="autotest",
-                    username=credentials["username"],
-                    password=credentials["password"],
-                    refresh_interval=540,
-                    session_timeout=1800,
-                )
-
-                # 添加超时处理
-                import threading
-                from queue import Queue
-
-                result_queue = Queue()
-
-                def create_session_with_timeout():
-                    try:
-                        success = session_mgr.create_session()
-                        result_queue.put((success, None))
-                    except Exception as e:
-                        result_queue.put((False, e))
-
-                # 在单独线程中创建会话，避免阻塞
-                session_thread = threading.Thread(target=create_session_with_timeout)
-                session_thread.daemon = True
-                session_thread.start()
-                session_thread.join(timeout=10)  # 10秒超时
-
-                if session_thread.is_alive():
-                    logger.error(f"线程 {thread_id}: 创建会话超时 - 服务器可能不可用")
-                    return None
-
-                success, error = result_queue.get()
-
-                if not success:
-                    error_msg = f"创建会话失败: {error}" if error else "创建会话失败"
-                    logger.error(f"线程 {thread_id}: {error_msg}")
-                    return None
-
-                session_mgr.start_auto_refresh()
-                self.session_managers[thread_id] = session_mgr
-                logger.info(f"线程 {thread_id}: 会话管理器创建成功")
-
-            except Exception as e:
-                logger.error(f"线程 {thread_id}: 创建会话管理器失败 - {e}")
-                return None
-
-        return self.session_managers[thread_id]
+        self.session_pool = session_pool
+        self.session_pool_factory = session_pool_factory
+        self.result_listener = result_listener
+        self.result_sink = result_sink
+        # 多进程测试运行中实时合并的统计
+        self._live_lock = threading.Lock()
+        self._live: Dict[str, Any] = {}
+        # 实时指标（指标端点）：按测试名称的请求计数、耗时直方图和进行中的请求数，
+        # 多进程测试合并各进程上报的增量
+        self.request_metrics = RequestMetrics()
+        self.metrics_server: Optional[MetricsServer] = None
+        # 本运行器创建、尚未关闭的会话池，以及已关闭会话池的登录/刷新次数
+        self._pool_lock = threading.Lock()
+        self._session_pools: List[Any] = []
+        self._closed_pool_auth = {"logins": 0, "refreshes": 0}
+        # 运行中的虚拟用户测试：(测试名称, 引擎)
+        self._virtual_user_test: Optional[Tuple[str, Any]] = None
+        # 上一次开环测试超时时仍在执行的请求（占用共享会话池的会话）
+        self._unfinished_requests: List[concurrent.futures.Future] = []
+
+    def _create_session_pool(self, size: int):
+        """按配置创建并登录会话池（并行登录）"""
+        if self.session_pool_factory is not None:
+            pool = resolve_reference(self.session_pool_factory)(size)
+            with self._pool_lock:
+                self._session_pools.append(pool)
+            return pool
+
+        from config_helper import get_credentials, get_server_url
+        from session_pool import SessionPool
+
+        credentials = get_credentials()
+        pool = SessionPool(
+            server_url=get_server_url(),
+            namespace="autotest",
+            username=credentials["username"],
+            password=credentials["password"],
+            size=size,
+            refresh_interval=540,
+            session_timeout=1800,
+            login_timeout=10,
+        )
+        pool.start()
+        with self._pool_lock:
+            self._session_pools.append(pool)
+        return pool
+
+    def _close_session_pool(self, pool):
+        """关闭本运行器创建的会话池，登录/刷新次数计入已关闭会话池的累计值"""
+        pool.close()
+        get_auth_stats = getattr(pool, "get_auth_stats", None)
+        with self._pool_lock:
+            if pool not in self._session_pools:
+                return
+            self._session_pools.remove(pool)
+            if get_auth_stats is not None:
+                stats = get_auth_stats()
+                for key in self._closed_pool_auth:
+                    self._closed_pool_auth[key] += stats[key]
+
+    def _close_session_pool_after(self, pool, futures):
+        """请求全部结束后关闭会话池；仍在执行的请求结束时在其线程中关闭"""
+        remaining = [future for future in futures if not future.done()]
+        if not remaining:
+            self._close_session_pool(pool)
+            return
+
+        lock = threading.Lock()
+        count = [len(remaining)]
+
+        def on_done(_):
+            with lock:
+                count[0] -= 1
+                last = count[0] == 0
+            if last:
+                self._close_session_pool(pool)
+
+        for future in remaining:
+            future.add_done_callback(on_done)
+
+    def _wait_unfinished_requests(self, timeout: float) -> bool:
+        """等待上一次开环测试超时时仍在执行的请求结束，避免其占用共享会话池
 
-    def _cleanup_session_managers(self):
-        """清理所有会话管理器"""
-        import threading
-        
-        def cleanup_single_manager(thread_id, session_mgr):
-            """清理单个会话管理器"""
-            try:
-                # 设置超时，避免无限等待
-                session_mgr.stop_auto_refresh()
-                session_mgr.close_session()
-                logger.info(f"线程 {thread_id}: 会话管理器清理完成")
-            except Exception as e:
-                logger.error(f"线程 {thread_id}: 清理会话管理器失败 - {e}")
-        
-        # 并行清理所有会话管理器
-        cleanup_threads = []
-        for thread_id, session_mgr in self.session_managers.items():
-            thread = threading.Thread(
-                target=cleanup_single_manager,
-                args=(thread_id, session_mgr),
-                daemon=True
-            )
-            thread.start()
-            cleanup_threads.append(thread)
-        
-        # 等待所有清理线程完成（最多5秒）
-        for thread in cleanup_threads:
-            thread.join(timeout=5)
-        
-        self.session_managers.clear()
+        Returns:
+            全部结束返回 True，超时返回 False（未结束的请求继续保留）
+        """
+        pending = self._unfinished_requests
+        if not pending:
+            return True
+        logger.info(f"等待上一次测试仍在执行的 {len(pending)} 个请求结束")
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        self._unfinished_requests = list(not_done)
+        if not_done:
+            logger.warning(f"仍有 {len(not_done)} 个请求未结束，继续占用会话")
+            return False
+        return True
 
     def run_concurrent_test(
         self, test_func: Callable, test_name: str, num_requests: int, **kwargs
@@ -157,43 +237,56 @@ class ConcurrentTestRunner:
         Returns:
             测试结果
         """
-        start_time = time.time()
         successful_requests = 0
         failed_requests = 0
-        response_times = []
         error_details = []
+        histogram = LatencyHistogram()
+
+        # 测试开始前并行登录，登录耗时不计入响应时间
+        pool = self.session_pool
+        if pool is None:
+            pool = self._create_session_pool(min(self.max_workers, num_requests))
+        session_setup_time = pool.get_stats()["startup_time"]
+
+        start_time = time.time()
 
         def worker(worker_id: int):
             nonlocal successful_requests, failed_requests
             worker_start = time.time()
+            session_mgr = None
+            self.request_metrics.started(test_name)
 
             try:
-                # 获取会话管理器
-                session_mgr = self._get_session_manager_for_thread(worker_id)
+                # 借用已登录的会话
+                session_mgr = pool.checkout(timeout=10)
                 if not session_mgr:
                     raise Exception("无法获取会话管理器")
 
-                # 执行测试函数
+                # 只统计测试函数本身的耗时
+                worker_start = time.time()
                 test_func(worker_id=worker_id, session_manager=session_mgr, **kwargs)
                 worker_end = time.time()
 
                 with self.results_lock:
                     successful_requests += 1
-                    response_times.append(worker_end - worker_start)
+                histogram.record(worker_end - worker_start)
+                self._notify(True, worker_end - worker_start, test_name, worker_id)
 
             except Exception as e:
                 worker_end = time.time()
                 with self.results_lock:
                     failed_requests += 1
-                    error_details.append(
-                        {
-                            "worker_id": worker_id,
-                            "error": str(e),
-                            "timestamp": datetime.now().isoformat(),
-                            "response_time": worker_end - worker_start,
-                        }
+                    self._add_error_detail(
+                        error_details, worker_id, e, worker_end - worker_start
                     )
+                self._notify(
+                    False, worker_end - worker_start, test_name, worker_id, str(e)
+                )
                 logger.error(f"线程 {worker_id}: 测试失败 - {e}")
+            finally:
+                if session_mgr:
+                    pool.checkin(session_mgr)
+                self.request_metrics.finished(test_name)
 
         logger.info(
             f"开始并发测试: {test_name}, 请求数: {num_requests}, 工作线程: {self.max_workers}"
@@ -214,19 +307,13 @@ class ConcurrentTestRunner:
                         if not future.done():
                             future.cancel()
         finally:
-            # 清理会话管理器
-            self._cleanup_session_managers()
+            # 外部传入的会话池由调用方关闭
+            if pool is not self.session_pool:
+                self._close_session_pool(pool)
 
         end_time = time.time()
         total_time = end_time - start_time
 
-        if response_times:
-            avg_response_time = sum(response_times) / len(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-        else:
-            avg_response_time = min_response_time = max_response_time = 0
-
         throughput = successful_requests / total_time if total_time > 0 else 0
 
         result = ConcurrentTestResult(
@@ -235,11 +322,13 @@ class ConcurrentTestRunner:
             successful_requests=successful_requests,
             failed_requests=failed_requests,
             total_time=total_time,
-            avg_response_time=avg_response_time,
-            min_response_time=min_response_time,
-            max_response_time=max_response_time,
+            avg_response_time=histogram.mean,
+            min_response_time=histogram.min,
+            max_response_time=histogram.max,
             throughput=throughput,
             error_details=error_details,
+            session_setup_time=session_setup_time,
+            latency_histogram=histogram,
         )
 
         self.results.append(result)
@@ -249,6 +338,789 @@ class ConcurrentTestRunner:
 
         return result
 
+    def run_open_loop_test(
+        self,
+        test_func: Callable,
+        test_name: str,
+        rate: Optional[float] = None,
+        duration: Optional[float] = None,
+        arrival: str = CONSTANT,
+        steps: Optional[Sequence[Tuple[float, float]]] = None,
+        seed: Optional[int] = None,
+        late_threshold: float = 0.01,
+        max_outstanding: Optional[int] = None,
+        timeout: float = 30,
+        **kwargs,
+    ) -> ConcurrentTestResult:
+        """运行开环（固定到达速率）并发测试
+
+        按到达时间表在计划时间发送请求，不等待之前的请求完成；响应时间从计划发送
+        时间开始计算，线程池排队时间也计入，修正协调遗漏。
+
+        Args:
+            test_func: 测试函数，接受worker_id参数
+            test_name: 测试名称
+            rate: 到达速率（次/秒，constant、poisson 使用）
+            duration: 持续时间（秒，constant、poisson 使用）
+            arrival: 到达方式，constant、poisson 或 stepped
+            steps: 分级速率 [(速率, 持续时间), ...]（stepped 使用）
+            seed: 泊松到达的随机种子
+            late_threshold: 开始执行晚于计划时间超过该值（秒）的请求计为延迟发送
+            max_outstanding: 已发送未完成的请求上限，超过时丢弃新请求，
+                默认工作线程数的 10 倍
+            timeout: 最后一个请求发送后等待完成的时间（秒），超时未开始的请求计为丢弃，
+                仍在执行的请求计为超时，结果不再计入；测试自建的会话池在这些请求结束
+                后关闭
+            **kwargs: 传递给测试函数的额外参数
+
+        Returns:
+            测试结果
+        """
+        arrivals = build_arrivals(arrival, rate, duration, steps, seed)
+        if max_outstanding is None:
+            max_outstanding = self.max_workers * 10
+        target_rate = len(arrivals) / arrivals[-1] if len(arrivals) > 1 else 0.0
+        if rate is not None and arrival != STEPPED:
+            target_rate = rate
+
+        successful_requests = 0
+        failed_requests = 0
+        dropped_requests = 0
+        late_requests = 0
+        timed_out_requests = 0
+        outstanding = 0
+        # 等待超时后置位，之后结束的请求不再计入结果
+        finished = False
+        max_send_lag = 0.0
+        service_time_sum = 0.0
+        error_details = []
+        histogram = LatencyHistogram()
+
+        pool = self.session_pool
+        if pool is None:
+            pool = self._create_session_pool(self.max_workers)
+        session_setup_time = pool.get_stats()["startup_time"]
+
+        def worker(worker_id: int, intended_time: float):
+            nonlocal successful_requests, failed_requests, late_requests
+            nonlocal outstanding, max_send_lag, service_time_sum
+            send_lag = time.time() - intended_time
+            session_mgr = None
+            service_start = time.time()
+            error = None
+            self.request_metrics.started(test_name)
+
+            try:
+                session_mgr = pool.checkout(timeout=10)
+                if not session_mgr:
+                    raise Exception("无法获取会话管理器")
+
+                service_start = time.time()
+                test_func(worker_id=worker_id, session_manager=session_mgr, **kwargs)
+            except Exception as e:
+                error = e
+                logger.error(f"请求 {worker_id}: 测试失败 - {e}")
+            finally:
+                end = time.time()
+                if session_mgr:
+                    pool.checkin(session_mgr)
+                self.request_metrics.finished(test_name)
+
+            # 统计一次完成，等待超时后结束的请求已计为超时，不再计入
+            with self.results_lock:
+                if finished:
+                    return
+                outstanding -= 1
+                max_send_lag = max(max_send_lag, send_lag)
+                if send_lag > late_threshold:
+                    late_requests += 1
+                if error is None:
+                    successful_requests += 1
+                    service_time_sum += end - service_start
+                else:
+                    failed_requests += 1
+                    self._add_error_detail(
+                        error_details, worker_id, error, end - intended_time
+                    )
+            if error is None:
+                histogram.record(end - intended_time)
+                self._notify(True, end - intended_time, test_name, worker_id)
+            else:
+                self._notify(
+                    False, end - intended_time, test_name, worker_id, str(error)
+                )
+
+        logger.info(
+            f"开始开环并发测试: {test_name}, 到达方式: {arrival}, "
+            f"请求数: {len(arrivals)}, 目标速率: {target_rate:.2f}/秒, "
+            f"工作线程: {self.max_workers}"
+        )
+
+        futures = []
+        start_time = time.time()
+        # 不使用 with 语句：退出时会等待超时仍在执行的请求，拖过截止时间
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for worker_id, offset in enumerate(arrivals):
+                intended_time = start_time + offset
+                delay = intended_time - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                with self.results_lock:
+                    if outstanding >= max_outstanding:
+                        dropped_requests += 1
+                        continue
+                    outstanding += 1
+                futures.append(executor.submit(worker, worker_id, intended_time))
+
+            _, not_done = concurrent.futures.wait(futures, timeout=timeout)
+            if not_done:
+                logger.warning(f"开环并发测试超时: {test_name} - 服务器可能不可用")
+        finally:
+            # 取消尚未开始的请求，不等待仍在执行的请求，它们计为超时
+            with self.results_lock:
+                for future in futures:
+                    if future.cancel():
+                        dropped_requests += 1
+                        outstanding -= 1
+                timed_out_requests = outstanding
+                finished = True
+            executor.shutdown(wait=False)
+            unfinished = [future for future in futures if not future.done()]
+            if pool is self.session_pool:
+                self._unfinished_requests.extend(unfinished)
+            else:
+                self._close_session_pool_after(pool, unfinished)
+
+        total_time = time.time() - start_time
+
+        result = ConcurrentTestResult(
+            test_name=test_name,
+            total_requests=len(arrivals),
+            successful_requests=successful_requests,
+            failed_requests=failed_requests,
+            total_time=total_time,
+            avg_response_time=histogram.mean,
+            min_response_time=histogram.min,
+            max_response_time=histogram.max,
+            throughput=successful_requests / total_time if total_time > 0 else 0,
+            error_details=error_details,
+            session_setup_time=session_setup_time,
+            mode="open_loop",
+            target_rate=target_rate,
+            dropped_requests=dropped_requests,
+            late_requests=late_requests,
+            timed_out_requests=timed_out_requests,
+            avg_service_time=(
+                service_time_sum / successful_requests if successful_requests else 0
+            ),
+            max_send_lag=max_send_lag,
+            latency_histogram=histogram,
+        )
+
+        self.results.append(result)
+        self._print_test_summary(result)
+        return result
+
+    def run_load_profile(
+        self,
+        test_func: Callable,
+        test_name: str,
+        steps: Sequence[Tuple[float, float]],
+        pause: float = 0.0,
+        **kwargs,
+    ) -> List[ConcurrentTestResult]:
+        """按负载曲线逐级运行开环测试，每级单独统计吞吐量和响应时间
+
+        各级共用一个会话池；每级等待请求全部完成后再开始下一级，避免上一级的积压
+        计入下一级（上一级超时仍在执行的请求最多再等待 timeout 秒）。负载曲线见
+        load_schedule.build_profile。
+
+        Args:
+            test_func: 测试函数，接受worker_id参数
+            test_name: 测试名称，每级结果命名为 "{test_name}_step{序号}"
+            steps: 分级速率 [(速率, 持续时间), ...]
+            pause: 两级之间的间隔（秒）
+            **kwargs: 传递给 run_open_loop_test 的参数（如 late_threshold、
+                max_outstanding、timeout）以及测试函数的额外参数
+
+        Returns:
+            每级的测试结果
+        """
+        owned_pool = self.session_pool is None
+        if owned_pool:
+            self.session_pool = self._create_session_pool(self.max_workers)
+
+        results = []
+        try:
+            for index, (rate, duration) in enumerate(steps):
+                if index:
+                    self._wait_unfinished_requests(kwargs.get("timeout", 30))
+                if index and pause > 0:
+                    time.sleep(pause)
+                logger.info(
+                    f"负载曲线 {test_name}: 第 {index + 1}/{len(steps)} 级，"
+                    f"速率 {rate:g}/秒，持续 {duration:g}秒"
+                )
+                results.append(
+                    self.run_open_loop_test(
+                        test_func,
+                        f"{test_name}_step{index + 1}",
+                        rate=rate,
+                        duration=duration,
+                        **kwargs,
+                    )
+                )
+        finally:
+            if owned_pool:
+                unfinished, self._unfinished_requests = self._unfinished_requests, []
+                self._close_session_pool_after(self.session_pool, unfinished)
+                self.session_pool = None
+        return results
+
+    def run_virtual_user_test(
+        self,
+        test_func: Callable,
+        test_name: str,
+        users: int,
+        duration: Optional[float] = None,
+        iterations: Optional[int] = None,
+        think_time: Union[float, Callable[[int], float]] = 1.0,
+        think_distribution: str = "exponential",
+        ramp_up: float = 0.0,
+        seed: Optional[int] = None,
+        timeout: float = 30,
+        **kwargs,
+    ) -> ConcurrentTestResult:
+        """运行虚拟用户测试：每个用户是一个协程，按自己的思考时间循环执行场景
+
+        同步测试函数在与会话数相同大小的线程池中执行，协程测试函数直接在事件循环中
+        执行（见 virtual_users.VirtualUserEngine）。
+
+        Args:
+            test_func: 测试函数（同步或协程函数），接受worker_id参数
+            test_name: 测试名称
+            users: 虚拟用户数
+            duration: 持续时间（秒，不含加压时间）
+            iterations: 每个用户执行的操作次数，与 duration 至少指定一个
+            think_time: 平均思考时间（秒），或按用户序号返回平均思考时间的函数
+            think_distribution: 思考时间分布，constant、uniform 或 exponential
+            ramp_up: 加压时间（秒），用户在此期间均匀启动
+            seed: 思考时间的随机种子
+            timeout: 结束后等待进行中操作完成的时间（秒）
+            **kwargs: 传递给测试函数的额外参数
+
+        Returns:
+            测试结果
+        """
+        from virtual_users import VirtualUserEngine
+
+        # 会话数即同时进行的请求数，默认与工作线程数相同
+        pool = self.session_pool
+        if pool is None:
+            pool = self._create_session_pool(min(self.max_workers, users))
+
+        def listener(success: bool, response_time: float):
+            self.request_metrics.record(test_name, success, response_time)
+            if self.result_listener is not None:
+                self.result_listener(success, response_time)
+
+        try:
+            engine = VirtualUserEngine(
+                pool,
+                users=users,
+                think_time=think_time,
+                think_distribution=think_distribution,
+                duration=duration,
+                iterations=iterations,
+                ramp_up=ramp_up,
+                seed=seed,
+                timeout=timeout,
+                result_listener=listener,
+                result_sink=self.result_sink,
+            )
+            self._virtual_user_test = (test_name, engine)
+            result = engine.run(test_func, test_name, **kwargs)
+        finally:
+            self._virtual_user_test = None
+            if pool is not self.session_pool:
+                self._close_session_pool(pool)
+
+        self.results.append(result)
+        self._print_test_summary(result)
+        return result
+
+    def run_multiprocess_test(
+        self,
+        test_func: Callable,
+        test_name: str,
+        num_requests: Optional[int] = None,
+        processes: Optional[int] = None,
+        rate: Optional[float] = None,
+        duration: Optional[float] = None,
+        arrival: str = CONSTANT,
+        steps: Optional[Sequence[Tuple[float, float]]] = None,
+        seed: Optional[int] = None,
+        report_interval: float = 1.0,
+        timeout: Optional[float] = None,
+        start_method: Optional[str] = None,
+        **kwargs,
+    ) -> ConcurrentTestResult:
+        """在多个进程中运行并发测试（绕开 GIL）
+
+        每个进程使用 max_workers 个工作线程和自己的会话池，运行自己的那份负载：
+        指定 num_requests 时为闭环测试，请求数平均分给各进程；指定 rate 或 steps
+        时为开环测试，到达速率平均分给各进程。进程每隔 report_interval 秒把计数和
+        直方图增量发回父进程，父进程实时合并（get_live_stats），结束后合并各进程
+        的结果。
+
+        Args:
+            test_func: 测试函数，接受worker_id参数（worker_id 在所有进程中唯一）
+            test_name: 测试名称
+            num_requests: 闭环测试的总请求数
+            processes: 进程数，默认 CPU 核数
+            rate、duration、arrival、steps、seed: 开环测试参数，见 run_open_loop_test
+            report_interval: 子进程上报间隔（秒）
+            timeout: 等待所有进程完成的最长时间（秒），默认闭环 60 秒，
+                开环为持续时间加 60 秒
+            start_method: 进程启动方式，spawn/forkserver 要求 test_func 可以 pickle
+            **kwargs: 传递给测试函数的额外参数（开环测试的 late_threshold、
+                max_outstanding 传给各进程的运行器）
+
+        Returns:
+            合并后的测试结果
+        """
+        processes = processes or os.cpu_count() or 1
+        options = {
+            "max_workers": self.max_workers,
+            "session_pool_factory": self.session_pool_factory,
+            "result_sink": self._sink_options(),
+        }
+        return self._run_load_group(
+            LoadProcessGroup(start_method),
+            test_func,
+            test_name,
+            processes,
+            options,
+            num_requests=num_requests,
+            rate=rate,
+            duration=duration,
+            arrival=arrival,
+            steps=steps,
+            seed=seed,
+            report_interval=report_interval,
+            timeout=timeout,
+            kwargs=kwargs,
+        )
+
+    def run_distributed_test(
+        self,
+        test_func: Union[Callable, str],
+        test_name: str,
+        coordinator,
+        num_requests: Optional[int] = None,
+        rate: Optional[float] = None,
+        duration: Optional[float] = None,
+        arrival: str = CONSTANT,
+        steps: Optional[Sequence[Tuple[float, float]]] = None,
+        seed: Optional[int] = None,
+        report_interval: float = 1.0,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> ConcurrentTestResult:
+        """在多台机器上的负载代理中运行并发测试
+
+        与 run_multiprocess_test 相同，只是每份负载由一个负载代理
+        （load_cluster.LoadAgent）执行：代理登录各自的会话池后在协调器的同步屏障上
+        同时开始，计数和直方图增量通过 TCP 发回并实时合并。
+
+        Args:
+            test_func: 模块级测试函数或其引用 "模块:函数"（在代理上导入）
+            test_name: 测试名称
+            coordinator: 负载协调器（load_cluster.LoadCoordinator），由调用方关闭
+            num_requests、rate、duration、arrival、steps、seed、report_interval、
+                timeout: 同 run_multiprocess_test
+            **kwargs: 传递给测试函数的额外参数（必须可以 JSON 序列化）
+
+        Returns:
+            合并后的测试结果
+
+        Raises:
+            ValueError: 测试函数或会话池工厂不是模块级函数
+            RuntimeError: 没有已连接的负载代理
+        """
+        factory = self.session_pool_factory
+        if factory is not None and not isinstance(factory, str):
+            factory = reference_of(factory)
+        if not isinstance(test_func, str):
+            test_func = reference_of(test_func)
+        agents = coordinator.wait_for_agents()
+        if agents == 0:
+            raise RuntimeError("没有已连接的负载代理")
+
+        options = {
+            "max_workers": self.max_workers,
+            "session_pool_factory": factory,
+            "result_sink": self._sink_options(),
+        }
+        return self._run_load_group(
+            coordinator,
+            test_func,
+            test_name,
+            agents,
+            options,
+            num_requests=num_requests,
+            rate=rate,
+            duration=duration,
+            arrival=arrival,
+            steps=steps,
+            seed=seed,
+            report_interval=report_interval,
+            timeout=timeout,
+            kwargs=kwargs,
+        )
+
+    def _run_load_group(
+        self,
+        group,
+        test_func: Union[Callable, str],
+        test_name: str,
+        processes: int,
+        options: Dict[str, Any],
+        num_requests: Optional[int],
+        rate: Optional[float],
+        duration: Optional[float],
+        arrival: str,
+        steps: Optional[Sequence[Tuple[float, float]]],
+        seed: Optional[int],
+        report_interval: float,
+        timeout: Optional[float],
+        kwargs: Dict[str, Any],
+    ) -> ConcurrentTestResult:
+        """把负载分成 processes 份交给进程组（或负载协调器）运行并合并结果"""
+        open_loop = rate is not None or steps is not None
+        if not open_loop:
+            if num_requests is None:
+                raise ValueError("需要指定 num_requests（闭环）或 rate/steps（开环）")
+            processes = max(1, min(processes, num_requests))
+
+        shares = []
+        offset = 0
+        for index in range(processes):
+            if open_loop:
+                share = {
+                    "rate": rate / processes if rate is not None else None,
+                    "duration": duration,
+                    "arrival": arrival,
+                    "steps": [(r / processes, d) for r, d in steps] if steps else None,
+                    "seed": None if seed is None else seed + index,
+                    # 固定间隔到达时各进程错开发送，整体仍是均匀的间隔
+                    "phase": index / rate if rate and arrival != POISSON else 0.0,
+                    "worker_ids": (index, processes),
+                }
+            else:
+                count = num_requests // processes + (index < num_requests % processes)
+                share = {"num_requests": count, "worker_ids": (offset, 1)}
+                offset += count
+            shares.append(share)
+
+        if timeout is None:
+            if open_loop:
+                planned = duration or sum(d for _, d in steps or [])
+                timeout = planned + 60
+            else:
+                timeout = 60
+
+        with self._live_lock:
+            self._live = {
+                "test_name": test_name,
+                "processes": processes,
+                "successful_requests": 0,
+                "failed_requests": 0,
+                "histogram": LatencyHistogram(),
+                "started_at": time.time(),
+            }
+
+        label = "多进程" if isinstance(group, LoadProcessGroup) else "分布式"
+        logger.info(
+            f"开始{label}并发测试: {test_name}, 负载进程数: {processes}, "
+            f"每进程工作线程: {self.max_workers}"
+        )
+
+        results: Dict[int, ConcurrentTestResult] = {}
+        process_errors: Dict[int, str] = {}
+
+        def on_message(kind, index, payload):
+            if kind == "progress":
+                histogram = LatencyHistogram.from_dict(payload["histogram"])
+                with self._live_lock:
+                    self._live["successful_requests"] += payload["successful"]
+                    self._live["failed_requests"] += payload["failed"]
+                    self._live["histogram"].merge(histogram)
+                self.request_metrics.merge(
+                    test_name, payload["successful"], payload["failed"], histogram
+                )
+            elif kind == "result":
+                results[index] = ConcurrentTestResult.from_dict(payload)
+            elif kind == ERROR:
+                process_errors[index] = payload
+
+        start_time = time.time()
+        last_log = start_time
+        group.start(
+            _run_test_process,
+            [
+                (options, test_func, test_name, share, report_interval, kwargs)
+                for share in shares
+            ],
+            name=f"ConcurrentTest-{test_name}",
+        )
+        try:
+            deadline = start_time + timeout
+            while group.running and time.time() < deadline:
+                for message in group.poll(timeout=report_interval):
+                    on_message(*message)
+                if time.time() - last_log >= 10:
+                    last_log = time.time()
+                    self._log_live_progress()
+            if group.running:
+                logger.warning(f"{label}并发测试超时: {test_name}")
+        finally:
+            group.stop(timeout=10, on_message=on_message)
+            with self._live_lock:
+                self._live["finished_at"] = time.time()
+
+        total_time = time.time() - start_time
+        result = self._merge_process_results(
+            test_name, shares, results, process_errors, total_time, open_loop
+        )
+        self.results.append(result)
+        self._print_test_summary(result)
+        return result
+
+    def _merge_process_results(
+        self,
+        test_name: str,
+        shares: List[Dict[str, Any]],
+        results: Dict[int, ConcurrentTestResult],
+        process_errors: Dict[int, str],
+        total_time: float,
+        open_loop: bool,
+    ) -> ConcurrentTestResult:
+        """合并各进程的测试结果"""
+        histogram = LatencyHistogram()
+        error_details: List[Dict[str, Any]] = []
+        totals = dict.fromkeys(
+            (
+                "total_requests",
+                "successful_requests",
+                "failed_requests",
+                "dropped_requests",
+                "late_requests",
+                "timed_out_requests",
+            ),
+            0,
+        )
+        service_time_sum = 0.0
+        for index, share in enumerate(shares):
+            result = results.get(index)
+            if result is None:
+                # 进程异常退出，闭环测试中它的请求全部计为失败
+                missing = share.get("num_requests", 0)
+                totals["total_requests"] += missing
+                totals["failed_requests"] += missing
+                error_details.append(
+                    {
+                        "worker_id": f"process-{index}",
+                        "error": process_errors.get(index, "进程未返回结果"),
+                        "timestamp": datetime.now().isoformat(),
+                        "response_time": 0,
+                    }
+                )
+                continue
+            for key in totals:
+                totals[key] += getattr(result, key)
+            histogram.merge(result.latency_histogram)
+            error_details.extend(
+                result.error_details[: MAX_ERROR_DETAILS - len(error_details)]
+            )
+            service_time_sum += result.avg_service_time * result.successful_requests
+
+        finished = list(results.values())
+        successful = totals["successful_requests"]
+        target_rate = sum(r.target_rate for r in finished) if open_loop else 0.0
+        return ConcurrentTestResult(
+            test_name=test_name,
+            total_time=total_time,
+            avg_response_time=histogram.mean,
+            min_response_time=histogram.min,
+            max_response_time=histogram.max,
+            throughput=successful / total_time if total_time > 0 else 0,
+            error_details=error_details,
+            session_setup_time=max(
+                (r.session_setup_time for r in finished), default=0.0
+            ),
+            mode="open_loop" if open_loop else "closed_loop",
+            target_rate=target_rate,
+            avg_service_time=service_time_sum / successful if successful else 0.0,
+            max_send_lag=max((r.max_send_lag for r in finished), default=0.0),
+            processes=len(shares),
+            latency_histogram=histogram,
+            **totals,
+        )
+
+    def get_live_stats(self) -> Dict[str, Any]:
+        """获取运行中多进程测试实时合并的统计（没有运行过时返回空字典）"""
+        with self._live_lock:
+            if not self._live:
+                return {}
+            live = {k: v for k, v in self._live.items() if k != "histogram"}
+            live["latency_percentiles"] = self._live["histogram"].summary()
+        elapsed = (live.get("finished_at") or time.time()) - live["started_at"]
+        live["elapsed"] = elapsed
+        live["throughput"] = live["successful_requests"] / elapsed if elapsed > 0 else 0
+        return live
+
+    def collect_metrics(self) -> str:
+        """当前指标（Prometheus 文本格式），在指标端点线程中调用
+
+        多进程/分布式测试的请求计数和耗时来自各进程上报的增量（按上报间隔更新），
+        进行中的请求数和会话登录/刷新次数只包含本进程。
+        """
+        entries = self.request_metrics.snapshot()
+        virtual_user_test = self._virtual_user_test
+        if virtual_user_test is not None and virtual_user_test[0] in entries:
+            name, engine = virtual_user_test
+            entries[name]["in_flight"] = engine.in_flight
+        tests = sorted(entries.items())
+
+        with self._pool_lock:
+            sessions = dict(self._closed_pool_auth)
+            pools = list(self._session_pools)
+        if self.session_pool is not None and self.session_pool not in pools:
+            pools.append(self.session_pool)
+        for pool in pools:
+            get_auth_stats = getattr(pool, "get_auth_stats", None)
+            if get_auth_stats is not None:
+                stats = get_auth_stats()
+                for key in sessions:
+                    sessions[key] += stats[key]
+
+        writer = MetricsWriter("vmi_concurrent_")
+        writer.counter(
+            "requests_total",
+            "完成的请求数",
+            [
+                ({"test": name, "result": result}, entry[field])
+                for name, entry in tests
+                for result, field in (("success", "successful"), ("failure", "failed"))
+            ],
+        )
+        writer.gauge(
+            "in_flight_requests",
+            "正在执行的请求数",
+            [({"test": name}, entry["in_flight"]) for name, entry in tests],
+        )
+        writer.gauge(
+            "error_rate_percent",
+            "失败请求的比例（百分比）",
+            [
+                (
+                    {"test": name},
+                    entry["failed"] / (entry["successful"] + entry["failed"]) * 100
+                    if entry["successful"] + entry["failed"]
+                    else 0.0,
+                )
+                for name, entry in tests
+            ],
+        )
+        writer.histogram(
+            "request_duration_seconds",
+            "成功请求的响应时间（秒）",
+            [({"test": name}, entry["histogram"]) for name, entry in tests],
+        )
+        writer.counter("session_logins_total", "会话登录次数", sessions["logins"])
+        writer.counter(
+            "session_refreshes_total", "会话刷新次数", sessions["refreshes"]
+        )
+        return writer.render()
+
+    def start_metrics_server(
+        self, host: str = "127.0.0.1", port: int = DEFAULT_METRICS_PORT
+    ) -> MetricsServer:
+        """启动实时指标端点（GET /metrics），由 stop_metrics_server 停止
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.collect_metrics, host, port)
+            self.metrics_server.start()
+        return self.metrics_server
+
+    def stop_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def _log_live_progress(self):
+        live = self.get_live_stats()
+        logger.info(
+            f"[{live['test_name']}] 成功: {live['successful_requests']}, "
+            f"失败: {live['failed_requests']}, "
+            f"吞吐量: {live['throughput']:.1f} 请求/秒, "
+            f"p99: {live['latency_percentiles']['p99']:.3f}秒"
+        )
+
+    def _notify(
+        self,
+        success: bool,
+        response_time: float,
+        test_name: Optional[str] = None,
+        worker_id: Any = None,
+        error: Optional[str] = None,
+    ):
+        if self.result_listener is not None:
+            try:
+                self.result_listener(success, response_time)
+            except Exception as e:
+                logger.error(f"请求结果回调异常: {e}")
+        if test_name is not None:
+            self.request_metrics.record(test_name, success, response_time)
+        if self.result_sink is not None and test_name is not None:
+            self.result_sink.record(
+                test_name, success, response_time, error, worker_id=worker_id
+            )
+
+    def _sink_options(self) -> Optional[Dict[str, Any]]:
+        """子进程（代理）打开自己的结果汇所需的参数，写入 name.p{序号}.ext"""
+        if self.result_sink is None:
+            return None
+        return {
+            "path": self.result_sink.path,
+            "sample_rate": self.result_sink.sample_rate,
+            "max_errors_per_second": self.result_sink.max_errors_per_second,
+        }
+
+    @staticmethod
+    def _add_error_detail(
+        error_details: List[Dict[str, Any]],
+        worker_id: Any,
+        error: Exception,
+        response_time: float,
+    ):
+        """记录错误详情（调用方持有锁），超过 MAX_ERROR_DETAILS 后只计数"""
+        if len(error_details) < MAX_ERROR_DETAILS:
+            error_details.append(
+                {
+                    "worker_id": worker_id,
+                    "error": str(error),
+                    "timestamp": datetime.now().isoformat(),
+                    "response_time": response_time,
+                }
+            )
+
     def _print_test_summary(self, result: ConcurrentTestResult):
         """打印测试摘要"""
         logger.info(f"\n{'='*60}")
@@ -262,11 +1134,33 @@ class ConcurrentTestRunner:
             if result.total_requests > 0
             else "成功率: N/A"
         )
+        logger.info(f"会话登录时间: {result.session_setup_time:.2f}秒（不计入响应时间）")
+        if result.processes > 1:
+            logger.info(f"负载进程数: {result.processes}")
+        if result.mode == "virtual_users":
+            logger.info(f"虚拟用户数: {result.virtual_users}")
+            logger.info(f"平均服务时间: {result.avg_service_time:.3f}秒（不含等待会话）")
+            logger.info(f"丢弃请求: {result.dropped_requests}")
         logger.info(f"总时间: {result.total_time:.2f}秒")
         logger.info(f"平均响应时间: {result.avg_response_time:.3f}秒")
         logger.info(f"最小响应时间: {result.min_response_time:.3f}秒")
         logger.info(f"最大响应时间: {result.max_response_time:.3f}秒")
+        percentiles = result.latency_percentiles
+        logger.info(
+            f"响应时间分位数: p50={percentiles['p50']:.3f}秒, "
+            f"p90={percentiles['p90']:.3f}秒, p99={percentiles['p99']:.3f}秒, "
+            f"p99.9={percentiles['p99_9']:.3f}秒"
+        )
         logger.info(f"吞吐量: {result.throughput:.2f} 请求/秒")
+        if result.mode == "open_loop":
+            logger.info(f"目标到达速率: {result.target_rate:.2f} 请求/秒")
+            logger.info(f"平均服务时间: {result.avg_service_time:.3f}秒（不含排队）")
+            logger.info(f"丢弃请求: {result.dropped_requests}")
+            logger.info(f"超时未完成请求: {result.timed_out_requests}")
+            logger.info(
+                f"延迟发送请求: {result.late_requests}，"
+                f"最大发送延迟: {result.max_send_lag:.3f}秒"
+            )
 
         if result.error_details:
             logger.info(f"\n错误详情 ({len(result.error_details)}个):")
@@ -283,9 +1177,13 @@ class ConcurrentTestRunner:
         total_requests = sum(r.total_requests for r in self.results)
         total_successful = sum(r.successful_requests for r in self.results)
         total_failed = sum(r.failed_requests for r in self.results)
+        total_dropped = sum(r.dropped_requests for r in self.results)
         total_time = sum(r.total_time for r in self.results)
 
         avg_throughput = total_successful / total_time if total_time > 0 else 0
+        combined = LatencyHistogram()
+        for r in self.results:
+            combined.merge(r.latency_histogram)
         success_rate = (
             (total_successful / total_requests * 100) if total_requests > 0 else 0
         )
@@ -296,9 +1194,11 @@ class ConcurrentTestRunner:
                 "total_requests": total_requests,
                 "total_successful": total_successful,
                 "total_failed": total_failed,
+                "total_dropped": total_dropped,
                 "total_time": total_time,
                 "avg_throughput": avg_throughput,
                 "success_rate": success_rate,
+                "latency_percentiles": combined.summary(),
                 "generated_at": datetime.now().isoformat(),
             },
             "detailed_results": [
@@ -313,18 +1213,45 @@ class ConcurrentTestRunner:
                         else 0
                     ),
                     "total_time": r.total_time,
+                    "session_setup_time": r.session_setup_time,
                     "avg_response_time": r.avg_response_time,
                     "min_response_time": r.min_response_time,
                     "max_response_time": r.max_response_time,
                     "throughput": r.throughput,
+                    "mode": r.mode,
+                    "target_rate": r.target_rate,
+                    "dropped_requests": r.dropped_requests,
+                    "late_requests": r.late_requests,
+                    "timed_out_requests": r.timed_out_requests,
+                    "avg_service_time": r.avg_service_time,
+                    "max_send_lag": r.max_send_lag,
+                    "processes": r.processes,
+                    "virtual_users": r.virtual_users,
+                    "latency_percentiles": r.latency_percentiles,
+                    "latency_histogram": r.latency_histogram.to_dict(),
                 }
                 for r in self.results
             ],
             "errors": [error for r in self.results for error in r.error_details],
         }
+        if self.result_sink is not None:
+            report["result_sink"] = self._read_sink()
 
         return report
 
+    def _read_sink(self) -> Dict[str, Any]:
+        """从结果汇读回各测试的汇总、每秒时间序列和抽样的错误事件"""
+        sink = self.result_sink
+        sink.flush()
+        return {
+            "path": sink.path,
+            "summary": sink.summary(),
+            "time_series": sink.time_series(),
+            "sampled_errors": list(
+                itertools.islice(sink.read_events(success=False), MAX_ERROR_DETAILS)
+            ),
+        }
+
     def save_report(self, filepath: str = "concurrent_test_report.json"):
         """保存测试报告到文件"""
         report = self.generate_report()
@@ -333,6 +1260,106 @@ class ConcurrentTestRunner:
         logger.info(f"测试报告已保存到: {filepath}")
 
 
+def _run_test_process(
+    channel,
+    stop_event,
+    options: Dict[str, Any],
+    test_func: Union[Callable, str],
+    test_name: str,
+    share: Dict[str, Any],
+    report_interval: float,
+    kwargs: Dict[str, Any],
+):
+    """多进程/分布式测试的子进程（代理）入口：运行本进程的那份负载，定期上报计数和
+    直方图增量"""
+    lock = threading.Lock()
+    pending = {"successful": 0, "failed": 0, "histogram": LatencyHistogram()}
+
+    def listener(success: bool, response_time: float):
+        with lock:
+            if success:
+                pending["successful"] += 1
+                pending["histogram"].record(response_time)
+            else:
+                pending["failed"] += 1
+
+    def flush():
+        with lock:
+            payload = {
+                "successful": pending["successful"],
+                "failed": pending["failed"],
+                "histogram": pending["histogram"].to_dict(),
+            }
+            pending.update(successful=0, failed=0, histogram=LatencyHistogram())
+        if payload["successful"] or payload["failed"]:
+            channel.send("progress", payload)
+
+    first_id, step = share["worker_ids"]
+    test_func = resolve_reference(test_func)
+
+    def process_test_func(worker_id: int, **test_kwargs):
+        # worker_id 在所有进程中唯一
+        return test_func(worker_id=first_id + worker_id * step, **test_kwargs)
+
+    sink = None
+    sink_options = options.get("result_sink")
+    if sink_options:
+        sink_options = dict(sink_options)
+        path = process_sink_path(sink_options.pop("path"), channel.index)
+        sink = open_sink(path, **sink_options)
+
+    runner = ConcurrentTestRunner(
+        max_workers=options["max_workers"],
+        session_pool_factory=options["session_pool_factory"],
+        result_listener=listener,
+        result_sink=sink,
+    )
+    # 先登录会话池再等待同步开始，登录耗时不影响各进程（代理）同时施压
+    max_workers = options["max_workers"]
+    runner.session_pool = runner._create_session_pool(
+        min(max_workers, share.get("num_requests", max_workers))
+    )
+
+    finished = threading.Event()
+
+    def report():
+        while not finished.wait(report_interval):
+            flush()
+
+    reporter = threading.Thread(target=report, name="ProgressReporter", daemon=True)
+    reporter.start()
+
+    try:
+        if not channel.barrier():
+            return
+        if "num_requests" in share:
+            result = runner.run_concurrent_test(
+                process_test_func, test_name, share["num_requests"], **kwargs
+            )
+        else:
+            # 各进程错开发送时间；开始前父进程已要求停止则不再施压
+            if stop_event.wait(share["phase"]):
+                return
+            result = runner.run_open_loop_test(
+                process_test_func,
+                test_name,
+                rate=share["rate"],
+                duration=share["duration"],
+                arrival=share["arrival"],
+                steps=share["steps"],
+                seed=share["seed"],
+                **kwargs,
+            )
+    finally:
+        runner._close_session_pool(runner.session_pool)
+        finished.set()
+        reporter.join(5)
+        flush()
+        if sink is not None:
+            sink.close()
+    channel.send("result", result.to_dict())
+
+
 class ConcurrentTestBase(unittest.TestCase):
     """并发测试基类"""
 
@@ -367,7 +1394,7 @@ class ConcurrentTestFactory:
         """创建门店创建测试函数"""
 
         def test_create_store(worker_id: int, session_manager):
-            from sdk.store import StoreSDK
+            from sdk import StoreSDK
 
             store_sdk = StoreSDK(session_manager.get_session())
             store_data = {
@@ -390,7 +1417,7 @@ class ConcurrentTestFactory:
         """创建产品创建测试函数"""
 
         def test_create_product(worker_id: int, session_manager):
-            from sdk.product import ProductSDK
+            from sdk import ProductSDK
 
             product_sdk = ProductSDK(session_manager.get_session())
             product_data = {
@@ -413,7 +1440,7 @@ class ConcurrentTestFactory:
         """创建仓库创建测试函数"""
 
         def test_create_warehouse(worker_id: int, session_manager):
-            from sdk.warehouse import WarehouseSDK
+            from sdk import WarehouseSDK
 
             warehouse_sdk = WarehouseSDK(session_manager.get_session())
             warehouse_data = {
@@ -431,6 +1458,44 @@ class ConcurrentTestFactory:
 
         return test_create_warehouse
 
+    @staticmethod
+    def create_mixed_operation_test(
+        spec: Optional[Dict[str, Any]] = None, seed: Optional[int] = None
+    ):
+        """创建混合操作测试函数（按负载模型的权重创建门店、产品或仓库）
+
+        Args:
+            spec: 负载模型配置（见 workload.py），默认读取 test_config.json 中
+                workload.mixed，只使用其中的 operations
+            seed: 随机种子
+
+        Raises:
+            ValueError: 配置了不支持的操作
+        """
+        from config_helper import get_workload_config
+        from workload import Workload
+
+        test_functions = {
+            "store": ConcurrentTestFactory.create_store_creation_test(),
+            "product": ConcurrentTestFactory.create_product_creation_test(),
+            "warehouse": ConcurrentTestFactory.create_warehouse_creation_test(),
+        }
+        if spec is None:
+            spec = get_workload_config().get("mixed")
+        workload = Workload(
+            spec,
+            default_operations={f"{name}.create": 1 for name in test_functions},
+            seed=seed,
+        )
+        workload.validate({name: ("create",) for name in test_functions})
+
+        def mixed_operation(worker_id: int, session_manager):
+            # 按权重选择一个操作
+            entity, _ = workload.choose_operation()
+            test_functions[entity](worker_id, session_manager)
+
+        return mixed_operation
+
 
 # 具体的并发测试类
 class TestConcurrentStoreOperations(ConcurrentTestBase):
@@ -490,20 +1555,8 @@ class TestConcurrentProductOperations(ConcurrentTestBase):
         """混合并发操作测试"""
         runner = ConcurrentTestRunner(max_workers=25)
 
-        # 随机选择测试函数
-        test_functions = [
-            ConcurrentTestFactory.create_store_creation_test(),
-            ConcurrentTestFactory.create_product_creation_test(),
-            ConcurrentTestFactory.create_warehouse_creation_test(),
-        ]
-
-        def mixed_operation(worker_id: int, session_manager):
-            # 随机选择一个操作
-            test_func = random.choice(test_functions)
-            test_func(worker_id, session_manager)
-
         result = runner.run_concurrent_test(
-            test_func=mixed_operation,
+            test_func=ConcurrentTestFactory.create_mixed_operation_test(),
             test_name="mixed_concurrent_operations",
             num_requests=100,
         )
@@ -532,6 +1585,30 @@ class TestConcurrentWarehouseOperations(ConcurrentTestBase):
         self.assertLess(result.avg_response_time, 4.0, "平均响应时间应小于4秒")
 
 
+class TestVirtualUserOperations(ConcurrentTestBase):
+    """虚拟用户测试"""
+
+    def test_virtual_user_mixed_operations(self):
+        """大量虚拟用户按思考时间混合操作测试"""
+        runner = ConcurrentTestRunner(max_workers=25)
+
+        result = runner.run_virtual_user_test(
+            test_func=ConcurrentTestFactory.create_mixed_operation_test(),
+            test_name="virtual_user_mixed_operations",
+            users=1000,
+            duration=30,
+            think_time=10.0,
+            ramp_up=10,
+        )
+
+        # 验证测试结果
+        self.assertGreater(result.total_requests, 0)
+        self.assertGreaterEqual(
+            result.successful_requests, result.total_requests * 0.8, "至少80%的请求应该成功"
+        )
+        self.assertLess(result.latency_percentiles["p99"], 10.0, "p99响应时间应小于10秒")
+
+
 def run_all_concurrent_tests():
     """运行所有并发测试"""
     import unittest
@@ -547,6 +1624,9 @@ def run_all_concurrent_tests():
     suite.addTests(
         unittest.TestLoader().loadTestsFromTestCase(TestConcurrentWarehouseOperations)
     )
+    suite.addTests(
+        unittest.TestLoader().loadTestsFromTestCase(TestVirtualUserOperations)
+    )
 
     # 运行测试
     runner = unittest.TextTestRunner(verbosity=2)
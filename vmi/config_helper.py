@@ -26,7 +26,7 @@ def get_config():
             "environment": "local",
         },
         "credentials": {"username": "administrator", "password": "administrator"},
-        "session": {"refresh_interval": 540, "timeout": 1800},
+        "session": {"refresh_interval": 540, "timeout": 1800, "token_cache": False},
         "concurrent": {"max_workers": 10, "timeout": 30, "retry_count": 3},
         "aging": {
             "duration_hours": 24,
@@ -34,7 +34,31 @@ def get_config():
             "operation_interval": 1.0,
             "max_data_count": 1000,
             "performance_degradation_threshold": 20.0,
+            "degradation_baseline_size": 100,
+            "degradation_confidence": 0.99,
+            "write_coalesce_window": 0,
+            "diff_updates": False,
+            "idempotent_creates": False,
+            "validate_payloads": False,
             "report_interval_minutes": 30,
+            "processes": 1,
+            "result_sink": "",
+            "result_sample_rate": 0.01,
+            "checkpoint_path": "",
+            "metrics_address": "",
+            "resource_sample_interval": 60,
+            "tracemalloc_top": 0,
+            "resource_count_objects": False,
+        },
+        "workload": {
+            "aging": {},
+            "mixed": {
+                "operations": {
+                    "store.create": 1,
+                    "product.create": 1,
+                    "warehouse.create": 1,
+                }
+            },
         },
     }
 
@@ -91,6 +115,12 @@ def get_aging_params():
     return config.get("aging", {})
 
 
+def get_workload_config():
+    """获取负载模型配置（见 workload.py）"""
+    config = get_config()
+    return config.get("workload", {})
+
+
 def get_session_config():
     """获取会话配置"""
     config = get_config()
@@ -55,6 +55,7 @@ def session_manager(test_config) -> Generator:
     提供自动会话刷新功能，9分钟刷新一次
     """
     from session_manager import SessionManager
+    from token_store import default_token_store
 
     logger.info("初始化全局会话管理器")
 
@@ -65,6 +66,7 @@ def session_manager(test_config) -> Generator:
         password=test_config["credentials"]["password"],
         refresh_interval=test_config["refresh_interval"],
         session_timeout=test_config["session_timeout"],
+        token_store=default_token_store(),
     )
 
     # 创建会话
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+性能劣化检测 - 按 "实体.操作" 分别建立基线，用 CUSUM 检测耗时的持续上升
+
+创建、删除和列表查询的耗时相差很大，混在一起比较均值时操作比例的随机波动就会造成
+假的"劣化"。这里每个操作单独检测：
+1. 基线：该操作前 baseline_size 次成功操作耗时（取对数）的均值和标准差
+2. 检测：单侧 CUSUM，S = max(0, S + z - drift)，z 为标准化后的对数耗时；S 超过
+   threshold 时怀疑耗时持续上升，变化时间估计为 S 最近一次离开 0 的时间
+3. 确认：怀疑之后再取 confirm_size 个样本（与触发检测的样本无关，避免选择偏差）
+   与基线做 Welch t 检验（正态近似），置信度（1 - p 值）达到 min_confidence 且
+   耗时上升超过 min_change_percent 时报警，否则清零 S 继续检测
+
+报警说明劣化的操作、开始时间、耗时变化幅度和置信度。检测器不加锁，每个工作线程
+一个；内存与运行时长无关。基线和检测状态可以保存为检查点（checkpoint），老化测试
+从检查点恢复时不需要重新建立基线。
+"""
+
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from streaming_stats import RunningStats
+
+# CUSUM 参数：drift 为允许的偏移（标准差），threshold 为报警阈值（标准差）；
+# drift=0.5、threshold=5 时无变化的平均运行长度约 900 个样本
+DEFAULT_DRIFT = 0.5
+DEFAULT_THRESHOLD = 5.0
+# 对数耗时标准差的下限，避免耗时非常稳定时微小波动被放大
+MIN_SIGMA = 0.05
+
+
+def _confidence(baseline: RunningStats, current: RunningStats) -> float:
+    """current 的均值大于 baseline 的单侧 Welch t 检验置信度（正态近似）"""
+    if current.count < 2 or baseline.count < 2:
+        return 0.0
+    error = math.sqrt(
+        baseline.stdev**2 / baseline.count + current.stdev**2 / current.count
+    )
+    if error == 0:
+        return 1.0 if current.mean > baseline.mean else 0.0
+    z = (current.mean - baseline.mean) / error
+    return 1.0 - 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class ChangePointDetector:
+    """单个操作的耗时变化点检测器"""
+
+    def __init__(
+        self,
+        baseline_size: int = 100,
+        drift: float = DEFAULT_DRIFT,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_confidence: float = 0.99,
+        min_change_percent: float = 20.0,
+        confirm_size: int = 30,
+    ):
+        """初始化检测器
+
+        Args:
+            baseline_size: 建立基线的样本数
+            drift: CUSUM 允许的偏移（基线标准差的倍数）
+            threshold: CUSUM 报警阈值（基线标准差的倍数）
+            min_confidence: 报警需要的最小置信度（0-1）
+            min_change_percent: 报警需要的最小耗时上升（百分比）
+            confirm_size: 怀疑耗时上升后用于确认的样本数
+        """
+        if baseline_size < 2 or confirm_size < 2:
+            raise ValueError("baseline_size 和 confirm_size 必须至少为 2")
+        self.baseline_size = baseline_size
+        self.drift = drift
+        self.threshold = threshold
+        self.min_confidence = min_confidence
+        self.min_change_percent = min_change_percent
+        self.confirm_size = confirm_size
+
+        self.baseline = RunningStats()  # 对数耗时
+        self._baseline_seconds = RunningStats()
+        self.cusum = 0.0
+        # S 最近一次离开 0 的时间（估计的变化时间）
+        self._run_start: Optional[float] = None
+        # 确认中：怀疑耗时上升后的对数耗时和耗时
+        self._confirm: Optional[RunningStats] = None
+        self._confirm_seconds = 0.0
+        self.suspicions = 0
+        self.samples = 0
+        self.alert: Optional[Dict[str, Any]] = None
+
+    @property
+    def ready(self) -> bool:
+        """基线是否已建立"""
+        return self.baseline.count >= self.baseline_size
+
+    def add(self, duration: float, timestamp: Optional[float] = None):
+        """记录一次成功操作的耗时（秒），新产生报警时返回报警，否则返回 None"""
+        if duration <= 0:
+            return None
+        timestamp = time.time() if timestamp is None else timestamp
+        value = math.log(duration)
+        self.samples += 1
+        if not self.ready:
+            self.baseline.add(value)
+            self._baseline_seconds.add(duration)
+            return None
+        if self.alert is not None:
+            return None
+
+        if self._confirm is not None:
+            return self._add_confirmation(value, duration, timestamp)
+
+        sigma = max(self.baseline.stdev, MIN_SIGMA)
+        z = (value - self.baseline.mean) / sigma
+        self.cusum = max(0.0, self.cusum + z - self.drift)
+        if self.cusum == 0:
+            self._run_start = None
+        elif self._run_start is None:
+            self._run_start = timestamp
+        if self.cusum >= self.threshold:
+            self.suspicions += 1
+            self._confirm = RunningStats()
+            self._confirm_seconds = 0.0
+        return None
+
+    def _add_confirmation(self, value: float, duration: float, timestamp: float):
+        self._confirm.add(value)
+        self._confirm_seconds += duration
+        if self._confirm.count < self.confirm_size:
+            return None
+        current = self._confirm_seconds / self._confirm.count
+        change = self.change_percent(current)
+        confidence = _confidence(self.baseline, self._confirm)
+        if confidence < self.min_confidence or change < self.min_change_percent:
+            # 没有得到确认，重新检测
+            self.cusum = 0.0
+            self._run_start = None
+            self._confirm = None
+            return None
+        self.alert = {
+            "started_at": datetime.fromtimestamp(self._run_start).isoformat(),
+            "detected_at": datetime.fromtimestamp(timestamp).isoformat(),
+            "baseline_duration": self._baseline_seconds.mean,
+            "current_duration": current,
+            "change_percent": change,
+            "confidence": confidence,
+            "samples": self._confirm.count,
+        }
+        return self.alert
+
+    def change_percent(self, duration: float) -> float:
+        baseline = self._baseline_seconds.mean
+        return (duration - baseline) / baseline * 100 if baseline > 0 else 0.0
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """可以 JSON 序列化的完整状态"""
+        return {
+            "baseline": self.baseline.checkpoint(),
+            "baseline_seconds": self._baseline_seconds.checkpoint(),
+            "cusum": self.cusum,
+            "run_start": self._run_start,
+            "confirm": self._confirm.checkpoint() if self._confirm else None,
+            "confirm_seconds": self._confirm_seconds,
+            "suspicions": self.suspicions,
+            "samples": self.samples,
+            "alert": self.alert,
+        }
+
+    def restore(self, data: Dict[str, Any]) -> "ChangePointDetector":
+        """从 checkpoint 的结果恢复，返回自身"""
+        self.baseline = RunningStats().restore(data["baseline"])
+        self._baseline_seconds = RunningStats().restore(data["baseline_seconds"])
+        self.cusum = data["cusum"]
+        self._run_start = data["run_start"]
+        confirm = data["confirm"]
+        self._confirm = RunningStats().restore(confirm) if confirm else None
+        self._confirm_seconds = data["confirm_seconds"]
+        self.suspicions = data["suspicions"]
+        self.samples = data["samples"]
+        self.alert = data["alert"]
+        return self
+
+    def state(self) -> Dict[str, Any]:
+        """检测器状态（可以 JSON 序列化）"""
+        return {
+            "samples": self.samples,
+            "baseline_ready": self.ready,
+            "baseline_duration": self._baseline_seconds.mean,
+            "cusum": self.cusum,
+            "suspicions": self.suspicions,
+            "alert": self.alert,
+        }
+
+
+class DegradationMonitor:
+    """按键（如 "partner.read"）分别检测耗时变化
+
+    record 由工作线程调用；alerts、state、checkpoint 可以在其他线程中调用，
+    遍历检测器前先取快照，工作线程同时新增键时不会出错
+    """
+
+    def __init__(self, **options: Any):
+        """初始化监视器
+
+        Args:
+            **options: ChangePointDetector 的参数
+        """
+        self.options = options
+        self.detectors: Dict[str, ChangePointDetector] = {}
+
+    def record(self, key: str, duration: float, timestamp: Optional[float] = None):
+        """记录一次成功操作的耗时，新产生报警时返回带 key 的报警，否则返回 None"""
+        detector = self.detectors.get(key)
+        if detector is None:
+            detector = self.detectors[key] = ChangePointDetector(**self.options)
+        alert = detector.add(duration, timestamp)
+        return dict(alert, key=key) if alert else None
+
+    def alerts(self) -> List[Dict[str, Any]]:
+        """所有报警，按耗时上升幅度从大到小排列"""
+        alerts = []
+        for key, detector in list(self.detectors.items()):
+            alert = detector.alert
+            if alert:
+                alerts.append(dict(alert, key=key))
+        return sorted(alerts, key=lambda alert: -alert["change_percent"])
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: detector.state() for key, detector in list(self.detectors.items())
+        }
+
+    def checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: detector.checkpoint()
+            for key, detector in list(self.detectors.items())
+        }
+
+    def restore(self, data: Dict[str, Dict[str, Any]]) -> "DegradationMonitor":
+        """从 checkpoint 的结果恢复，检测器参数使用当前的 options，返回自身"""
+        self.detectors = {
+            key: ChangePointDetector(**self.options).restore(state)
+            for key, state in data.items()
+        }
+        return self
+
+
+def format_alert(alert: Dict[str, Any]) -> str:
+    """报警的文字说明"""
+    return (
+        f"{alert['key']} 自 {alert['started_at']} 起耗时上升 "
+        f"{alert['change_percent']:.1f}%（{alert['baseline_duration']:.3f}s -> "
+        f"{alert['current_duration']:.3f}s，置信度 {alert['confidence'] * 100:.2f}%）"
+    )
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+延迟直方图 - 高动态范围（HDR）直方图，按固定相对精度记录延迟
+
+平均值会掩盖长尾延迟。直方图以微秒为单位记录延迟，按对数-线性分桶：
+小于 sub_bucket_count 的值精确记录，更大的值按 2 的幂分段，每段内线性划分
+sub_bucket_count / 2 个桶，相对误差不超过 1 / (sub_bucket_count / 2)。
+significant_figures=3 时相对误差约 0.1%，从 1 微秒到 1 小时只需约两万个桶，
+只保存非零桶（稀疏字典）。
+
+直方图可以合并：各线程/进程分别记录，最后合并计算整体分位数；to_dict/from_dict
+用于写入 JSON 报告或跨进程传递。
+
+使用示例：
+    histograms = HistogramSet()
+    histograms.record("partner.create", 0.123)
+    histograms.summary()["partner.create"]["p99"]
+"""
+
+import math
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 报告中输出的分位数：(键, 百分位)
+REPORT_PERCENTILES = (("p50", 50), ("p90", 90), ("p99", 99), ("p99_9", 99.9))
+
+# HistogramSet 汇总所有键时使用的键
+ALL_KEY = "all"
+
+
+class LatencyHistogram:
+    """可合并的 HDR 延迟直方图（线程安全）"""
+
+    def __init__(self, significant_figures: int = 3):
+        """初始化直方图
+
+        Args:
+            significant_figures: 有效数字位数（1-5），决定相对精度
+        """
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures 必须在 1 到 5 之间")
+        self.significant_figures = significant_figures
+        # 精确记录的范围至少覆盖 2 * 10^significant_figures
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._half_count = self._sub_bucket_count // 2
+
+        self._lock = threading.Lock()
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self._total_us = 0
+        self._min_us: Optional[int] = None
+        self._max_us = 0
+
+    # ---- 记录 ----
+
+    def record(self, seconds: float, count: int = 1):
+        """记录延迟
+
+        Args:
+            seconds: 延迟（秒），负值按 0 记录
+            count: 记录次数
+        """
+        value = max(0, int(round(seconds * 1_000_000)))
+        index = self._index_of(value)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + count
+            self.count += count
+            self._total_us += value * count
+            self._max_us = max(self._max_us, value)
+            if self._min_us is None or value < self._min_us:
+                self._min_us = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """合并另一个直方图（精度必须相同），返回自身"""
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("只能合并有效数字位数相同的直方图")
+        with other._lock:
+            counts = dict(other._counts)
+            count, total = other.count, other._total_us
+            min_us, max_us = other._min_us, other._max_us
+        with self._lock:
+            for index, value in counts.items():
+                self._counts[index] = self._counts.get(index, 0) + value
+            self.count += count
+            self._total_us += total
+            self._max_us = max(self._max_us, max_us)
+            if min_us is not None and (self._min_us is None or min_us < self._min_us):
+                self._min_us = min_us
+        return self
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram(self.significant_figures).merge(self)
+
+    # ---- 查询 ----
+
+    @property
+    def min(self) -> float:
+        return (self._min_us or 0) / 1_000_000
+
+    @property
+    def max(self) -> float:
+        return self._max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self._total_us / self.count / 1_000_000 if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """获取分位数（秒），没有数据时返回 0
+
+        返回该分位数所在桶的上界（不超过记录到的最大值），与 HdrHistogram 一致。
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, math.ceil(self.count * pct / 100))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= target:
+                    value = min(self._highest_equivalent(index), self._max_us)
+                    return value / 1_000_000
+            return self._max_us / 1_000_000
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> List[int]:
+        """不超过各上界（秒，升序）的记录次数，用于输出固定分桶的直方图
+
+        按桶内最小值判断，误差与桶精度相同。
+        """
+        limits = [int(round(bound * 1_000_000)) for bound in bounds]
+        counts = [0] * len(limits)
+        with self._lock:
+            buckets = sorted(self._counts.items())
+        position = 0
+        seen = 0
+        for index, count in buckets:
+            lowest = self._lowest_equivalent(index)
+            while position < len(limits) and lowest > limits[position]:
+                counts[position] = seen
+                position += 1
+            seen += count
+        for i in range(position, len(limits)):
+            counts[i] = seen
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """汇总：次数、最小/平均/最大值和 p50/p90/p99/p99.9（秒）"""
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "min": self.min,
+            "mean": self.mean,
+        }
+        for key, pct in REPORT_PERCENTILES:
+            result[key] = self.percentile(pct)
+        result["max"] = self.max
+        return result
+
+    # ---- 序列化 ----
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可写入 JSON 的字典（只包含非零桶）"""
+        with self._lock:
+            return {
+                "significant_figures": self.significant_figures,
+                "unit": "us",
+                "count": self.count,
+                "total": self._total_us,
+                "min": self._min_us or 0,
+                "max": self._max_us,
+                "buckets": [[i, self._counts[i]] for i in sorted(self._counts)],
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """从 to_dict 的结果恢复直方图"""
+        histogram = cls(data.get("significant_figures", 3))
+        histogram._counts = {int(i): int(c) for i, c in data.get("buckets", [])}
+        histogram.count = int(data.get("count", sum(histogram._counts.values())))
+        histogram._total_us = int(data.get("total", 0))
+        histogram._max_us = int(data.get("max", 0))
+        histogram._min_us = int(data["min"]) if histogram.count else None
+        return histogram
+
+    # ---- 分桶 ----
+
+    def _index_of(self, value: int) -> int:
+        if value < self._sub_bucket_count:
+            return value
+        shift = value.bit_length() - self._sub_bucket_bits
+        sub = value >> shift
+        bucket_start = self._sub_bucket_count + (shift - 1) * self._half_count
+        return bucket_start + sub - self._half_count
+
+    def _lowest_equivalent(self, index: int) -> int:
+        """桶内的最小值（微秒）"""
+        if index < self._sub_bucket_count:
+            return index
+        offset = index - self._sub_bucket_count
+        shift = offset // self._half_count + 1
+        sub = offset % self._half_count + self._half_count
+        return sub << shift
+
+    def _highest_equivalent(self, index: int) -> int:
+        """桶内的最大值（微秒）"""
+        if index < self._sub_bucket_count:
+            return index
+        offset = index - self._sub_bucket_count
+        shift = offset // self._half_count + 1
+        sub = offset % self._half_count + self._half_count
+        return ((sub + 1) << shift) - 1
+
+
+class HistogramSet:
+    """按键（如 "partner.create"）分组的延迟直方图集合"""
+
+    def __init__(self, significant_figures: int = 3):
+        self.significant_figures = significant_figures
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def get(self, key: str) -> LatencyHistogram:
+        """获取键对应的直方图，不存在时创建"""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = LatencyHistogram(self.significant_figures)
+                self._histograms[key] = histogram
+            return histogram
+
+    def record(self, key: str, seconds: float):
+        self.get(key).record(seconds)
+
+    def merge(self, other: "HistogramSet") -> "HistogramSet":
+        """合并另一个集合，返回自身"""
+        for key, histogram in other.items():
+            self.get(key).merge(histogram)
+        return self
+
+    def items(self) -> Iterator[Tuple[str, LatencyHistogram]]:
+        with self._lock:
+            return iter(sorted(self._histograms.items()))
+
+    def combined(self) -> LatencyHistogram:
+        """所有键合并后的直方图"""
+        total = LatencyHistogram(self.significant_figures)
+        for _, histogram in self.items():
+            total.merge(histogram)
+        return total
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """各键及全部（"all"）的分位数汇总"""
+        result = {ALL_KEY: self.combined().summary()}
+        for key, histogram in self.items():
+            result[key] = histogram.summary()
+        return result
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {key: histogram.to_dict() for key, histogram in self.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, Any]]) -> "HistogramSet":
+        histograms = cls()
+        for key, value in data.items():
+            histogram = LatencyHistogram.from_dict(value)
+            histograms.significant_figures = histogram.significant_figures
+            histograms._histograms[key] = histogram
+        return histograms
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._histograms)
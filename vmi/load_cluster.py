@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+分布式负载 - 协调器（coordinator）把负载分给多台机器上的负载代理（agent）
+
+单台施压机无法把平台压到极限时，在多台机器上各运行一个代理，连接到协调器：
+    export VMI_CLUSTER_TOKEN=<共享令牌>
+    python load_cluster.py agent --coordinator 10.0.0.5:7070
+
+协调器默认只监听本机地址；监听其他地址接受远程代理时必须设置共享令牌（环境变量
+VMI_CLUSTER_TOKEN 或 token 参数），代理在 hello 消息中携带令牌，不匹配的连接被拒绝。
+
+协调器把每个代理当作一个负载进程：LoadCoordinator 与 load_processes.LoadProcessGroup
+接口相同（start/poll/running/stop），可以直接代替进程组交给并发测试和老化测试运行器，
+代理执行与本地多进程模式相同的子进程入口，计数和直方图增量通过 TCP 发回协调器合并。
+
+同步启动：代理收到任务后先完成准备（登录会话池），调用 channel.barrier() 报告就绪；
+全部代理就绪（或已退出）后协调器广播开始消息，代理在收到后等待 start_delay 秒同时
+开始施压。使用相对延迟而不是绝对时间，不依赖各机器时钟同步，误差为单程网络延迟。
+
+协议：每行一个 JSON 消息 {"type": ...}
+- 代理 → 协调器：hello（name、token）、ready、message（kind/payload，同 ProcessChannel.send）、exit
+- 协调器 → 代理：task（入口引用 "模块:函数"、参数）、start（delay）、stop
+任务入口和参数在代理上按引用导入/JSON 解码，因此入口必须是模块级函数，参数必须可以
+JSON 序列化。代理执行完一个任务后等待下一个任务，协调器关闭连接时退出。
+收到格式错误的消息时断开连接，协调器把该代理记为已退出。
+"""
+
+import hmac
+import importlib
+import ipaddress
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from load_processes import ERROR, EXIT, Message
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 7070
+DEFAULT_HOST = "127.0.0.1"
+# 协调器和代理之间的共享令牌
+TOKEN_ENV = "VMI_CLUSTER_TOKEN"
+
+
+def reference_of(func: Callable) -> str:
+    """获取模块级函数的引用 "模块:限定名"
+
+    Raises:
+        ValueError: 函数是闭包或 lambda，无法在其他进程中导入
+    """
+    qualname = getattr(func, "__qualname__", "")
+    if not qualname or "<" in qualname:
+        raise ValueError(f"只能引用模块级函数: {func!r}")
+    return f"{func.__module__}:{qualname}"
+
+
+def resolve_reference(reference: Union[str, Callable]) -> Callable:
+    """按 "模块:限定名" 导入函数，传入可调用对象时原样返回"""
+    if callable(reference):
+        return reference
+    module_name, _, qualname = reference.partition(":")
+    if not qualname:
+        raise ValueError(f"引用格式应为 模块:函数: {reference}")
+    target: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
+
+
+def parse_address(address: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """解析 "主机:端口"（端口可省略）"""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, default_port
+    return host, int(port)
+
+
+def is_loopback(host: str) -> bool:
+    """是否为本机回环地址"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _Connection:
+    """按行收发 JSON 消息的 TCP 连接"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        data = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            with self._send_lock:
+                self.sock.sendall(data)
+            return True
+        except OSError as e:
+            logger.debug(f"发送消息失败: {e}")
+            return False
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """接收一条消息，连接关闭时返回 None
+
+        Raises:
+            ValueError: 消息不是 JSON 对象
+        """
+        try:
+            line = self._reader.readline()
+        except (OSError, ValueError):
+            return None
+        if not line:
+            return None
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError(f"消息不是 JSON 对象: {line[:100]!r}")
+        return message
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self.sock.close()
+
+
+class AgentChannel:
+    """代理上的任务向协调器发送消息的通道（与 ProcessChannel 接口相同）"""
+
+    def __init__(
+        self,
+        connection: _Connection,
+        index: int,
+        start_event: threading.Event,
+        stop_event: threading.Event,
+        start_delay: Dict[str, float],
+    ):
+        self._connection = connection
+        self.index = index
+        self._start_event = start_event
+        self._stop_event = stop_event
+        self._start_delay = start_delay
+
+    def send(self, kind: str, payload: Any = None):
+        self._connection.send({"type": "message", "kind": kind, "payload": payload})
+
+    def barrier(self) -> bool:
+        """报告就绪并等待协调器的开始消息
+
+        Returns:
+            开始时返回 True，等待期间被要求停止返回 False
+        """
+        self._connection.send({"type": "ready"})
+        while not self._start_event.wait(0.1):
+            if self._stop_event.is_set():
+                return False
+        return not self._stop_event.wait(self._start_delay["delay"])
+
+
+class LoadAgent:
+    """负载代理：连接协调器，依次执行收到的任务"""
+
+    def __init__(
+        self,
+        coordinator: str,
+        name: Optional[str] = None,
+        connect_timeout: float = 60,
+        token: Optional[str] = None,
+    ):
+        """初始化负载代理
+
+        Args:
+            coordinator: 协调器地址 "主机:端口"
+            name: 代理名称，默认主机名
+            connect_timeout: 连接协调器的最长等待时间（秒），期间每秒重试
+            token: 共享令牌，默认读取环境变量 VMI_CLUSTER_TOKEN
+        """
+        self.host, self.port = parse_address(coordinator)
+        self.name = name or socket.gethostname()
+        self.connect_timeout = connect_timeout
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        self.tasks_completed = 0
+
+    def run(self) -> bool:
+        """连接协调器并执行任务，直到协调器关闭连接
+
+        Returns:
+            连接成功返回 True，连接超时返回 False
+        """
+        connection = self._connect()
+        if connection is None:
+            return False
+        tasks: "queue.Queue" = queue.Queue()
+        reader = threading.Thread(
+            target=self._read,
+            args=(connection, tasks),
+            name="LoadAgentReader",
+            daemon=True,
+        )
+        reader.start()
+        connection.send({"type": "hello", "name": self.name, "token": self.token})
+        logger.info(f"负载代理 {self.name} 已连接协调器 {self.host}:{self.port}")
+
+        try:
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                self._run_task(connection, *task)
+                self.tasks_completed += 1
+        finally:
+            connection.close()
+        logger.info(f"负载代理 {self.name} 已断开，共执行 {self.tasks_completed} 个任务")
+        return True
+
+    def _connect(self) -> Optional[_Connection]:
+        deadline = time.time() + self.connect_timeout
+        while True:
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=10)
+                sock.settimeout(None)
+                return _Connection(sock)
+            except OSError as e:
+                if time.time() >= deadline:
+                    logger.error(f"连接协调器 {self.host}:{self.port} 失败: {e}")
+                    return None
+                time.sleep(1)
+
+    @staticmethod
+    def _read(connection: _Connection, tasks: "queue.Queue"):
+        """读取协调器消息：任务放入队列，开始/停止设置当前任务的事件"""
+        current = None
+        while True:
+            try:
+                message = connection.receive()
+            except ValueError as e:
+                logger.error(f"协调器消息格式错误，断开连接: {e}")
+                break
+            if message is None:
+                break
+            kind = message.get("type")
+            if kind == "task":
+                current = {
+                    "start": threading.Event(),
+                    "stop": threading.Event(),
+                    "delay": {"delay": 0.0},
+                }
+                tasks.put((message, current))
+            elif kind == "start" and current is not None:
+                current["delay"]["delay"] = message.get("delay", 0.0)
+                current["start"].set()
+            elif kind == "stop" and current is not None:
+                current["stop"].set()
+        if current is not None:
+            current["stop"].set()
+        tasks.put(None)
+
+    def _run_task(self, connection: _Connection, task: Dict[str, Any], events):
+        index = task["index"]
+        channel = AgentChannel(
+            connection, index, events["start"], events["stop"], events["delay"]
+        )
+        logger.info(f"负载代理 {self.name}: 开始任务 {task.get('name', index)}")
+        try:
+            target = resolve_reference(task["target"])
+            target(channel, events["stop"], *task["args"])
+        except BaseException as e:
+            logger.error(f"负载代理 {self.name}: 任务异常: {e}")
+            channel.send(ERROR, str(e) or repr(e))
+        finally:
+            connection.send({"type": "exit"})
+
+
+class LoadCoordinator:
+    """负载协调器：接受代理连接，分发任务并汇总消息（与 LoadProcessGroup 接口相同）"""
+
+    def __init__(
+        self,
+        agents: int,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        start_delay: float = 1.0,
+        accept_timeout: float = 120,
+        token: Optional[str] = None,
+    ):
+        """初始化协调器并开始监听
+
+        Args:
+            agents: 等待连接的代理数
+            host: 监听地址，默认只监听本机
+            port: 监听端口，0 表示随机端口（见 address）
+            start_delay: 全部代理就绪后到开始施压的延迟（秒）
+            accept_timeout: 等待全部代理连接的最长时间（秒）
+            token: 代理必须携带的共享令牌，默认读取环境变量 VMI_CLUSTER_TOKEN
+
+        Raises:
+            ValueError: 监听非本机地址但没有设置共享令牌
+        """
+        self.token = token if token is not None else os.environ.get(TOKEN_ENV)
+        if not self.token and not is_loopback(host):
+            raise ValueError(
+                f"监听非本机地址 {host} 时必须设置共享令牌（{TOKEN_ENV} 或 token 参数）"
+            )
+        self.agents = agents
+        self.start_delay = start_delay
+        self.accept_timeout = accept_timeout
+        self._server = socket.create_server((host, port))
+        self.address: Tuple[str, int] = self._server.getsockname()[:2]
+
+        self._lock = threading.Lock()
+        self._connections: List[_Connection] = []
+        self.agent_names: List[str] = []
+        self._queue: "queue.Queue[Message]" = queue.Queue()
+        self._active: set = set()
+        self._ready: set = set()
+        self._exited: set = set()
+        self._started = False
+        logger.info(f"负载协调器监听 {self.address[0]}:{self.address[1]}")
+
+    @property
+    def agent_count(self) -> int:
+        return len(self._connections)
+
+    def wait_for_agents(self, timeout: Optional[float] = None) -> int:
+        """等待代理连接，返回已连接的代理数
+
+        Args:
+            timeout: 最长等待时间（秒），默认 accept_timeout
+        """
+        deadline = time.time() + (self.accept_timeout if timeout is None else timeout)
+        while self.agent_count < self.agents:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(
+                    f"等待代理连接超时: {self.agent_count}/{self.agents} 个已连接"
+                )
+                break
+            self._server.settimeout(remaining)
+            try:
+                sock, peer = self._server.accept()
+            except socket.timeout:
+                continue
+            sock.settimeout(None)
+            connection = _Connection(sock)
+            try:
+                hello = connection.receive()
+            except ValueError:
+                hello = None
+            if not hello or hello.get("type") != "hello":
+                connection.close()
+                continue
+            if self.token and not hmac.compare_digest(
+                str(hello.get("token") or ""), self.token
+            ):
+                logger.warning(f"拒绝来自 {peer[0]}:{peer[1]} 的代理连接: 令牌不匹配")
+                connection.close()
+                continue
+            index = len(self._connections)
+            self._connections.append(connection)
+            self.agent_names.append(hello.get("name") or f"{peer[0]}:{peer[1]}")
+            threading.Thread(
+                target=self._read,
+                args=(index, connection),
+                name=f"LoadCoordinator-{index}",
+                daemon=True,
+            ).start()
+            logger.info(f"负载代理 {self.agent_names[-1]} 已连接（{index + 1}/{self.agents}）")
+        return self.agent_count
+
+    def start(self, target: Callable, args_list: Sequence[tuple], name: str = "Load"):
+        """把任务分发给代理，每组参数一个代理
+
+        Args:
+            target: 任务入口（模块级函数或 "模块:函数" 引用），
+                在代理上以 target(channel, stop_event, *args) 调用
+            args_list: 每个代理的参数（必须可以 JSON 序列化）
+            name: 任务名前缀
+        """
+        self.wait_for_agents()
+        if len(args_list) > self.agent_count:
+            raise ValueError(
+                f"任务数 {len(args_list)} 超过已连接的代理数 {self.agent_count}"
+            )
+        reference = target if isinstance(target, str) else reference_of(target)
+        with self._lock:
+            self._active = set(range(len(args_list)))
+            self._ready = set()
+            self._exited = set()
+            self._started = False
+        for index, args in enumerate(args_list):
+            sent = self._connections[index].send(
+                {
+                    "type": "task",
+                    "index": index,
+                    "name": f"{name}-{index}",
+                    "target": reference,
+                    "args": list(args),
+                }
+            )
+            if not sent:
+                self._mark_exited(index, "代理连接已断开")
+        logger.info(f"已向 {len(args_list)} 个负载代理分发任务")
+
+    def poll(self, timeout: float = 1.0) -> List[Message]:
+        """接收消息：等待第一条消息最多 timeout 秒，然后取出队列中所有消息"""
+        messages: List[Message] = []
+        try:
+            messages.append(self._queue.get(timeout=timeout))
+            while True:
+                messages.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    @property
+    def running(self) -> bool:
+        """是否还有代理未完成当前任务（退出消息已进入队列）"""
+        with self._lock:
+            return bool(self._active - self._exited)
+
+    def exited(self, index: int) -> bool:
+        with self._lock:
+            return index in self._exited
+
+    def stop(self, timeout: float = 30, on_message: Optional[Callable] = None):
+        """要求代理停止当前任务并等待完成，连接保持以便执行下一个任务
+
+        Args:
+            timeout: 等待完成的最长时间（秒）
+            on_message: 等待期间收到消息的回调 on_message(kind, index, payload)
+        """
+        with self._lock:
+            pending = self._active - self._exited
+        for index in pending:
+            self._connections[index].send({"type": "stop"})
+        deadline = time.time() + timeout
+        while self.running and time.time() < deadline:
+            wait = min(0.5, max(0.0, deadline - time.time()))
+            for message in self.poll(timeout=wait):
+                if on_message is not None:
+                    on_message(*message)
+        if self.running:
+            logger.warning("部分负载代理未按时完成任务")
+        # 取出剩余消息（包括已完成代理的退出消息）
+        for message in self.poll(timeout=0):
+            if on_message is not None:
+                on_message(*message)
+
+    def close(self):
+        """关闭全部代理连接和监听端口，代理随之退出"""
+        for connection in self._connections:
+            connection.close()
+        self._server.close()
+        logger.info("负载协调器已关闭")
+
+    def __enter__(self) -> "LoadCoordinator":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---- 内部 ----
+
+    def _read(self, index: int, connection: _Connection):
+        while True:
+            try:
+                message = connection.receive()
+            except ValueError as e:
+                logger.error(f"负载代理 {self.agent_names[index]} 消息格式错误: {e}")
+                connection.close()
+                self._mark_exited(index, f"代理消息格式错误: {e}")
+                return
+            if message is None:
+                break
+            kind = message.get("type")
+            if kind == "message" and "kind" in message:
+                self._queue.put((message["kind"], index, message.get("payload")))
+            elif kind == "ready":
+                with self._lock:
+                    self._ready.add(index)
+                self._check_barrier()
+            elif kind == "exit":
+                self._mark_exited(index)
+        if not connection.closed:
+            logger.warning(f"负载代理 {self.agent_names[index]} 连接断开")
+        self._mark_exited(index, "代理连接已断开")
+
+    def _mark_exited(self, index: int, error: Optional[str] = None):
+        with self._lock:
+            if index not in self._active or index in self._exited:
+                return
+            self._exited.add(index)
+        if error:
+            self._queue.put((ERROR, index, error))
+        self._queue.put((EXIT, index, None))
+        self._check_barrier()
+
+    def _check_barrier(self):
+        """全部代理就绪或已退出时广播开始消息"""
+        with self._lock:
+            if self._started or not self._ready:
+                return
+            if self._active - self._ready - self._exited:
+                return
+            self._started = True
+            starting = sorted(self._ready - self._exited)
+        logger.info(f"{len(starting)} 个负载代理已就绪，{self.start_delay:g}秒后开始")
+        for index in starting:
+            self._connections[index].send({"type": "start", "delay": self.start_delay})
+
+
+def main():
+    """主函数：运行负载代理"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="分布式负载代理")
+    parser.add_argument("mode", choices=["agent"], help="运行模式")
+    parser.add_argument("--coordinator", required=True, help="协调器地址 主机:端口")
+    parser.add_argument("--name", default=None, help="代理名称，默认主机名")
+    parser.add_argument(
+        "--connect-timeout", type=float, default=60, help="连接协调器的超时（秒）"
+    )
+    parser.add_argument(
+        "--token",
+        default=None,
+        help=f"共享令牌，默认读取环境变量 {TOKEN_ENV}（避免令牌出现在进程列表中）",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    agent = LoadAgent(args.coordinator, args.name, args.connect_timeout, args.token)
+    return 0 if agent.run() else 1
+
+
+if __name__ == "__main__":
+    exit(main())
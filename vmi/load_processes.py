@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+多进程负载生成 - 在多个工作进程中施压，绕开 GIL
+
+单个 Python 进程在 JSON 编解码和 HTTP 请求上很快就占满一个 CPU 核，早于服务器
+达到瓶颈。LoadProcessGroup 启动若干工作进程，每个进程自行登录会话、运行自己的
+那份负载，通过 multiprocessing 队列（管道）把计数和直方图增量发回父进程，父进程
+边接收边合并。
+
+子进程入口的调用方式为 target(channel, stop_event, *args)：
+- channel.send(kind, payload) 向父进程发送消息（payload 必须可以 pickle）
+- channel.barrier() 在准备完成（如登录会话池）后调用，等待所有进程同时开始；
+  本地进程组立即返回，分布式代理（load_cluster）等待协调器的开始消息
+- stop_event 是进程间共享的 Event，父进程要求停止时被设置
+
+使用 spawn/forkserver 启动方式时 target 和参数必须可以 pickle（模块级函数）；
+默认使用平台的启动方式（Linux 上为 fork，闭包也可以使用）。
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 子进程消息类型：子进程入口异常、子进程退出
+ERROR = "error"
+EXIT = "exit"
+
+# 消息：(类型, 进程序号, 内容)
+Message = Tuple[str, int, Any]
+
+
+class ProcessChannel:
+    """子进程向父进程发送消息的通道"""
+
+    def __init__(self, message_queue, index: int):
+        self._queue = message_queue
+        self.index = index
+
+    def send(self, kind: str, payload: Any = None):
+        self._queue.put((kind, self.index, payload))
+
+    def barrier(self) -> bool:
+        """等待同步开始，本地进程不需要等待，返回 True 表示开始"""
+        return True
+
+
+def _process_entry(target: Callable, message_queue, stop_event, index: int, args):
+    channel = ProcessChannel(message_queue, index)
+    try:
+        target(channel, stop_event, *args)
+    except BaseException as e:
+        logger.error(f"负载进程 {index} 异常: {e}")
+        channel.send(ERROR, str(e) or repr(e))
+    finally:
+        channel.send(EXIT)
+
+
+class LoadProcessGroup:
+    """一组负载工作进程及其消息队列"""
+
+    def __init__(self, start_method: Optional[str] = None):
+        """初始化进程组
+
+        Args:
+            start_method: 进程启动方式（fork、spawn、forkserver），默认使用平台默认值
+        """
+        self._ctx = multiprocessing.get_context(start_method)
+        self._queue = self._ctx.Queue()
+        self.stop_event = self._ctx.Event()
+        self.processes: List[multiprocessing.Process] = []
+        self._exited: set = set()
+
+    def start(self, target: Callable, args_list: Sequence[tuple], name: str = "Load"):
+        """启动进程，每组参数一个进程
+
+        Args:
+            target: 子进程入口 target(channel, stop_event, *args)
+            args_list: 每个进程的参数
+            name: 进程名前缀
+        """
+        for index, args in enumerate(args_list):
+            process = self._ctx.Process(
+                target=_process_entry,
+                args=(target, self._queue, self.stop_event, index, tuple(args)),
+                name=f"{name}-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"已启动 {len(self.processes)} 个负载进程")
+
+    def poll(self, timeout: float = 1.0) -> List[Message]:
+        """接收消息：等待第一条消息最多 timeout 秒，然后取出队列中所有消息"""
+        messages: List[Message] = []
+        try:
+            messages.append(self._queue.get(timeout=timeout))
+            while True:
+                messages.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        for kind, index, _ in messages:
+            if kind == EXIT:
+                self._exited.add(index)
+        return messages
+
+    @property
+    def running(self) -> bool:
+        """是否还有进程未处理完
+
+        正常结束的进程（exitcode 为 0）的退出消息一定在队列中，收到前仍视为运行中；
+        被信号终止的进程不会发送退出消息，视为已退出。
+        """
+        return any(
+            index not in self._exited and (process.is_alive() or process.exitcode == 0)
+            for index, process in enumerate(self.processes)
+        )
+
+    def exited(self, index: int) -> bool:
+        return index in self._exited
+
+    def stop(self, timeout: float = 30, on_message: Optional[Callable] = None):
+        """要求所有进程停止并等待退出，超时后强制终止
+
+        Args:
+            timeout: 等待退出的最长时间（秒）
+            on_message: 等待期间收到消息的回调 on_message(kind, index, payload)
+        """
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        while self.running and time.time() < deadline:
+            wait = min(0.5, max(0.0, deadline - time.time()))
+            for message in self.poll(timeout=wait):
+                if on_message is not None:
+                    on_message(*message)
+
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                logger.warning(f"负载进程 {process.name} 未按时退出，强制终止")
+                process.terminate()
+                process.join(5)
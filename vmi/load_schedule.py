@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+开环负载的到达时间表
+
+开环（open-loop）测试按目标到达速率预先排好每个请求的计划发送时间，不等待上一个
+请求完成；响应时间从计划发送时间开始计算，服务变慢时排队时间也计入延迟，避免
+闭环测试的协调遗漏（coordinated omission）。
+
+支持的到达方式：
+- constant：固定间隔 1/rate
+- poisson：泊松过程，间隔服从均值 1/rate 的指数分布
+- stepped：分级速率，依次按 [(rate, duration), ...] 中每一级的速率固定间隔发送
+
+时间表为相对测试开始时间的偏移（秒），升序排列。
+
+负载曲线（profile）生成分级速率 [(rate, duration), ...]，每一级单独测量：
+- ramp：线性爬升，从起始速率到最高速率等分为若干级
+- stairs：阶梯，每级增加固定速率
+- spike：基础速率中间插入一段突发速率
+- soak：长时间固定速率，按窗口分级以观察随时间的劣化
+"""
+
+import random
+from typing import Any, List, Optional, Sequence, Tuple
+
+CONSTANT = "constant"
+POISSON = "poisson"
+STEPPED = "stepped"
+
+ARRIVAL_MODES = (CONSTANT, POISSON, STEPPED)
+
+RAMP = "ramp"
+STAIRS = "stairs"
+SPIKE = "spike"
+SOAK = "soak"
+
+LOAD_PROFILES = (RAMP, STAIRS, SPIKE, SOAK)
+
+Steps = List[Tuple[float, float]]
+
+
+def constant_arrivals(rate: float, duration: float, start: float = 0.0) -> List[float]:
+    """固定速率的到达时间表
+
+    Args:
+        rate: 到达速率（次/秒）
+        duration: 持续时间（秒）
+        start: 起始偏移（秒）
+    """
+    if rate <= 0 or duration <= 0:
+        return []
+    interval = 1.0 / rate
+    count = int(round(rate * duration))
+    return [start + i * interval for i in range(count)]
+
+
+def poisson_arrivals(
+    rate: float, duration: float, seed: Optional[int] = None, start: float = 0.0
+) -> List[float]:
+    """泊松过程的到达时间表
+
+    Args:
+        rate: 平均到达速率（次/秒）
+        duration: 持续时间（秒）
+        seed: 随机种子，指定后时间表可重现
+        start: 起始偏移（秒）
+    """
+    if rate <= 0 or duration <= 0:
+        return []
+    rng = random.Random(seed)
+    arrivals = []
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        arrivals.append(start + offset)
+        offset += rng.expovariate(rate)
+    return arrivals
+
+
+def stepped_arrivals(steps: Sequence[Tuple[float, float]]) -> List[float]:
+    """分级速率的到达时间表
+
+    Args:
+        steps: [(速率, 持续时间), ...]，依次执行
+    """
+    arrivals: List[float] = []
+    start = 0.0
+    for rate, duration in steps:
+        arrivals.extend(constant_arrivals(rate, duration, start))
+        start += duration
+    return arrivals
+
+
+def build_arrivals(
+    arrival: str = CONSTANT,
+    rate: Optional[float] = None,
+    duration: Optional[float] = None,
+    steps: Optional[Sequence[Tuple[float, float]]] = None,
+    seed: Optional[int] = None,
+) -> List[float]:
+    """按到达方式生成时间表
+
+    Args:
+        arrival: constant、poisson 或 stepped
+        rate: 到达速率（constant、poisson 使用）
+        duration: 持续时间（constant、poisson 使用）
+        steps: 分级速率（stepped 使用）
+        seed: 随机种子（poisson 使用）
+
+    Raises:
+        ValueError: 到达方式未知或缺少参数
+    """
+    if arrival == STEPPED:
+        if not steps:
+            raise ValueError("stepped 到达方式需要指定 steps")
+        return stepped_arrivals(steps)
+    if arrival not in (CONSTANT, POISSON):
+        raise ValueError(f"未知的到达方式: {arrival}")
+    if rate is None or duration is None:
+        raise ValueError(f"{arrival} 到达方式需要指定 rate 和 duration")
+    if arrival == POISSON:
+        return poisson_arrivals(rate, duration, seed)
+    return constant_arrivals(rate, duration)
+
+
+def ramp_steps(
+    start_rate: float, end_rate: float, duration: float, step_count: int = 10
+) -> Steps:
+    """线性爬升：从 start_rate 到 end_rate 等分为 step_count 级
+
+    Args:
+        start_rate: 第一级速率（次/秒）
+        end_rate: 最后一级速率（次/秒）
+        duration: 总持续时间（秒），每级 duration / step_count
+        step_count: 级数
+    """
+    if step_count < 1 or duration <= 0:
+        raise ValueError("ramp 需要 step_count >= 1 且 duration > 0")
+    step_duration = duration / step_count
+    if step_count == 1:
+        return [(end_rate, step_duration)]
+    increment = (end_rate - start_rate) / (step_count - 1)
+    return [(start_rate + i * increment, step_duration) for i in range(step_count)]
+
+
+def stair_steps(
+    start_rate: float, step_rate: float, step_count: int, step_duration: float
+) -> Steps:
+    """阶梯：从 start_rate 开始每级增加 step_rate
+
+    Args:
+        start_rate: 第一级速率（次/秒）
+        step_rate: 每级增加的速率（次/秒）
+        step_count: 级数
+        step_duration: 每级持续时间（秒）
+    """
+    if step_count < 1 or step_duration <= 0:
+        raise ValueError("stairs 需要 step_count >= 1 且 step_duration > 0")
+    return [(start_rate + i * step_rate, step_duration) for i in range(step_count)]
+
+
+def spike_steps(
+    base_rate: float, spike_rate: float, duration: float, spike_duration: float
+) -> Steps:
+    """突发：基础速率持续 duration，正中插入 spike_duration 的突发速率
+
+    Args:
+        base_rate: 基础速率（次/秒）
+        spike_rate: 突发速率（次/秒）
+        duration: 总持续时间（秒，包含突发）
+        spike_duration: 突发持续时间（秒）
+    """
+    if not 0 < spike_duration < duration:
+        raise ValueError("spike 需要 0 < spike_duration < duration")
+    before = (duration - spike_duration) / 2
+    return [(base_rate, before), (spike_rate, spike_duration), (base_rate, before)]
+
+
+def soak_steps(rate: float, duration: float, window: float = 60.0) -> Steps:
+    """浸泡：固定速率持续 duration，按 window 分级（最后一级可能较短）
+
+    Args:
+        rate: 速率（次/秒）
+        duration: 总持续时间（秒）
+        window: 每级时长（秒）
+    """
+    if duration <= 0 or window <= 0:
+        raise ValueError("soak 需要 duration > 0 且 window > 0")
+    steps: Steps = []
+    remaining = duration
+    while remaining > 1e-9:
+        steps.append((rate, min(window, remaining)))
+        remaining -= window
+    return steps
+
+
+_PROFILE_BUILDERS = {
+    RAMP: ramp_steps,
+    STAIRS: stair_steps,
+    SPIKE: spike_steps,
+    SOAK: soak_steps,
+}
+
+
+def build_profile(profile: str, **params: Any) -> Steps:
+    """按负载曲线名称生成分级速率
+
+    Args:
+        profile: ramp、stairs、spike 或 soak
+        **params: 对应生成函数的参数
+
+    Raises:
+        ValueError: 曲线未知或参数不合法
+    """
+    builder = _PROFILE_BUILDERS.get(profile)
+    if builder is None:
+        raise ValueError(f"未知的负载曲线: {profile}")
+    try:
+        return builder(**params)
+    except TypeError as e:
+        raise ValueError(f"{profile} 负载曲线参数错误: {e}") from e
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+负载生成测试的共享辅助类
+
+多进程和分布式负载测试都用 FakeAgingWorker 代替 AgingTestWorker，
+验证运行器的分发和统计合并，不访问服务器。
+"""
+
+import os
+import time
+
+from latency_histogram import HistogramSet
+
+
+class FakeAgingWorker:
+    """代替 AgingTestWorker，不访问服务器，按固定耗时记录操作
+
+    第 N 个工作线程（从 0 开始）每次操作记录 0.01 * (N + 1) 秒
+    """
+
+    def __init__(self, worker_id, config, result_sink=None):
+        self.worker_id = worker_id
+        self.latency_histograms = HistogramSet()
+        self.operations = 0
+
+    def run(self, stop_event):
+        while not stop_event.is_set():
+            self.operations += 1
+            self.latency_histograms.record("partner.read", 0.01 * (self.worker_id + 1))
+            time.sleep(0.01)
+
+    def get_statistics(self):
+        return {
+            "total_operations": self.operations,
+            "successful_operations": self.operations,
+            "failed_operations": 0,
+            "total_entities": 0,
+            "avg_duration": 0.01 * (self.worker_id + 1),
+            "pid": os.getpid(),
+        }
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+本地 VMI 测试服务器
+
+基于内存存储实现 VMI 实体的 REST 接口和 CAS 会话接口，用于在没有真实服务器时
+验证 SDK、会话管理和并发/老化测试框架的行为：
+- 实体接口：POST/GET {path}s/、GET/PUT/DELETE {path}s/{id}、GET {path}/count/
+- 会话接口：/api/v1/cas/session/login/、refresh/、logout/
+- 会话实体可携带 expireTime（毫秒），用于验证按令牌过期时间主动刷新
+- 支持 Idempotency-Key 请求头：同一个键的创建请求只执行一次，重复请求返回首次结果
+- 支持故障注入：处理请求后丢弃响应（模拟超时后结果未知）、固定延迟
+
+使用示例：
+    with LocalTestServer() as server:
+        session = MagicSession(server.url, "")
+        ...
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+CAS_SESSION_PREFIX = f"{API_PREFIX}/cas/session/"
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """加大监听队列，避免并发建连被丢弃后等待 1 秒重传"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalTestServer:
+    """内存版 VMI 测试服务器"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        honor_idempotency: bool = True,
+        require_auth: bool = False,
+        session_ttl: Optional[float] = None,
+    ):
+        """初始化测试服务器
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            honor_idempotency: 是否按 Idempotency-Key 去重创建请求
+            require_auth: 实体接口是否校验 Bearer 令牌
+            session_ttl: 令牌有效期（秒），设置后登录/刷新返回的实体携带 expireTime
+        """
+        self.honor_idempotency = honor_idempotency
+        self.require_auth = require_auth
+        self.session_ttl = session_ttl
+        # 每个请求的固定处理延迟（秒）
+        self.latency = 0.0
+
+        self._lock = threading.Lock()
+        self._entities: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._next_id = 1
+        self._idempotent: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, str] = {}
+        self._drop_rules: List[List[Any]] = []
+        self.stats = {
+            "requests": 0,
+            "by_method": {},
+            "logins": 0,
+            "refreshes": 0,
+            "idempotent_replays": 0,
+            "dropped_responses": 0,
+        }
+
+        self._httpd = _HTTPServer((host, port), _make_handler(self))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """服务器地址（作为 MagicSession 的 base_url）"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalTestServer":
+        """在后台线程启动服务器"""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="local-test-server",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("本地测试服务器已启动: %s", self.url)
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(5)
+            self._thread = None
+
+    def __enter__(self) -> "LocalTestServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ---- 故障注入与检查 ----
+
+    def drop_responses(self, count: int = 1, method: str = "POST"):
+        """处理后续 count 个 method 请求后丢弃响应（服务端已执行，客户端看到连接中断）"""
+        with self._lock:
+            self._drop_rules.append([method.upper(), count])
+
+    def entities(self, entity_path: str) -> List[Dict[str, Any]]:
+        """获取指定实体路径（如 '/vmi/partner'）下的全部实体"""
+        with self._lock:
+            return [dict(v) for v in self._entities.get(entity_path, {}).values()]
+
+    def entity_count(self, entity_path: str) -> int:
+        """获取指定实体路径下的实体数量"""
+        with self._lock:
+            return len(self._entities.get(entity_path, {}))
+
+    # ---- 请求处理 ----
+
+    def _should_drop(self, method: str) -> bool:
+        with self._lock:
+            for rule in self._drop_rules:
+                if rule[0] == method and rule[1] > 0:
+                    rule[1] -= 1
+                    self.stats["dropped_responses"] += 1
+                    return True
+        return False
+
+    def _count_request(self, method: str):
+        with self._lock:
+            self.stats["requests"] += 1
+            by_method = self.stats["by_method"]
+            by_method[method] = by_method.get(method, 0) + 1
+
+    def handle(
+        self, method: str, raw_path: str, headers: Dict[str, str], body: Any
+    ) -> Tuple[int, Dict[str, Any]]:
+        """处理请求，返回 (HTTP状态码, 响应体)"""
+        self._count_request(method)
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        parts = urlsplit(raw_path)
+        path = parts.path
+        query = dict(parse_qsl(parts.query))
+
+        if path.startswith(CAS_SESSION_PREFIX):
+            action = path[len(CAS_SESSION_PREFIX) :]
+            return self._handle_cas(method, action, headers, body)
+
+        if self.require_auth and not self._authorized(headers):
+            return 401, _error(401, "未授权")
+
+        if not path.startswith(API_PREFIX):
+            return 404, _error(404, f"未知路径: {path}")
+        path = path[len(API_PREFIX) :]
+
+        if path.endswith("/count/") and method == "GET":
+            entity_path = path[: -len("/count/")]
+            return 200, {"total": len(self._filter(entity_path, query))}
+
+        if path.endswith("s/"):
+            entity_path = path[:-2]
+            if method == "POST":
+                return self._insert(entity_path, body, headers.get("Idempotency-Key"))
+            if method == "GET":
+                values = self._filter(entity_path, query)
+                return 200, {"values": values}
+
+        head, sep, tail = path.rpartition("s/")
+        if sep and tail.isdigit():
+            return self._handle_item(method, head, int(tail), body)
+
+        return 404, _error(404, f"未知路径: {path}")
+
+    def _authorized(self, headers: Dict[str, str]) -> bool:
+        auth = headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return False
+        with self._lock:
+            return auth[len("Bearer ") :] in self._tokens
+
+    def _handle_cas(
+        self, method: str, action: str, headers: Dict[str, str], body: Any
+    ) -> Tuple[int, Dict[str, Any]]:
+        if action == "login/" and method == "POST":
+            account = (body or {}).get("account")
+            if not account:
+                return 400, _error(4, "缺少账户")
+            token = uuid.uuid4().hex
+            with self._lock:
+                self._tokens[token] = account
+                self.stats["logins"] += 1
+            return 200, {"value": self._session_value(token, account)}
+
+        auth = headers.get("Authorization", "")
+        old_token = auth[len("Bearer ") :] if auth.startswith("Bearer ") else ""
+        with self._lock:
+            account = self._tokens.pop(old_token, None)
+            if account is None:
+                return 401, _error(401, "会话无效")
+            if action == "refresh/" and method == "GET":
+                token = uuid.uuid4().hex
+                self._tokens[token] = account
+                self.stats["refreshes"] += 1
+                return 200, {"value": self._session_value(token, account)}
+            if action == "logout/" and method == "DELETE":
+                return 200, {"value": {"account": account}}
+            self._tokens[old_token] = account
+        return 404, _error(404, f"未知会话操作: {action}")
+
+    def _session_value(self, token: str, account: str) -> Dict[str, Any]:
+        entity = {"account": account}
+        if self.session_ttl is not None:
+            entity["expireTime"] = int((time.time() + self.session_ttl) * 1000)
+        return {"sessionToken": token, "entity": entity}
+
+    def _insert(
+        self, entity_path: str, body: Any, idempotency_key: Optional[str]
+    ) -> Tuple[int, Dict[str, Any]]:
+        if not isinstance(body, dict):
+            return 400, _error(4, "illegal value type")
+        with self._lock:
+            if self.honor_idempotency and idempotency_key:
+                cached = self._idempotent.get(idempotency_key)
+                if cached is not None:
+                    self.stats["idempotent_replays"] += 1
+                    return 200, cached
+            entity = {k: v for k, v in body.items() if k != "id"}
+            entity["id"] = self._next_id
+            entity["createTime"] = entity["modifyTime"] = int(time.time() * 1000)
+            entity["namespace"] = ""
+            self._next_id += 1
+            self._entities.setdefault(entity_path, {})[entity["id"]] = entity
+            response = {"value": dict(entity)}
+            if self.honor_idempotency and idempotency_key:
+                self._idempotent[idempotency_key] = response
+        return 200, response
+
+    def _filter(self, entity_path: str, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            values = list(self._entities.get(entity_path, {}).values())
+        # 只按实体中存在的字段做等值过滤，分页等其他参数忽略
+        return [
+            dict(v)
+            for v in values
+            if all(str(v[k]) == val for k, val in query.items() if k in v)
+        ]
+
+    def _handle_item(
+        self, method: str, entity_path: str, entity_id: int, body: Any
+    ) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            table = self._entities.get(entity_path, {})
+            entity = table.get(entity_id)
+            if entity is None:
+                return 200, _error(6, f"实体不存在, ID: {entity_id}")
+            if method == "GET":
+                return 200, {"value": dict(entity)}
+            if method == "PUT":
+                if not isinstance(body, dict):
+                    return 400, _error(4, "illegal value type")
+                entity.update({k: v for k, v in body.items() if k != "id"})
+                entity["modifyTime"] = int(time.time() * 1000)
+                return 200, {"value": dict(entity)}
+            if method == "DELETE":
+                del table[entity_id]
+                return 200, {"value": dict(entity)}
+        return 405, _error(405, f"不支持的方法: {method}")
+
+
+def _error(code: int, message: str) -> Dict[str, Any]:
+    return {"error": {"code": code, "message": message}}
+
+
+def _make_handler(server: LocalTestServer):
+    """创建绑定到测试服务器实例的请求处理类"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _dispatch(self, method: str):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = None
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    body = None
+
+            status, payload = server.handle(method, self.path, dict(self.headers), body)
+
+            if server._should_drop(method):
+                # 请求已处理，但不返回响应
+                self.close_connection = True
+                return
+
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, format, *args):
+            logger.debug("本地测试服务器: " + format, *args)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地 VMI 测试服务器")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    local_server = LocalTestServer(args.host, args.port).start()
+    print(f"本地测试服务器运行中: {local_server.url}，按 Ctrl+C 停止")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        local_server.stop()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+实时指标端点 - 以 Prometheus 文本格式（exposition format 0.0.4）输出运行中测试的
+指标，供监控系统定期抓取
+
+- MetricsWriter：按指标族输出 HELP/TYPE 和样本，直方图由 LatencyHistogram 按固定
+  上界（le）输出累计次数
+- RequestMetrics：线程安全的请求计数、耗时直方图和进行中的请求数（按键）
+- MetricsServer：后台线程中的 HTTP 服务器，GET /metrics 时调用 collect() 生成内容
+
+老化测试运行器和并发测试运行器各自实现 collect_metrics()，启动方式见
+AgingTestRunner（配置 metrics_address）和 ConcurrentTestRunner.start_metrics_server。
+
+使用示例：
+    with MetricsServer(runner.collect_metrics, port=9108) as server:
+        ...  # curl http://127.0.0.1:9108/metrics
+"""
+
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# 默认监听端口
+DEFAULT_METRICS_PORT = 9108
+# 耗时直方图的上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Dict[str, Any]
+Samples = Union[float, Iterable[Tuple[Labels, float]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    """Prometheus 文本格式输出，指标名加上统一前缀"""
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help_text: str) -> str:
+        name = self.prefix + name
+        self._lines.append(f"# HELP {name} {_escape(help_text)}")
+        self._lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def _samples(self, name: str, samples: Samples):
+        if isinstance(samples, (int, float)):
+            samples = [({}, samples)]
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def counter(self, name: str, help_text: str, samples: Samples):
+        """计数器，name 应以 _total 结尾"""
+        self._samples(self._family(name, "counter", help_text), samples)
+
+    def gauge(self, name: str, help_text: str, samples: Samples):
+        self._samples(self._family(name, "gauge", help_text), samples)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        histograms: Iterable[Tuple[Labels, LatencyHistogram]],
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        """直方图：各上界的累计次数（_bucket）、总和（_sum）和次数（_count）"""
+        name = self._family(name, "histogram", help_text)
+        bounds = sorted(buckets)
+        for labels, histogram in histograms:
+            counts = histogram.cumulative_counts(bounds)
+            for bound, count in zip(bounds, counts):
+                le = _format_labels(dict(labels, le=_format_value(float(bound))))
+                self._lines.append(f"{name}_bucket{le} {count}")
+            count = histogram.count
+            le = _format_labels(dict(labels, le="+Inf"))
+            self._lines.append(f"{name}_bucket{le} {count}")
+            self._lines.append(
+                f"{name}_sum{_format_labels(labels)} {histogram.mean * count!r}"
+            )
+            self._lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+class RequestMetrics:
+    """按键（如测试名称）统计请求次数、成功请求的耗时直方图和进行中的请求数
+    （线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = {
+                "successful": 0,
+                "failed": 0,
+                "in_flight": 0,
+                "histogram": LatencyHistogram(),
+            }
+        return entry
+
+    def started(self, key: str):
+        with self._lock:
+            self._entry(key)["in_flight"] += 1
+
+    def finished(self, key: str):
+        with self._lock:
+            self._entry(key)["in_flight"] -= 1
+
+    def record(self, key: str, success: bool, duration: float):
+        with self._lock:
+            entry = self._entry(key)
+            entry["successful" if success else "failed"] += 1
+            histogram = entry["histogram"]
+        if success:
+            histogram.record(duration)
+
+    def merge(
+        self,
+        key: str,
+        successful: int,
+        failed: int,
+        histogram: Optional[LatencyHistogram] = None,
+    ):
+        """合并其他进程上报的增量"""
+        with self._lock:
+            entry = self._entry(key)
+            entry["successful"] += successful
+            entry["failed"] += failed
+            target = entry["histogram"]
+        if histogram is not None:
+            target.merge(histogram)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """各键的次数、进行中的请求数和直方图副本"""
+        with self._lock:
+            entries = {key: dict(entry) for key, entry in self._keys.items()}
+        for entry in entries.values():
+            entry["histogram"] = entry["histogram"].copy()
+        return entries
+
+
+def _make_handler(collect: Callable[[], str]):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = collect().encode("utf-8")
+            except Exception as e:
+                logger.error(f"生成指标失败: {e}")
+                self.send_error(500)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("指标端点: " + format, *args)
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """指标 HTTP 服务器（后台线程）"""
+
+    def __init__(
+        self,
+        collect: Callable[[], str],
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_METRICS_PORT,
+    ):
+        """初始化指标服务器
+
+        Args:
+            collect: 生成 Prometheus 文本的函数，每次抓取时在服务器线程中调用
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(collect))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="metrics-server",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(f"指标端点已启动: {self.url}")
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join(5)
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -9,13 +9,20 @@
 4. 向后兼容：默认使用autotest租户，保持现有行为不变
 """
 
+import concurrent.futures
 import logging
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# 并行初始化/关闭租户会话的默认并发数和单个租户超时（秒）
+DEFAULT_TENANT_CONCURRENCY = 8
+DEFAULT_TENANT_INIT_TIMEOUT = 30
+DEFAULT_TENANT_CLOSE_TIMEOUT = 10
+
 
 class MultiTenantSessionManager:
     """多租户会话管理器
@@ -45,6 +52,8 @@ class MultiTenantSessionManager:
         self.session_managers: Dict[str, SessionManager] = {}
         self.session_locks: Dict[str, threading.RLock] = {}
         self.is_initialized = False
+        # 最近一次初始化的明细：租户ID -> {"status": ok/failed/timeout/error, "elapsed": 秒}
+        self.init_report: Dict[str, Dict[str, Any]] = {}
 
         # 为每个租户创建SessionManager实例和锁
         for tenant_id, config in tenant_configs.items():
@@ -58,8 +67,18 @@ class MultiTenantSessionManager:
                 self.session_locks[tenant_id] = threading.RLock()
                 logger.debug(f"为租户 '{tenant_id}' 创建了SessionManager")
 
-    def initialize_all(self) -> Dict[str, bool]:
-        """初始化所有租户的会话
+    def initialize_all(
+        self,
+        max_concurrency: int = DEFAULT_TENANT_CONCURRENCY,
+        timeout: Optional[float] = DEFAULT_TENANT_INIT_TIMEOUT,
+    ) -> Dict[str, bool]:
+        """并行初始化所有租户的会话
+
+        部分租户失败不影响其他租户；再次调用时只重试尚未登录的租户。
+
+        Args:
+            max_concurrency: 同时登录的租户数量上限
+            timeout: 单个租户登录的超时时间（秒），None 表示不限制
 
         Returns:
             字典：租户ID -> 初始化是否成功
@@ -69,23 +88,130 @@ class MultiTenantSessionManager:
             return {tid: True for tid in self.session_managers.keys()}
 
         results = {}
+        pending = []
         for tenant_id, session_mgr in self.session_managers.items():
-            with self.session_locks[tenant_id]:
-                try:
-                    success = session_mgr.create_session()
-                    if success:
-                        session_mgr.start_auto_refresh()
-                        logger.info(f"租户 '{tenant_id}' 会话初始化成功")
-                    else:
-                        logger.error(f"租户 '{tenant_id}' 会话初始化失败")
-                    results[tenant_id] = success
-                except Exception as e:
-                    logger.error(f"租户 '{tenant_id}' 会话初始化异常: {e}")
-                    results[tenant_id] = False
+            if session_mgr.is_logged_in:
+                results[tenant_id] = True
+            else:
+                pending.append(tenant_id)
+
+        start_time = time.time()
+        report = self._run_for_tenants(
+            pending, self._initialize_tenant, max_concurrency, timeout, "初始化"
+        )
+        for tenant_id, outcome in report.items():
+            results[tenant_id] = outcome["status"] == "ok"
+            self.init_report[tenant_id] = outcome
 
         self.is_initialized = all(results.values())
+        failed = [tid for tid, success in results.items() if not success]
+        logger.info(
+            f"多租户会话初始化完成: 成功 {len(results) - len(failed)}/{len(results)}，"
+            f"耗时 {time.time() - start_time:.2f}秒"
+            + (f"，失败租户: {failed}" if failed else "")
+        )
         return results
 
+    def _initialize_tenant(self, tenant_id: str, abandoned: threading.Event) -> bool:
+        """登录单个租户并启动自动刷新（在初始化线程池中执行）"""
+        session_mgr = self.session_managers[tenant_id]
+        with self.session_locks[tenant_id]:
+            success = session_mgr.create_session()
+            if success and abandoned.is_set():
+                # 已按超时处理，丢弃迟到的会话，下次初始化重新登录
+                session_mgr.close_session()
+                return False
+            if success:
+                session_mgr.start_auto_refresh()
+                logger.info(f"租户 '{tenant_id}' 会话初始化成功")
+            else:
+                logger.error(f"租户 '{tenant_id}' 会话初始化失败")
+            return success
+
+    def _run_for_tenants(
+        self,
+        tenant_ids: List[str],
+        func: Callable[[str, threading.Event], bool],
+        max_concurrency: int,
+        timeout: Optional[float],
+        action: str,
+    ) -> Dict[str, Dict[str, Any]]:
+        """在线程池中对多个租户并行执行操作
+
+        timeout 是每个租户的时限，从该租户开始执行时计时（排队等待并发名额的时间不
+        计入）。超时的租户记为超时并设置 abandoned 事件，由 func 在完成后自行清理；
+        它的线程不再占用并发名额，排队的租户立即开始，不受其他租户耗时的影响。
+
+        Returns:
+            租户ID -> {"status": ok/failed/timeout/error, "elapsed": 秒}
+        """
+        report: Dict[str, Dict[str, Any]] = {}
+        if not tenant_ids:
+            return report
+
+        abandoned = {tid: threading.Event() for tid in tenant_ids}
+
+        def run(tenant_id: str) -> Tuple[bool, float]:
+            start_time = time.time()
+            success = func(tenant_id, abandoned[tenant_id])
+            return success, time.time() - start_time
+
+        workers = max(1, min(max_concurrency, len(tenant_ids)))
+        pending = deque(tenant_ids)
+        # 运行中的租户：future -> (租户ID, 开始时间)
+        running: Dict[concurrent.futures.Future, Tuple[str, float]] = {}
+        # 超时放弃的租户仍占用线程，线程数按租户数上限创建，并发名额只计运行中的租户
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(tenant_ids), thread_name_prefix=f"tenant-{action}"
+        )
+
+        def fill():
+            while pending and len(running) < workers:
+                tenant_id = pending.popleft()
+                running[executor.submit(run, tenant_id)] = (tenant_id, time.time())
+
+        try:
+            fill()
+            while running:
+                wait_timeout = None
+                if timeout is not None:
+                    first_deadline = min(start for _, start in running.values())
+                    wait_timeout = max(0.0, first_deadline + timeout - time.time())
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=wait_timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    tenant_id, _ = running.pop(future)
+                    try:
+                        success, elapsed = future.result()
+                        report[tenant_id] = {
+                            "status": "ok" if success else "failed",
+                            "elapsed": elapsed,
+                        }
+                    except Exception as e:
+                        logger.error(f"租户 '{tenant_id}' {action}异常: {e}")
+                        report[tenant_id] = {"status": "error", "elapsed": 0.0}
+                if timeout is not None:
+                    now = time.time()
+                    for future, (tenant_id, start) in list(running.items()):
+                        if now - start < timeout:
+                            continue
+                        del running[future]
+                        abandoned[tenant_id].set()
+                        logger.error(f"租户 '{tenant_id}' {action}超时({timeout}秒)")
+                        report[tenant_id] = {
+                            "status": "timeout",
+                            "elapsed": now - start,
+                        }
+                fill()
+        finally:
+            # 不等待超时的租户，其线程在操作返回后自行退出
+            executor.shutdown(wait=False)
+
+        return report
+
     def get_session_manager(self, tenant_id: str = "autotest") -> Optional[Any]:
         """获取指定租户的SessionManager实例
 
@@ -147,11 +273,8 @@ class MultiTenantSessionManager:
                 logger.warning(f"租户 '{tenant_id}' 会话超时，尝试重新登录")
                 return session_mgr.reconnect()
 
-            # 检查是否需要刷新
-            if (
-                current_time - session_mgr.last_refresh_time
-                > session_mgr.refresh_interval
-            ):
+            # 检查是否需要刷新（刷新时间带抖动，或令牌即将过期）
+            if session_mgr.needs_refresh():
                 logger.debug(f"租户 '{tenant_id}' 会话需要刷新")
                 return session_mgr.refresh_session()
 
@@ -249,25 +372,37 @@ class MultiTenantSessionManager:
                     logger.error(f"租户 '{tenant_id}' 停止自动刷新失败: {e}")
         return results
 
-    def close_all_sessions(self) -> Dict[str, bool]:
-        """关闭所有租户的会话
+    def close_all_sessions(
+        self,
+        max_concurrency: int = DEFAULT_TENANT_CONCURRENCY,
+        timeout: Optional[float] = DEFAULT_TENANT_CLOSE_TIMEOUT,
+    ) -> Dict[str, bool]:
+        """并行关闭所有租户的会话
+
+        Args:
+            max_concurrency: 同时关闭的租户数量上限
+            timeout: 单个租户关闭的超时时间（秒），None 表示不限制
 
         Returns:
             字典：租户ID -> 关闭是否成功
         """
-        results = {}
-        for tenant_id, session_mgr in self.session_managers.items():
-            with self.session_locks[tenant_id]:
-                try:
-                    session_mgr.close_session()
-                    results[tenant_id] = True
-                    logger.debug(f"租户 '{tenant_id}' 会话已关闭")
-                except Exception as e:
-                    results[tenant_id] = False
-                    logger.error(f"租户 '{tenant_id}' 关闭会话失败: {e}")
+        report = self._run_for_tenants(
+            list(self.session_managers.keys()),
+            self._close_tenant,
+            max_concurrency,
+            timeout,
+            "关闭会话",
+        )
 
         self.is_initialized = False
-        return results
+        return {tid: outcome["status"] == "ok" for tid, outcome in report.items()}
+
+    def _close_tenant(self, tenant_id: str, abandoned: threading.Event) -> bool:
+        """关闭单个租户的会话（在线程池中执行）"""
+        with self.session_locks[tenant_id]:
+            self.session_managers[tenant_id].close_session()
+            logger.debug(f"租户 '{tenant_id}' 会话已关闭")
+            return True
 
     def get_tenant_status(self, tenant_id: str) -> Dict[str, Any]:
         """获取指定租户的会话状态
@@ -291,10 +426,10 @@ class MultiTenantSessionManager:
                 "username": session_mgr.username,
                 "last_activity_time": session_mgr.last_activity_time,
                 "last_refresh_time": session_mgr.last_refresh_time,
+                "next_refresh_time": session_mgr.next_refresh_time,
                 "session_timeout": session_mgr.session_timeout,
                 "refresh_interval": session_mgr.refresh_interval,
-                "is_auto_refresh_running": session_mgr.refresh_thread is not None
-                and session_mgr.refresh_thread.is_alive(),
+                "is_auto_refresh_running": session_mgr.is_auto_refresh_running(),
             }
 
     def get_all_tenant_status(self) -> Dict[str, Dict[str, Any]]:
@@ -422,8 +557,13 @@ def init_global_multi_tenant_manager() -> Optional[MultiTenantSessionManager]:
             # 创建多租户管理器
             _global_multi_tenant_manager = MultiTenantSessionManager(tenant_configs)
 
-            # 初始化所有租户会话
-            init_results = _global_multi_tenant_manager.initialize_all()
+            # 并行初始化所有租户会话
+            init_results = _global_multi_tenant_manager.initialize_all(
+                max_concurrency=config.get(
+                    "init_concurrency", DEFAULT_TENANT_CONCURRENCY
+                ),
+                timeout=config.get("init_timeout", DEFAULT_TENANT_INIT_TIMEOUT),
+            )
 
             # 检查初始化结果
             successful_tenants = [
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+多租户性能隔离（noisy neighbor）基准测试
+
+逐级提高一个"施压"租户（aggressor）的请求速率，同时让其他"受害"租户（victims）
+保持固定的低速率请求，测量受害租户的延迟分位数，输出每个受害租户随施压速率
+变化的劣化曲线。第一级施压速率固定为 0，作为基线。
+
+请求按固定速率开环发送（不等待上一个请求完成），由 TenantScheduler 按租户分配
+并发配额执行，客户端排队不会让施压租户挤占受害租户的并发名额；延迟只统计
+请求本身的耗时。
+
+使用方法：
+    python3 noisy_neighbor_benchmark.py --aggressor tenant1 \\
+        --victims autotest tenant2 --rates 5 10 20 40 --victim-rate 2
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+import unicodedata
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from tenant_scheduler import ROUND_ROBIN, TenantScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """计算分位数（线性插值），没有数据时返回 0
+
+    Args:
+        values: 样本
+        pct: 百分位（0-100）
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies: Sequence[float], errors: int = 0) -> Dict[str, Any]:
+    """汇总延迟样本"""
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+    }
+
+
+def make_partner_count_operation(multi_tenant_mgr) -> Callable[[str], Any]:
+    """默认操作：统计租户的会员数量（只读，不产生数据）"""
+    from sdk import PartnerSDK
+
+    def count_partners(tenant_id: str):
+        work_session = multi_tenant_mgr.get_session(tenant_id)
+        if work_session is None:
+            raise RuntimeError(f"租户 '{tenant_id}' 没有可用会话")
+        result = PartnerSDK(work_session).count_partner({})
+        if result is None:
+            raise RuntimeError(f"租户 '{tenant_id}' 统计会员失败")
+        return result
+
+    return count_partners
+
+
+class NoisyNeighborBenchmark:
+    """多租户性能隔离基准测试"""
+
+    def __init__(
+        self,
+        aggressor: str,
+        victims: List[str],
+        operation: Optional[Callable[[str], Any]] = None,
+        aggressor_operation: Optional[Callable[[str], Any]] = None,
+        multi_tenant_mgr=None,
+        aggressor_rates: Sequence[float] = (5, 10, 20, 40),
+        victim_rate: float = 2.0,
+        step_duration: float = 30.0,
+        warmup: float = 2.0,
+        aggressor_concurrency: int = 32,
+        victim_concurrency: int = 4,
+        degradation_threshold: float = 20.0,
+    ):
+        """初始化基准测试
+
+        Args:
+            aggressor: 施压租户ID
+            victims: 受害租户ID列表
+            operation: 受害租户的操作 operation(tenant_id)，默认统计会员数量
+            aggressor_operation: 施压租户的操作，默认与 operation 相同
+            multi_tenant_mgr: 多租户会话管理器，设置后执行前确保租户会话有效
+            aggressor_rates: 施压租户逐级的请求速率（次/秒），
+                自动在最前面加入 0 作为基线
+            victim_rate: 每个受害租户的固定请求速率（次/秒）
+            step_duration: 每一级的测量时长（秒）
+            warmup: 每一级开始测量前的预热时长（秒），预热期间的样本丢弃
+            aggressor_concurrency: 施压租户的并发配额
+            victim_concurrency: 每个受害租户的并发配额
+            degradation_threshold: 受害租户 p99 劣化的允许上限（百分比）
+        """
+        if operation is None:
+            if multi_tenant_mgr is None:
+                raise ValueError("未指定操作时必须提供多租户会话管理器")
+            operation = make_partner_count_operation(multi_tenant_mgr)
+
+        self.aggressor = aggressor
+        self.victims = list(victims)
+        self.operation = operation
+        self.aggressor_operation = aggressor_operation or operation
+        self.multi_tenant_mgr = multi_tenant_mgr
+        rates = [float(rate) for rate in aggressor_rates]
+        self.aggressor_rates = rates if rates and rates[0] == 0 else [0.0] + rates
+        self.victim_rate = victim_rate
+        self.step_duration = step_duration
+        self.warmup = warmup
+        self.aggressor_concurrency = aggressor_concurrency
+        self.victim_concurrency = victim_concurrency
+        self.degradation_threshold = degradation_threshold
+
+    def run(self) -> Dict[str, Any]:
+        """逐级执行并生成报告"""
+        start_time = datetime.now()
+        logger.info(
+            f"性能隔离测试开始: 施压租户 {self.aggressor}，受害租户 {self.victims}，"
+            f"施压速率 {self.aggressor_rates}"
+        )
+
+        steps = []
+        for rate in self.aggressor_rates:
+            step = self._run_step(rate)
+            steps.append(step)
+            victims_p99 = {
+                tid: f"{step['tenants'][tid]['p99'] * 1000:.1f}ms"
+                for tid in self.victims
+            }
+            logger.info(
+                f"施压速率 {rate:g}/s（实际 {step['aggressor_throughput']:.1f}/s）: "
+                f"受害租户 p99 {victims_p99}"
+            )
+
+        report = self._build_report(steps)
+        report["benchmark_info"]["start_time"] = start_time.isoformat()
+        report["benchmark_info"]["end_time"] = datetime.now().isoformat()
+        return report
+
+    def _run_step(self, aggressor_rate: float) -> Dict[str, Any]:
+        """以指定施压速率运行一级"""
+        tenants = [self.aggressor] + self.victims
+        latencies: Dict[str, List[float]] = {tid: [] for tid in tenants}
+        errors = {tid: 0 for tid in tenants}
+        lock = threading.Lock()
+        measure_start = time.time() + self.warmup
+        measure_end = measure_start + self.step_duration
+
+        def timed(tenant_id: str, operation: Callable[[str], Any]):
+            start = time.perf_counter()
+            try:
+                result = operation(tenant_id)
+            except Exception:
+                if time.time() >= measure_start:
+                    with lock:
+                        errors[tenant_id] += 1
+                raise
+            # 只统计成功请求的延迟，失败请求计入错误数
+            elapsed = time.perf_counter() - start
+            if time.time() >= measure_start:
+                with lock:
+                    latencies[tenant_id].append(elapsed)
+            return result
+
+        concurrency = {tid: self.victim_concurrency for tid in self.victims}
+        concurrency[self.aggressor] = self.aggressor_concurrency
+        scheduler = TenantScheduler(
+            self.multi_tenant_mgr,
+            max_workers=sum(concurrency.values()),
+            policy=ROUND_ROBIN,
+            concurrency=concurrency,
+        )
+
+        stop = threading.Event()
+        sent = {tid: 0 for tid in tenants}
+
+        def pace(tenant_id: str, rate: float, operation: Callable[[str], Any]):
+            # 开环发送：按计划时间提交，不等待上一个请求完成
+            interval = 1.0 / rate
+            next_time = time.time()
+            while not stop.is_set():
+                scheduler.submit(tenant_id, timed, operation)
+                sent[tenant_id] += 1
+                next_time += interval
+                stop.wait(max(0.0, next_time - time.time()))
+
+        pacers = [
+            threading.Thread(
+                target=pace,
+                args=(tid, self.victim_rate, self.operation),
+                daemon=True,
+            )
+            for tid in self.victims
+        ]
+        if aggressor_rate > 0:
+            pacers.append(
+                threading.Thread(
+                    target=pace,
+                    args=(self.aggressor, aggressor_rate, self.aggressor_operation),
+                    daemon=True,
+                )
+            )
+        for pacer in pacers:
+            pacer.start()
+
+        stop.wait(max(0.0, measure_end - time.time()))
+        stop.set()
+        for pacer in pacers:
+            pacer.join(5)
+        # 测量窗口结束后仍在执行的请求也计入（它们的延迟最能体现干扰）
+        scheduler.wait_all(timeout=max(self.step_duration, 10))
+        scheduler.shutdown()
+
+        with lock:
+            summaries = {
+                tid: summarize_latencies(latencies[tid], errors[tid]) for tid in tenants
+            }
+        return {
+            "aggressor_rate": aggressor_rate,
+            "aggressor_throughput": summaries[self.aggressor]["count"]
+            / self.step_duration,
+            "sent": sent,
+            "tenants": summaries,
+        }
+
+    def _build_report(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """生成劣化曲线和隔离结论"""
+        baseline = {tid: steps[0]["tenants"][tid] for tid in self.victims}
+        curves: Dict[str, List[Dict[str, Any]]] = {tid: [] for tid in self.victims}
+        max_degradation = {}
+
+        for tid in self.victims:
+            base_p99 = baseline[tid]["p99"]
+            worst = 0.0
+            for step in steps:
+                summary = step["tenants"][tid]
+                degradation = 0.0
+                if base_p99 > 0:
+                    degradation = (summary["p99"] - base_p99) / base_p99 * 100
+                worst = max(worst, degradation)
+                curves[tid].append(
+                    {
+                        "aggressor_rate": step["aggressor_rate"],
+                        "aggressor_throughput": step["aggressor_throughput"],
+                        "p50": summary["p50"],
+                        "p95": summary["p95"],
+                        "p99": summary["p99"],
+                        "errors": summary["errors"],
+                        "p99_degradation_pct": degradation,
+                    }
+                )
+            max_degradation[tid] = worst
+
+        return {
+            "benchmark_info": {
+                "aggressor": self.aggressor,
+                "victims": self.victims,
+                "aggressor_rates": self.aggressor_rates,
+                "victim_rate": self.victim_rate,
+                "step_duration": self.step_duration,
+                "warmup": self.warmup,
+            },
+            "baseline": baseline,
+            "steps": steps,
+            "curves": curves,
+            "isolation": {
+                "threshold_pct": self.degradation_threshold,
+                "max_degradation_pct": max_degradation,
+                "isolated": all(
+                    d <= self.degradation_threshold for d in max_degradation.values()
+                ),
+            },
+        }
+
+
+def save_report(report: Dict[str, Any], prefix: str = "noisy_neighbor_report") -> str:
+    """保存 JSON 报告和文本劣化曲线，返回 JSON 文件名"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = f"{prefix}_{timestamp}.json"
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"性能隔离报告已保存到: {report_file}")
+
+    summary_file = f"{prefix}_{timestamp}.txt"
+    with open(summary_file, "w", encoding="utf-8") as f:
+        f.write(format_curves(report))
+    logger.info(f"劣化曲线已保存到: {summary_file}")
+    return report_file
+
+
+# 劣化曲线表格的列名和显示宽度
+CURVE_COLUMNS = [
+    ("施压速率", 10),
+    ("实际吞吐", 10),
+    ("p50(ms)", 9),
+    ("p95(ms)", 9),
+    ("p99(ms)", 9),
+    ("p99劣化", 9),
+    ("错误", 6),
+]
+
+
+def _display_width(text: str) -> int:
+    """终端显示宽度，中文等全角字符占两列"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def _table_row(cells: Iterable[str]) -> str:
+    """按显示宽度右对齐各列"""
+    return "  " + " ".join(
+        " " * (width - _display_width(cell)) + cell
+        for cell, (_, width) in zip(cells, CURVE_COLUMNS)
+    )
+
+
+def format_curves(report: Dict[str, Any]) -> str:
+    """把劣化曲线格式化为文本表格"""
+    info = report["benchmark_info"]
+    isolation = report["isolation"]
+    lines = [
+        "=" * 60,
+        "多租户性能隔离测试报告",
+        "=" * 60,
+        f"施压租户: {info['aggressor']}",
+        f"受害租户: {', '.join(info['victims'])}（每个 {info['victim_rate']:g} 次/秒）",
+        "",
+    ]
+    for tid, curve in report["curves"].items():
+        lines.append(f"受害租户 {tid}:")
+        lines.append(_table_row(name for name, _ in CURVE_COLUMNS))
+        for point in curve:
+            lines.append(
+                _table_row(
+                    [
+                        f"{point['aggressor_rate']:g}",
+                        f"{point['aggressor_throughput']:.1f}",
+                        f"{point['p50'] * 1000:.1f}",
+                        f"{point['p95'] * 1000:.1f}",
+                        f"{point['p99'] * 1000:.1f}",
+                        f"{point['p99_degradation_pct']:.1f}%",
+                        str(point["errors"]),
+                    ]
+                )
+            )
+        lines.append("")
+    lines.append(
+        f"结论: {'性能隔离' if isolation['isolated'] else '存在性能干扰'}"
+        f"（p99 劣化阈值 {isolation['threshold_pct']:g}%）"
+    )
+    lines.append("=" * 60)
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="多租户性能隔离（noisy neighbor）基准测试"
+    )
+    parser.add_argument("--aggressor", required=True, help="施压租户ID")
+    parser.add_argument("--victims", nargs="+", required=True, help="受害租户ID")
+    parser.add_argument(
+        "--rates",
+        nargs="+",
+        type=float,
+        default=[5, 10, 20, 40],
+        help="施压租户逐级请求速率（次/秒），自动加入 0 作为基线",
+    )
+    parser.add_argument(
+        "--victim-rate", type=float, default=2.0, help="每个受害租户的请求速率（次/秒）"
+    )
+    parser.add_argument(
+        "--step-duration", type=float, default=30.0, help="每级测量时长（秒），默认30"
+    )
+    parser.add_argument("--warmup", type=float, default=2.0, help="每级预热时长（秒）")
+    parser.add_argument(
+        "--threshold", type=float, default=20.0, help="p99 劣化阈值（百分比），默认20%"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    from multi_tenant_manager import (cleanup_global_multi_tenant_manager,
+                                      init_global_multi_tenant_manager)
+
+    multi_tenant_mgr = init_global_multi_tenant_manager()
+    if multi_tenant_mgr is None:
+        logger.error("初始化多租户管理器失败")
+        return 1
+
+    try:
+        benchmark = NoisyNeighborBenchmark(
+            aggressor=args.aggressor,
+            victims=args.victims,
+            multi_tenant_mgr=multi_tenant_mgr,
+            aggressor_rates=args.rates,
+            victim_rate=args.victim_rate,
+            step_duration=args.step_duration,
+            warmup=args.warmup,
+            degradation_threshold=args.threshold,
+        )
+        report = benchmark.run()
+        save_report(report)
+        print(format_curves(report))
+        return 0 if report["isolation"]["isolated"] else 1
+    finally:
+        cleanup_global_multi_tenant_manager()
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+会话刷新调度器 - 进程内所有会话共享的刷新定时器
+
+用一个调度线程维护按截止时间排序的小根堆，休眠到最近的截止时间再唤醒，
+不做按秒轮询；到期的刷新任务交给一个小线程池执行，单个会话登录变慢
+不会推迟其他会话的刷新。单个进程内上千个会话只需要一个调度线程。
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 到期回调：执行刷新，返回下一次截止时间（time.time() 时间戳），返回 None 表示不再调度
+RefreshCallback = Callable[[], Optional[float]]
+
+
+class RefreshScheduler:
+    """基于截止时间小根堆的刷新调度器"""
+
+    def __init__(self, max_workers: int = 4, name: str = "SessionRefreshScheduler"):
+        """初始化调度器
+
+        Args:
+            max_workers: 执行到期刷新任务的线程数
+            name: 调度线程名称
+        """
+        self.name = name
+        self.max_workers = max_workers
+
+        self._cond = threading.Condition()
+        # 堆元素为 (截止时间, 序号, 键)；重新调度或取消后旧元素在出堆时丢弃
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int, RefreshCallback]] = {}
+        self._running: Set[Hashable] = set()
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopped = False
+
+        self.stats = {"scheduled": 0, "fired": 0, "failed": 0, "wakeups": 0}
+
+    def schedule(self, key: Hashable, deadline: float, callback: RefreshCallback):
+        """添加或重新调度刷新任务
+
+        Args:
+            key: 任务键（如 SessionManager 实例），同一个键只保留最新的截止时间
+            deadline: 截止时间（time.time() 时间戳）
+            callback: 到期回调
+        """
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"刷新调度器 {self.name} 已关闭")
+            seq = next(self._seq)
+            self._entries[key] = (deadline, seq, callback)
+            heapq.heappush(self._heap, (deadline, seq, key))
+            self.stats["scheduled"] += 1
+            self._compact()
+            self._ensure_thread()
+            self._cond.notify()
+
+    def cancel(self, key: Hashable):
+        """取消刷新任务（正在执行的回调完成后也不再重新调度）"""
+        with self._cond:
+            self._entries.pop(key, None)
+            self._running.discard(key)
+
+    def is_scheduled(self, key: Hashable) -> bool:
+        """任务是否已调度或正在执行"""
+        with self._cond:
+            return key in self._entries or key in self._running
+
+    def next_deadline(self, key: Hashable) -> Optional[float]:
+        """获取任务的截止时间，未调度时返回 None"""
+        with self._cond:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._entries) + len(self._running)
+
+    def shutdown(self, wait: bool = True):
+        """关闭调度器，丢弃所有未到期的任务"""
+        with self._cond:
+            self._stopped = True
+            self._entries.clear()
+            self._running.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+            thread, executor = self._thread, self._executor
+        if thread and wait and thread is not threading.current_thread():
+            thread.join(5)
+        if executor:
+            executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取调度统计"""
+        with self._cond:
+            return {**self.stats, "pending": len(self._entries)}
+
+    def _ensure_thread(self):
+        """首次调度时启动调度线程（调用方持有锁）"""
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+            )
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+    def _compact(self):
+        """过期元素过多时重建堆（调用方持有锁）"""
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                (deadline, seq, key)
+                for key, (deadline, seq, _) in self._entries.items()
+            ]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, seq: int, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] == seq
+
+    def _run(self):
+        """调度线程：休眠到最近的截止时间，取出到期任务交给线程池"""
+        logger.debug("刷新调度器 %s 启动", self.name)
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        logger.debug("刷新调度器 %s 退出", self.name)
+                        return
+                    while self._heap and not self._is_current(
+                        self._heap[0][1], self._heap[0][2]
+                    ):
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+
+                self.stats["wakeups"] += 1
+                now = time.time()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, seq, key = heapq.heappop(self._heap)
+                    if not self._is_current(seq, key):
+                        continue
+                    _, _, callback = self._entries.pop(key)
+                    self._running.add(key)
+                    due.append((key, callback))
+                executor = self._executor
+
+            for key, callback in due:
+                executor.submit(self._fire, key, callback)
+
+    def _fire(self, key: Hashable, callback: RefreshCallback):
+        """执行到期回调并按返回值重新调度"""
+        next_deadline = None
+        try:
+            next_deadline = callback()
+        except Exception as e:
+            logger.error("刷新调度器 %s: 刷新任务异常 - %s", self.name, e)
+            with self._cond:
+                self.stats["failed"] += 1
+
+        with self._cond:
+            self.stats["fired"] += 1
+            if key not in self._running:
+                # 执行期间被取消
+                return
+            self._running.discard(key)
+            if next_deadline is not None and not self._stopped:
+                seq = next(self._seq)
+                self._entries[key] = (next_deadline, seq, callback)
+                heapq.heappush(self._heap, (next_deadline, seq, key))
+                self._cond.notify()
+
+
+# 进程级共享调度器
+_global_scheduler: Optional[RefreshScheduler] = None
+_global_scheduler_lock = threading.Lock()
+
+
+def get_refresh_scheduler() -> RefreshScheduler:
+    """获取进程级共享的刷新调度器（首次调用时创建）
+
+    Returns:
+        刷新调度器实例
+    """
+    global _global_scheduler
+
+    with _global_scheduler_lock:
+        if _global_scheduler is None or _global_scheduler._stopped:
+            _global_scheduler = RefreshScheduler()
+        return _global_scheduler
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+客户端资源监控 - 定期采样负载进程自身的资源，用趋势分析发现持续增长（泄漏）
+
+长时间老化测试中耗时上升时，需要先排除测试客户端本身的问题（如未关闭的
+requests.Session、没有停止的刷新线程、泄漏的套接字）再怀疑服务器。每次采样记录：
+- rss_bytes：常驻内存
+- open_fds：打开的文件描述符数
+- sockets：按 TCP 状态统计的套接字数（CLOSE_WAIT 持续增长通常是连接未关闭）
+- threads：线程总数及按名称分组的线程数（去掉名称中的序号）
+- gc：无法回收的对象数和各代回收次数
+- 启用 count_objects 时：垃圾回收跟踪的对象总数（gc.objects）和指定类型
+  （如 requests.sessions.Session）的存活对象数（objects）。统计需要遍历整个堆
+  （gc.get_objects），堆很大时耗时明显，默认关闭，只在排查客户端泄漏时启用
+- traced_bytes 和 top_allocations：启用 tracemalloc 时的内存和相对第一次采样
+  增长最多的分配位置
+
+安装 psutil 时使用 psutil，否则在 Linux 上读取 /proc，都不可用的项记为 None。
+
+趋势分析：对每个序列最近一半时间的采样做最小二乘线性回归，斜率显著大于 0
+（置信度达到 min_confidence）且增量同时超过绝对下限和 min_growth_percent 时认为
+持续增长。只看最近一半可以忽略启动阶段的预热增长。采样数超过 max_samples 时隔一个
+丢弃一个，内存与运行时长无关。
+
+使用示例：
+    monitor = ResourceMonitor(interval=60).start()
+    ...
+    monitor.stop()
+    for trend in monitor.summary()["leaks"]:
+        print(format_trend(trend))
+"""
+
+import gc
+import logging
+import math
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 默认统计存活对象数的类型（模块名.类名）
+DEFAULT_TRACKED_TYPES = (
+    "requests.sessions.Session",
+    "session_manager.SessionManager",
+)
+# 趋势分析需要的最少采样数（最近一半时间内）
+MIN_TREND_SAMPLES = 10
+# 认为持续增长的最小增量（按序列名前缀），其余序列（计数）为 DEFAULT_MIN_GROWTH
+MIN_GROWTH = {
+    "rss_bytes": 32 * 1024 * 1024,
+    "traced_bytes": 32 * 1024 * 1024,
+    "gc.objects": 10000,
+}
+DEFAULT_MIN_GROWTH = 5
+
+# /proc/net/tcp 中的连接状态
+TCP_STATES = {
+    "01": "ESTABLISHED",
+    "02": "SYN_SENT",
+    "03": "SYN_RECV",
+    "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2",
+    "06": "TIME_WAIT",
+    "07": "CLOSE",
+    "08": "CLOSE_WAIT",
+    "09": "LAST_ACK",
+    "0A": "LISTEN",
+    "0B": "CLOSING",
+}
+# 不是 TCP 连接的套接字（UDP、Unix 域套接字等）
+OTHER_SOCKET = "OTHER"
+
+_THREAD_NUMBER = re.compile(r"[-_]\d+(?= \(|$)")
+
+
+def thread_group(name: str) -> str:
+    """线程名去掉序号后的分组名，如 "SessionPoolLogin_3" -> "SessionPoolLogin"、
+    "Thread-7 (run)" -> "Thread (run)" """
+    return _THREAD_NUMBER.sub("", name)
+
+
+# ---- 采样 ----
+
+
+def _proc_path(*parts: str) -> str:
+    return os.path.join("/proc", "self", *parts)
+
+
+def _read_rss() -> Optional[int]:
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open(_proc_path("statm")) as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _socket_inodes() -> Optional[List[str]]:
+    """本进程打开的套接字的 inode（/proc），不可用时返回 None"""
+    try:
+        names = os.listdir(_proc_path("fd"))
+    except OSError:
+        return None
+    inodes = []
+    for name in names:
+        try:
+            target = os.readlink(_proc_path("fd", name))
+        except OSError:
+            continue  # 读取期间已关闭
+        if target.startswith("socket:["):
+            inodes.append(target[8:-1])
+    return inodes
+
+
+def _read_open_fds() -> Optional[int]:
+    if PSUTIL_AVAILABLE and hasattr(psutil.Process, "num_fds"):
+        return psutil.Process().num_fds()
+    try:
+        return len(os.listdir(_proc_path("fd")))
+    except OSError:
+        return None
+
+
+def _read_sockets() -> Optional[Dict[str, int]]:
+    if PSUTIL_AVAILABLE:
+        process = psutil.Process()
+        connections = getattr(process, "net_connections", process.connections)
+        try:
+            return dict(
+                Counter(
+                    connection.status
+                    if connection.status != psutil.CONN_NONE
+                    else OTHER_SOCKET
+                    for connection in connections(kind="inet")
+                )
+            )
+        except psutil.Error:
+            return None
+    inodes = _socket_inodes()
+    if inodes is None:
+        return None
+    states = {}
+    for table in ("tcp", "tcp6"):
+        try:
+            with open(_proc_path("net", table)) as f:
+                next(f, None)  # 表头
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 9:
+                        states[fields[9]] = TCP_STATES.get(fields[3], fields[3])
+        except OSError:
+            continue
+    return dict(Counter(states.get(inode, OTHER_SOCKET) for inode in inodes))
+
+
+def _count_objects(tracked_types: Sequence[str]) -> Tuple[int, Dict[str, int]]:
+    """垃圾回收跟踪的对象总数和指定类型的存活对象数"""
+    by_type = Counter(map(type, gc.get_objects()))
+    wanted = set(tracked_types)
+    counts = dict.fromkeys(tracked_types, 0)
+    for cls, count in by_type.items():
+        name = f"{cls.__module__}.{cls.__qualname__}"
+        if name in wanted:
+            counts[name] += count
+    return sum(by_type.values()), counts
+
+
+def sample_resources(
+    tracked_types: Sequence[str] = DEFAULT_TRACKED_TYPES, count_objects: bool = False
+):
+    """采样当前进程的资源（可以 JSON 序列化）
+
+    Args:
+        tracked_types: count_objects 时统计存活对象数的类型（模块名.类名）
+        count_objects: 是否遍历整个堆统计对象数（开销与堆大小成正比）
+    """
+    threads = [thread.name for thread in threading.enumerate()]
+    generations = gc.get_stats()
+    sample = {
+        "time": time.time(),
+        "timestamp": datetime.now().isoformat(),
+        "rss_bytes": _read_rss(),
+        "open_fds": _read_open_fds(),
+        "sockets": _read_sockets(),
+        "threads": len(threads),
+        "thread_groups": dict(Counter(map(thread_group, threads))),
+        "gc": {
+            "garbage": len(gc.garbage),
+            "uncollectable": sum(g["uncollectable"] for g in generations),
+            "collections": [g["collections"] for g in generations],
+        },
+    }
+    if count_objects:
+        sample["gc"]["objects"], sample["objects"] = _count_objects(tracked_types)
+    if tracemalloc.is_tracing():
+        sample["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+    return sample
+
+
+def sample_series(sample: Dict[str, Any]) -> Dict[str, float]:
+    """把采样展开为做趋势分析的序列：{序列名: 值}，不可用的项不包含"""
+    series = {}
+    for name in ("rss_bytes", "open_fds", "threads", "traced_bytes"):
+        if sample.get(name) is not None:
+            series[name] = sample[name]
+    for state, count in (sample.get("sockets") or {}).items():
+        series[f"sockets.{state}"] = count
+    for group, count in sample.get("thread_groups", {}).items():
+        series[f"threads.{group}"] = count
+    for name in ("objects", "garbage"):
+        if sample["gc"].get(name) is not None:
+            series[f"gc.{name}"] = sample["gc"][name]
+    for name, count in sample.get("objects", {}).items():
+        series[f"objects.{name}"] = count
+    return series
+
+
+# ---- 趋势分析 ----
+
+
+def _min_growth(series: str) -> float:
+    for prefix, value in MIN_GROWTH.items():
+        if series == prefix or series.startswith(prefix + "."):
+            return value
+    return DEFAULT_MIN_GROWTH
+
+
+def analyze_trend(
+    series: str,
+    points: Sequence[Tuple[float, float]],
+    min_confidence: float = 0.99,
+    min_growth_percent: float = 10.0,
+) -> Optional[Dict[str, Any]]:
+    """对最近一半时间的采样做线性回归，采样不足时返回 None
+
+    Args:
+        series: 序列名，决定增量的绝对下限（MIN_GROWTH）
+        points: [(时间戳（秒）, 值), ...]，按时间排序
+        min_confidence: 认为持续增长需要的斜率大于 0 的置信度（0-1）
+        min_growth_percent: 认为持续增长需要的增量（相对窗口开始时的拟合值，百分比）
+
+    Returns:
+        趋势：每小时斜率、窗口内增量、置信度等，growing 表示是否持续增长
+    """
+    if not points:
+        return None
+    middle = (points[0][0] + points[-1][0]) / 2
+    window = [point for point in points if point[0] >= middle]
+    n = len(window)
+    if n < MIN_TREND_SAMPLES:
+        return None
+    t0 = window[0][0]
+    xs = [(t - t0) / 3600 for t, _ in window]
+    ys = [value for _, value in window]
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    error = math.sqrt(residual / (n - 2) / sxx)
+    if error == 0:
+        confidence = 1.0 if slope > 0 else 0.0
+    else:
+        # 单侧 t 检验（正态近似）
+        confidence = 1.0 - 0.5 * math.erfc(slope / error / math.sqrt(2))
+    hours = xs[-1]
+    growth = slope * hours
+    start = intercept
+    growth_percent = growth / max(abs(start), 1.0) * 100
+    return {
+        "series": series,
+        "samples": n,
+        "window_hours": hours,
+        "start_value": start,
+        "latest": ys[-1],
+        "slope_per_hour": slope,
+        "growth": growth,
+        "growth_percent": growth_percent,
+        "confidence": confidence,
+        "growing": (
+            confidence >= min_confidence
+            and growth >= _min_growth(series)
+            and growth_percent >= min_growth_percent
+        ),
+    }
+
+
+def analyze_trends(
+    samples: Iterable[Dict[str, Any]], **options: Any
+) -> Dict[str, Dict[str, Any]]:
+    """所有序列的趋势
+
+    同一分组（线程组、套接字状态、对象类型）在某次采样中不存在时按 0 计算；
+    rss_bytes 等不可用的项跳过。
+    """
+    samples = list(samples)
+    expanded = [(sample["time"], sample_series(sample)) for sample in samples]
+    names = sorted({name for _, series in expanded for name in series})
+    counts = ("sockets.", "threads.", "objects.")
+    trends = {}
+    for name in names:
+        if name.startswith(counts):
+            points = [(t, series.get(name, 0)) for t, series in expanded]
+        else:
+            points = [(t, series[name]) for t, series in expanded if name in series]
+        trend = analyze_trend(name, points, **options)
+        if trend is not None:
+            trends[name] = trend
+    return trends
+
+
+def format_trend(trend: Dict[str, Any]) -> str:
+    """趋势的文字说明"""
+    unit = 1024 * 1024 if trend["series"].endswith("_bytes") else 1
+    suffix = " MB" if unit > 1 else ""
+    return (
+        f"{trend['series']} 在最近 {trend['window_hours']:.2f} 小时内从 "
+        f"{trend['start_value'] / unit:.1f}{suffix} 增长到 "
+        f"{trend['latest'] / unit:.1f}{suffix}（每小时 "
+        f"{trend['slope_per_hour'] / unit:+.2f}{suffix}，"
+        f"置信度 {trend['confidence'] * 100:.2f}%）"
+    )
+
+
+# ---- 监控 ----
+
+
+class ResourceMonitor:
+    """后台线程定期采样当前进程的资源并分析趋势"""
+
+    def __init__(
+        self,
+        interval: float = 60.0,
+        tracemalloc_top: int = 0,
+        tracked_types: Sequence[str] = DEFAULT_TRACKED_TYPES,
+        count_objects: bool = False,
+        max_samples: int = 2880,
+        min_confidence: float = 0.99,
+        min_growth_percent: float = 10.0,
+    ):
+        """初始化资源监控
+
+        Args:
+            interval: 采样间隔（秒）
+            tracemalloc_top: 输出增长最多的分配位置数，大于 0 时启用 tracemalloc
+                （内存和耗时开销较大，只在排查客户端泄漏时使用）
+            tracked_types: 统计存活对象数的类型（模块名.类名）
+            count_objects: 每次采样遍历整个堆统计对象数（gc.get_objects，堆大时
+                开销明显，只在排查客户端泄漏时使用）
+            max_samples: 保留的最大采样数，超过时隔一个丢弃一个
+            min_confidence: 认为持续增长需要的置信度（0-1）
+            min_growth_percent: 认为持续增长需要的增量（百分比）
+        """
+        if interval <= 0:
+            raise ValueError("interval 必须大于 0")
+        if max_samples < 2 * MIN_TREND_SAMPLES:
+            raise ValueError(f"max_samples 必须至少为 {2 * MIN_TREND_SAMPLES}")
+        self.interval = interval
+        self.tracemalloc_top = tracemalloc_top
+        self.tracked_types = tuple(tracked_types)
+        self.count_objects = count_objects
+        self.max_samples = max_samples
+        self.trend_options = {
+            "min_confidence": min_confidence,
+            "min_growth_percent": min_growth_percent,
+        }
+
+        self._lock = threading.Lock()
+        self._samples: List[Dict[str, Any]] = []
+        self._trends: Dict[str, Dict[str, Any]] = {}
+        self._top_allocations: List[Dict[str, Any]] = []
+        self._baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ResourceMonitor":
+        """开始采样（立即采样一次），返回自身"""
+        if self.tracemalloc_top > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.sample()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="resource-monitor", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止采样（最后采样一次），由本监控启动的 tracemalloc 同时停止"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(self.interval + 5)
+        self._thread = None
+        self.sample()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """采样一次并更新趋势，失败时记录日志并返回 None"""
+        try:
+            sample = sample_resources(self.tracked_types, self.count_objects)
+            top_allocations = self._compare_allocations()
+        except Exception as e:
+            logger.error(f"资源采样失败: {e}")
+            return None
+        with self._lock:
+            self._samples.append(sample)
+            if len(self._samples) > self.max_samples:
+                # 保留最近一次采样
+                self._samples = self._samples[(len(self._samples) - 1) % 2 :: 2]
+            samples = list(self._samples)
+            if top_allocations is not None:
+                self._top_allocations = top_allocations
+        trends = analyze_trends(samples, **self.trend_options)
+        with self._lock:
+            self._trends = trends
+        return sample
+
+    def _compare_allocations(self) -> Optional[List[Dict[str, Any]]]:
+        """相对第一次快照增长最多的分配位置（按代码行）"""
+        if self.tracemalloc_top <= 0 or not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        if self._baseline_snapshot is None:
+            self._baseline_snapshot = snapshot
+        statistics = snapshot.compare_to(self._baseline_snapshot, "lineno")
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in statistics[: self.tracemalloc_top]
+        ]
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def summary(self) -> Dict[str, Any]:
+        """最近一次采样、各序列的趋势、持续增长的序列和增长最多的分配位置"""
+        with self._lock:
+            trends = self._trends
+            return {
+                "samples": len(self._samples),
+                "first_sample_at": (
+                    self._samples[0]["timestamp"] if self._samples else None
+                ),
+                "latest": self._samples[-1] if self._samples else None,
+                "trends": trends,
+                "leaks": sorted(
+                    (trend for trend in trends.values() if trend["growing"]),
+                    key=lambda trend: -trend["growth_percent"],
+                ),
+                "top_allocations": self._top_allocations,
+            }
@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+结果汇 - 运行过程中把每次操作的结果按秒聚合写入文件，内存占用有界
+
+长时间运行（如 480 小时老化测试）时把每次操作都保存在列表中会让内存无限增长。
+结果汇只在内存中保留尚未结束的秒的聚合和少量待写入的原始事件：
+- 每秒每个键（如 "partner.create" 或测试名称）一行聚合：次数、成功/失败数、
+  耗时总和/最小值/最大值
+- 原始事件抽样保存：成功事件按 sample_rate 抽样，失败事件每秒最多保存
+  max_errors_per_second 条
+
+报告通过读回结果汇生成（summary、time_series、read_events），运行中断后也可以
+读取已写入的数据。
+
+后端按文件扩展名选择（open_sink）：
+- .jsonl：每行一个 JSON，type 为 aggregate 或 event
+- .csv：聚合写入该文件，原始事件写入同名的 .events.csv
+- .db / .sqlite / .sqlite3：SQLite 数据库，aggregates 和 events 两张表
+
+使用示例：
+    sink = open_sink("aging_results.db", sample_rate=0.01)
+    sink.record("partner.create", success=True, duration=0.12, worker_id=3)
+    sink.close()
+    open_sink("aging_results.db").summary()["partner.create"]["count"]
+"""
+
+import contextlib
+import csv
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from latency_histogram import ALL_KEY
+
+logger = logging.getLogger(__name__)
+
+# 聚合行字段
+AGGREGATE_FIELDS = (
+    "second",
+    "key",
+    "count",
+    "successful",
+    "failed",
+    "duration_total",
+    "duration_min",
+    "duration_max",
+)
+# 原始事件字段，其他字段以 JSON 保存在 fields 中
+EVENT_FIELDS = ("timestamp", "key", "success", "duration", "error", "fields")
+
+# 待写入的原始事件达到该数量时立即写入
+EVENT_BATCH_SIZE = 100
+
+
+class ResultSink:
+    """结果汇基类：按秒聚合并抽样原始事件，子类实现写入和读取（线程安全）"""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        max_errors_per_second: int = 10,
+        seed: Optional[int] = None,
+    ):
+        """初始化结果汇
+
+        Args:
+            sample_rate: 成功事件的抽样比例（0-1）
+            max_errors_per_second: 每秒最多保存的失败事件数
+            seed: 抽样的随机种子
+        """
+        self.sample_rate = sample_rate
+        self.max_errors_per_second = max_errors_per_second
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # 秒 -> 键 -> 聚合
+        self._buckets: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._errors_per_second: Dict[int, int] = {}
+        self._events: List[Dict[str, Any]] = []
+        self.closed = False
+
+    # ---- 写入 ----
+
+    def record(
+        self,
+        key: str,
+        success: bool,
+        duration: float,
+        error: Optional[str] = None,
+        timestamp: Optional[float] = None,
+        **fields: Any,
+    ):
+        """记录一次操作结果
+
+        Args:
+            key: 操作键，如 "partner.create" 或测试名称
+            success: 是否成功
+            duration: 耗时（秒）
+            error: 错误信息
+            timestamp: 完成时间（Unix 时间戳），默认当前时间
+            **fields: 随原始事件保存的其他字段（如 worker_id）
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        second = int(timestamp)
+        with self._lock:
+            if self.closed:
+                return
+            buckets = self._buckets.setdefault(second, {})
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {
+                    "second": second,
+                    "key": key,
+                    "count": 0,
+                    "successful": 0,
+                    "failed": 0,
+                    "duration_total": 0.0,
+                    "duration_min": duration,
+                    "duration_max": duration,
+                }
+            bucket["count"] += 1
+            bucket["successful" if success else "failed"] += 1
+            bucket["duration_total"] += duration
+            bucket["duration_min"] = min(bucket["duration_min"], duration)
+            bucket["duration_max"] = max(bucket["duration_max"], duration)
+
+            if success:
+                keep = self._rng.random() < self.sample_rate
+            else:
+                errors = self._errors_per_second.get(second, 0)
+                keep = errors < self.max_errors_per_second
+                self._errors_per_second[second] = errors + 1
+            if keep:
+                self._events.append(
+                    {
+                        "timestamp": timestamp,
+                        "key": key,
+                        "success": success,
+                        "duration": duration,
+                        "error": error,
+                        "fields": fields,
+                    }
+                )
+
+            # 上一秒之前的聚合已经完整，写出后从内存中移除
+            aggregates = self._pop_buckets(lambda s: s < second - 1)
+            events = []
+            if aggregates or len(self._events) >= EVENT_BATCH_SIZE:
+                events, self._events = self._events, []
+        if aggregates or events:
+            self._write_safely(aggregates, events)
+
+    def flush(self):
+        """写出内存中全部聚合和事件"""
+        with self._lock:
+            aggregates = self._pop_buckets(lambda s: True)
+            events, self._events = self._events, []
+        if aggregates or events:
+            self._write_safely(aggregates, events)
+
+    def close(self):
+        """写出剩余数据并关闭，之后的 record 被忽略，仍可读取"""
+        self.flush()
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        with self._write_lock:
+            self._close()
+
+    def _pop_buckets(self, done) -> List[Dict[str, Any]]:
+        rows = []
+        for second in sorted(s for s in self._buckets if done(s)):
+            rows.extend(self._buckets.pop(second).values())
+            self._errors_per_second.pop(second, None)
+        return rows
+
+    def _write_safely(self, aggregates, events):
+        try:
+            with self._write_lock:
+                self._write(aggregates, events)
+        except Exception as e:
+            logger.error(f"结果汇写入失败: {e}")
+
+    # ---- 读取 ----
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """读回聚合，按键（以及全部 "all"）汇总，见 summarize"""
+        return summarize(self.read_aggregates())
+
+    def time_series(self, key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """读回每秒的次数、失败数和平均耗时，见 time_series"""
+        return time_series(self.read_aggregates(), key)
+
+    def read_aggregates(self) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def read_events(self, success: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """读回抽样的原始事件，success 指定时只返回成功或失败的事件"""
+        for event in self._read_events():
+            if success is None or event["success"] == success:
+                yield event
+
+    # ---- 后端 ----
+
+    def _write(self, aggregates: List[Dict[str, Any]], events: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def _read_events(self) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlResultSink(ResultSink):
+    """JSON Lines 结果汇"""
+
+    def __init__(self, path: str, **options: Any):
+        super().__init__(**options)
+        self.path = path
+
+    def _write(self, aggregates, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for row in aggregates:
+                f.write(json.dumps({"type": "aggregate", **row}, ensure_ascii=False))
+                f.write("\n")
+            for event in events:
+                f.write(json.dumps({"type": "event", **event}, ensure_ascii=False))
+                f.write("\n")
+
+    def _read_lines(self, kind: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.pop("type", None) == kind:
+                    yield data
+
+    def read_aggregates(self):
+        return self._read_lines("aggregate")
+
+    def _read_events(self):
+        return self._read_lines("event")
+
+
+class CsvResultSink(ResultSink):
+    """CSV 结果汇：聚合写入 path，原始事件写入同名的 .events.csv"""
+
+    def __init__(self, path: str, **options: Any):
+        super().__init__(**options)
+        self.path = path
+        self.events_path = os.path.splitext(path)[0] + ".events.csv"
+
+    @staticmethod
+    def _append(path: str, fields, rows):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def _write(self, aggregates, events):
+        if aggregates:
+            self._append(self.path, AGGREGATE_FIELDS, aggregates)
+        if events:
+            rows = [
+                {
+                    **event,
+                    "success": int(event["success"]),
+                    "error": event["error"] or "",
+                    "fields": json.dumps(event["fields"], ensure_ascii=False),
+                }
+                for event in events
+            ]
+            self._append(self.events_path, EVENT_FIELDS, rows)
+
+    @staticmethod
+    def _read(path: str) -> Iterator[Dict[str, str]]:
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+    def read_aggregates(self):
+        for row in self._read(self.path):
+            yield {
+                "second": int(row["second"]),
+                "key": row["key"],
+                "count": int(row["count"]),
+                "successful": int(row["successful"]),
+                "failed": int(row["failed"]),
+                "duration_total": float(row["duration_total"]),
+                "duration_min": float(row["duration_min"]),
+                "duration_max": float(row["duration_max"]),
+            }
+
+    def _read_events(self):
+        for row in self._read(self.events_path):
+            yield {
+                "timestamp": float(row["timestamp"]),
+                "key": row["key"],
+                "success": row["success"] == "1",
+                "duration": float(row["duration"]),
+                "error": row["error"] or None,
+                "fields": json.loads(row["fields"]),
+            }
+
+
+class SqliteResultSink(ResultSink):
+    """SQLite 结果汇"""
+
+    def __init__(self, path: str, **options: Any):
+        super().__init__(**options)
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            path, check_same_thread=False
+        )
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS aggregates (
+                second INTEGER, key TEXT, count INTEGER, successful INTEGER,
+                failed INTEGER, duration_total REAL, duration_min REAL,
+                duration_max REAL
+            );
+            CREATE INDEX IF NOT EXISTS aggregates_second ON aggregates (second);
+            CREATE TABLE IF NOT EXISTS events (
+                timestamp REAL, key TEXT, success INTEGER, duration REAL,
+                error TEXT, fields TEXT
+            );
+            """
+        )
+
+    def _write(self, aggregates, events):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [tuple(row[f] for f in AGGREGATE_FIELDS) for row in aggregates],
+            )
+            self._conn.executemany(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        e["timestamp"],
+                        e["key"],
+                        int(e["success"]),
+                        e["duration"],
+                        e["error"],
+                        json.dumps(e["fields"], ensure_ascii=False),
+                    )
+                    for e in events
+                ],
+            )
+
+    def _query(self, sql: str) -> List[tuple]:
+        # 读取与写入共用一个连接，一次取出结果；关闭后临时打开连接读取
+        with self._write_lock:
+            if self._conn is not None:
+                return self._conn.execute(sql).fetchall()
+        with contextlib.closing(sqlite3.connect(self.path)) as conn:
+            return conn.execute(sql).fetchall()
+
+    def read_aggregates(self):
+        columns = ", ".join(AGGREGATE_FIELDS)
+        for values in self._query(f"SELECT {columns} FROM aggregates ORDER BY second"):
+            yield dict(zip(AGGREGATE_FIELDS, values))
+
+    def _read_events(self):
+        columns = ", ".join(EVENT_FIELDS)
+        for values in self._query(f"SELECT {columns} FROM events ORDER BY timestamp"):
+            event = dict(zip(EVENT_FIELDS, values))
+            event["success"] = bool(event["success"])
+            event["fields"] = json.loads(event["fields"])
+            yield event
+
+    def _close(self):
+        self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+
+_BACKENDS = {
+    ".jsonl": JsonlResultSink,
+    ".csv": CsvResultSink,
+    ".db": SqliteResultSink,
+    ".sqlite": SqliteResultSink,
+    ".sqlite3": SqliteResultSink,
+}
+
+
+def open_sink(path: str, **options: Any) -> ResultSink:
+    """按扩展名打开结果汇（.jsonl、.csv、.db/.sqlite/.sqlite3）
+
+    Args:
+        path: 文件路径，已存在时追加写入
+        **options: ResultSink 的参数（sample_rate、max_errors_per_second、seed）
+
+    Raises:
+        ValueError: 扩展名不支持
+    """
+    backend = _BACKENDS.get(os.path.splitext(path)[1].lower())
+    if backend is None:
+        raise ValueError(
+            f"不支持的结果汇文件类型: {path}，可选 {', '.join(sorted(_BACKENDS))}"
+        )
+    return backend(path, **options)
+
+
+def process_sink_path(path: str, index: int) -> str:
+    """多进程模式下各工作进程使用的结果汇路径：name.p{序号}.ext"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.p{index}{ext}"
+
+
+def summarize(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按键（以及全部 "all"）汇总聚合行，可以传入多个结果汇的聚合
+
+    Returns:
+        {键: {count, successful, failed, error_rate, avg_duration, min_duration,
+        max_duration, first_second, last_second, peak_per_second}}
+    """
+    totals: Dict[str, Dict[str, Any]] = {}
+    per_second: Dict[str, Dict[int, int]] = {}
+    for row in rows:
+        for key in (row["key"], ALL_KEY):
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = {
+                    "count": 0,
+                    "successful": 0,
+                    "failed": 0,
+                    "duration_total": 0.0,
+                    "min_duration": row["duration_min"],
+                    "max_duration": row["duration_max"],
+                    "first_second": row["second"],
+                    "last_second": row["second"],
+                }
+            for field in ("count", "successful", "failed", "duration_total"):
+                total[field] += row[field]
+            total["min_duration"] = min(total["min_duration"], row["duration_min"])
+            total["max_duration"] = max(total["max_duration"], row["duration_max"])
+            total["first_second"] = min(total["first_second"], row["second"])
+            total["last_second"] = max(total["last_second"], row["second"])
+            seconds = per_second.setdefault(key, {})
+            seconds[row["second"]] = seconds.get(row["second"], 0) + row["count"]
+
+    for key, total in totals.items():
+        count = total["count"]
+        total["avg_duration"] = total.pop("duration_total") / count if count else 0
+        total["error_rate"] = total["failed"] / count * 100 if count else 0
+        total["peak_per_second"] = max(per_second[key].values())
+    return totals
+
+
+def time_series(
+    rows: Iterable[Dict[str, Any]], key: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """把聚合行合并为每秒一个点（次数、失败数、平均耗时），key 为空时合并所有键"""
+    seconds: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        if key is not None and row["key"] != key:
+            continue
+        point = seconds.get(row["second"])
+        if point is None:
+            point = seconds[row["second"]] = {
+                "second": row["second"],
+                "count": 0,
+                "failed": 0,
+                "duration_total": 0.0,
+            }
+        point["count"] += row["count"]
+        point["failed"] += row["failed"]
+        point["duration_total"] += row["duration_total"]
+    series = []
+    for second in sorted(seconds):
+        point = seconds[second]
+        total = point.pop("duration_total")
+        point["avg_duration"] = total / point["count"] if point["count"] else 0
+        series.append(point)
+    return series
@@ -13,6 +13,7 @@ VMI 统一测试入口
     python3 run_tests.py --validation    # 框架验证测试
     python3 run_tests.py --module        # 模块测试
     python3 run_tests.py --pytest --all  # 使用 pytest 运行
+    python3 run_tests.py --all --token-cache  # 子进程复用缓存的登录令牌
 """
 
 import argparse
@@ -257,6 +258,7 @@ def main():
     python3 run_tests.py --aging 30      # 30分钟老化测试
     python3 run_tests.py --multi-tenant  # 多租户测试
     python3 run_tests.py --pytest --all  # 使用 pytest 运行所有测试
+    python3 run_tests.py --all --token-cache  # 子进程复用缓存的登录令牌
         """,
     )
 
@@ -270,13 +272,22 @@ def main():
     parser.add_argument("--module", action="store_true", help="运行模块测试")
     parser.add_argument("--pytest", action="store_true", help="使用 pytest 运行测试")
     parser.add_argument("--check-config", action="store_true", help="检查配置状态")
+    parser.add_argument(
+        "--token-cache",
+        action="store_true",
+        help="启用加密令牌缓存，各测试子进程复用登录令牌而不是重新登录",
+    )
 
     args = parser.parse_args()
 
-    if not any(vars(args).values()):
+    if not any(v for k, v in vars(args).items() if k != "token_cache"):
         parser.print_help()
         return
 
+    if args.token_cache:
+        # 子进程按顺序执行，同一时间只有一个进程使用缓存的令牌
+        os.environ["VMI_TOKEN_CACHE"] = "1"
+
     print("🚀 VMI 测试系统")
     print("=" * 60)
     print(f"运行模式: {'pytest' if args.pytest else 'unittest'}")
@@ -2,47 +2,33 @@
 
 提供 VMI 系统的 SDK 类，用于编写测试用例。
 对应 VMI 实体定义中的 18 个核心实体。
+
+SDK 类由 spec.SDK_SPECS 声明式定义，在首次访问时生成（PEP 562 模块 __getattr__），
+``import sdk`` 本身不会加载 HTTP 会话等依赖。
 """
 
-from .base import VMISDKBase
-from .credit import CreditSDK
-from .credit_report import CreditReportSDK
-from .credit_reward import CreditRewardSDK
-from .goods import GoodsSDK
-from .goods_info import GoodsInfoSDK
-from .goods_item import GoodsItemSDK
-from .member import MemberSDK
-from .order import OrderSDK
-from .partner import PartnerSDK
-from .product import ProductSDK
-from .product_info import ProductInfoSDK
-from .reward_policy import RewardPolicySDK
-from .shelf import ShelfSDK
-from .status import StatusSDK
-from .stockin import StockinSDK
-from .stockout import StockoutSDK
-from .store import StoreSDK
-from .warehouse import WarehouseSDK
+from .spec import SDK_SPECS, SPECS_BY_CLASS
 
 # 导出所有 SDK 类
-__all__ = [
-    "VMISDKBase",
-    "StatusSDK",
-    "PartnerSDK",
-    "WarehouseSDK",
-    "ShelfSDK",
-    "ProductSDK",
-    "ProductInfoSDK",
-    "StoreSDK",
-    "MemberSDK",
-    "GoodsSDK",
-    "StockinSDK",
-    "StockoutSDK",
-    "GoodsInfoSDK",
-    "OrderSDK",
-    "GoodsItemSDK",
-    "CreditSDK",
-    "CreditReportSDK",
-    "CreditRewardSDK",
-    "RewardPolicySDK",
-]
+__all__ = ["VMISDKBase"] + [spec.class_name for spec in SDK_SPECS]
+
+
+def __getattr__(name):
+    """按需生成 SDK 类并缓存到模块命名空间"""
+    if name == "VMISDKBase":
+        from .base import VMISDKBase
+
+        value = VMISDKBase
+    elif name in SPECS_BY_CLASS:
+        from .builder import build_sdk_class
+
+        value = build_sdk_class(SPECS_BY_CLASS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
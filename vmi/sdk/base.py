@@ -4,7 +4,12 @@
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .idempotency import DONE, IdempotencyTable
+from .validator import Validator, compile_validator, fields_from_entity_definition
+from .version_tracker import VersionTracker, diff_fields
+from .write_buffer import WriteBehindBuffer
 
 # 导入session模块
 try:
@@ -78,6 +83,10 @@ class VMISDKBase:
     封装 MagicEntity 的通用 CRUD 操作，提供统一的错误处理和日志记录。
     """
 
+    # 参数校验函数，由生成的 SDK 类根据实体定义预编译（见 builder.build_sdk_class）
+    create_validator: Optional[Validator] = None
+    update_validator: Optional[Validator] = None
+
     def __init__(self, work_session, entity_path):
         """初始化 SDK
 
@@ -93,6 +102,179 @@ class VMISDKBase:
         else:
             entity_path_with_api = entity_path
         self.entity = common.MagicEntity(entity_path_with_api, work_session)
+        # 写后合并缓冲区（默认关闭）
+        self.write_buffer: Optional[WriteBehindBuffer] = None
+        # 差量更新的已知版本记录（默认关闭）
+        self.version_tracker: Optional[VersionTracker] = None
+        self.diff_stats = {"updates": 0, "skipped": 0, "fields_total": 0, "fields_sent": 0}
+        # 幂等创建记录（默认关闭）
+        self.idempotency_table: Optional[IdempotencyTable] = None
+        self.idempotency_lookup_field: Optional[str] = None
+        self.idempotency_stats = {
+            "deduplicated": 0,
+            "resolved_by_lookup": 0,
+            "resent": 0,
+        }
+        # 本地参数校验（默认关闭，由 enable_payload_validation 开启）
+        self.validate_payloads = False
+        self.validation_stats = {"checked": 0, "rejected": 0}
+
+    def set_schema(self, fields: Dict[str, str], required: Tuple[str, ...] = ()):
+        """为当前实例设置字段定义并编译校验函数
+
+        Args:
+            fields: 字段名 -> 类型声明，如 {"warehouse": "warehouse*"}
+            required: 创建时必填的字段
+        """
+        self.create_validator = compile_validator(fields, required)
+        self.update_validator = compile_validator(fields)
+
+    def load_remote_schema(
+        self, entity_id: Union[str, int], required: Tuple[str, ...] = ()
+    ) -> bool:
+        """从平台实体定义（/core/entity/query）加载字段定义
+
+        Args:
+            entity_id: 平台实体定义ID
+            required: 创建时必填的字段，平台定义未包含必填信息时由调用方指定
+
+        Returns:
+            加载成功返回 True
+        """
+        try:
+            val = self.session.get(f"/api/v1/core/entity/query/{entity_id}")
+            if val is None or val.get("error") is not None:
+                logger.error("查询%s实体定义失败, ID: %s", self.entity_path, entity_id)
+                return False
+            fields = fields_from_entity_definition(val.get("value") or {})
+            if not fields:
+                logger.error("%s实体定义没有可用字段, ID: %s", self.entity_path, entity_id)
+                return False
+            self.set_schema(fields, required or getattr(self, "required_fields", ()))
+            return True
+        except Exception as e:
+            logger.error("加载%s实体定义异常: %s", self.entity_path, str(e))
+            return False
+
+    def _check_payload(
+        self, validator: Optional[Validator], action: str, param: Dict[str, Any]
+    ) -> bool:
+        """发送请求前本地校验参数，失败时记录日志并返回 False"""
+        if validator is None or not self.validate_payloads:
+            return True
+        self.validation_stats["checked"] += 1
+        error = validator(param)
+        if error is None:
+            return True
+        self.validation_stats["rejected"] += 1
+        logger.error("%s%s参数校验失败: %s", action, self.entity_path, error)
+        return False
+
+    def enable_idempotent_creates(
+        self, lookup_field: Optional[str] = None, max_entries: int = 10000
+    ):
+        """启用幂等创建
+
+        启用后 create 按幂等键记录创建结果：已成功的键直接返回首次结果；
+        结果未知的键重试前先按 lookup_field 查询，唯一匹配时直接采用，
+        否则携带同一个键重新发送（由服务端按 Idempotency-Key 去重）。
+
+        Args:
+            lookup_field: 用于确认创建结果的唯一字段，如 'sku'；为 None 时不查询
+            max_entries: 最多记录的幂等键数量
+        """
+        self.idempotency_table = IdempotencyTable(max_entries)
+        self.idempotency_lookup_field = lookup_field
+
+    def disable_idempotent_creates(self):
+        """关闭幂等创建并清除记录"""
+        self.idempotency_table = None
+        self.idempotency_lookup_field = None
+
+    def enable_diff_updates(self, max_tracked: int = 10000):
+        """启用差量更新
+
+        启用后 SDK 记录 query/filter/create/update 返回的实体版本，
+        update 只发送与已知版本不同的字段，无变化时跳过请求。
+        需要服务端 PUT 支持部分字段更新。
+
+        Args:
+            max_tracked: 最多记录的实体数量
+        """
+        self.version_tracker = VersionTracker(max_tracked)
+
+    def disable_diff_updates(self):
+        """关闭差量更新并清除已知版本"""
+        self.version_tracker = None
+
+    def enable_payload_validation(self):
+        """启用本地参数校验
+
+        启用后 create/update 发送前按字段定义检查必填字段和类型，不合法时记录日志、
+        不发送请求并返回 None。没有字段定义（未生成校验函数）时不检查。
+        """
+        self.validate_payloads = True
+
+    def disable_payload_validation(self):
+        """关闭本地参数校验，参数原样发送"""
+        self.validate_payloads = False
+
+    def _remember(self, result: Any):
+        """记录服务端返回的实体版本"""
+        if self.version_tracker is None or not result:
+            return
+        if isinstance(result, list):
+            for item in result:
+                self.version_tracker.record(item)
+        else:
+            self.version_tracker.record(result)
+
+    def enable_write_buffer(
+        self,
+        window: float = 0.5,
+        max_pending: int = 1000,
+        on_flush: Optional[Callable[[Union[str, int], float, bool], None]] = None,
+    ):
+        """启用更新合并缓冲区
+
+        启用后 update 只写入缓冲区，同一 ID 在窗口内的多次更新合并为一次 PUT。
+        query/filter/count 前会先刷新，保证读己之写；delete 会丢弃该 ID 的待发送更新。
+
+        Args:
+            window: 合并窗口（秒）
+            max_pending: 待刷新 ID 数上限
+            on_flush: 每次实际发送更新后调用 on_flush(entity_id, 耗时秒数, 是否成功)
+        """
+        if self.write_buffer:
+            self.write_buffer.close()
+        self.write_buffer = WriteBehindBuffer(
+            self._send_update,
+            window=window,
+            max_pending=max_pending,
+            name=f"write-buffer{self.entity_path}",
+            on_flush=on_flush,
+        )
+
+    def disable_write_buffer(self):
+        """刷新并关闭更新合并缓冲区"""
+        if self.write_buffer:
+            self.write_buffer.close()
+            self.write_buffer = None
+
+    def flush_writes(
+        self, entity_id: Optional[Union[str, int]] = None
+    ) -> Dict[Union[str, int], Optional[Dict[str, Any]]]:
+        """立即刷新待发送的更新
+
+        Args:
+            entity_id: 只刷新该 ID；为 None 时刷新全部
+
+        Returns:
+            字典：实体ID -> 更新结果
+        """
+        if not self.write_buffer:
+            return {}
+        return self.write_buffer.flush(entity_id)
 
     def filter(self, param: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
         """过滤实体
@@ -104,9 +286,11 @@ class VMISDKBase:
             实体列表或 None（失败时）
         """
         try:
+            self.flush_writes()
             result = self.entity.filter(param)
             if result is None:
                 logger.error("过滤%s失败: 无返回结果", self.entity_path)
+            self._remember(result)
             return result
         except Exception as e:
             logger.error("过滤%s异常: %s", self.entity_path, str(e))
@@ -122,46 +306,131 @@ class VMISDKBase:
             实体信息或 None（失败时）
         """
         try:
+            self.flush_writes(entity_id)
             result = self.entity.query(entity_id)
             if result is None:
                 logger.error("查询%s失败, ID: %s", self.entity_path, entity_id)
+            self._remember(result)
             return result
         except Exception as e:
             logger.error("查询%s异常, ID: %s: %s", self.entity_path, entity_id, str(e))
             return None
 
-    def create(self, param: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def create(
+        self, param: Dict[str, Any], idempotency_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """创建实体
 
+        有校验函数时先在本地检查必填字段和字段类型，校验失败不发送请求。
+        提供 idempotency_key 时随请求发送 Idempotency-Key 请求头；重试时
+        使用同一个键和参数，启用幂等创建后可避免超时重试产生重复数据。
+
         Args:
             param: 实体参数
+            idempotency_key: 幂等键，同一次逻辑创建的所有重试使用同一个键
 
         Returns:
             创建的实体信息或 None（失败时）
         """
+        if not self._check_payload(self.create_validator, "创建", param):
+            return None
+
+        table = self.idempotency_table
+        if idempotency_key and table is not None:
+            entry = table.get(idempotency_key)
+            if entry is not None:
+                if entry["state"] == DONE:
+                    self.idempotency_stats["deduplicated"] += 1
+                    return entry["result"]
+                # 上次请求结果未知，先确认服务端是否已创建
+                found = self._lookup_created(param)
+                if found is not None:
+                    self.idempotency_stats["resolved_by_lookup"] += 1
+                    table.mark_done(idempotency_key, found)
+                    self._remember(found)
+                    return found
+                self.idempotency_stats["resent"] += 1
+            table.mark_pending(idempotency_key)
+
         try:
-            result = self.entity.insert(param)
+            if idempotency_key:
+                result = self.entity.insert(param, idempotency_key=idempotency_key)
+            else:
+                result = self.entity.insert(param)
             if result is None:
                 logger.error(
                     "创建%s失败, 参数: %s", self.entity_path, param.get("name", "未知")
                 )
+            elif idempotency_key and table is not None:
+                table.mark_done(idempotency_key, result)
+            self._remember(result)
             return result
         except Exception as e:
             logger.error("创建%s异常: %s", self.entity_path, str(e))
             return None
 
+    def _lookup_created(self, param: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """按唯一字段查询上次结果未知的创建是否已生效，唯一匹配时返回该实体"""
+        field = self.idempotency_lookup_field
+        if not field or param.get(field) is None:
+            return None
+        try:
+            matches = self.entity.filter({field: param[field]})
+        except Exception as e:
+            logger.warning("按%s查询%s异常: %s", field, self.entity_path, str(e))
+            return None
+        if isinstance(matches, list) and len(matches) == 1:
+            return matches[0]
+        return None
+
     def update(
-        self, entity_id: Union[str, int], param: Dict[str, Any]
+        self,
+        entity_id: Union[str, int],
+        param: Dict[str, Any],
+        base: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """更新实体
 
+        提供 base 或启用差量更新时，只发送与已知版本不同的字段，
+        无变化时跳过请求并返回已知版本。
+        启用合并缓冲区时只写入缓冲区，返回该 ID 合并后的待发送参数。
+        有校验函数时先在本地检查字段类型，校验失败不发送请求。
+
         Args:
             entity_id: 实体ID
             param: 更新参数
+            base: 调用方已知的实体版本，为 None 时使用 SDK 记录的最近版本
 
         Returns:
             更新的实体信息或 None（失败时）
         """
+        if not self._check_payload(self.update_validator, "更新", param):
+            return None
+        if base is None and self.version_tracker is not None:
+            base = self.version_tracker.get(entity_id)
+
+        if base is not None:
+            changes = diff_fields(base, param)
+            self.diff_stats["updates"] += 1
+            self.diff_stats["fields_total"] += len(param)
+            self.diff_stats["fields_sent"] += len(changes)
+            if not changes:
+                self.diff_stats["skipped"] += 1
+                logger.debug("更新%s无变化，跳过请求, ID: %s", self.entity_path, entity_id)
+                return {**base, **param}
+            param = changes
+
+        if self.write_buffer:
+            result = self.write_buffer.put(entity_id, param)
+            if self.version_tracker is not None:
+                self.version_tracker.apply(entity_id, param)
+            return {**base, **result} if base is not None else result
+        return self._send_update(entity_id, param)
+
+    def _send_update(
+        self, entity_id: Union[str, int], param: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """发送更新请求"""
         try:
             # 确保参数中包含 ID
             if "id" not in param:
@@ -169,6 +438,9 @@ class VMISDKBase:
             result = self.entity.update(entity_id, param)
             if result is None:
                 logger.error("更新%s失败, ID: %s", self.entity_path, entity_id)
+                if self.version_tracker is not None:
+                    self.version_tracker.forget(entity_id)
+            self._remember(result)
             return result
         except Exception as e:
             logger.error("更新%s异常, ID: %s: %s", self.entity_path, entity_id, str(e))
@@ -184,6 +456,10 @@ class VMISDKBase:
             删除的实体信息或 None（失败时）
         """
         try:
+            if self.write_buffer:
+                self.write_buffer.discard(entity_id)
+            if self.version_tracker is not None:
+                self.version_tracker.forget(entity_id)
             result = self.entity.delete(entity_id)
             if result is None:
                 logger.error("删除%s失败, ID: %s", self.entity_path, entity_id)
@@ -199,6 +475,7 @@ class VMISDKBase:
             实体数量或 None（失败时）
         """
         try:
+            self.flush_writes()
             result = self.entity.count(param)
             if result is None:
                 logger.error("统计%s数量失败", self.entity_path)
@@ -0,0 +1,105 @@
+"""SDK 类生成器
+
+根据 spec.EntitySpec 生成 VMISDKBase 子类。
+"""
+
+import types
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .base import VMISDKBase
+from .spec import OPERATIONS, EntitySpec
+from .validator import compile_validator
+
+
+def _filter(self, param: Dict[str, Any] = None) -> Optional[List[Dict[str, Any]]]:
+    return self.filter(param)
+
+
+def _query(self, entity_id: Union[str, int]) -> Optional[Dict[str, Any]]:
+    return self.query(entity_id)
+
+
+def _create(
+    self, param: Dict[str, Any], idempotency_key: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    return self.create(param, idempotency_key=idempotency_key)
+
+
+def _update(
+    self,
+    entity_id: Union[str, int],
+    param: Dict[str, Any],
+    base: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    return self.update(entity_id, param, base=base)
+
+
+def _delete(self, entity_id: Union[str, int]) -> Optional[Dict[str, Any]]:
+    return self.delete(entity_id)
+
+
+def _count(self, param: Dict[str, Any] = None) -> Optional[int]:
+    return self.count(param)
+
+
+# 操作 -> (实现, 文档模板)
+_OPERATION_IMPLS = {
+    "filter": (_filter, "过滤{title}，返回{title}列表或 None（失败时）"),
+    "query": (_query, "查询{title}，返回{title}信息或 None（失败时）"),
+    "create": (_create, "创建{title}，返回创建的{title}信息或 None（失败时）"),
+    "update": (_update, "更新{title}，返回更新的{title}信息或 None（失败时）"),
+    "delete": (_delete, "删除{title}，返回删除的{title}信息或 None（失败时）"),
+    "count": (_count, "统计{title}数量，返回数量或 None（失败时）"),
+}
+
+
+def _make_method(op: str, method_name: str, spec: EntitySpec) -> Callable:
+    """生成委托到 VMISDKBase 标准操作的方法"""
+    if op not in _OPERATION_IMPLS:
+        raise ValueError(f"{spec.class_name} 方法 {method_name} 指向未知操作: {op}")
+    impl, doc = _OPERATION_IMPLS[op]
+
+    # 复制函数对象而不是包装，调用时没有额外的栈帧开销
+    method = types.FunctionType(
+        impl.__code__, impl.__globals__, method_name, impl.__defaults__
+    )
+    method.__qualname__ = f"{spec.class_name}.{method_name}"
+    method.__doc__ = doc.format(title=spec.title)
+    method.__annotations__ = dict(impl.__annotations__)
+    return method
+
+
+def build_sdk_class(spec: EntitySpec) -> type:
+    """根据实体定义生成 SDK 类
+
+    Args:
+        spec: 实体定义
+
+    Returns:
+        VMISDKBase 子类，构造参数为 work_session
+    """
+
+    def __init__(self, work_session):
+        VMISDKBase.__init__(self, work_session, spec.path)
+
+    __init__.__qualname__ = f"{spec.class_name}.__init__"
+    __init__.__doc__ = f"初始化{spec.title} SDK"
+
+    namespace = {
+        "__init__": __init__,
+        "__doc__": f"{spec.title} SDK 类",
+        "__module__": __package__,
+        "spec": spec,
+        "required_fields": spec.required,
+        "create_validator": staticmethod(compile_validator(spec.fields, spec.required)),
+        "update_validator": staticmethod(compile_validator(spec.fields)),
+    }
+
+    for op in OPERATIONS:
+        method_name = f"{op}_{spec.name}"
+        namespace[method_name] = _make_method(op, method_name, spec)
+
+    for alias, op in spec.aliases.items():
+        namespace[alias] = _make_method(op, alias, spec)
+
+    return type(spec.class_name, (VMISDKBase,), namespace)
@@ -0,0 +1,69 @@
+"""创建请求幂等记录
+
+为 create 生成幂等键，并在客户端记录每个键的创建结果：
+- 已成功的键再次创建时直接返回首次结果，不再发送请求
+- 结果未知的键（上次请求超时或连接中断）重试前先按唯一字段查询，
+  已存在则直接采用，否则携带同一个键重新发送
+"""
+
+import copy
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# 记录状态：请求已发送但结果未知 / 已确认创建成功
+PENDING = "pending"
+DONE = "done"
+
+
+def new_idempotency_key() -> str:
+    """生成新的幂等键"""
+    return uuid.uuid4().hex
+
+
+class IdempotencyTable:
+    """幂等键 -> 创建结果（LRU，数量有上限）"""
+
+    def __init__(self, max_entries: int = 10000):
+        """初始化幂等记录
+
+        Args:
+            max_entries: 最多记录的键数量，超过时淘汰最久未使用的记录
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取记录（副本），格式为 {"state": ..., "result": ...}"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry)
+
+    def mark_pending(self, key: str):
+        """记录请求已发送、结果未知"""
+        self._put(key, {"state": PENDING, "result": None})
+
+    def mark_done(self, key: str, result: Dict[str, Any]):
+        """记录创建成功及其结果"""
+        self._put(key, {"state": DONE, "result": copy.deepcopy(result)})
+
+    def forget(self, key: str):
+        """删除记录"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _put(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,255 @@
+"""VMI SDK 声明式定义
+
+每个实体只需声明名称、路径和必填字段，SDK 类在首次访问时由
+builder.build_sdk_class 生成，生成的方法名与原手写 SDK 保持一致
+（如 create_store / filter_goods）。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+# 每个实体生成的标准操作，方法名为 "{操作}_{实体名}"
+OPERATIONS = ("filter", "query", "create", "update", "delete", "count")
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """实体 SDK 定义
+
+    Attributes:
+        name: 实体名（snake_case），用于生成类名和方法名
+        path: 实体路径，如 '/vmi/warehouse/shelf'
+        title: 实体中文名称，用于日志和文档
+        required: 创建时必填的字段
+        fields: 字段名 -> 类型声明，如 {"warehouse": "warehouse*"}，用于本地参数校验
+        aliases: 额外的方法别名 -> 标准操作，如 {"list_goods": "filter"}
+    """
+
+    name: str
+    path: str
+    title: str
+    required: Tuple[str, ...] = ()
+    fields: Dict[str, str] = field(default_factory=dict)
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def class_name(self) -> str:
+        """生成的 SDK 类名，如 credit_report -> CreditReportSDK"""
+        return "".join(part.capitalize() for part in self.name.split("_")) + "SDK"
+
+
+# 对应 VMI 实体定义中的 18 个核心实体
+# 必填字段和字段类型来自各模块测试用例中记录的实体字段定义，
+# 文档未记录的实体按测试用例中的参数补充；系统自动生成的字段不声明
+SDK_SPECS: Tuple[EntitySpec, ...] = (
+    EntitySpec(
+        "status",
+        "/vmi/status",
+        "状态",
+        fields={"value": "int", "name": "string"},
+    ),
+    EntitySpec(
+        "partner",
+        "/vmi/partner",
+        "合作伙伴",
+        required=("name", "status"),
+        fields={
+            "name": "string",
+            "telephone": "string",
+            "wechat": "string",
+            "description": "string",
+            "referer": "partner*",
+            "status": "status*",
+        },
+    ),
+    EntitySpec(
+        "warehouse",
+        "/vmi/warehouse",
+        "仓库",
+        required=("name",),
+        fields={"name": "string", "description": "string"},
+    ),
+    EntitySpec(
+        "shelf",
+        "/vmi/warehouse/shelf",
+        "货架",
+        required=("warehouse", "status"),
+        fields={
+            "description": "string",
+            "used": "int",
+            "capacity": "int",
+            "warehouse": "warehouse*",
+            "status": "status*",
+        },
+    ),
+    EntitySpec(
+        "product",
+        "/vmi/product",
+        "产品",
+        required=("name", "status"),
+        fields={
+            "name": "string",
+            "description": "string",
+            "image": "string[]",
+            "expire": "int",
+            "status": "status*",
+            "tags": "string[]",
+        },
+    ),
+    EntitySpec(
+        "product_info",
+        "/vmi/product/productInfo",
+        "产品 SKU 信息",
+        required=("sku", "product"),
+        fields={
+            "sku": "string",
+            "description": "string",
+            "image": "string[]",
+            "product": "product*",
+        },
+    ),
+    EntitySpec(
+        "store",
+        "/vmi/store",
+        "店铺",
+        required=("name",),
+        fields={"name": "string", "description": "string", "shelf": "shelf[]"},
+    ),
+    EntitySpec(
+        "member",
+        "/vmi/store/member",
+        "店铺成员",
+        required=("title", "name", "store"),
+        fields={"title": "string", "name": "string", "store": "store*"},
+    ),
+    EntitySpec(
+        "goods",
+        "/vmi/store/goods",
+        "商品信息",
+        required=(
+            "sku",
+            "name",
+            "product",
+            "count",
+            "price",
+            "shelf",
+            "store",
+            "status",
+        ),
+        fields={
+            "sku": "string",
+            "name": "string",
+            "description": "string",
+            "parameter": "string",
+            "serviceInfo": "string",
+            "product": "productInfo*",
+            "count": "int",
+            "price": "float64",
+            "shelf": "shelf[]",
+            "store": "store*",
+            "status": "status*",
+        },
+    ),
+    EntitySpec(
+        "stockin",
+        "/vmi/store/stockin",
+        "入库单",
+        required=("goodsInfo", "store", "status"),
+        fields={
+            "goodsInfo": "goodsInfo[]",
+            "description": "string",
+            "status": "status*",
+            "store": "store*",
+        },
+    ),
+    EntitySpec(
+        "stockout",
+        "/vmi/store/stockout",
+        "出库单",
+        required=("goodsInfo", "store", "status"),
+        fields={
+            "goodsInfo": "goodsInfo[]",
+            "description": "string",
+            "status": "status*",
+            "store": "store*",
+        },
+    ),
+    EntitySpec(
+        "goods_info",
+        "/vmi/store/goodsInfo",
+        "商品SKU",
+        required=("sku", "product"),
+        fields={
+            "sku": "string",
+            "product": "productInfo*",
+            "type": "int",
+            "count": "int",
+            "price": "float64",
+            "store": "store*",
+            "status": "status*",
+        },
+    ),
+    EntitySpec(
+        "order",
+        "/vmi/order",
+        "订单信息",
+        required=("customer",),
+        fields={
+            "type": "int",
+            "customer": "partner*",
+            "goods": "goodsItem[]",
+            "cost": "float64",
+            "store": "store*",
+            "status": "status*",
+        },
+    ),
+    EntitySpec(
+        "goods_item",
+        "/vmi/order/goodsItem",
+        "商品条目",
+        required=("sku",),
+        fields={"sku": "string", "name": "string", "price": "float64", "count": "int"},
+    ),
+    EntitySpec(
+        "credit",
+        "/vmi/credit",
+        "积分信息",
+        required=("owner", "credit", "type", "level"),
+        fields={
+            "owner": "partner*",
+            "memo": "string",
+            "credit": "int64",
+            "type": "int",
+            "level": "int",
+        },
+    ),
+    EntitySpec(
+        "credit_report",
+        "/vmi/credit/creditReport",
+        "积分报表",
+        required=("owner",),
+        fields={"owner": "partner*", "credit": "int64", "available": "int64"},
+    ),
+    EntitySpec(
+        "credit_reward",
+        "/vmi/credit/creditReward",
+        "积分消费记录",
+        required=("owner",),
+        fields={"owner": "partner*", "credit": "int64", "memo": "string"},
+    ),
+    EntitySpec(
+        "reward_policy",
+        "/vmi/credit/rewardPolicy",
+        "积分策略",
+        required=("name", "status"),
+        fields={
+            "name": "string",
+            "description": "string",
+            "policy": "string",
+            "status": "status*",
+        },
+    ),
+)
+
+# 类名 -> 定义
+SPECS_BY_CLASS: Dict[str, EntitySpec] = {spec.class_name: spec for spec in SDK_SPECS}
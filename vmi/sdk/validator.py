@@ -0,0 +1,173 @@
+"""实体参数校验
+
+根据实体字段定义编译校验函数，在 create/update 发送请求前本地检查
+必填字段和字段类型，避免类型错误（如 "illegal value type"）占用一次服务端往返。
+
+字段类型沿用实体定义文档中的写法：
+- 基础类型：string、int、int64、float64、bool、time 等
+- 实体引用：status*、warehouse* 等，取值必须是包含 id 的对象，如 {"id": 1}
+- 数组：string[]、shelf[]、goodsInfo[] 等
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# 校验函数：参数合法时返回 None，否则返回错误描述
+Validator = Callable[[Dict[str, Any]], Optional[str]]
+
+_INT_TYPES = {
+    "int",
+    "int8",
+    "int16",
+    "int32",
+    "int64",
+    "uint",
+    "uint8",
+    "uint16",
+    "uint32",
+    "uint64",
+}
+_FLOAT_TYPES = {"float32", "float64"}
+
+# 平台实体定义中的基础类型编码（见 platform/entity/entity.py）
+_BASIC_TYPE_VALUES = {
+    100: "bool",
+    101: "int8",
+    102: "int16",
+    103: "int32",
+    104: "int",
+    105: "int64",
+    106: "uint8",
+    107: "uint16",
+    108: "uint32",
+    109: "uint",
+    110: "uint64",
+    111: "float32",
+    112: "float64",
+    113: "string",
+    114: "time",
+}
+_STRUCT_TYPE_VALUE = 115
+_SLICE_TYPE_VALUE = 116
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_float(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_string(value: Any) -> bool:
+    return isinstance(value, str)
+
+
+def _is_bool(value: Any) -> bool:
+    return isinstance(value, bool)
+
+
+def _is_time(value: Any) -> bool:
+    return isinstance(value, str) or _is_int(value)
+
+
+def _is_reference(value: Any) -> bool:
+    return isinstance(value, dict) and "id" in value
+
+
+def _is_object(value: Any) -> bool:
+    return isinstance(value, dict)
+
+
+_SCALAR_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    **{name: _is_int for name in _INT_TYPES},
+    **{name: _is_float for name in _FLOAT_TYPES},
+    "string": _is_string,
+    "bool": _is_bool,
+    "time": _is_time,
+}
+
+
+def _compile_type(type_decl: str) -> Callable[[Any], bool]:
+    """将字段类型声明编译为检查函数"""
+    if type_decl.endswith("[]"):
+        elem_decl = type_decl[:-2]
+        # 实体数组的元素可能是引用也可能是内嵌对象，只要求是对象
+        elem_check = (
+            _compile_type(elem_decl) if elem_decl in _SCALAR_CHECKS else _is_object
+        )
+
+        def check_list(value: Any) -> bool:
+            return isinstance(value, list) and all(elem_check(item) for item in value)
+
+        return check_list
+    if type_decl.endswith("*"):
+        return _is_reference
+    if type_decl in _SCALAR_CHECKS:
+        return _SCALAR_CHECKS[type_decl]
+    raise ValueError(f"未知的字段类型: {type_decl}")
+
+
+def compile_validator(
+    fields: Dict[str, str], required: Iterable[str] = ()
+) -> Validator:
+    """编译参数校验函数
+
+    字段定义只在编译时解析一次，返回的校验函数只做字典查找和类型检查。
+    未在 fields 中声明的字段不做检查，值为 None 的可选字段视为未设置。
+
+    Args:
+        fields: 字段名 -> 类型声明，如 {"warehouse": "warehouse*"}
+        required: 必填字段（create 使用；update 为部分更新，传空）
+
+    Returns:
+        校验函数：参数合法时返回 None，否则返回错误描述
+    """
+    checks = {name: (_compile_type(decl), decl) for name, decl in fields.items()}
+    required = tuple(required)
+
+    def validate(param: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(param, dict):
+            return f"参数必须是字典，实际为 {type(param).__name__}"
+        for name in required:
+            if param.get(name) is None:
+                return f"缺少必填字段: {name}"
+        for name, value in param.items():
+            entry = checks.get(name)
+            if entry is not None and value is not None and not entry[0](value):
+                return f"字段 {name} 类型错误: 期望 {entry[1]}, 实际为 {value!r}"
+        return None
+
+    return validate
+
+
+def fields_from_entity_definition(definition: Dict[str, Any]) -> Dict[str, str]:
+    """将平台实体定义（/core/entity/query 返回值）转换为字段类型声明
+
+    Args:
+        definition: 实体定义，fields 中每项包含 name、type、spec
+
+    Returns:
+        字段名 -> 类型声明（不含主键字段）
+    """
+    fields = {}
+    for field in definition.get("fields") or []:
+        spec = field.get("spec") or {}
+        if spec.get("primaryKey"):
+            continue
+        decl = _type_declaration(field.get("type") or {})
+        if decl:
+            fields[field["name"]] = decl
+    return fields
+
+
+def _type_declaration(type_info: Dict[str, Any]) -> Optional[str]:
+    """将平台类型描述转换为类型声明，无法识别时返回 None"""
+    value = type_info.get("value")
+    if value in _BASIC_TYPE_VALUES:
+        return _BASIC_TYPE_VALUES[value]
+    if value == _STRUCT_TYPE_VALUE:
+        return f"{type_info.get('name', 'struct')}*"
+    if value == _SLICE_TYPE_VALUE:
+        elem = _type_declaration(type_info.get("elemType") or {})
+        return f"{elem.rstrip('*')}[]" if elem else None
+    return None
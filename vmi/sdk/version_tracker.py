@@ -0,0 +1,85 @@
+"""实体版本记录
+
+记录 SDK 最近一次读取/写入的实体版本，用于差量更新：
+只发送与已知版本不同的字段，无变化时跳过请求。
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+EntityId = Union[str, int]
+
+
+def diff_fields(base: Dict[str, Any], param: Dict[str, Any]) -> Dict[str, Any]:
+    """计算与已知版本不同的顶层字段
+
+    嵌套对象（如 status、warehouse）按整体比较，有变化时整体发送。
+
+    Args:
+        base: 已知版本
+        param: 新参数
+
+    Returns:
+        变化的字段字典（不含 id）
+    """
+    changes = {}
+    for key, value in param.items():
+        if key == "id":
+            continue
+        if key not in base or base[key] != value:
+            changes[key] = value
+    return changes
+
+
+class VersionTracker:
+    """按实体ID记录最近已知版本（LRU，数量有上限）"""
+
+    def __init__(self, max_entries: int = 10000):
+        """初始化版本记录
+
+        Args:
+            max_entries: 最多记录的实体数量，超过时淘汰最久未使用的记录
+        """
+        self.max_entries = max_entries
+        self._versions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, entity_id: EntityId) -> Optional[Dict[str, Any]]:
+        """获取已知版本（副本）"""
+        key = str(entity_id)
+        with self._lock:
+            version = self._versions.get(key)
+            if version is None:
+                return None
+            self._versions.move_to_end(key)
+            return copy.deepcopy(version)
+
+    def record(self, entity: Optional[Dict[str, Any]]):
+        """记录服务端返回的完整实体"""
+        if not isinstance(entity, dict) or "id" not in entity:
+            return
+        key = str(entity["id"])
+        with self._lock:
+            self._versions[key] = copy.deepcopy(entity)
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+
+    def apply(self, entity_id: EntityId, changes: Dict[str, Any]):
+        """将已发送的变更合并到已知版本"""
+        key = str(entity_id)
+        with self._lock:
+            version = self._versions.get(key)
+            if version is not None:
+                version.update(copy.deepcopy(changes))
+
+    def forget(self, entity_id: EntityId):
+        """删除指定实体的记录"""
+        with self._lock:
+            self._versions.pop(str(entity_id), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._versions)
@@ -0,0 +1,308 @@
+"""写后合并缓冲区
+
+将同一实体 ID 在合并窗口内的多次更新合并为一次 PUT 请求。
+缓冲区在以下时机刷新：
+1. 定时器到期（最早一次未刷新更新的时间 + 窗口）
+2. 读己之写：查询/过滤/统计前由 SDK 主动刷新
+3. 进程退出（atexit）
+
+刷新线程只持有缓冲区的弱引用，所属 SDK 未关闭缓冲区就被回收时线程随之退出；
+有待刷新的更新时缓冲区由模块持有，更新发送后才可能被回收。
+"""
+
+import atexit
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EntityId = Union[str, int]
+
+# 空闲的刷新线程检查缓冲区是否已被回收的间隔（秒）
+IDLE_CHECK_INTERVAL = 60.0
+
+# 所有存活的缓冲区，进程退出时统一刷新
+_live_buffers: "weakref.WeakSet[WriteBehindBuffer]" = weakref.WeakSet()
+# 有待刷新更新的缓冲区，发送前不会被回收
+_pending_buffers: "set[WriteBehindBuffer]" = set()
+
+
+class WriteBehindBuffer:
+    """写后合并缓冲区
+
+    同一 ID 的多次更新按字段合并（后写覆盖先写），窗口到期后通过
+    flush_func(entity_id, param) 一次性发送。
+    """
+
+    def __init__(
+        self,
+        flush_func: Callable[[EntityId, Dict[str, Any]], Optional[Dict[str, Any]]],
+        window: float = 0.5,
+        max_pending: int = 1000,
+        name: str = "write-buffer",
+        on_flush: Optional[Callable[[EntityId, float, bool], None]] = None,
+    ):
+        """初始化缓冲区
+
+        Args:
+            flush_func: 实际发送更新的函数，签名为 (entity_id, param)
+            window: 合并窗口（秒），从某 ID 第一次未刷新更新开始计时
+            max_pending: 待刷新 ID 数上限，超过时立即刷新全部
+            name: 刷新线程名称
+            on_flush: 每次 PUT 返回后调用 on_flush(entity_id, 耗时秒数, 是否成功)，
+                用于统计实际发送更新的耗时（put 本身只是写入内存）
+        """
+        self.flush_func = flush_func
+        self.on_flush = on_flush
+        self.window = window
+        self.max_pending = max_pending
+        self.name = name
+
+        # entity_id -> 合并后的参数 / 首次未刷新写入时间
+        self._pending: Dict[EntityId, Dict[str, Any]] = {}
+        self._first_write: Dict[EntityId, float] = {}
+        # 已从待刷新表取出、PUT 尚未返回的 ID
+        self._inflight = set()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # 统计信息
+        self.updates_received = 0
+        self.updates_coalesced = 0
+        self.puts_sent = 0
+        self.puts_failed = 0
+
+        # 线程参数不能引用缓冲区本身，否则缓冲区和所属 SDK 永远不会被回收
+        self._thread = threading.Thread(
+            target=_flush_worker,
+            args=(weakref.ref(self), self._cond),
+            daemon=True,
+            name=f"{name}-flush",
+        )
+        self._thread.start()
+        # 缓冲区被回收时唤醒空闲等待的刷新线程，使其退出
+        weakref.finalize(self, _wake, self._cond)
+        _live_buffers.add(self)
+
+    def put(self, entity_id: EntityId, param: Dict[str, Any]) -> Dict[str, Any]:
+        """写入一次更新
+
+        Args:
+            entity_id: 实体ID
+            param: 更新参数
+
+        Returns:
+            该 ID 当前合并后的待发送参数（副本）
+        """
+        overflow = False
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} 已关闭")
+            merged = self._pending.get(entity_id)
+            if merged is None:
+                merged = {}
+                self._pending[entity_id] = merged
+                self._first_write[entity_id] = time.monotonic()
+                _pending_buffers.add(self)
+                # flush() 的等待方也在同一条件上等待，必须唤醒全部，保证刷新线程被唤醒
+                self._cond.notify_all()
+            else:
+                self.updates_coalesced += 1
+            merged.update(param)
+            self.updates_received += 1
+            snapshot = dict(merged)
+            overflow = len(self._pending) > self.max_pending
+
+        if overflow:
+            logger.debug("%s: 待刷新数量超过上限(%d)，立即刷新", self.name, self.max_pending)
+            self.flush()
+
+        return snapshot
+
+    def pending(self, entity_id: EntityId) -> Optional[Dict[str, Any]]:
+        """获取指定 ID 待发送的合并参数"""
+        with self._cond:
+            merged = self._pending.get(entity_id)
+            return dict(merged) if merged is not None else None
+
+    def pending_count(self) -> int:
+        """获取待刷新的 ID 数量"""
+        with self._cond:
+            return len(self._pending)
+
+    def discard(self, entity_id: EntityId) -> bool:
+        """丢弃指定 ID 的待发送更新（如实体即将被删除）
+
+        并等待该 ID 正在发送的更新返回，随后的删除请求不会被这次更新覆盖。
+
+        Returns:
+            是否存在被丢弃的更新
+        """
+        with self._cond:
+            self._first_write.pop(entity_id, None)
+            discarded = self._pending.pop(entity_id, None) is not None
+            self._release_if_idle()
+            while entity_id in self._inflight:
+                self._cond.wait()
+            return discarded
+
+    def flush(
+        self, entity_id: Optional[EntityId] = None
+    ) -> Dict[EntityId, Optional[Dict[str, Any]]]:
+        """立即刷新
+
+        Args:
+            entity_id: 只刷新该 ID；为 None 时刷新全部
+
+        Returns:
+            字典：实体ID -> flush_func 返回值
+        """
+        with self._cond:
+            if entity_id is None:
+                batch = self._pending
+                self._pending = {}
+                self._first_write = {}
+            elif entity_id in self._pending:
+                batch = {entity_id: self._pending.pop(entity_id)}
+                self._first_write.pop(entity_id, None)
+            else:
+                batch = {}
+            self._inflight.update(batch)
+            self._release_if_idle()
+
+        results = self._send(batch)
+
+        # 等待定时线程正在发送的同 ID 更新完成，保证读己之写
+        with self._cond:
+            while (
+                self._inflight
+                if entity_id is None
+                else entity_id in self._inflight
+            ):
+                self._cond.wait()
+
+        return results
+
+    def _send(
+        self, batch: Dict[EntityId, Dict[str, Any]]
+    ) -> Dict[EntityId, Optional[Dict[str, Any]]]:
+        """发送一批合并后的更新"""
+        results = {}
+        for entity_id, param in batch.items():
+            start = time.monotonic()
+            try:
+                result = self.flush_func(entity_id, param)
+            except Exception as e:
+                logger.error("%s: 刷新ID %s 异常: %s", self.name, entity_id, e)
+                result = None
+            if self.on_flush is not None:
+                duration = time.monotonic() - start
+                try:
+                    self.on_flush(entity_id, duration, result is not None)
+                except Exception as e:
+                    logger.error("%s: 刷新回调异常: %s", self.name, e)
+            with self._cond:
+                self.puts_sent += 1
+                if result is None:
+                    self.puts_failed += 1
+                self._inflight.discard(entity_id)
+                self._cond.notify_all()
+            results[entity_id] = result
+        return results
+
+    def _take_due(self, now: float) -> Tuple[Dict[EntityId, Dict[str, Any]], float]:
+        """取出已到期的更新（调用方持有锁）
+
+        Returns:
+            (到期的更新, 距最早到期时间的秒数)；没有到期的更新时第一项为空
+        """
+        deadline = min(self._first_write.values()) + self.window
+        if deadline > now:
+            return {}, deadline - now
+
+        expired = now - self.window
+        due = [eid for eid, first in self._first_write.items() if first <= expired]
+        batch = {}
+        for eid in due:
+            batch[eid] = self._pending.pop(eid)
+            del self._first_write[eid]
+        self._inflight.update(batch)
+        self._release_if_idle()
+        return batch, 0.0
+
+    def _release_if_idle(self):
+        """没有待刷新的更新时不再由模块持有（调用方持有锁）"""
+        if not self._first_write:
+            _pending_buffers.discard(self)
+
+    def close(self):
+        """停止接收更新，刷新全部待发送更新并停止刷新线程"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        _live_buffers.discard(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取合并统计信息"""
+        with self._cond:
+            received = self.updates_received
+            coalesced = self.updates_coalesced
+            return {
+                "updates_received": received,
+                "updates_coalesced": coalesced,
+                "puts_sent": self.puts_sent,
+                "puts_failed": self.puts_failed,
+                "pending": len(self._pending),
+                "coalesce_ratio": coalesced / received if received else 0.0,
+            }
+
+
+def _flush_worker(
+    buffer_ref: "weakref.ref[WriteBehindBuffer]", cond: threading.Condition
+):
+    """定时刷新线程：睡眠到最早的到期时间
+
+    等待时不持有缓冲区，缓冲区被回收或关闭后退出
+    """
+    while True:
+        with cond:
+            buffer = buffer_ref()
+            if buffer is None or buffer._closed:
+                return
+            if not buffer._first_write:
+                buffer = None
+                # 回收可能恰好发生在本线程持锁期间（唤醒先于等待），定期自查兜底
+                cond.wait(IDLE_CHECK_INTERVAL)
+                continue
+            batch, delay = buffer._take_due(time.monotonic())
+            if not batch:
+                buffer = None
+                cond.wait(delay)
+                continue
+
+        buffer._send(batch)
+        buffer = None
+
+
+def _wake(cond: threading.Condition):
+    """唤醒刷新线程（缓冲区被回收时调用）"""
+    with cond:
+        cond.notify_all()
+
+
+@atexit.register
+def _flush_all_buffers():
+    """进程退出时刷新所有缓冲区"""
+    for buffer in list(_live_buffers):
+        try:
+            buffer.close()
+        except Exception as e:
+            logger.error("退出时刷新写缓冲区失败: %s", e)
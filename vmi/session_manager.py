@@ -3,21 +3,91 @@
 会话管理器 - 管理测试会话的创建、刷新和超时处理
 """
 
+import base64
+import json
 import logging
+import random
 import threading
 import time
-from typing import Optional, Tuple
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from refresh_scheduler import RefreshScheduler, get_refresh_scheduler
 
 logger = logging.getLogger(__name__)
 
+# 刷新或重新登录失败后的重试间隔（秒）
+REFRESH_RETRY_DELAY = 60
+
+# 已知令牌过期时间时，在剩余有效期的该比例处主动刷新
+TOKEN_REFRESH_RATIO = 0.8
+
+
+class _AuthFlight:
+    """同一身份（单飞范围）的登录/刷新状态，由该身份的所有会话管理器共享"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # 按操作记录完成次数，以及最近一次的执行者（弱引用）和结果
+        self.generations: Dict[str, int] = {}
+        self.results: Dict[str, Tuple[Any, bool]] = {}
+
+
+# 按单飞范围登记的认证状态，最后一个会话管理器释放后自动移除
+_auth_flights: "weakref.WeakValueDictionary[Tuple, _AuthFlight]" = (
+    weakref.WeakValueDictionary()
+)
+_auth_flights_lock = threading.Lock()
+
+
+def _auth_flight(key: Tuple) -> _AuthFlight:
+    """获取单飞范围对应的认证状态，不存在时创建"""
+    with _auth_flights_lock:
+        flight = _auth_flights.get(key)
+        if flight is None:
+            flight = _AuthFlight()
+            _auth_flights[key] = flight
+        return flight
+
+
+def token_expire_time(session_token: Optional[str], entity=None) -> Optional[float]:
+    """获取令牌过期时间（time.time() 时间戳）
+
+    优先使用登录/刷新返回实体中的 expireTime（毫秒），否则解析 JWT 令牌的 exp；
+    都没有时返回 None
+
+    Args:
+        session_token: 会话令牌
+        entity: 登录/刷新返回的会话实体
+    """
+    if isinstance(entity, dict) and entity.get("expireTime"):
+        try:
+            return float(entity["expireTime"]) / 1000
+        except (TypeError, ValueError):
+            pass
+
+    if not session_token or session_token.count(".") != 2:
+        return None
+    try:
+        payload = session_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"]) if "exp" in claims else None
+    except (ValueError, TypeError, KeyError):
+        return None
+
 
 class SessionManager:
     """会话管理器类
 
     管理测试会话的生命周期，包括：
     1. 会话创建和登录
-    2. 定期刷新避免超时
+    2. 定期刷新避免超时（由进程共享的 RefreshScheduler 调度，不单独占用线程）
     3. 超时检测和自动重新登录
+
+    刷新时间带随机抖动，同时创建的会话不会在同一时刻集中刷新；已知令牌过期时间时
+    在过期前主动刷新。登录、刷新和重新登录同一时间只执行一个，并发执行同一操作
+    （同一身份）的调用方等待并复用正在进行的那次结果。
     """
 
     def __init__(
@@ -27,8 +97,11 @@ class SessionManager:
         username: str,
         password: str,
         refresh_interval: int = 540,  # 9分钟刷新一次（服务器要求不超过10分钟）
-        session_timeout: int = 1800,
-    ):  # 30分钟会话超时
+        session_timeout: int = 1800,  # 30分钟会话超时
+        refresh_jitter: float = 0.1,
+        token_store=None,
+        auth_scope: Optional[str] = None,
+    ):
         """初始化会话管理器
 
         Args:
@@ -38,6 +111,11 @@ class SessionManager:
             password: 密码
             refresh_interval: 刷新间隔（秒）
             session_timeout: 会话超时时间（秒）
+            refresh_jitter: 刷新时间随机提前的最大比例（0 表示不抖动）
+            token_store: 令牌缓存（token_store.TokenStore），登录时优先复用缓存令牌；
+                同一身份的多个会话共用缓存会互相吊销令牌，只应由单会话调用方传入
+            auth_scope: 登录/刷新单飞范围，默认同一身份的会话管理器依次登录和刷新；
+                需要并行登录多个独立会话的调用方（如会话池）为每个会话传入不同的值
         """
         self.server_url = server_url
         self.namespace = namespace
@@ -45,6 +123,9 @@ class SessionManager:
         self.password = password
         self.refresh_interval = refresh_interval
         self.session_timeout = session_timeout
+        self.refresh_jitter = refresh_jitter
+        self.token_store = token_store
+        self.auth_scope = auth_scope
 
         # 会话相关对象
         self.work_session = None
@@ -53,11 +134,17 @@ class SessionManager:
         # 会话状态
         self.last_activity_time = 0
         self.last_refresh_time = 0
+        self.next_refresh_time = 0
+        self.token_expire_time: Optional[float] = None
         self.is_logged_in = False
 
-        # 刷新线程
-        self.refresh_thread = None
-        self.stop_refresh = threading.Event()
+        # 登录/刷新单飞：同一身份同一时间只有一个认证请求，同一会话管理器上并发
+        # 执行同一操作的调用方等待并复用结果
+        self._auth_flight = _auth_flight(self._identity() + (auth_scope,))
+        self.auth_stats = {"logins": 0, "refreshes": 0, "joined": 0}
+
+        # 自动刷新调度器（启动自动刷新后设置）
+        self.refresh_scheduler: Optional[RefreshScheduler] = None
 
     def create_session(self) -> bool:
         """创建会话并登录
@@ -65,6 +152,10 @@ class SessionManager:
         Returns:
             登录是否成功
         """
+        return self._single_flight(self._create_session)
+
+    def _create_session(self) -> bool:
+        """创建会话并登录（调用方持有认证锁）"""
         try:
             # 添加必要的Python路径
             import os
@@ -92,15 +183,18 @@ class SessionManager:
             self.cas_session = Cas(self.work_session)
 
             # 登录
-            if not self.cas_session.login(self.username, self.password):
+            self.auth_stats["logins"] += 1
+            logged_in = self.cas_session.login(
+                self.username, self.password, token_store=self.token_store
+            )
+            if not logged_in:
                 logger.error("会话管理器: 登录失败")
                 return False
 
             self.work_session.bind_token(self.cas_session.get_session_token())
 
             # 更新状态
-            self.last_activity_time = time.time()
-            self.last_refresh_time = time.time()
+            self._mark_authenticated()
             self.is_logged_in = True
 
             logger.info("会话管理器: 登录成功")
@@ -116,6 +210,10 @@ class SessionManager:
         Returns:
             刷新是否成功
         """
+        return self._single_flight(self._refresh_session)
+
+    def _refresh_session(self) -> bool:
+        """刷新会话（调用方持有认证锁）"""
         if not self.is_logged_in or not self.cas_session:
             logger.warning("会话管理器: 尝试刷新未登录的会话")
             return False
@@ -124,23 +222,24 @@ class SessionManager:
             session_token = self.cas_session.get_session_token()
             if not session_token:
                 logger.warning("会话管理器: 会话令牌为空，需要重新登录")
-                return self.reconnect()
+                return self._reconnect()
 
             # 调用刷新API
+            self.auth_stats["refreshes"] += 1
             new_token = self.cas_session.refresh(session_token)
             if new_token:
                 self.work_session.bind_token(new_token)
-                self.last_refresh_time = time.time()
-                self.last_activity_time = time.time()
+                self._mark_authenticated()
+                self._save_token()
                 logger.debug("会话管理器: 会话刷新成功")
                 return True
             else:
                 logger.warning("会话管理器: 会话刷新失败，尝试重新登录")
-                return self.reconnect()
+                return self._reconnect()
 
         except Exception as e:
             logger.error(f"会话管理器: 刷新会话异常 - {e}")
-            return self.reconnect()
+            return self._reconnect()
 
     def reconnect(self) -> bool:
         """重新连接（重新登录）
@@ -148,13 +247,110 @@ class SessionManager:
         Returns:
             重新登录是否成功
         """
+        return self._single_flight(self._reconnect)
+
+    def _reconnect(self) -> bool:
+        """重新登录（调用方持有认证锁）"""
         logger.info("会话管理器: 尝试重新登录")
 
+        # 重新登录后保持自动刷新
+        scheduler = self.refresh_scheduler
+
+        # 需要重新登录说明当前令牌已不可用，不再从缓存复用
+        if self.token_store is not None:
+            self.token_store.delete(self._identity())
+
         # 关闭现有会话
         self.close_session()
 
         # 创建新会话
-        return self.create_session()
+        success = self._create_session()
+        if scheduler is not None:
+            self.start_auto_refresh(scheduler)
+        return success
+
+    def _single_flight(self, action: Callable[[], bool]) -> bool:
+        """执行登录/刷新操作，同一身份同一时间只有一个在进行
+
+        同一身份的其他会话管理器等待正在进行的认证请求结束后再执行自己的操作；
+        等待期间如果同一会话管理器的其他调用方已完成同一操作，直接复用其结果，
+        不再重复请求服务器。不同操作（如登录和刷新）不互相复用结果
+        """
+        flight = self._auth_flight
+        name = action.__name__
+        with _auth_flights_lock:
+            generation = flight.generations.get(name, 0)
+        with flight.lock:
+            with _auth_flights_lock:
+                completed = flight.generations.get(name, 0)
+                owner, result = flight.results.get(name, (None, False))
+            if completed != generation and owner is not None and owner() is self:
+                self.auth_stats["joined"] += 1
+                logger.debug("会话管理器: 复用并发完成的登录/刷新结果")
+                return result
+            try:
+                result = action()
+            except Exception as e:
+                logger.error(f"会话管理器: 登录/刷新异常 - {e}")
+                result = False
+            with _auth_flights_lock:
+                flight.results[name] = (weakref.ref(self), result)
+                flight.generations[name] = completed + 1
+            return result
+
+    def _identity(self) -> Tuple[str, str, str]:
+        """令牌缓存中的身份"""
+        return (self.server_url, self.namespace, self.username)
+
+    def _save_token(self):
+        """刷新后令牌可能已更换，同步到令牌缓存"""
+        if self.token_store is not None:
+            self.token_store.put(
+                self._identity(),
+                self.cas_session.get_session_token(),
+                self.cas_session.get_current_entity(),
+            )
+
+    def _mark_authenticated(self):
+        """登录或刷新成功后更新时间并计算下一次刷新时间"""
+        now = time.time()
+        self.last_activity_time = now
+        self.last_refresh_time = now
+        previous_expire_time = self.token_expire_time
+        self.token_expire_time = token_expire_time(
+            self.cas_session.get_session_token(),
+            self.cas_session.get_current_entity(),
+        )
+        lead = self._refresh_lead(now, previous_expire_time)
+        self.next_refresh_time = now + self._jittered(lead)
+
+    def _refresh_lead(
+        self, now: float, previous_expire_time: Optional[float] = None
+    ) -> float:
+        """距下一次刷新的基础间隔：刷新间隔与令牌剩余有效期的一定比例取较小者
+
+        令牌已过期或刷新没有延长有效期时，按重试间隔再刷新，避免连续刷新
+        """
+        lead = self.refresh_interval
+        if self.token_expire_time is not None:
+            remaining = self.token_expire_time - now
+            if remaining <= 0 or (
+                previous_expire_time is not None
+                and self.token_expire_time <= previous_expire_time
+            ):
+                return min(self.refresh_interval, REFRESH_RETRY_DELAY)
+            lead = min(lead, remaining * TOKEN_REFRESH_RATIO)
+        return lead
+
+    def _jittered(self, delay: float) -> float:
+        """按 refresh_jitter 随机提前，避免同时创建的会话同时刷新"""
+        if self.refresh_jitter <= 0:
+            return delay
+        return delay * (1 - random.uniform(0, self.refresh_jitter))
+
+    def needs_refresh(self) -> bool:
+        """是否已到刷新时间"""
+        return time.time() >= self.next_refresh_time
 
     def close_session(self):
         """关闭会话"""
@@ -167,71 +363,72 @@ class SessionManager:
         self.work_session = None
         self.cas_session = None
         self.is_logged_in = False
-        self.stop_refresh.set()
+        self.stop_auto_refresh()
 
-        if self.refresh_thread and self.refresh_thread.is_alive():
-            self.refresh_thread.join(timeout=5)
+    def start_auto_refresh(self, scheduler: Optional[RefreshScheduler] = None):
+        """启动自动刷新
 
-    def start_auto_refresh(self):
-        """启动自动刷新线程"""
-        if self.refresh_thread and self.refresh_thread.is_alive():
-            logger.warning("会话管理器: 自动刷新线程已在运行")
+        Args:
+            scheduler: 刷新调度器，默认使用进程共享的调度器
+        """
+        if self.is_auto_refresh_running():
+            logger.warning("会话管理器: 自动刷新已在运行")
             return
 
-        self.stop_refresh.clear()
-        self.refresh_thread = threading.Thread(
-            target=self._refresh_worker, daemon=True, name="SessionRefreshThread"
+        self.refresh_scheduler = (
+            scheduler if scheduler is not None else get_refresh_scheduler()
+        )
+        self.refresh_scheduler.schedule(
+            self, self._next_refresh_deadline(), self._scheduled_refresh
         )
-        self.refresh_thread.start()
-        logger.info("会话管理器: 自动刷新线程已启动")
+        logger.info("会话管理器: 自动刷新已启动")
 
     def stop_auto_refresh(self):
-        """停止自动刷新线程"""
-        self.stop_refresh.set()
-        if self.refresh_thread and self.refresh_thread.is_alive():
-            self.refresh_thread.join(timeout=5)
-            logger.info("会话管理器: 自动刷新线程已停止")
+        """停止自动刷新"""
+        if self.refresh_scheduler is not None:
+            self.refresh_scheduler.cancel(self)
+            self.refresh_scheduler = None
+            logger.info("会话管理器: 自动刷新已停止")
+
+    def is_auto_refresh_running(self) -> bool:
+        """自动刷新是否在运行"""
+        scheduler = self.refresh_scheduler
+        return scheduler is not None and scheduler.is_scheduled(self)
+
+    def _next_refresh_deadline(self) -> float:
+        """计算下一次刷新检查时间：刷新间隔或会话超时，取先到者"""
+        if not self.is_logged_in:
+            return time.time() + self._retry_delay()
+        return min(
+            self.next_refresh_time,
+            self.last_activity_time + self.session_timeout,
+        )
 
-    def _refresh_worker(self):
-        """刷新工作线程"""
-        logger.debug("会话管理器: 刷新工作线程启动")
+    def _retry_delay(self) -> float:
+        return self._jittered(min(self.refresh_interval, REFRESH_RETRY_DELAY))
 
-        while not self.stop_refresh.is_set():
-            try:
-                # 检查是否需要刷新
-                current_time = time.time()
-                time_since_refresh = current_time - self.last_refresh_time
-                time_since_activity = current_time - self.last_activity_time
-
-                # 如果超过刷新间隔，刷新会话
-                if time_since_refresh >= self.refresh_interval:
-                    logger.debug(
-                        f"会话管理器: 达到刷新间隔({self.refresh_interval}s)，刷新会话"
-                    )
-                    self.refresh_session()
-
-                # 如果超过会话超时时间，重新登录
-                elif time_since_activity >= self.session_timeout:
-                    logger.warning(
-                        f"会话管理器: 会话超时({self.session_timeout}s)，重新登录"
-                    )
-                    self.reconnect()
-
-                # 使用更短的睡眠时间，并检查停止信号
-                for _ in range(60):  # 将60秒分解为60个1秒的检查
-                    if self.stop_refresh.is_set():
-                        break
-                    time.sleep(1)
-
-            except Exception as e:
-                logger.error(f"会话管理器: 刷新工作线程异常 - {e}")
-                # 异常时也使用短睡眠
-                for _ in range(60):
-                    if self.stop_refresh.is_set():
-                        break
-                    time.sleep(1)
+    def _scheduled_refresh(self) -> Optional[float]:
+        """调度器到期回调：按需刷新或重新登录，返回下一次检查时间"""
+        current_time = time.time()
+        time_since_activity = current_time - self.last_activity_time
 
-        logger.debug("会话管理器: 刷新工作线程退出")
+        if not self.is_logged_in:
+            logger.warning("会话管理器: 会话未登录，尝试重新登录")
+            success = self.reconnect()
+        elif self.needs_refresh():
+            # 到达刷新时间（刷新间隔或令牌即将过期），刷新会话
+            logger.debug("会话管理器: 到达刷新时间，刷新会话")
+            success = self.refresh_session()
+        elif time_since_activity >= self.session_timeout:
+            # 如果超过会话超时时间，重新登录
+            logger.warning(f"会话管理器: 会话超时({self.session_timeout}s)，重新登录")
+            success = self.reconnect()
+        else:
+            success = True
+
+        if not success:
+            return time.time() + self._retry_delay()
+        return self._next_refresh_deadline()
 
     def update_activity(self):
         """更新活动时间"""
@@ -293,6 +490,7 @@ def init_global_session_manager(
     password: str,
     refresh_interval: int = 540,  # 9分钟（服务器要求不超过10分钟）
     session_timeout: int = 1800,
+    token_store=None,
 ) -> SessionManager:
     """初始化全局会话管理器
 
@@ -303,6 +501,7 @@ def init_global_session_manager(
         password: 密码
         refresh_interval: 刷新间隔（秒）
         session_timeout: 会话超时时间（秒）
+        token_store: 令牌缓存
 
     Returns:
         初始化的会话管理器
@@ -313,7 +512,13 @@ def init_global_session_manager(
         _global_session_manager.close_session()
 
     _global_session_manager = SessionManager(
-        server_url, namespace, username, password, refresh_interval, session_timeout
+        server_url,
+        namespace,
+        username,
+        password,
+        refresh_interval,
+        session_timeout,
+        token_store=token_store,
     )
 
     return _global_session_manager
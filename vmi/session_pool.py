@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+会话池 - 启动时并行登录一组会话，由工作线程借出/归还
+
+并发测试中每个请求都新建会话管理器会把 CAS 登录计入操作响应时间。会话池在测试
+开始前并行完成登录（登录耗时单独统计），工作线程只借用已登录的会话；池中所有
+会话由进程共享的 RefreshScheduler 统一刷新，不为每个会话创建线程。
+
+使用示例：
+    with SessionPool(server_url, namespace, username, password, size=10) as pool:
+        with pool.session() as session_mgr:
+            sdk = StoreSDK(session_mgr.get_session())
+"""
+
+import concurrent.futures
+import itertools
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from refresh_scheduler import RefreshScheduler
+from session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """预先登录的会话池"""
+
+    def __init__(
+        self,
+        server_url: str,
+        namespace: str,
+        username: str,
+        password: str,
+        size: int,
+        refresh_interval: int = 540,
+        session_timeout: int = 1800,
+        login_workers: Optional[int] = None,
+        login_timeout: float = 30,
+        scheduler: Optional[RefreshScheduler] = None,
+    ):
+        """初始化会话池
+
+        Args:
+            server_url: 服务器URL
+            namespace: 命名空间
+            username: 用户名
+            password: 密码
+            size: 会话数量
+            refresh_interval: 刷新间隔（秒）
+            session_timeout: 会话超时时间（秒）
+            login_workers: 并行登录的线程数，默认与会话数量相同（最多 32）
+            login_timeout: 启动时等待全部登录完成的最长时间（秒）
+            scheduler: 刷新调度器，默认使用进程共享的调度器
+        """
+        self.server_url = server_url
+        self.namespace = namespace
+        self.username = username
+        self.password = password
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.session_timeout = session_timeout
+        self.login_workers = login_workers or min(size, 32)
+        self.login_timeout = login_timeout
+        self.scheduler = scheduler
+
+        self._available: "queue.Queue[SessionManager]" = queue.Queue()
+        self._managers: List[SessionManager] = []
+        self._lock = threading.Lock()
+        # 每个会话使用独立的单飞范围，同一身份的会话可以并行登录
+        self._manager_ids = itertools.count()
+        self._started = False
+        self._closed = False
+        # 已关闭会话的登录/刷新次数
+        self._closed_auth_stats = {"logins": 0, "refreshes": 0, "joined": 0}
+
+        self.stats: Dict[str, Any] = {
+            "size": size,
+            "ready": 0,
+            "login_failures": 0,
+            "startup_time": 0.0,
+            "login_times": [],
+            "checkouts": 0,
+            "checkout_wait_time": 0.0,
+            "checkout_timeouts": 0,
+            "reconnects": 0,
+            "late_logins": 0,
+            "retired": 0,
+        }
+
+    def start(self) -> int:
+        """并行登录全部会话并启动自动刷新
+
+        Returns:
+            登录成功的会话数量
+        """
+        with self._lock:
+            if self._started:
+                return self.stats["ready"]
+            self._started = True
+
+        start_time = time.time()
+        managers = [self._new_manager() for _ in range(self.size)]
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.login_workers, thread_name_prefix="SessionPoolLogin"
+        )
+        try:
+            futures = {
+                executor.submit(self._login, manager): manager for manager in managers
+            }
+            done, not_done = concurrent.futures.wait(
+                futures, timeout=self.login_timeout
+            )
+            for future in not_done:
+                # 已开始的登录无法取消，完成后立即关闭其会话，不放入会话池
+                if not future.cancel():
+                    future.add_done_callback(
+                        lambda _, manager=futures[future]: self._discard_late(manager)
+                    )
+        finally:
+            # 不等待超时未完成的登录
+            executor.shutdown(wait=False)
+
+        with self._lock:
+            self._managers = managers
+            for future, manager in futures.items():
+                if future in done and future.result() is not None:
+                    self.stats["login_times"].append(future.result())
+                    manager.start_auto_refresh(self.scheduler)
+                    self._available.put(manager)
+                    self.stats["ready"] += 1
+                else:
+                    self.stats["login_failures"] += 1
+            self.stats["startup_time"] = time.time() - start_time
+
+        logger.info(
+            f"会话池: {self.stats['ready']}/{self.size} 个会话登录成功，"
+            f"耗时 {self.stats['startup_time']:.2f}秒"
+        )
+        return self.stats["ready"]
+
+    def checkout(self, timeout: Optional[float] = None) -> Optional[SessionManager]:
+        """借出一个会话
+
+        Args:
+            timeout: 等待空闲会话的最长时间（秒），None 表示一直等待
+
+        Returns:
+            会话管理器，会话池为空或等待超时返回 None；
+            已失效且重新登录失败的会话从池中移除，改借其他会话
+        """
+        if not self._started:
+            self.start()
+
+        wait_start = time.time()
+        deadline = None if timeout is None else wait_start + timeout
+        while True:
+            if self.stats["ready"] == 0:
+                logger.error("会话池: 没有可用的会话")
+                return None
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            try:
+                manager = self._available.get(timeout=remaining)
+            except queue.Empty:
+                with self._lock:
+                    self.stats["checkout_timeouts"] += 1
+                logger.warning(f"会话池: 等待空闲会话超时({timeout}秒)")
+                return None
+            if manager is None:
+                # 最后一个会话已移除，唤醒其他等待的线程
+                self._available.put(None)
+                continue
+
+            if not manager.is_session_valid():
+                # 会话超时或自动刷新失败，借出前先重新登录，不计入操作耗时
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                if not manager.reconnect():
+                    self._retire(manager)
+                    continue
+
+            with self._lock:
+                self.stats["checkouts"] += 1
+                self.stats["checkout_wait_time"] += time.time() - wait_start
+            return manager
+
+    def checkin(self, manager: SessionManager):
+        """归还会话"""
+        if self._closed:
+            return
+        self._available.put(manager)
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None) -> Iterator[SessionManager]:
+        """借出会话的上下文管理器，退出时自动归还
+
+        Raises:
+            RuntimeError: 无法借出会话
+        """
+        manager = self.checkout(timeout)
+        if manager is None:
+            raise RuntimeError("无法从会话池获取会话")
+        try:
+            yield manager
+        finally:
+            self.checkin(manager)
+
+    def close(self):
+        """停止自动刷新并关闭全部会话"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            managers = list(self._managers)
+            self._managers.clear()
+            for manager in managers:
+                for key in self._closed_auth_stats:
+                    self._closed_auth_stats[key] += manager.auth_stats[key]
+
+        for manager in managers:
+            try:
+                manager.stop_auto_refresh()
+                manager.close_session()
+            except Exception as e:
+                logger.error(f"会话池: 关闭会话失败 - {e}")
+        logger.info(f"会话池: 已关闭 {len(managers)} 个会话")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取会话池统计（登录耗时与操作耗时分开统计）"""
+        with self._lock:
+            login_times = self.stats["login_times"]
+            stats = {k: v for k, v in self.stats.items() if k != "login_times"}
+            stats["avg_login_time"] = (
+                sum(login_times) / len(login_times) if login_times else 0
+            )
+            stats["max_login_time"] = max(login_times) if login_times else 0
+            stats["available"] = self._available.qsize()
+        return stats
+
+    def get_auth_stats(self) -> Dict[str, int]:
+        """全部会话（含已关闭的）登录、刷新和复用进行中认证结果的次数之和"""
+        with self._lock:
+            managers = list(self._managers)
+            totals = dict(self._closed_auth_stats)
+        for manager in managers:
+            for key in totals:
+                totals[key] += manager.auth_stats[key]
+        return totals
+
+    def __enter__(self) -> "SessionPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _retire(self, manager: SessionManager):
+        """移除重新登录失败的会话"""
+        with self._lock:
+            if manager in self._managers:
+                self._managers.remove(manager)
+                for key in self._closed_auth_stats:
+                    self._closed_auth_stats[key] += manager.auth_stats[key]
+            self.stats["ready"] -= 1
+            self.stats["retired"] += 1
+            ready = self.stats["ready"]
+        manager.close_session()
+        logger.warning(f"会话池: 会话重新登录失败，已移除，剩余 {ready} 个会话")
+        if ready == 0:
+            self._available.put(None)
+
+    def _discard_late(self, manager: SessionManager):
+        """关闭启动超时后才完成登录的会话"""
+        manager.close_session()
+        with self._lock:
+            self.stats["late_logins"] += 1
+        logger.info("会话池: 关闭启动超时后才完成登录的会话")
+
+    def _new_manager(self) -> SessionManager:
+        return SessionManager(
+            server_url=self.server_url,
+            namespace=self.namespace,
+            username=self.username,
+            password=self.password,
+            refresh_interval=self.refresh_interval,
+            session_timeout=self.session_timeout,
+            auth_scope=f"pool-{id(self)}-{next(self._manager_ids)}",
+        )
+
+    @staticmethod
+    def _login(manager: SessionManager) -> Optional[float]:
+        """登录单个会话，返回登录耗时，失败返回 None"""
+        start_time = time.time()
+        if not manager.create_session():
+            return None
+        return time.time() - start_time
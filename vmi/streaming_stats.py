@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+常量内存的流式统计 - 长时间运行时统计的内存和计算量不随运行时长增长
+
+- RunningStats：次数、总和、最小值、最大值、均值和方差（Welford 算法）
+- RollingWindow：最近 N 个值的环形缓冲区，维护窗口总和，均值 O(1)
+- DecayedRate：指数衰减的事件速率（次/秒），近期事件权重高，反映当前速率而不是
+  全程平均速率
+
+分位数使用 latency_histogram.LatencyHistogram（HDR 直方图，内存只与精度有关）。
+以上类不加锁，由调用方保证单线程使用（如每个工作线程一个）；DecayedRate 的 rate()
+不修改状态，可以在其他线程（统计、指标线程）中调用。RunningStats 和 RollingWindow
+可以保存为检查点（checkpoint）并恢复（restore）。
+"""
+
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+class RunningStats:
+    """次数、总和、最小值、最大值、均值和方差"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """样本标准差，少于 2 个值时为 0"""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "stdev": self.stdev,
+        }
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """可以 JSON 序列化的完整状态"""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self._mean,
+            "m2": self._m2,
+        }
+
+    def restore(self, data: Dict[str, Any]) -> "RunningStats":
+        """从 checkpoint 的结果恢复，返回自身"""
+        self.count = data["count"]
+        self.total = data["total"]
+        self.min = data["min"]
+        self.max = data["max"]
+        self._mean = data["mean"]
+        self._m2 = data["m2"]
+        return self
+
+
+class RollingWindow:
+    """最近 size 个值的环形缓冲区"""
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("size 必须大于 0")
+        self.size = size
+        self._values: Deque[float] = deque(maxlen=size)
+        self._total = 0.0
+        self._added = 0
+
+    def add(self, value: float):
+        if len(self._values) == self.size:
+            self._total -= self._values[0]
+        self._values.append(value)
+        self._total += value
+        self._added += 1
+        # 定期重新求和，避免浮点误差随加减次数累积
+        if self._added % self.size == 0:
+            self._total = math.fsum(self._values)
+
+    @property
+    def mean(self) -> float:
+        return self._total / len(self._values) if self._values else 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self.size
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def checkpoint(self) -> List[float]:
+        return list(self._values)
+
+    def restore(self, values: List[float]) -> "RollingWindow":
+        """从 checkpoint 的结果恢复（只保留最后 size 个值），返回自身"""
+        self._values.clear()
+        self._total = 0.0
+        for value in values:
+            self.add(value)
+        return self
+
+
+class DecayedRate:
+    """指数衰减的事件速率：half_life 秒前的事件权重减半
+
+    mark() 由单个线程调用；(衰减值, 更新时间) 作为一个元组整体替换，rate() 只读取
+    该元组并在本地计算衰减，不写回，其他线程读取时不会重复衰减或丢失记录。
+    """
+
+    def __init__(self, half_life: float = 60.0, clock=time.monotonic):
+        if half_life <= 0:
+            raise ValueError("half_life 必须大于 0")
+        self.half_life = half_life
+        self._tau = half_life / math.log(2)
+        self._clock = clock
+        self._start = clock()
+        self._state = (0.0, self._start)
+
+    def _decayed(self, now: float) -> float:
+        value, updated = self._state
+        elapsed = now - updated
+        return value * math.exp(-elapsed / self._tau) if elapsed > 0 else value
+
+    def mark(self, count: float = 1.0):
+        """记录 count 次事件"""
+        now = self._clock()
+        self._state = (self._decayed(now) + count, max(now, self._state[1]))
+
+    def rate(self) -> float:
+        """当前速率（次/秒）
+
+        运行时间不足时按已运行时间修正，避免刚开始时速率偏低。
+        """
+        now = self._clock()
+        weight = 1.0 - math.exp(-(now - self._start) / self._tau)
+        return self._decayed(now) / (self._tau * weight) if weight > 0 else 0.0
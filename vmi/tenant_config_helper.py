@@ -24,6 +24,8 @@ def get_multi_tenant_config() -> Dict[str, Any]:
     {
         "enabled": False,  # 多租户是否启用
         "default_tenant": "autotest",  # 默认租户ID
+        "init_concurrency": 8,  # 并行登录的租户数量上限
+        "init_timeout": 30,  # 单个租户登录超时（秒）
         "tenants": {  # 租户配置字典
             "autotest": {
                 "server_url": "https://autotest.local.vpc",
@@ -44,6 +46,8 @@ def get_multi_tenant_config() -> Dict[str, Any]:
     multi_tenant_config = {
         "enabled": False,  # 默认禁用多租户
         "default_tenant": "autotest",
+        "init_concurrency": 8,
+        "init_timeout": 30,
         "tenants": {},
     }
 
@@ -70,6 +74,8 @@ def get_multi_tenant_config() -> Dict[str, Any]:
         multi_tenant_config["default_tenant"] = mt_config.get(
             "default_tenant", "autotest"
         )
+        multi_tenant_config["init_concurrency"] = mt_config.get("init_concurrency", 8)
+        multi_tenant_config["init_timeout"] = mt_config.get("init_timeout", 30)
 
         # 添加所有租户配置
         for tenant in mt_config.get("tenants", []):
@@ -190,6 +196,8 @@ def create_multi_tenant_config_template() -> Dict[str, Any]:
         "multi_tenant": {
             "enabled": False,  # 设置为True启用多租户
             "default_tenant": "autotest",
+            "init_concurrency": 8,  # 并行登录的租户数量上限
+            "init_timeout": 30,  # 单个租户登录超时（秒）
             "tenants": [
                 {
                     "id": "autotest",
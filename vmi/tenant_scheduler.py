@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+多租户公平调度器 - 按租户分队列、分配额并发执行工作负载
+
+每个租户有独立的任务队列和并发配额，工作线程按轮询（round_robin）或加权公平
+（weighted_fair）策略从各租户队列取任务，所有租户同时施压：
+- round_robin：依次轮流从有任务且未达到配额的租户取任务
+- weighted_fair：按 "已占用服务时间 / 权重" 最小的租户优先，权重高的租户获得
+  更多执行时间；一个租户的慢请求不会挤占其他租户的份额（派发时按该租户平均
+  执行时间预扣，完成后按实际执行时间修正）
+
+调度器统计每个租户的排队时间、执行时间和吞吐量，用于衡量租户间的相互影响
+（noisy neighbor）以及跨命名空间的平台总吞吐量。
+
+使用示例：
+    scheduler = TenantScheduler(multi_tenant_mgr, max_workers=16)
+    results = scheduler.run_for_all_tenants(create_partner)
+    scheduler.shutdown()
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+WEIGHTED_FAIR = "weighted_fair"
+
+# 每个租户保留的最近耗时样本数（平均值和最大值按全部任务累计）
+SAMPLE_WINDOW = 1000
+
+
+class _TenantQueue:
+    """单个租户的任务队列、配额和统计"""
+
+    def __init__(self, tenant_id: str, concurrency: int, weight: float):
+        self.tenant_id = tenant_id
+        self.concurrency = concurrency
+        self.weight = weight
+        self.tasks: Deque[tuple] = deque()
+        self.running = 0
+        # 加权公平调度的虚拟时间：累计服务时间 / 权重
+        self.virtual_time = 0.0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_wait_times: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.service_times: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_service_time = 0.0
+        self.max_service_time = 0.0
+        self.first_start: Optional[float] = None
+        self.last_finish: Optional[float] = None
+
+    def record_wait(self, wait: float):
+        self.queue_wait_times.append(wait)
+        self.total_queue_wait += wait
+        self.max_queue_wait = max(self.max_queue_wait, wait)
+
+    def record_service(self, service_time: float):
+        self.service_times.append(service_time)
+        self.total_service_time += service_time
+        self.max_service_time = max(self.max_service_time, service_time)
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.failed + self.running
+        finished = self.completed + self.failed
+        active = (
+            self.last_finish - self.first_start
+            if self.first_start is not None and self.last_finish is not None
+            else 0
+        )
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": len(self.tasks),
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "weight": self.weight,
+            "avg_queue_wait": self.total_queue_wait / started if started else 0,
+            "max_queue_wait": self.max_queue_wait,
+            "avg_service_time": (
+                self.total_service_time / finished if finished else 0
+            ),
+            "max_service_time": self.max_service_time,
+            "service_times": list(self.service_times),
+            "throughput": self.completed / active if active > 0 else 0,
+        }
+
+
+class TenantScheduler:
+    """按租户分片的公平工作调度器"""
+
+    def __init__(
+        self,
+        multi_tenant_mgr=None,
+        max_workers: int = 16,
+        per_tenant_concurrency: int = 4,
+        policy: str = WEIGHTED_FAIR,
+        weights: Optional[Dict[str, float]] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+    ):
+        """初始化调度器
+
+        Args:
+            multi_tenant_mgr: 多租户会话管理器，设置后执行任务前确保租户会话有效
+            max_workers: 工作线程总数
+            per_tenant_concurrency: 每个租户默认的并发配额
+            policy: 调度策略，round_robin 或 weighted_fair
+            weights: 租户权重（weighted_fair 使用），默认 1
+            concurrency: 单独指定部分租户的并发配额
+        """
+        if policy not in (ROUND_ROBIN, WEIGHTED_FAIR):
+            raise ValueError(f"未知的调度策略: {policy}")
+
+        self.multi_tenant_mgr = multi_tenant_mgr
+        self.max_workers = max_workers
+        self.per_tenant_concurrency = per_tenant_concurrency
+        self.policy = policy
+        self.weights = dict(weights or {})
+        self.concurrency = dict(concurrency or {})
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, _TenantQueue] = {}
+        self._order: List[str] = []
+        self._cursor = 0
+        self._workers: List[threading.Thread] = []
+        self._stopped = False
+        self._start_time: Optional[float] = None
+
+    # ---- 提交任务 ----
+
+    def submit(self, tenant_id: str, func: Callable, *args, **kwargs) -> Future:
+        """提交租户任务
+
+        Args:
+            tenant_id: 租户ID
+            func: 任务函数，调用方式为 func(tenant_id, *args, **kwargs)
+
+        Returns:
+            任务 Future
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("租户调度器已关闭")
+            queue = self._get_queue(tenant_id)
+            if not queue.tasks and queue.running == 0:
+                # 重新活跃的租户从当前最小虚拟时间开始，不能攒下份额后突发占用
+                queue.virtual_time = max(queue.virtual_time, self._min_virtual_time())
+            queue.tasks.append((future, func, args, kwargs, time.time()))
+            queue.submitted += 1
+            if self._start_time is None:
+                self._start_time = time.time()
+            self._ensure_workers()
+            self._cond.notify()
+        return future
+
+    def run_for_all_tenants(
+        self,
+        func: Callable,
+        *args,
+        tenant_ids: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Dict[str, Dict[str, Any]]:
+        """对所有租户同时执行 func(tenant_id, *args, **kwargs)
+
+        Args:
+            tenant_ids: 租户ID列表，默认使用多租户管理器中所有启用的租户
+            timeout: 等待全部完成的超时时间（秒）
+
+        Returns:
+            租户ID -> {"status": "passed", "result": ...}
+                或 {"status": "failed", "error": ...}
+        """
+        if tenant_ids is None:
+            tenant_ids = self._default_tenant_ids()
+
+        futures = {tid: self.submit(tid, func, *args, **kwargs) for tid in tenant_ids}
+        deadline = time.time() + timeout if timeout is not None else None
+
+        results = {}
+        for tenant_id, future in futures.items():
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            try:
+                results[tenant_id] = {
+                    "status": "passed",
+                    "result": future.result(timeout=remaining),
+                }
+            except Exception as e:
+                results[tenant_id] = {"status": "failed", "error": str(e) or repr(e)}
+                logger.error(f"租户 '{tenant_id}' 任务失败: {e}")
+        return results
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已提交的任务完成
+
+        Returns:
+            是否在超时前全部完成
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._cond:
+            while any(q.tasks or q.running for q in self._queues.values()):
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, wait: bool = True):
+        """关闭调度器，未开始的任务被取消"""
+        with self._cond:
+            self._stopped = True
+            for queue in self._queues.values():
+                while queue.tasks:
+                    queue.tasks.popleft()[0].cancel()
+            self._cond.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join(5)
+
+    # ---- 统计 ----
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各租户和平台整体统计"""
+        with self._cond:
+            tenants = {tid: q.stats() for tid, q in self._queues.items()}
+            completed = sum(q.completed for q in self._queues.values())
+            failed = sum(q.failed for q in self._queues.values())
+            last_finish = max(
+                (q.last_finish for q in self._queues.values() if q.last_finish),
+                default=None,
+            )
+            elapsed = (
+                last_finish - self._start_time
+                if last_finish is not None and self._start_time is not None
+                else 0
+            )
+        return {
+            "policy": self.policy,
+            "tenants": tenants,
+            "total_completed": completed,
+            "total_failed": failed,
+            "elapsed": elapsed,
+            "throughput": completed / elapsed if elapsed > 0 else 0,
+        }
+
+    # ---- 内部实现 ----
+
+    def _default_tenant_ids(self) -> List[str]:
+        if self.multi_tenant_mgr is not None:
+            return self.multi_tenant_mgr.get_enabled_tenant_ids()
+        with self._cond:
+            return list(self._order)
+
+    def _get_queue(self, tenant_id: str) -> _TenantQueue:
+        """获取租户队列，不存在时创建（调用方持有锁）"""
+        queue = self._queues.get(tenant_id)
+        if queue is None:
+            queue = _TenantQueue(
+                tenant_id,
+                self.concurrency.get(tenant_id, self.per_tenant_concurrency),
+                self.weights.get(tenant_id, 1.0),
+            )
+            self._queues[tenant_id] = queue
+            self._order.append(tenant_id)
+        return queue
+
+    def _min_virtual_time(self) -> float:
+        active = [
+            q.virtual_time for q in self._queues.values() if q.tasks or q.running
+        ]
+        return min(active) if active else 0.0
+
+    def _ensure_workers(self):
+        """首次提交任务时启动工作线程（调用方持有锁）"""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker,
+                name=f"TenantScheduler-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _eligible(self) -> List[_TenantQueue]:
+        return [
+            self._queues[tid]
+            for tid in self._order
+            if self._queues[tid].tasks
+            and self._queues[tid].running < self._queues[tid].concurrency
+        ]
+
+    def _next_queue(self) -> Optional[_TenantQueue]:
+        """按调度策略选择下一个租户（调用方持有锁）"""
+        eligible = self._eligible()
+        if not eligible:
+            return None
+        if self.policy == WEIGHTED_FAIR:
+            return min(eligible, key=lambda q: q.virtual_time)
+
+        count = len(self._order)
+        for offset in range(count):
+            tenant_id = self._order[(self._cursor + offset) % count]
+            queue = self._queues[tenant_id]
+            if queue in eligible:
+                self._cursor = (self._cursor + offset + 1) % count
+                return queue
+        return None
+
+    def _estimate_service_time(self, queue: _TenantQueue) -> float:
+        """预估任务执行时间：租户平均值，没有记录时用所有租户的平均值"""
+        queues = [queue] if queue.service_times else self._queues.values()
+        recent = [t for q in queues for t in islice(reversed(q.service_times), 100)]
+        return sum(recent) / len(recent) if recent else 0.001
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                queue = self._next_queue()
+                while queue is None:
+                    if self._stopped:
+                        return
+                    self._cond.wait()
+                    queue = self._next_queue()
+                future, func, args, kwargs, submitted_at = queue.tasks.popleft()
+                queue.running += 1
+                estimate = self._estimate_service_time(queue)
+                queue.virtual_time += estimate / queue.weight
+                started_at = time.time()
+                queue.record_wait(started_at - submitted_at)
+                if queue.first_start is None:
+                    queue.first_start = started_at
+
+            success = self._execute(queue.tenant_id, future, func, args, kwargs)
+
+            with self._cond:
+                finished_at = time.time()
+                service_time = finished_at - started_at
+                queue.running -= 1
+                queue.record_service(service_time)
+                queue.virtual_time += (service_time - estimate) / queue.weight
+                queue.last_finish = finished_at
+                if success:
+                    queue.completed += 1
+                else:
+                    queue.failed += 1
+                self._cond.notify_all()
+
+    def _execute(self, tenant_id, future, func, args, kwargs) -> bool:
+        if not future.set_running_or_notify_cancel():
+            return False
+        try:
+            if self.multi_tenant_mgr is not None:
+                # 只检查会话，不持有租户锁执行任务，同一租户的任务可以并发
+                if not self.multi_tenant_mgr.ensure_session_valid(tenant_id):
+                    raise RuntimeError(f"租户 '{tenant_id}' 会话无效且无法恢复")
+            result = func(tenant_id, *args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            return False
+        future.set_result(result)
+        return True
@@ -38,6 +38,7 @@ class TestBaseMultiTenant(TestBaseWithSessionManager):
     multi_tenant_enabled = False
     multi_tenant_manager = None
     sdk_factory = None
+    tenant_scheduler = None
 
     # 当前测试的租户上下文
     current_tenant_id = "autotest"
@@ -137,6 +138,10 @@ class TestBaseMultiTenant(TestBaseWithSessionManager):
     @classmethod
     def tearDownClass(cls):
         """测试类清理"""
+        if cls.tenant_scheduler is not None:
+            cls.tenant_scheduler.shutdown()
+            cls.tenant_scheduler = None
+
         if cls.multi_tenant_enabled and cls.multi_tenant_manager:
             logger.info("多租户测试基类: 清理多租户管理器")
             from multi_tenant_manager import \
@@ -321,6 +326,41 @@ class TestBaseMultiTenant(TestBaseWithSessionManager):
 
         return results
 
+    def get_tenant_scheduler(self, **kwargs):
+        """获取（首次调用时创建）本测试类共享的多租户公平调度器
+
+        Args:
+            **kwargs: 传给 TenantScheduler 的参数（max_workers、policy、weights 等），
+                只在首次创建时生效
+        """
+        cls = type(self)
+        if cls.tenant_scheduler is None:
+            from tenant_scheduler import TenantScheduler
+
+            cls.tenant_scheduler = TenantScheduler(self.multi_tenant_manager, **kwargs)
+        return cls.tenant_scheduler
+
+    def run_for_all_tenants_concurrently(
+        self, test_func: Callable, *args, **kwargs
+    ) -> Dict[str, Any]:
+        """同时为所有启用的租户运行测试函数
+
+        与 run_for_all_tenants 不同，各租户并发执行且不切换 current_tenant_id，
+        test_func 应通过 tenant_id 参数获取对应租户的 SDK（get_sdk_for_tenant）。
+
+        Args:
+            test_func: 测试函数，第一个参数是tenant_id
+            *args, **kwargs: 测试函数的其他参数（tenant_ids、timeout 由调度器使用）
+
+        Returns:
+            字典：租户ID -> 测试结果
+        """
+        if not self.multi_tenant_enabled:
+            return self.run_for_all_tenants(test_func, *args, **kwargs)
+        return self.get_tenant_scheduler().run_for_all_tenants(
+            test_func, *args, **kwargs
+        )
+
     def execute_with_tenant_session_check(
         self, tenant_id: str, operation_func: Callable, *args, **kwargs
     ) -> Any:
@@ -415,6 +455,50 @@ class TestBaseMultiTenant(TestBaseWithSessionManager):
                 f"租户 '{tenant2_id}' 访问租户 '{tenant1_id}' 的数据失败，符合隔离性预期: {e}"
             )
 
+    def assert_performance_isolation(
+        self,
+        aggressor_id: str,
+        victim_ids: List[str],
+        operation_func: Optional[Callable] = None,
+        max_degradation_pct: float = 20.0,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """断言租户性能隔离性
+
+        逐级提高施压租户的请求速率，验证受害租户的 p99 延迟劣化不超过阈值。
+
+        Args:
+            aggressor_id: 施压租户ID
+            victim_ids: 受害租户ID列表
+            operation_func: 操作函数，接受tenant_id参数，默认统计会员数量
+            max_degradation_pct: p99 延迟劣化上限（百分比）
+            **kwargs: 传给 NoisyNeighborBenchmark 的其他参数（aggressor_rates 等）
+
+        Returns:
+            基准测试报告（包含每个受害租户的劣化曲线）
+
+        Raises:
+            AssertionError: 如果受害租户的延迟劣化超过阈值
+        """
+        if not self.multi_tenant_enabled:
+            self.skipTest("多租户功能未启用，跳过性能隔离性测试")
+
+        from noisy_neighbor_benchmark import NoisyNeighborBenchmark, format_curves
+
+        report = NoisyNeighborBenchmark(
+            aggressor=aggressor_id,
+            victims=victim_ids,
+            operation=operation_func,
+            multi_tenant_mgr=self.multi_tenant_manager,
+            degradation_threshold=max_degradation_pct,
+            **kwargs,
+        ).run()
+        self.assertTrue(
+            report["isolation"]["isolated"],
+            f"性能隔离性验证失败:\n{format_curves(report)}",
+        )
+        return report
+
     # ==================== 向后兼容的包装方法 ====================
 
     def ensure_session_before_operation(self) -> bool:
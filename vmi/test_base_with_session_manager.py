@@ -140,6 +140,7 @@ class TestBaseWithSessionManager(unittest.TestCase):
         """测试类初始化 - 使用会话管理器"""
         from config_helper import get_credentials, get_server_url
         from session_manager import init_global_session_manager
+        from token_store import default_token_store
 
         cls.server_url = get_server_url()
         cls.credentials = get_credentials()
@@ -153,6 +154,7 @@ class TestBaseWithSessionManager(unittest.TestCase):
             password=cls.credentials["password"],
             refresh_interval=540,
             session_timeout=1800,
+            token_store=default_token_store(),
         )
 
         if not cls.session_manager.create_session():
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+容量分析测试
+验证拐点判定和按负载曲线逐级施压的容量测试，使用本地测试服务器
+"""
+
+import json
+import threading
+import time
+import unittest
+
+from capacity_analyzer import (find_saturation_point, format_capacity,
+                               measure_capacity)
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+
+
+def point(offered, throughput, p99, error_rate=0.0):
+    return {
+        "test_name": f"step_{offered}",
+        "offered_rate": offered,
+        "throughput": throughput,
+        "p50": p99 / 2,
+        "p99": p99,
+        "error_rate": error_rate,
+        "total_requests": 100,
+    }
+
+
+class TestFindSaturationPoint(unittest.TestCase):
+    """拐点判定测试"""
+
+    def test_knee_where_throughput_flattens(self):
+        analysis = find_saturation_point(
+            [
+                point(10, 10, 0.020),
+                point(20, 19.8, 0.021),
+                point(30, 29.5, 0.025),
+                point(40, 33.0, 0.060),
+                point(50, 33.5, 0.900),
+            ]
+        )
+        self.assertTrue(analysis["saturated"])
+        self.assertEqual(analysis["knee"]["offered_rate"], 40)
+        self.assertAlmostEqual(analysis["max_sustainable_rps"], 29.5)
+        self.assertEqual(
+            [step["healthy"] for step in analysis["steps"]],
+            [True, True, True, False, False],
+        )
+        self.assertIn("超过拐点", analysis["steps"][-1]["reasons"])
+
+    def test_latency_and_errors(self):
+        analysis = find_saturation_point(
+            [point(10, 10, 0.1), point(20, 20, 0.5), point(30, 30, 0.1)]
+        )
+        self.assertEqual(analysis["knee"]["offered_rate"], 20)
+        self.assertIn("p99", analysis["knee"]["reasons"][0])
+
+        analysis = find_saturation_point(
+            [point(10, 10, 0.1), point(20, 20, 0.1, error_rate=0.05)]
+        )
+        self.assertEqual(analysis["knee"]["offered_rate"], 20)
+        self.assertEqual(analysis["max_sustainable_rps"], 10)
+
+    def test_not_saturated(self):
+        analysis = find_saturation_point(
+            [point(rate, rate, 0.01) for rate in (30, 10, 20)]
+        )
+        self.assertFalse(analysis["saturated"])
+        self.assertIsNone(analysis["knee"])
+        self.assertEqual(analysis["max_sustainable_rps"], 30)
+        self.assertEqual([s["offered_rate"] for s in analysis["steps"]], [10, 20, 30])
+
+    def test_empty(self):
+        self.assertEqual(find_saturation_point([])["max_sustainable_rps"], 0.0)
+
+
+class TestMeasureCapacity(unittest.TestCase):
+    """按负载曲线测量容量测试"""
+
+    def test_detects_service_capacity(self):
+        """服务串行处理、每次 10ms（容量约 100 次/秒），阶梯越过容量后找到拐点"""
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        service = threading.Lock()
+
+        def operation(worker_id, session_manager):
+            with service:
+                time.sleep(0.01)
+
+        steps = [(20, 0.6), (50, 0.6), (200, 0.6)]
+        with LocalTestServer() as server:
+            with SessionPool(server.url, "", "user", "pwd", size=8) as pool:
+                runner = ConcurrentTestRunner(max_workers=8, session_pool=pool)
+                report = measure_capacity(
+                    runner, {"serial": operation}, steps, max_outstanding=1000
+                )
+
+        analysis = report["operations"]["serial"]
+        self.assertTrue(analysis["saturated"])
+        self.assertEqual(analysis["knee"]["offered_rate"], 200)
+        self.assertLess(analysis["knee"]["throughput"], 110)
+        self.assertGreater(analysis["max_sustainable_rps"], 40)
+        self.assertEqual(
+            [r.test_name for r in runner.results],
+            ["capacity_serial_step1", "capacity_serial_step2", "capacity_serial_step3"],
+        )
+        self.assertIn("serial", format_capacity(report))
+        json.dumps(report)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+检查点测试
+验证检查点存储的保存和读取、统计与劣化检测状态的恢复以及老化测试运行器从检查点
+继续运行，不访问服务器
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from checkpoint_store import CheckpointStore
+from degradation_detector import ChangePointDetector
+from streaming_stats import RollingWindow, RunningStats
+
+START = 1_700_000_000.0
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+
+class TestCheckpointStore(CheckpointTestCase):
+    """检查点存储测试"""
+
+    def test_save_and_load(self):
+        store = CheckpointStore(self.path("checkpoint.db"))
+        self.assertFalse(store.has_checkpoint())
+        self.assertIsNone(store.load())
+
+        history = [{"timestamp": "t0", "elapsed_minutes": 0, "metrics": {"a": 1}}]
+        workers = [{"worker_id": 0, "entity_cache": {"partner": ["1"]}}]
+        self.assertTrue(store.save({"elapsed_seconds": 60}, history, workers))
+        history.append({"timestamp": "t1", "elapsed_minutes": 30, "metrics": {"a": 2}})
+        workers = [
+            {"worker_id": 0, "entity_cache": {"partner": ["1", "2"]}},
+            {"worker_id": 1, "entity_cache": {}},
+        ]
+        self.assertTrue(store.save({"elapsed_seconds": 1860}, history, workers))
+        store.close()
+
+        checkpoint = CheckpointStore(self.path("checkpoint.db")).load()
+        self.assertEqual(checkpoint["run"]["elapsed_seconds"], 1860)
+        self.assertIn("checkpointed_at", checkpoint["run"])
+        # 指标历史只追加新增记录，工作线程状态替换为最新
+        self.assertEqual(checkpoint["metrics_history"], history)
+        self.assertEqual(checkpoint["workers"], workers)
+
+    def test_failed_save_keeps_previous_checkpoint(self):
+        store = CheckpointStore(self.path("checkpoint.db"))
+        store.save({"elapsed_seconds": 60}, [], [{"worker_id": 0, "n": 1}])
+        with self.assertLogs("checkpoint_store", "ERROR"):
+            self.assertFalse(
+                store.save({"elapsed_seconds": 120}, [], [{"worker_id": 0, "n": {1j}}])
+            )
+        checkpoint = store.load()
+        self.assertEqual(checkpoint["run"]["elapsed_seconds"], 60)
+        self.assertEqual(checkpoint["workers"], [{"worker_id": 0, "n": 1}])
+
+
+class TestStateRestore(unittest.TestCase):
+    """统计和劣化检测状态恢复测试"""
+
+    def test_statistics(self):
+        stats = RunningStats()
+        window = RollingWindow(5)
+        for value in range(1, 11):
+            stats.add(float(value))
+            window.add(float(value))
+        restored = RunningStats().restore(stats.checkpoint())
+        restored.add(11.0)
+        stats.add(11.0)
+        self.assertEqual(restored.to_dict(), stats.to_dict())
+        restored_window = RollingWindow(3).restore(window.checkpoint())
+        self.assertEqual(list(restored_window), [8.0, 9.0, 10.0])
+        self.assertAlmostEqual(restored_window.mean, 9.0)
+
+    def test_detector_continues_after_restore(self):
+        rng = random.Random(1)
+        durations = [
+            rng.lognormvariate(0, 0.2) * (0.1 if i < 500 else 0.2) for i in range(1000)
+        ]
+        detector = ChangePointDetector()
+        for i, duration in enumerate(durations[:300]):
+            detector.add(duration, START + i)
+        restored = ChangePointDetector().restore(detector.checkpoint())
+        self.assertTrue(restored.ready)
+
+        alerts = []
+        for candidate in (detector, restored):
+            alert = None
+            for i, duration in enumerate(durations[300:], 300):
+                alert = alert or candidate.add(duration, START + i)
+            alerts.append(alert)
+        self.assertIsNotNone(alerts[0])
+        self.assertEqual(alerts[0], alerts[1])
+
+
+class TestAgingResume(CheckpointTestCase):
+    """老化测试从检查点继续运行"""
+
+    def make_config(self):
+        from aging_test_simple import AgingTestConfig
+
+        config = AgingTestConfig()
+        config.workload = {}
+        config.concurrent_threads = 2
+        config.degradation_baseline_size = 20
+        config.checkpoint_path = self.path("aging.db")
+        return config
+
+    def test_worker_round_trip(self):
+        from aging_test_simple import AgingTestWorker
+
+        config = self.make_config()
+        worker = AgingTestWorker(1, config)
+        worker.entity_cache["partner"].extend(["11", "12"])
+        for i in range(50):
+            worker._record_result("partner", "read", i % 10 != 0, 0.05, None)
+            worker.latency_histograms.record("partner.read", 0.05)
+            worker._update_performance_window(0.05)
+            worker._detect_degradation("partner.read", 0.05)
+        worker.error_counts["by_entity"]["partner"] += 1
+
+        restored = AgingTestWorker(1, config)
+        restored.restore(worker.checkpoint())
+        self.assertEqual(restored.entity_cache["partner"], ["11", "12"])
+        self.assertEqual(restored.operation_counts, worker.operation_counts)
+        self.assertEqual(restored.error_counts["by_entity"]["partner"], 1)
+        self.assertAlmostEqual(restored.performance_window.mean, 0.05)
+        detector = restored.degradation_monitor.detectors["partner.read"]
+        self.assertTrue(detector.ready)
+        statistics = restored.get_statistics()
+        self.assertEqual(statistics["failed_operations"], 5)
+        self.assertEqual(statistics["latency_percentiles"]["partner.read"]["count"], 50)
+
+    def test_runner_resumes_from_checkpoint(self):
+        import aging_test_simple
+        from aging_test_simple import AgingTestRunner, AgingTestWorker
+
+        config = self.make_config()
+        runner = AgingTestRunner(config)
+        runner._open_checkpoint()
+        runner.start_time = datetime.fromtimestamp(datetime.now().timestamp() - 7200)
+        runner.workers = [AgingTestWorker(i, config) for i in range(2)]
+        runner.workers[0].entity_cache["goods"].append("42")
+        runner.workers[1]._record_result("goods", "create", True, 0.1, None)
+        runner._record_metrics()
+        runner._save_checkpoint()
+        runner.checkpoint_store.close()
+
+        # 已有检查点时必须指定 resume，避免覆盖之前的运行
+        with self.assertRaises(ValueError):
+            AgingTestRunner(config)._open_checkpoint()
+
+        resumed = AgingTestRunner(config, resume=True)
+        resumed._open_checkpoint()
+        elapsed = (datetime.now() - resumed.start_time).total_seconds()
+        self.assertAlmostEqual(elapsed, 7200, delta=60)
+        self.assertEqual(len(resumed.metrics_history), 1)
+        self.assertIsNotNone(resumed.resumed_from)
+
+        with mock.patch.object(aging_test_simple.time, "sleep"), mock.patch.object(
+            AgingTestWorker, "run", lambda self, stop_event: None
+        ):
+            resumed._start_workers(2)
+        self.assertEqual(resumed.workers[0].entity_cache["goods"], ["42"])
+        self.assertEqual(resumed.workers[1].operation_counts["total"], 1)
+
+        resumed._record_metrics()
+        resumed._save_checkpoint()
+        checkpoint = resumed.checkpoint_store.load()
+        self.assertEqual(len(checkpoint["metrics_history"]), 2)
+        self.assertEqual(
+            checkpoint["metrics_history"][1]["metrics"]["total_operations"], 1
+        )
+        self.assertGreaterEqual(checkpoint["run"]["elapsed_seconds"], 7200)
+        resumed.checkpoint_store.close()
+
+    def test_process_state_messages(self):
+        from aging_test_simple import AgingTestRunner
+
+        runner = AgingTestRunner(self.make_config())
+        runner._on_process_message("state", 0, [{"worker_id": 3, "n": 1}])
+        runner._on_process_message("state", 1, [{"worker_id": 4, "n": 2}])
+        self.assertEqual(sorted(runner._worker_states), [3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
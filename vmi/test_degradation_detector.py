@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+性能劣化检测测试
+验证按操作的变化点检测（误报、检测时间和幅度、操作比例变化）以及老化测试的报警，
+不访问服务器
+"""
+
+import random
+import unittest
+from datetime import datetime
+
+from degradation_detector import (ChangePointDetector, DegradationMonitor,
+                                  format_alert)
+
+START = 1_700_000_000.0
+
+
+def lognormal(rng, median, sigma=0.2):
+    return rng.lognormvariate(0, sigma) * median
+
+
+class TestChangePointDetector(unittest.TestCase):
+    """单个操作的检测测试"""
+
+    def test_no_false_alarm_on_stable_latency(self):
+        rng = random.Random(1)
+        detector = ChangePointDetector()
+        for i in range(20000):
+            self.assertIsNone(detector.add(lognormal(rng, 0.1), START + i))
+        self.assertIsNone(detector.alert)
+        self.assertTrue(detector.state()["baseline_ready"])
+
+    def test_detects_shift_with_time_and_magnitude(self):
+        rng = random.Random(2)
+        detector = ChangePointDetector()
+        alert = None
+        for i in range(3000):
+            median = 0.1 if i < 1000 else 0.15
+            alert = alert or detector.add(lognormal(rng, median), START + i)
+        self.assertIsNotNone(alert)
+        started = datetime.fromisoformat(alert["started_at"]).timestamp()
+        detected = datetime.fromisoformat(alert["detected_at"]).timestamp()
+        # 变化时间接近第 1000 个样本，几十个样本内发现
+        self.assertLess(abs(started - (START + 1000)), 30)
+        self.assertLess(detected - (START + 1000), 60)
+        self.assertAlmostEqual(alert["change_percent"], 50, delta=20)
+        self.assertGreaterEqual(alert["confidence"], 0.99)
+        self.assertAlmostEqual(alert["baseline_duration"], 0.1, delta=0.01)
+
+    def test_small_shift_ignored(self):
+        rng = random.Random(3)
+        detector = ChangePointDetector(min_change_percent=20.0)
+        for i in range(5000):
+            median = 0.1 if i < 1000 else 0.105
+            detector.add(lognormal(rng, median, sigma=0.05), START + i)
+        self.assertIsNone(detector.alert)
+
+    def test_invalid_baseline(self):
+        with self.assertRaises(ValueError):
+            ChangePointDetector(baseline_size=1)
+
+
+class TestDegradationMonitor(unittest.TestCase):
+    """按操作检测测试"""
+
+    def test_operation_mix_change_is_not_degradation(self):
+        """慢操作比例上升时混合均值上升，但每个操作的耗时没有变化"""
+        rng = random.Random(4)
+        monitor = DegradationMonitor()
+        for i in range(10000):
+            create_share = 0.1 if i < 2000 else 0.5
+            if rng.random() < create_share:
+                monitor.record("partner.create", lognormal(rng, 1.0), START + i)
+            else:
+                monitor.record("partner.list", lognormal(rng, 0.05), START + i)
+        self.assertEqual(monitor.alerts(), [])
+        self.assertEqual(set(monitor.state()), {"partner.create", "partner.list"})
+
+    def test_reports_regressed_endpoint(self):
+        rng = random.Random(5)
+        monitor = DegradationMonitor(baseline_size=50)
+        for i in range(4000):
+            monitor.record("goods.read", lognormal(rng, 0.05), START + i)
+            slow = 0.2 if i < 2000 else 0.4
+            monitor.record("goods.list", lognormal(rng, slow), START + i)
+        alerts = monitor.alerts()
+        self.assertEqual([alert["key"] for alert in alerts], ["goods.list"])
+        self.assertIn("goods.list", format_alert(alerts[0]))
+
+    def test_new_key_during_iteration(self):
+        """读取状态时工作线程新增键不会导致遍历出错"""
+        monitor = DegradationMonitor()
+        monitor.record("goods.read", 0.05, START)
+        detector = monitor.detectors["goods.read"]
+        original_state = detector.state
+
+        def state_while_recording():
+            monitor.record(f"key{len(monitor.detectors)}", 0.05, START)
+            return original_state()
+
+        detector.state = state_while_recording
+        self.assertEqual(list(monitor.state()), ["goods.read"])
+        self.assertEqual(monitor.alerts(), [])
+        self.assertEqual(len(monitor.checkpoint()), 2)
+
+
+class TestAgingDegradation(unittest.TestCase):
+    """老化测试的劣化报警"""
+
+    def test_runner_stop_reason_names_endpoint(self):
+        from aging_test_simple import (AgingTestConfig, AgingTestRunner,
+                                       AgingTestWorker)
+
+        config = AgingTestConfig()
+        config.workload = {}
+        config.degradation_baseline_size = 50
+        worker = AgingTestWorker(3, config)
+        rng = random.Random(6)
+        for i in range(600):
+            worker._record_result("partner", "read", True, 0.05, None)
+            worker._detect_degradation("partner.read", lognormal(rng, 0.05))
+            median = 0.1 if i < 300 else 0.3
+            worker._detect_degradation("stockin.create", lognormal(rng, median))
+
+        self.assertGreater(worker.check_performance_degradation(), 100)
+        alerts = worker.get_statistics()["degradation_alerts"]
+        self.assertEqual([alert["key"] for alert in alerts], ["stockin.create"])
+
+        runner = AgingTestRunner(config)
+        runner.workers = [worker]
+        metrics = runner._record_metrics()["metrics"]
+        self.assertTrue(metrics["performance_degradation_detected"])
+        self.assertEqual(metrics["degradation_alerts"][0]["worker_id"], 3)
+        self.assertIn("stockin.create", runner.stop_reason)
+        self.assertFalse(runner._check_continue_conditions())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+延迟直方图测试
+验证分位数精度、合并、序列化以及运行器报告中的分位数，无需外部服务器
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+from latency_histogram import ALL_KEY, HistogramSet, LatencyHistogram
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+
+
+def exact_percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * pct / 100 + 0.999999) - 1)]
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """直方图测试"""
+
+    def test_percentiles_within_precision(self):
+        rng = random.Random(1)
+        values = [rng.lognormvariate(-3, 1.5) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, len(values))
+        for pct in (50, 90, 99, 99.9):
+            exact = exact_percentile(values, pct)
+            self.assertAlmostEqual(
+                histogram.percentile(pct), exact, delta=exact * 0.002
+            )
+        self.assertAlmostEqual(histogram.max, max(values), delta=1e-6)
+        self.assertAlmostEqual(histogram.min, min(values), delta=1e-6)
+        self.assertAlmostEqual(histogram.mean, sum(values) / len(values), delta=1e-6)
+
+    def test_tail_visible(self):
+        """少量慢请求体现在 p99.9 而不是平均值"""
+        histogram = LatencyHistogram()
+        for _ in range(998):
+            histogram.record(0.010)
+        histogram.record(2.0)
+        histogram.record(2.5)
+
+        summary = histogram.summary()
+        self.assertLess(summary["mean"], 0.02)
+        self.assertAlmostEqual(summary["p50"], 0.010, places=4)
+        self.assertAlmostEqual(summary["p99_9"], 2.0, delta=0.002)
+        self.assertAlmostEqual(summary["max"], 2.5)
+
+    def test_empty(self):
+        summary = LatencyHistogram().summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertEqual(summary["p99"], 0)
+        self.assertEqual(summary["min"], 0)
+
+    def test_merge_across_threads(self):
+        """每个线程单独记录，合并结果与单个直方图记录全部数据相同"""
+        rng = random.Random(2)
+        chunks = [[rng.uniform(0, 1) for _ in range(2000)] for _ in range(4)]
+        parts = [LatencyHistogram() for _ in chunks]
+        threads = [
+            threading.Thread(target=lambda h, c: [h.record(v) for v in c], args=pair)
+            for pair in zip(parts, chunks)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        merged = LatencyHistogram()
+        for part in parts:
+            merged.merge(part)
+        single = LatencyHistogram()
+        for chunk in chunks:
+            for value in chunk:
+                single.record(value)
+        self.assertEqual(merged.to_dict(), single.to_dict())
+
+    def test_merge_requires_same_precision(self):
+        with self.assertRaises(ValueError):
+            LatencyHistogram(3).merge(LatencyHistogram(2))
+
+    def test_serialization_round_trip(self):
+        """序列化结果可写入 JSON，恢复后（例如在另一个进程中）可继续合并"""
+        histogram = LatencyHistogram()
+        for value in (0.001, 0.02, 0.3, 4.0, 4.0):
+            histogram.record(value)
+
+        data = json.loads(json.dumps(histogram.to_dict()))
+        restored = LatencyHistogram.from_dict(data)
+        self.assertEqual(restored.summary(), histogram.summary())
+        restored.merge(histogram)
+        self.assertEqual(restored.count, 10)
+        self.assertLess(len(histogram.to_dict()["buckets"]), 5)
+
+
+class TestHistogramSet(unittest.TestCase):
+    """按操作分组的直方图测试"""
+
+    def test_summary_by_key(self):
+        histograms = HistogramSet()
+        histograms.record("partner.create", 0.2)
+        histograms.record("partner.read", 0.01)
+        histograms.record("partner.read", 0.03)
+
+        summary = histograms.summary()
+        self.assertEqual(summary[ALL_KEY]["count"], 3)
+        self.assertEqual(summary["partner.read"]["count"], 2)
+        self.assertAlmostEqual(summary["partner.create"]["p50"], 0.2, delta=0.001)
+
+        restored = HistogramSet.from_dict(json.loads(json.dumps(histograms.to_dict())))
+        self.assertEqual(restored.summary(), summary)
+        restored.merge(histograms)
+        self.assertEqual(restored.summary()[ALL_KEY]["count"], 6)
+
+
+class TestRunnerReports(unittest.TestCase):
+    """运行器报告中的分位数测试"""
+
+    def test_concurrent_runner_report(self):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        with LocalTestServer() as server:
+            with SessionPool(server.url, "", "user", "pwd", size=2) as pool:
+                runner = ConcurrentTestRunner(max_workers=2, session_pool=pool)
+
+                def operation(worker_id, session_manager):
+                    time.sleep(0.1 if worker_id == 0 else 0.005)
+
+                result = runner.run_concurrent_test(operation, "percentiles", 20)
+
+        self.assertEqual(result.latency_histogram.count, 20)
+        self.assertGreater(result.latency_percentiles["max"], 0.09)
+        self.assertLess(result.latency_percentiles["p50"], 0.05)
+
+        report = runner.generate_report()
+        detail = report["detailed_results"][0]
+        self.assertEqual(detail["latency_percentiles"]["count"], 20)
+        restored = LatencyHistogram.from_dict(detail["latency_histogram"])
+        self.assertEqual(restored.summary(), result.latency_percentiles)
+        self.assertEqual(report["summary"]["latency_percentiles"]["count"], 20)
+        json.dumps(report)
+
+    def test_aging_report_merges_workers(self):
+        from aging_test_simple import AgingTestConfig, AgingTestRunner
+
+        runner = AgingTestRunner(AgingTestConfig())
+        runner.start_time = datetime.now()
+        for worker_id, duration in enumerate((0.01, 0.5)):
+            histograms = HistogramSet()
+            histograms.record("partner.create", duration)
+            histograms.record("goods.read", duration / 10)
+            runner.workers.append(
+                SimpleNamespace(worker_id=worker_id, latency_histograms=histograms)
+            )
+
+        runner.latency_histograms = runner._merge_latency_histograms()
+        report = runner._generate_report()
+
+        percentiles = report["summary"]["latency_percentiles"]
+        self.assertEqual(percentiles[ALL_KEY]["count"], 4)
+        self.assertEqual(percentiles["partner.create"]["count"], 2)
+        self.assertAlmostEqual(percentiles["partner.create"]["max"], 0.5)
+        self.assertIn("goods.read", report["latency_histograms"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "summary.txt")
+            runner._generate_text_report(report, filename)
+            with open(filename, encoding="utf-8") as f:
+                text = f.read()
+        self.assertIn("p99.9", text)
+        self.assertIn("partner.create", text)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
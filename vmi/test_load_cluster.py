@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+分布式负载测试
+在本机启动多个负载代理进程，验证任务分发、同步开始、断线处理以及并发测试和老化测试
+运行器的分布式模式，使用本地测试服务器
+"""
+
+import json
+import multiprocessing
+import os
+import socket
+import time
+import unittest
+from unittest import mock
+
+from latency_histogram import ALL_KEY
+from load_cluster import (TOKEN_ENV, LoadAgent, LoadCoordinator, reference_of,
+                          resolve_reference)
+from load_processes import ERROR, EXIT
+from load_test_helpers import FakeAgingWorker
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+
+FORK_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+
+# 代理进程通过 fork 继承，会话池工厂按引用在代理中调用
+SERVER_URL = None
+
+
+def make_pool(size):
+    pool = SessionPool(SERVER_URL, "", "user", "pwd", size=size)
+    pool.start()
+    return pool
+
+
+def remote_operation(worker_id, session_manager):
+    assert session_manager.is_logged_in
+    time.sleep(0.01)
+
+
+def report_start(channel, stop_event, setup_delay):
+    """准备耗时不同的任务，同步开始后上报开始时间"""
+    time.sleep(setup_delay)
+    if channel.barrier():
+        channel.send("started", {"pid": os.getpid(), "at": time.time()})
+
+
+def crash(channel, stop_event):
+    os._exit(3)
+
+
+def _run_agent(address):
+    LoadAgent(address, connect_timeout=10).run()
+
+
+class TestReferences(unittest.TestCase):
+    """函数引用测试"""
+
+    def test_round_trip(self):
+        reference = reference_of(remote_operation)
+        self.assertEqual(reference, f"{__name__}:remote_operation")
+        self.assertIs(resolve_reference(reference), remote_operation)
+        self.assertIs(resolve_reference(remote_operation), remote_operation)
+
+    def test_closure_rejected(self):
+        with self.assertRaises(ValueError):
+            reference_of(lambda: None)
+
+
+class TestCoordinatorConnections(unittest.TestCase):
+    """协调器的监听地址、令牌校验和格式错误的消息"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop(TOKEN_ENV, None)
+
+    def make_coordinator(self, **kwargs):
+        coordinator = LoadCoordinator(1, port=0, **kwargs)
+        self.addCleanup(coordinator.close)
+        return coordinator
+
+    def connect(self, coordinator, token):
+        sock = socket.create_connection(coordinator.address)
+        self.addCleanup(sock.close)
+        hello = {"type": "hello", "name": "raw", "token": token}
+        sock.sendall((json.dumps(hello) + "\n").encode("utf-8"))
+        return sock
+
+    def test_remote_listen_requires_token(self):
+        self.assertEqual(self.make_coordinator().address[0], "127.0.0.1")
+        with self.assertRaises(ValueError):
+            LoadCoordinator(1, host="0.0.0.0", port=0)
+        os.environ[TOKEN_ENV] = "secret"
+        self.assertEqual(self.make_coordinator(host="0.0.0.0").token, "secret")
+
+    def test_wrong_token_rejected(self):
+        coordinator = self.make_coordinator(token="secret")
+        self.connect(coordinator, "guess")
+        self.assertEqual(coordinator.wait_for_agents(0.3), 0)
+        self.connect(coordinator, "secret")
+        self.assertEqual(coordinator.wait_for_agents(2), 1)
+
+    def test_malformed_message_marks_agent_exited(self):
+        coordinator = self.make_coordinator()
+        sock = self.connect(coordinator, None)
+        self.assertEqual(coordinator.wait_for_agents(2), 1)
+        coordinator.start(report_start, [(0.0,)])
+        sock.sendall(b"not json\n")
+
+        messages = []
+        deadline = time.time() + 5
+        while coordinator.running and time.time() < deadline:
+            messages.extend(coordinator.poll(timeout=0.5))
+        self.assertFalse(coordinator.running)
+        errors = [payload for kind, _, payload in messages if kind == ERROR]
+        self.assertTrue(errors and "格式错误" in errors[0])
+        self.assertIn((EXIT, 0, None), messages)
+
+
+@unittest.skipUnless(FORK_AVAILABLE, "需要 fork 启动方式")
+class ClusterTestCase(unittest.TestCase):
+    """启动协调器和本机负载代理进程"""
+
+    agents = 2
+
+    def start_cluster(self):
+        self.coordinator = LoadCoordinator(
+            self.agents, host="127.0.0.1", port=0, start_delay=0.2
+        )
+        address = "%s:%d" % self.coordinator.address
+        ctx = multiprocessing.get_context("fork")
+        self.agent_processes = [
+            ctx.Process(target=_run_agent, args=(address,), daemon=True)
+            for _ in range(self.agents)
+        ]
+        for process in self.agent_processes:
+            process.start()
+            self.addCleanup(process.join, 5)
+        # 先关闭协调器，代理随之退出
+        self.addCleanup(self.coordinator.close)
+        self.assertEqual(self.coordinator.wait_for_agents(10), self.agents)
+
+    def collect(self, timeout=10):
+        messages = []
+        deadline = time.time() + timeout
+        while self.coordinator.running and time.time() < deadline:
+            messages.extend(self.coordinator.poll(timeout=0.5))
+        messages.extend(self.coordinator.poll(timeout=0))
+        return messages
+
+
+class TestLoadCoordinator(ClusterTestCase):
+    """协调器与代理测试"""
+
+    agents = 3
+
+    def test_synchronized_start_and_reuse(self):
+        self.start_cluster()
+        # 准备最慢的代理就绪后所有代理同时开始
+        self.coordinator.start(report_start, [(0.0,), (0.3,), (0.6,)])
+        messages = self.collect()
+        started = [payload for kind, _, payload in messages if kind == "started"]
+        self.assertEqual(len(started), 3)
+        self.assertEqual(len({item["pid"] for item in started}), 3)
+        times = [item["at"] for item in started]
+        self.assertLess(max(times) - min(times), 0.1)
+        self.assertEqual(sum(1 for kind, _, _ in messages if kind == EXIT), 3)
+
+        # 同一组代理执行下一个任务
+        self.coordinator.start(report_start, [(0.0,), (0.0,)])
+        messages = self.collect()
+        self.assertEqual(sum(1 for kind, _, _ in messages if kind == "started"), 2)
+        self.assertFalse(self.coordinator.running)
+
+    def test_lost_agent_reported(self):
+        self.start_cluster()
+        self.coordinator.start(crash, [()])
+        messages = self.collect()
+        self.assertIn((ERROR, 0, "代理连接已断开"), messages)
+        self.assertIn((EXIT, 0, None), messages)
+
+
+class TestDistributedRunners(ClusterTestCase):
+    """运行器分布式模式测试"""
+
+    def setUp(self):
+        global SERVER_URL
+        self.server = LocalTestServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        SERVER_URL = self.server.url
+
+    def test_concurrent_runner(self):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        self.start_cluster()
+        runner = ConcurrentTestRunner(
+            max_workers=2, session_pool_factory=f"{__name__}:make_pool"
+        )
+        result = runner.run_distributed_test(
+            remote_operation, "distributed_closed", self.coordinator, num_requests=20
+        )
+        self.assertEqual(result.processes, 2)
+        self.assertEqual(result.successful_requests, 20)
+        self.assertEqual(result.latency_histogram.count, 20)
+        # 每个代理登录自己的会话池
+        self.assertEqual(self.server.stats["logins"], 4)
+        self.assertEqual(runner.get_live_stats()["successful_requests"], 20)
+
+        result = runner.run_distributed_test(
+            remote_operation,
+            "distributed_open",
+            self.coordinator,
+            rate=40,
+            duration=0.5,
+        )
+        self.assertEqual(result.mode, "open_loop")
+        self.assertEqual(result.total_requests, 20)
+        self.assertEqual(result.successful_requests, 20)
+
+    def test_aging_runner(self):
+        import aging_test_simple
+        from aging_test_simple import AgingTestConfig, AgingTestRunner
+
+        with mock.patch.object(aging_test_simple, "AgingTestWorker", FakeAgingWorker):
+            with mock.patch.object(aging_test_simple, "PROCESS_SNAPSHOT_INTERVAL", 0.1):
+                self.start_cluster()
+                runner = AgingTestRunner(AgingTestConfig(), self.coordinator)
+                runner._start_workers(4)
+                time.sleep(0.6)
+                metrics = runner._record_metrics()["metrics"]
+                runner.stop()
+
+        self.assertEqual(metrics["worker_count"], 4)
+        self.assertGreater(metrics["total_operations"], 0)
+        summary = runner.latency_histograms.summary()
+        self.assertGreater(summary[ALL_KEY]["count"], 0)
+        self.assertIsNone(runner._process_group)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+多进程负载生成测试
+验证进程组消息、并发测试运行器和老化测试运行器的多进程模式，使用本地测试服务器
+"""
+
+import functools
+import multiprocessing
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from latency_histogram import ALL_KEY
+from load_processes import ERROR, EXIT, LoadProcessGroup
+from load_test_helpers import FakeAgingWorker
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+
+FORK_AVAILABLE = "fork" in multiprocessing.get_all_start_methods()
+
+
+def _send_pid(channel, stop_event, count):
+    for i in range(count):
+        channel.send("pid", (os.getpid(), i))
+
+
+def _fail(channel, stop_event):
+    raise RuntimeError("boom")
+
+
+def _wait_for_stop(channel, stop_event):
+    stop_event.wait(30)
+    channel.send("stopped")
+
+
+def _make_pool(server_url, size):
+    pool = SessionPool(server_url, "", "user", "pwd", size=size)
+    pool.start()
+    return pool
+
+
+class TestLoadProcessGroup(unittest.TestCase):
+    """进程组测试"""
+
+    def test_messages_from_all_processes(self):
+        group = LoadProcessGroup()
+        group.start(_send_pid, [(3,), (3,)])
+        messages = []
+        while group.running:
+            messages.extend(group.poll(timeout=1))
+        group.stop()
+
+        pids = {payload[0] for kind, _, payload in messages if kind == "pid"}
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertEqual(sum(1 for kind, _, _ in messages if kind == "pid"), 6)
+        self.assertTrue(group.exited(0) and group.exited(1))
+
+    def test_error_reported(self):
+        group = LoadProcessGroup()
+        group.start(_fail, [()])
+        messages = []
+        while group.running:
+            messages.extend(group.poll(timeout=1))
+        self.assertIn((ERROR, 0, "boom"), messages)
+        self.assertIn((EXIT, 0, None), messages)
+
+    def test_stop_sets_shared_event(self):
+        group = LoadProcessGroup()
+        group.start(_wait_for_stop, [(), ()])
+        received = []
+        start = time.time()
+        group.stop(timeout=10, on_message=lambda *m: received.append(m[0]))
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(received.count("stopped"), 2)
+        self.assertFalse(any(p.is_alive() for p in group.processes))
+
+
+@unittest.skipUnless(FORK_AVAILABLE, "需要 fork 启动方式（测试函数为闭包）")
+class TestMultiprocessConcurrentRunner(unittest.TestCase):
+    """并发测试运行器多进程模式测试"""
+
+    def setUp(self):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        self.server = LocalTestServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.runner = ConcurrentTestRunner(
+            max_workers=2,
+            session_pool_factory=functools.partial(_make_pool, self.server.url),
+        )
+        self.calls = multiprocessing.get_context("fork").Queue()
+
+    def operation(self, worker_id, session_manager):
+        self.assertTrue(session_manager.is_logged_in)
+        self.calls.put((worker_id, os.getpid()))
+        time.sleep(0.01)
+
+    def drain_calls(self):
+        calls = []
+        while not self.calls.empty():
+            calls.append(self.calls.get(timeout=1))
+        return calls
+
+    def test_closed_loop_split_across_processes(self):
+        result = self.runner.run_multiprocess_test(
+            self.operation,
+            "mp_closed",
+            num_requests=30,
+            processes=3,
+            start_method="fork",
+        )
+
+        self.assertEqual(result.processes, 3)
+        self.assertEqual(result.total_requests, 30)
+        self.assertEqual(result.successful_requests, 30)
+        self.assertEqual(result.latency_histogram.count, 30)
+        calls = self.drain_calls()
+        self.assertEqual(sorted(worker_id for worker_id, _ in calls), list(range(30)))
+        self.assertEqual(len({pid for _, pid in calls}), 3)
+        # 每个进程登录自己的会话
+        self.assertEqual(self.server.stats["logins"], 6)
+
+        live = self.runner.get_live_stats()
+        self.assertEqual(live["successful_requests"], 30)
+        self.assertEqual(live["latency_percentiles"]["count"], 30)
+        detail = self.runner.generate_report()["detailed_results"][0]
+        self.assertEqual(detail["processes"], 3)
+
+    def test_open_loop_rate_split_across_processes(self):
+        result = self.runner.run_multiprocess_test(
+            self.operation,
+            "mp_open",
+            processes=2,
+            rate=40,
+            duration=0.5,
+            start_method="fork",
+        )
+
+        self.assertEqual(result.mode, "open_loop")
+        self.assertEqual(result.target_rate, 40)
+        self.assertEqual(result.total_requests, 20)
+        self.assertEqual(result.successful_requests, 20)
+        calls = self.drain_calls()
+        self.assertEqual(len({worker_id for worker_id, _ in calls}), 20)
+
+    def test_failed_process_counted(self):
+        def broken_factory(size):
+            raise RuntimeError("登录失败")
+
+        self.runner.session_pool_factory = broken_factory
+        result = self.runner.run_multiprocess_test(
+            self.operation,
+            "mp_broken",
+            num_requests=4,
+            processes=2,
+            start_method="fork",
+        )
+        self.assertEqual(result.failed_requests, 4)
+        self.assertEqual(len(result.error_details), 2)
+        self.assertIn("登录失败", result.error_details[0]["error"])
+
+
+@unittest.skipUnless(FORK_AVAILABLE, "需要 fork 启动方式")
+class TestMultiprocessAgingRunner(unittest.TestCase):
+    """老化测试运行器多进程模式测试"""
+
+    def test_statistics_merged_from_processes(self):
+        import aging_test_simple
+        from aging_test_simple import AgingTestConfig, AgingTestRunner
+
+        config = AgingTestConfig()
+        config.processes = 2
+        runner = AgingTestRunner(config)
+
+        with mock.patch.object(aging_test_simple, "AgingTestWorker", FakeAgingWorker):
+            with mock.patch.object(aging_test_simple, "PROCESS_SNAPSHOT_INTERVAL", 0.1):
+                runner._start_workers(4)
+                time.sleep(0.5)
+                metrics = runner._record_metrics()["metrics"]
+                runner.stop()
+
+        self.assertEqual(metrics["worker_count"], 4)
+        self.assertGreater(metrics["total_operations"], 0)
+        live_count = metrics["latency_percentiles"][ALL_KEY]["count"]
+        self.assertGreater(live_count, 0)
+        # 停止时接收各进程的最终统计
+        summary = runner.latency_histograms.summary()
+        self.assertGreaterEqual(summary["partner.read"]["count"], live_count)
+        self.assertAlmostEqual(summary["partner.read"]["max"], 0.04, delta=0.001)
+        self.assertIsNone(runner._process_group)
+
+
+    def test_stop_does_not_hold_statistics_lock(self):
+        """等待工作进程退出期间其他线程仍可读取统计"""
+        from aging_test_simple import AgingTestConfig, AgingTestRunner
+
+        entered = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        class SlowGroup:
+            def stop(self, timeout, on_message):
+                snapshot = {"statistics": {"0": {"total_operations": 5}}}
+                on_message("snapshot", 0, snapshot)
+                entered.set()
+                release.wait(5)
+
+        runner = AgingTestRunner(AgingTestConfig())
+        runner._process_group = SlowGroup()
+        stopper = threading.Thread(target=runner._stop_worker_processes)
+        stopper.start()
+        self.assertTrue(entered.wait(5))
+
+        collected = []
+        reader = threading.Thread(
+            target=lambda: collected.extend(runner._collect_worker_statistics())
+        )
+        reader.start()
+        reader.join(1)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(collected, [(0, {"total_operations": 5})])
+
+        release.set()
+        stopper.join(5)
+        self.assertIsNone(runner._process_group)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
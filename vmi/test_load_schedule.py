@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+开环负载测试
+验证到达时间表以及开环运行器的协调遗漏修正、延迟/丢弃统计，使用本地测试服务器
+"""
+
+import threading
+import time
+import unittest
+
+from load_schedule import (POISSON, SPIKE, STEPPED, build_arrivals,
+                           build_profile, constant_arrivals, poisson_arrivals,
+                           ramp_steps, soak_steps, stair_steps, stepped_arrivals)
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+
+
+class TestArrivalSchedules(unittest.TestCase):
+    """到达时间表测试"""
+
+    def test_constant(self):
+        arrivals = constant_arrivals(10, 1)
+        self.assertEqual(len(arrivals), 10)
+        self.assertAlmostEqual(arrivals[1] - arrivals[0], 0.1)
+        self.assertEqual(constant_arrivals(0, 1), [])
+
+    def test_poisson_reproducible(self):
+        arrivals = poisson_arrivals(100, 10, seed=7)
+        self.assertEqual(arrivals, poisson_arrivals(100, 10, seed=7))
+        self.assertEqual(arrivals, sorted(arrivals))
+        self.assertLess(arrivals[-1], 10)
+        # 平均速率接近目标速率
+        self.assertAlmostEqual(len(arrivals) / 10, 100, delta=10)
+
+    def test_stepped(self):
+        arrivals = stepped_arrivals([(10, 1), (20, 0.5)])
+        self.assertEqual(len(arrivals), 20)
+        self.assertAlmostEqual(arrivals[10], 1.0)
+        self.assertAlmostEqual(arrivals[11] - arrivals[10], 0.05)
+
+    def test_build_arrivals(self):
+        self.assertEqual(len(build_arrivals(rate=5, duration=2)), 10)
+        self.assertEqual(
+            build_arrivals(POISSON, 50, 1, seed=1), poisson_arrivals(50, 1, seed=1)
+        )
+        self.assertEqual(len(build_arrivals(STEPPED, steps=[(4, 1)])), 4)
+        with self.assertRaises(ValueError):
+            build_arrivals("burst", 1, 1)
+        with self.assertRaises(ValueError):
+            build_arrivals(STEPPED)
+        with self.assertRaises(ValueError):
+            build_arrivals(POISSON, rate=10)
+
+
+
+class TestLoadProfiles(unittest.TestCase):
+    """负载曲线测试"""
+
+    def test_ramp(self):
+        steps = ramp_steps(10, 100, 50, step_count=10)
+        self.assertEqual(len(steps), 10)
+        self.assertEqual(steps[0], (10, 5))
+        self.assertEqual(steps[-1], (100, 5))
+
+    def test_stairs(self):
+        self.assertEqual(stair_steps(5, 5, 3, 10), [(5, 10), (10, 10), (15, 10)])
+
+    def test_spike_and_soak(self):
+        self.assertEqual(
+            build_profile(
+                SPIKE, base_rate=10, spike_rate=50, duration=60, spike_duration=10
+            ),
+            [(10, 25), (50, 10), (10, 25)],
+        )
+        self.assertEqual(soak_steps(10, 150, window=60), [(10, 60), (10, 60), (10, 30)])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            build_profile("sine", rate=1)
+        with self.assertRaises(ValueError):
+            build_profile(SPIKE, base_rate=10)
+        with self.assertRaises(ValueError):
+            build_profile(
+                SPIKE, base_rate=1, spike_rate=2, duration=5, spike_duration=5
+            )
+
+class TestOpenLoopRunner(unittest.TestCase):
+    """开环运行器测试"""
+
+    def setUp(self):
+        self.server = LocalTestServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def make_runner(self, workers):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        pool = SessionPool(self.server.url, "", "user", "pwd", size=workers)
+        pool.start()
+        self.addCleanup(pool.close)
+        return ConcurrentTestRunner(max_workers=workers, session_pool=pool)
+
+    def test_keeps_arrival_rate(self):
+        """容量充足时按目标速率发送，响应时间接近服务时间"""
+        runner = self.make_runner(4)
+
+        def operation(worker_id, session_manager):
+            time.sleep(0.005)
+
+        start = time.time()
+        result = runner.run_open_loop_test(operation, "steady", rate=50, duration=0.5)
+
+        self.assertEqual(result.mode, "open_loop")
+        self.assertEqual(result.total_requests, 25)
+        self.assertEqual(result.successful_requests, 25)
+        self.assertEqual(result.dropped_requests, 0)
+        self.assertGreaterEqual(time.time() - start, 0.45)
+        self.assertLess(result.max_response_time, 0.1)
+        self.assertEqual(result.target_rate, 50)
+
+    def test_queueing_counted_in_latency(self):
+        """容量不足时排队时间计入响应时间（修正协调遗漏）"""
+        runner = self.make_runner(1)
+
+        def operation(worker_id, session_manager):
+            time.sleep(0.04)
+
+        # 到达间隔 20ms，服务时间 40ms，积压持续增长
+        result = runner.run_open_loop_test(
+            operation, "overload", rate=50, duration=0.4, max_outstanding=100
+        )
+
+        self.assertEqual(result.successful_requests, 20)
+        self.assertLess(result.avg_service_time, 0.08)
+        self.assertGreater(result.max_response_time, 0.3)
+        self.assertGreater(result.avg_response_time, 2 * result.avg_service_time)
+        self.assertGreater(result.late_requests, 10)
+        self.assertGreater(result.max_send_lag, 0.3)
+
+    def test_drops_when_backlog_full(self):
+        """积压超过上限时丢弃请求并计数"""
+        runner = self.make_runner(1)
+
+        def operation(worker_id, session_manager):
+            time.sleep(0.05)
+
+        result = runner.run_open_loop_test(
+            operation, "drops", rate=100, duration=0.3, max_outstanding=2
+        )
+
+        self.assertGreater(result.dropped_requests, 0)
+        self.assertEqual(
+            result.successful_requests + result.dropped_requests, result.total_requests
+        )
+        detail = runner.generate_report()["detailed_results"][0]
+        self.assertEqual(detail["dropped_requests"], result.dropped_requests)
+        self.assertEqual(detail["mode"], "open_loop")
+
+    def test_stops_waiting_at_deadline(self):
+        """超过等待时间后立即返回，未开始的请求计为丢弃，仍在执行的请求计为超时"""
+        runner = self.make_runner(1)
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def operation(worker_id, session_manager):
+            release.wait(5)
+
+        start = time.time()
+        result = runner.run_open_loop_test(
+            operation, "stuck", rate=100, duration=0.05, timeout=0.2
+        )
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(result.successful_requests, 0)
+        self.assertEqual(result.dropped_requests, result.total_requests - 1)
+        self.assertEqual(result.timed_out_requests, 1)
+
+        # 超时的请求之后完成，不改变已返回的结果
+        release.set()
+        self.assertTrue(runner._wait_unfinished_requests(5))
+        self.assertEqual(result.successful_requests, 0)
+        self.assertEqual(result.latency_histogram.count, 0)
+
+    def test_owned_pool_closed_after_late_requests(self):
+        """测试自建的会话池等超时仍在执行的请求结束后再关闭"""
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        pools = []
+
+        def make_pool(size):
+            pool = SessionPool(self.server.url, "", "user", "pwd", size=size)
+            pool.start()
+            pools.append(pool)
+            return pool
+
+        runner = ConcurrentTestRunner(max_workers=1, session_pool_factory=make_pool)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        sessions = []
+
+        def operation(worker_id, session_manager):
+            release.wait(5)
+            sessions.append(session_manager.is_logged_in)
+
+        result = runner.run_open_loop_test(
+            operation, "late", rate=1, duration=1, timeout=0.1
+        )
+        self.assertEqual(result.timed_out_requests, 1)
+        self.assertFalse(pools[0]._closed)
+
+        release.set()
+        deadline = time.time() + 5
+        while not pools[0]._closed and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(pools[0]._closed)
+        self.assertEqual(sessions, [True])
+
+    def test_load_profile_waits_for_previous_step(self):
+        """负载曲线的下一级等待上一级超时仍在执行的请求结束后再开始"""
+        runner = self.make_runner(1)
+        calls = []
+
+        def operation(worker_id, session_manager):
+            calls.append(worker_id)
+            if len(calls) == 1:
+                time.sleep(0.5)
+
+        results = runner.run_load_profile(
+            operation, "profile", [(1, 1), (1, 1)], timeout=0.3
+        )
+
+        self.assertEqual(results[0].timed_out_requests, 1)
+        self.assertEqual(results[1].successful_requests, 1)
+        # 第二级开始时会话已归还，响应时间不含等待上一级请求的时间
+        self.assertLess(results[1].max_response_time, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+实时指标端点测试
+验证 Prometheus 文本格式、HTTP 端点以及并发测试和老化测试运行器输出的指标，使用本地
+测试服务器
+"""
+
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from latency_histogram import LatencyHistogram
+from local_test_server import LocalTestServer
+from metrics_endpoint import (CONTENT_TYPE, MetricsServer, MetricsWriter,
+                              RequestMetrics)
+from session_pool import SessionPool
+
+
+def parse_samples(text):
+    """解析样本行：{"名称{标签}": 值}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode("utf-8")
+
+
+class TestMetricsWriter(unittest.TestCase):
+    """文本格式测试"""
+
+    def test_families_and_labels(self):
+        writer = MetricsWriter("vmi_")
+        writer.counter("requests_total", "请求数", [({"test": 'a"b\\c'}, 3)])
+        writer.gauge("in_flight", "进行中", 2.5)
+        text = writer.render()
+        self.assertIn("# TYPE vmi_requests_total counter\n", text)
+        self.assertIn('vmi_requests_total{test="a\\"b\\\\c"} 3\n', text)
+        self.assertIn("# HELP vmi_in_flight 进行中\n", text)
+        self.assertIn("vmi_in_flight 2.5\n", text)
+
+    def test_histogram_buckets(self):
+        histogram = LatencyHistogram()
+        for seconds in (0.001, 0.05, 0.1, 0.1, 0.2, 3.0):
+            histogram.record(seconds)
+        writer = MetricsWriter()
+        writer.histogram(
+            "duration_seconds", "耗时", [({"op": "read"}, histogram)], (0.1, 1, 0.01)
+        )
+        samples = parse_samples(writer.render())
+        self.assertEqual(samples['duration_seconds_bucket{op="read",le="0.01"}'], 1)
+        self.assertEqual(samples['duration_seconds_bucket{op="read",le="0.1"}'], 4)
+        self.assertEqual(samples['duration_seconds_bucket{op="read",le="1.0"}'], 5)
+        self.assertEqual(samples['duration_seconds_bucket{op="read",le="+Inf"}'], 6)
+        self.assertEqual(samples['duration_seconds_count{op="read"}'], 6)
+        self.assertAlmostEqual(samples['duration_seconds_sum{op="read"}'], 3.451)
+
+    def test_request_metrics(self):
+        metrics = RequestMetrics()
+        metrics.started("t")
+        metrics.record("t", True, 0.1)
+        metrics.record("t", False, 0.2)
+        remote = LatencyHistogram()
+        remote.record(0.3)
+        metrics.merge("t", 1, 2, remote)
+        entry = metrics.snapshot()["t"]
+        self.assertEqual((entry["successful"], entry["failed"]), (2, 3))
+        self.assertEqual(entry["in_flight"], 1)
+        self.assertEqual(entry["histogram"].count, 2)
+        metrics.finished("t")
+        self.assertEqual(metrics.snapshot()["t"]["in_flight"], 0)
+
+
+class TestMetricsServer(unittest.TestCase):
+    """HTTP 端点测试"""
+
+    def test_serves_metrics(self):
+        calls = []
+
+        def collect():
+            calls.append(1)
+            if len(calls) > 1:
+                raise RuntimeError("统计失败")
+            return "up 1\n"
+
+        with MetricsServer(collect, port=0) as server:
+            content_type, body = fetch(server.url)
+            self.assertEqual(content_type, CONTENT_TYPE)
+            self.assertEqual(body, "up 1\n")
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                fetch(server.url.replace("/metrics", "/other"))
+            self.assertEqual(context.exception.code, 404)
+            with self.assertLogs("metrics_endpoint", "ERROR"):
+                with self.assertRaises(urllib.error.HTTPError) as context:
+                    fetch(server.url)
+            self.assertEqual(context.exception.code, 500)
+
+
+class TestRunnerMetrics(unittest.TestCase):
+    """运行器输出的指标"""
+
+    def test_concurrent_runner(self):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        started = threading.Barrier(5)
+        release = threading.Event()
+
+        def blocking(worker_id, session_manager):
+            started.wait(5)
+            release.wait(5)
+
+        def operation(worker_id, session_manager):
+            if worker_id % 4 == 0:
+                raise RuntimeError("失败")
+
+        with LocalTestServer() as server:
+            with SessionPool(server.url, "", "user", "pwd", size=4) as pool:
+                runner = ConcurrentTestRunner(max_workers=4, session_pool=pool)
+                server_url = runner.start_metrics_server(port=0).url
+                self.addCleanup(runner.stop_metrics_server)
+
+                thread = threading.Thread(
+                    target=runner.run_concurrent_test, args=(blocking, "blocking", 4)
+                )
+                thread.start()
+                started.wait(5)
+                samples = parse_samples(fetch(server_url)[1])
+                release.set()
+                thread.join(10)
+                self.assertEqual(
+                    samples['vmi_concurrent_in_flight_requests{test="blocking"}'], 4
+                )
+
+                runner.run_concurrent_test(operation, "closed", 40)
+                samples = parse_samples(fetch(server_url)[1])
+
+        success = 'vmi_concurrent_requests_total{test="closed",result="success"}'
+        failure = 'vmi_concurrent_requests_total{test="closed",result="failure"}'
+        self.assertEqual(samples[success], 30)
+        self.assertEqual(samples[failure], 10)
+        error_rate = 'vmi_concurrent_error_rate_percent{test="closed"}'
+        self.assertEqual(samples[error_rate], 25)
+        self.assertEqual(
+            samples['vmi_concurrent_request_duration_seconds_count{test="closed"}'], 30
+        )
+        self.assertEqual(samples['vmi_concurrent_in_flight_requests{test="closed"}'], 0)
+        self.assertEqual(samples["vmi_concurrent_session_logins_total"], 4)
+
+    def test_finished_pools_are_pruned(self):
+        """测试结束后释放本运行器创建的会话池，登录次数仍累计在指标中"""
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        with LocalTestServer() as server:
+
+            def make_pool(size):
+                pool = SessionPool(server.url, "", "user", "pwd", size=size)
+                pool.start()
+                return pool
+
+            runner = ConcurrentTestRunner(max_workers=2, session_pool_factory=make_pool)
+            for name in ("first", "second"):
+                runner.run_concurrent_test(lambda **kwargs: None, name, 4)
+                self.assertEqual(runner._session_pools, [])
+            samples = parse_samples(runner.collect_metrics())
+
+        self.assertEqual(samples["vmi_concurrent_session_logins_total"], 4)
+
+    def test_aging_runner(self):
+        from aging_test_simple import (AgingTestConfig, AgingTestRunner,
+                                       AgingTestWorker)
+
+        config = AgingTestConfig()
+        config.workload = {}
+        config.degradation_baseline_size = 20
+        workers = [AgingTestWorker(i, config) for i in range(2)]
+        for worker in workers:
+            worker.entity_cache["partner"].extend(["1", "2"])
+            for n in range(10):
+                worker._record_result("partner", "read", n != 0, 0.05, None)
+                worker.latency_histograms.record("partner.read", 0.05)
+            worker._record_result("goods", "create", True, 0.2, None)
+            worker.latency_histograms.record("goods.create", 0.2)
+        workers[1].in_flight = 1
+        for n in range(100):
+            workers[0]._detect_degradation("partner.list", 0.1 if n < 50 else 0.3)
+
+        runner = AgingTestRunner(config)
+        runner.workers = workers
+        samples = parse_samples(runner.collect_metrics())
+
+        labels = 'entity="partner",operation="read"'
+        self.assertEqual(
+            samples[f'vmi_aging_operations_total{{{labels},result="success"}}'], 18
+        )
+        self.assertEqual(
+            samples[f'vmi_aging_operations_total{{{labels},result="failure"}}'], 2
+        )
+        self.assertEqual(
+            samples[f'vmi_aging_operation_duration_seconds_count{{{labels}}}'], 20
+        )
+        self.assertEqual(samples["vmi_aging_workers"], 2)
+        self.assertEqual(samples["vmi_aging_in_flight_operations"], 1)
+        self.assertEqual(samples['vmi_aging_entities{entity="partner"}'], 4)
+        self.assertEqual(samples["vmi_aging_session_logins_total"], 0)
+        self.assertGreater(samples["vmi_aging_recent_operations_per_second"], 0)
+        self.assertGreater(samples["vmi_aging_recent_error_rate_percent"], 0)
+        degradation = (
+            'vmi_aging_degradation_change_percent{entity="partner",operation="list"}'
+        )
+        self.assertAlmostEqual(samples[degradation], 200, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -11,6 +11,8 @@ VMI 多租户测试
 import json
 import logging
 import os
+import threading
+import time
 import unittest
 from unittest.mock import Mock, patch
 
@@ -265,6 +267,153 @@ class TestMultiTenantIntegration(unittest.TestCase):
         print("✅ 多租户管理器与配置集成测试通过")
 
 
+class TestParallelTenantInitialization(unittest.TestCase):
+    """多租户并行初始化与关闭测试"""
+
+    def _make_manager(self, tenant_count, login=None):
+        """创建多租户管理器，每个租户的 SessionManager 替换为模拟对象"""
+        from multi_tenant_manager import MultiTenantSessionManager
+
+        configs = {
+            f"tenant{i}": {
+                "server_url": "https://tenant.local.vpc",
+                "username": "admin",
+                "password": "password",
+                "namespace": f"tenant{i}",
+            }
+            for i in range(tenant_count)
+        }
+        mt_manager = MultiTenantSessionManager(configs)
+        for tenant_id in configs:
+            mock_session = Mock()
+            mock_session.is_logged_in = False
+
+            def create_session(tenant_id=tenant_id, mock_session=mock_session):
+                success = login(tenant_id) if login else True
+                mock_session.is_logged_in = success
+                return success
+
+            mock_session.create_session.side_effect = create_session
+            mt_manager.session_managers[tenant_id] = mock_session
+        return mt_manager
+
+    def test_tenants_login_in_parallel(self):
+        """租户并行登录，总耗时不随租户数线性增长"""
+        mt_manager = self._make_manager(10, login=lambda tid: time.sleep(0.2) or True)
+
+        start_time = time.time()
+        results = mt_manager.initialize_all(max_concurrency=10)
+        elapsed = time.time() - start_time
+
+        self.assertEqual(results, {f"tenant{i}": True for i in range(10)})
+        self.assertTrue(mt_manager.is_initialized)
+        self.assertLess(elapsed, 1.0)
+        for session_mgr in mt_manager.session_managers.values():
+            session_mgr.start_auto_refresh.assert_called_once()
+
+    def test_concurrency_limit(self):
+        """同时登录的租户数不超过并发上限"""
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def login(tenant_id):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return True
+
+        mt_manager = self._make_manager(9, login=login)
+        results = mt_manager.initialize_all(max_concurrency=3)
+
+        self.assertTrue(all(results.values()))
+        self.assertEqual(active[1], 3)
+
+    def test_partial_success_and_timeout(self):
+        """失败和超时的租户不影响其他租户，再次初始化只重试失败的租户"""
+        attempts = {}
+
+        def login(tenant_id):
+            attempts[tenant_id] = attempts.get(tenant_id, 0) + 1
+            if tenant_id == "tenant1" and attempts[tenant_id] == 1:
+                return False
+            if tenant_id == "tenant2" and attempts[tenant_id] == 1:
+                time.sleep(0.5)
+            return True
+
+        mt_manager = self._make_manager(4, login=login)
+        results = mt_manager.initialize_all(timeout=0.2)
+
+        self.assertEqual(
+            results,
+            {"tenant0": True, "tenant1": False, "tenant2": False, "tenant3": True},
+        )
+        self.assertFalse(mt_manager.is_initialized)
+        self.assertEqual(mt_manager.init_report["tenant1"]["status"], "failed")
+        self.assertEqual(mt_manager.init_report["tenant2"]["status"], "timeout")
+
+        # 超时租户迟到的会话被关闭
+        time.sleep(0.5)
+        late_session = mt_manager.session_managers["tenant2"]
+        late_session.close_session.assert_called_once()
+        late_session.start_auto_refresh.assert_not_called()
+        late_session.is_logged_in = False
+
+        results = mt_manager.initialize_all(timeout=0.2)
+        self.assertTrue(all(results.values()))
+        self.assertTrue(mt_manager.is_initialized)
+        self.assertEqual(
+            attempts, {"tenant0": 1, "tenant1": 2, "tenant2": 2, "tenant3": 1}
+        )
+
+    def test_queued_tenants_not_timed_out(self):
+        """排队等待并发名额的租户不会因排队时间被判定超时"""
+        mt_manager = self._make_manager(4, login=lambda tid: time.sleep(0.15) or True)
+        results = mt_manager.initialize_all(max_concurrency=2, timeout=0.2)
+
+        self.assertTrue(all(results.values()))
+        for outcome in mt_manager.init_report.values():
+            self.assertLess(outcome["elapsed"], 0.2)
+
+    def test_timeout_is_per_tenant(self):
+        """每个租户从开始执行时单独计时，卡住的租户超时后不再占用并发名额"""
+
+        def login(tenant_id):
+            time.sleep(1.0 if tenant_id == "tenant0" else 0.15)
+            return True
+
+        mt_manager = self._make_manager(4, login=login)
+        start_time = time.time()
+        results = mt_manager.initialize_all(max_concurrency=1, timeout=0.2)
+        elapsed = time.time() - start_time
+
+        self.assertEqual(
+            results,
+            {"tenant0": False, "tenant1": True, "tenant2": True, "tenant3": True},
+        )
+        timed_out = mt_manager.init_report["tenant0"]
+        self.assertEqual(timed_out["status"], "timeout")
+        self.assertLess(timed_out["elapsed"], 0.35)
+        # 卡住的租户超时后其余租户依次执行：0.2 + 3 * 0.15
+        self.assertLess(elapsed, 0.9)
+
+    def test_parallel_close(self):
+        """并行关闭所有租户会话"""
+        mt_manager = self._make_manager(6)
+        mt_manager.initialize_all()
+        for session_mgr in mt_manager.session_managers.values():
+            session_mgr.close_session.side_effect = lambda: time.sleep(0.2)
+
+        start_time = time.time()
+        results = mt_manager.close_all_sessions(max_concurrency=6)
+
+        self.assertTrue(all(results.values()))
+        self.assertLess(time.time() - start_time, 1.0)
+        self.assertFalse(mt_manager.is_initialized)
+
+
 def run_multi_tenant_tests():
     """运行所有多租户测试"""
     print("=" * 60)
@@ -278,6 +427,7 @@ def run_multi_tenant_tests():
         TestMultiTenantCore,
         TestMultiTenantConfig,
         TestMultiTenantIntegration,
+        TestParallelTenantInitialization,
     ]:
         suite.addTests(loader.loadTestsFromTestCase(test_class))
 
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+多租户性能隔离基准测试的测试
+用模拟的共享/隔离后端验证劣化曲线和隔离结论，无需外部服务器
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from noisy_neighbor_benchmark import (NoisyNeighborBenchmark, _display_width,
+                                      format_curves, percentile, save_report,
+                                      summarize_latencies)
+
+
+class FakeBackend:
+    """模拟后端：shared 为 True 时所有租户共享容量，请求越多越慢"""
+
+    def __init__(self, shared: bool, base: float = 0.005, per_request: float = 0.002):
+        self.shared = shared
+        self.base = base
+        self.per_request = per_request
+        self.in_flight = 0
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, tenant_id):
+        with self._lock:
+            self.in_flight += 1
+            self.calls[tenant_id] = self.calls.get(tenant_id, 0) + 1
+            load = self.in_flight if self.shared else 1
+        try:
+            time.sleep(self.base + self.per_request * load)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_benchmark(operation, **kwargs):
+    options = dict(
+        aggressor="noisy",
+        victims=["quiet1", "quiet2"],
+        operation=operation,
+        aggressor_rates=[100, 400],
+        victim_rate=40,
+        step_duration=0.5,
+        warmup=0.05,
+        aggressor_concurrency=32,
+        victim_concurrency=4,
+        degradation_threshold=50,
+    )
+    options.update(kwargs)
+    return NoisyNeighborBenchmark(**options)
+
+
+class TestPercentile(unittest.TestCase):
+    """分位数计算测试"""
+
+    def test_linear_interpolation(self):
+        values = [4, 1, 3, 2]
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 100), 4)
+        self.assertAlmostEqual(percentile(values, 50), 2.5)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_summary(self):
+        summary = summarize_latencies([0.1, 0.2, 0.3], errors=2)
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["errors"], 2)
+        self.assertAlmostEqual(summary["mean"], 0.2)
+        self.assertAlmostEqual(summary["max"], 0.3)
+
+
+class TestNoisyNeighborBenchmark(unittest.TestCase):
+    """性能隔离基准测试"""
+
+    def test_baseline_step_added(self):
+        """施压速率列表自动以 0 开头作为基线"""
+        benchmark = make_benchmark(FakeBackend(shared=False))
+        self.assertEqual(benchmark.aggressor_rates, [0.0, 100.0, 400.0])
+
+    def test_operation_or_manager_required(self):
+        with self.assertRaises(ValueError):
+            NoisyNeighborBenchmark(aggressor="noisy", victims=["quiet"])
+
+    def test_shared_backend_degrades_victims(self):
+        """共享后端：受害租户 p99 随施压速率上升，判定为存在性能干扰"""
+        backend = FakeBackend(shared=True, per_request=0.004)
+        report = make_benchmark(backend).run()
+
+        self.assertEqual(len(report["steps"]), 3)
+        self.assertEqual(report["steps"][0]["tenants"]["noisy"]["count"], 0)
+        for tid in ("quiet1", "quiet2"):
+            curve = report["curves"][tid]
+            self.assertEqual([p["aggressor_rate"] for p in curve], [0, 100, 400])
+            self.assertEqual(curve[0]["p99_degradation_pct"], 0)
+            self.assertGreater(curve[-1]["p99"], curve[0]["p99"])
+            self.assertGreater(report["isolation"]["max_degradation_pct"][tid], 50)
+        self.assertFalse(report["isolation"]["isolated"])
+        self.assertGreater(report["steps"][-1]["aggressor_throughput"], 100)
+
+    def test_isolated_backend_passes(self):
+        """隔离后端：受害租户延迟不受施压租户影响"""
+        # 基础延迟较大，线程调度抖动相对可以忽略
+        backend = FakeBackend(shared=False, base=0.03)
+        report = make_benchmark(backend, aggressor_rates=[100]).run()
+
+        self.assertTrue(report["isolation"]["isolated"])
+        for tid in ("quiet1", "quiet2"):
+            for point in report["curves"][tid]:
+                self.assertGreater(point["p50"], 0)
+            # 每级约 0.5 秒 * 40 次/秒
+            self.assertGreater(report["steps"][1]["tenants"][tid]["count"], 10)
+
+    def test_errors_counted(self):
+        """操作异常计入错误数，不中断测试"""
+
+        def flaky(tenant_id):
+            if tenant_id == "quiet1":
+                raise RuntimeError("boom")
+
+        report = make_benchmark(flaky, aggressor_rates=[50]).run()
+        self.assertGreater(report["curves"]["quiet1"][0]["errors"], 0)
+        self.assertEqual(report["curves"]["quiet2"][0]["errors"], 0)
+        # 失败请求不计入延迟样本
+        for step in report["steps"]:
+            self.assertEqual(step["tenants"]["quiet1"]["count"], 0)
+            self.assertGreater(step["tenants"]["quiet2"]["count"], 0)
+
+    def test_save_report(self):
+        report = make_benchmark(FakeBackend(shared=False), step_duration=0.2).run()
+        text = format_curves(report)
+        self.assertIn("quiet1", text)
+        self.assertIn("p99", text)
+        # 表头和数据行按显示宽度对齐
+        table = [line for line in text.splitlines() if line.startswith("  ")]
+        self.assertGreater(len(table), 1)
+        self.assertEqual(len({_display_width(line) for line in table}), 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                report_file = save_report(report)
+                self.assertTrue(os.path.exists(report_file))
+                self.assertTrue(os.path.exists(report_file[:-5] + ".txt"))
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
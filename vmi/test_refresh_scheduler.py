@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+会话刷新调度器测试
+验证共享调度器按截止时间触发刷新、不为每个会话创建线程，无需外部服务器
+"""
+
+import threading
+import time
+import unittest
+
+from local_test_server import LocalTestServer
+from refresh_scheduler import RefreshScheduler
+
+
+def _wait_until(predicate, timeout=2.0):
+    """等待条件成立"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    """刷新调度器测试"""
+
+    def setUp(self):
+        self.scheduler = RefreshScheduler(max_workers=2, name="test-scheduler")
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_fires_in_deadline_order(self):
+        """按截止时间顺序触发"""
+        fired = []
+        lock = threading.Lock()
+
+        def callback(name):
+            def run():
+                with lock:
+                    fired.append(name)
+                return None
+
+            return run
+
+        now = time.time()
+        self.scheduler.schedule("c", now + 0.15, callback("c"))
+        self.scheduler.schedule("a", now + 0.05, callback("a"))
+        self.scheduler.schedule("b", now + 0.10, callback("b"))
+
+        self.assertTrue(_wait_until(lambda: len(fired) == 3))
+        self.assertEqual(fired, ["a", "b", "c"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_callback_return_value_reschedules(self):
+        """回调返回下一次截止时间时自动重新调度"""
+        count = [0]
+
+        def callback():
+            count[0] += 1
+            return time.time() + 0.02 if count[0] < 3 else None
+
+        self.scheduler.schedule("s", time.time(), callback)
+
+        self.assertTrue(_wait_until(lambda: count[0] == 3))
+        time.sleep(0.05)
+        self.assertEqual(count[0], 3)
+        self.assertFalse(self.scheduler.is_scheduled("s"))
+
+    def test_cancel_and_reschedule(self):
+        """取消的任务不触发，重新调度只保留最新截止时间"""
+        fired = []
+        now = time.time()
+        self.scheduler.schedule("x", now + 0.05, lambda: fired.append("x"))
+        self.scheduler.cancel("x")
+        self.scheduler.schedule("y", now + 0.05, lambda: fired.append("y1"))
+        self.scheduler.schedule("y", now + 0.10, lambda: fired.append("y2"))
+
+        self.assertTrue(_wait_until(lambda: fired))
+        time.sleep(0.1)
+        self.assertEqual(fired, ["y2"])
+
+    def test_many_sessions_single_thread_no_polling(self):
+        """上千个任务只使用一个调度线程，且不按秒轮询"""
+        threads_before = threading.active_count()
+        fired = []
+        now = time.time()
+        for i in range(2000):
+            self.scheduler.schedule(i, now + 60 + i, lambda: fired.append(1))
+
+        # 调度线程 + 未创建的线程池线程
+        self.assertLessEqual(threading.active_count() - threads_before, 1)
+        time.sleep(0.3)
+        self.assertEqual(self.scheduler.get_stats()["wakeups"], 0)
+        self.assertEqual(len(self.scheduler), 2000)
+        self.assertEqual(fired, [])
+
+    def test_callback_exception_does_not_stop_scheduler(self):
+        """回调异常不影响其他任务"""
+        fired = []
+
+        def broken():
+            raise RuntimeError("boom")
+
+        self.scheduler.schedule("bad", time.time(), broken)
+        self.scheduler.schedule("good", time.time() + 0.05, lambda: fired.append(1))
+
+        self.assertTrue(_wait_until(lambda: fired))
+        self.assertEqual(self.scheduler.get_stats()["failed"], 1)
+
+
+class TestSessionManagerAutoRefresh(unittest.TestCase):
+    """会话管理器自动刷新测试"""
+
+    def test_managers_share_scheduler(self):
+        """多个会话管理器共享一个调度器并按间隔刷新"""
+        from session_manager import SessionManager
+
+        scheduler = RefreshScheduler(name="test-session-scheduler")
+        with LocalTestServer() as server:
+            managers = [
+                SessionManager(server.url, "", f"user{i}", "pwd", refresh_interval=0.1)
+                for i in range(5)
+            ]
+            try:
+                for manager in managers:
+                    self.assertTrue(manager.create_session())
+                threads_before = threading.active_count()
+                for manager in managers:
+                    manager.start_auto_refresh(scheduler)
+
+                self.assertTrue(all(m.is_auto_refresh_running() for m in managers))
+                self.assertTrue(_wait_until(lambda: server.stats["refreshes"] >= 10))
+                # 调度线程 + 线程池线程，与会话数量无关
+                self.assertLessEqual(
+                    threading.active_count() - threads_before, 1 + scheduler.max_workers
+                )
+            finally:
+                for manager in managers:
+                    manager.stop_auto_refresh()
+                    manager.close_session()
+                scheduler.shutdown()
+
+            self.assertFalse(managers[0].is_auto_refresh_running())
+
+    def test_reconnect_keeps_auto_refresh(self):
+        """刷新失败触发重新登录后仍保持自动刷新"""
+        from session_manager import SessionManager
+
+        scheduler = RefreshScheduler(name="test-reconnect-scheduler")
+        with LocalTestServer() as server:
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=0.1
+            )
+            try:
+                self.assertTrue(manager.create_session())
+                manager.start_auto_refresh(scheduler)
+                # 令牌失效，刷新失败后重新登录
+                manager.cas_session.session_token = "invalid"
+
+                self.assertTrue(_wait_until(lambda: server.stats["logins"] >= 2))
+                self.assertTrue(manager.is_logged_in)
+                self.assertTrue(manager.is_auto_refresh_running())
+            finally:
+                manager.close_session()
+                scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
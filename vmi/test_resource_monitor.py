@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+客户端资源监控测试
+验证资源采样、线程分组、趋势分析（持续增长与预热后平稳的区分）、tracemalloc 分配
+统计以及老化测试运行器中的资源报告和指标，不访问服务器
+"""
+
+import os
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import resource_monitor
+from resource_monitor import (ResourceMonitor, analyze_trends, format_trend,
+                              sample_resources, thread_group)
+from test_metrics_endpoint import parse_samples
+
+START = 1_700_000_000.0
+MB = 1024 * 1024
+
+
+class Leaky:
+    pass
+
+
+def synthetic_samples(count, leak=True, interval=1800.0):
+    """count 次采样：预热后内存平稳；leak 时刷新线程和 CLOSE_WAIT 套接字持续增长"""
+    rng = random.Random(count)
+    samples = []
+    for i in range(count):
+        growing = i // 2 if leak else 2
+        samples.append(
+            {
+                "time": START + i * interval,
+                "timestamp": f"t{i}",
+                "rss_bytes": 200 * MB + min(i, 8) * 10 * MB + rng.randint(0, MB),
+                "open_fds": 20 + growing,
+                "sockets": {"ESTABLISHED": 4, "CLOSE_WAIT": growing},
+                "threads": 12 + growing,
+                "thread_groups": {"MainThread": 1, "SessionRefresh": growing},
+                "gc": {"objects": 50000 + rng.randint(0, 500), "garbage": 0},
+                "objects": {"requests.sessions.Session": 4},
+            }
+        )
+    return samples
+
+
+class TestSampling(unittest.TestCase):
+    """资源采样测试"""
+
+    def test_thread_group(self):
+        self.assertEqual(thread_group("SessionPoolLogin_3"), "SessionPoolLogin")
+        self.assertEqual(thread_group("Thread-7 (run)"), "Thread (run)")
+        self.assertEqual(thread_group("AgingTest-12"), "AgingTest")
+        self.assertEqual(thread_group("MainThread"), "MainThread")
+
+    @unittest.skipUnless(
+        resource_monitor.PSUTIL_AVAILABLE or os.path.isdir("/proc/self/fd"),
+        "需要 psutil 或 /proc",
+    )
+    def test_sample_resources(self):
+        leaked_type = f"{Leaky.__module__}.{Leaky.__qualname__}"
+        before = sample_resources((leaked_type,), count_objects=True)
+
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        client = socket.create_connection(server.getsockname())
+        accepted, _ = server.accept()
+        for sock in (server, client, accepted):
+            self.addCleanup(sock.close)
+        leaked = [Leaky() for _ in range(10)]
+        release = threading.Event()
+        thread = threading.Thread(target=release.wait, name="Leaked-1")
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+
+        after = sample_resources((leaked_type,), count_objects=True)
+        self.assertGreater(after["rss_bytes"], 0)
+        self.assertGreaterEqual(after["open_fds"] - before["open_fds"], 3)
+        self.assertEqual(after["sockets"].get("LISTEN", 0), 1)
+        self.assertEqual(after["sockets"].get("ESTABLISHED", 0), 2)
+        self.assertEqual(after["threads"], before["threads"] + 1)
+        self.assertEqual(after["thread_groups"]["Leaked"], 1)
+        self.assertEqual(after["objects"][leaked_type], len(leaked))
+        self.assertGreater(after["gc"]["objects"], 0)
+
+    def test_object_counting_is_opt_in(self):
+        """默认不遍历整个堆"""
+        with mock.patch.object(
+            resource_monitor.gc, "get_objects", side_effect=AssertionError
+        ):
+            sample = sample_resources()
+            self.assertIsNotNone(ResourceMonitor().sample())
+        self.assertNotIn("objects", sample)
+        self.assertNotIn("objects", sample["gc"])
+        self.assertIn("gc.garbage", resource_monitor.sample_series(sample))
+        self.assertNotIn("gc.objects", resource_monitor.sample_series(sample))
+
+
+class TestTrendAnalysis(unittest.TestCase):
+    """趋势分析测试"""
+
+    def test_growth_is_flagged(self):
+        trends = analyze_trends(synthetic_samples(48))
+        growing = {name for name, trend in trends.items() if trend["growing"]}
+        self.assertIn("threads.SessionRefresh", growing)
+        self.assertIn("sockets.CLOSE_WAIT", growing)
+        self.assertIn("open_fds", growing)
+        # 预热阶段的内存增长和稳定值的随机波动不算持续增长
+        self.assertNotIn("rss_bytes", growing)
+        self.assertNotIn("gc.objects", growing)
+        self.assertNotIn("sockets.ESTABLISHED", growing)
+
+        trend = trends["threads.SessionRefresh"]
+        self.assertAlmostEqual(trend["slope_per_hour"], 1.0, delta=0.05)
+        self.assertGreater(trend["confidence"], 0.99)
+        self.assertIn("threads.SessionRefresh", format_trend(trend))
+
+    def test_stable_and_short_runs(self):
+        trends = analyze_trends(synthetic_samples(48, leak=False))
+        self.assertFalse(any(trend["growing"] for trend in trends.values()))
+        # 最近一半时间内采样不足时不分析
+        self.assertEqual(analyze_trends(synthetic_samples(12)), {})
+
+    def test_memory_growth(self):
+        samples = synthetic_samples(48, leak=False)
+        for i, sample in enumerate(samples):
+            sample["rss_bytes"] += i * 4 * MB
+        trends = analyze_trends(samples)
+        self.assertTrue(trends["rss_bytes"]["growing"])
+        self.assertIn("MB", format_trend(trends["rss_bytes"]))
+
+
+class TestResourceMonitor(unittest.TestCase):
+    """资源监控测试"""
+
+    def test_thinning_keeps_latest(self):
+        monitor = ResourceMonitor(max_samples=20)
+        samples = synthetic_samples(45)
+        with mock.patch.object(
+            resource_monitor, "sample_resources", side_effect=samples
+        ):
+            for _ in samples:
+                monitor.sample()
+        summary = monitor.summary()
+        self.assertLessEqual(summary["samples"], 20)
+        self.assertEqual(summary["latest"]["timestamp"], "t44")
+        self.assertIn("threads.SessionRefresh", [t["series"] for t in summary["leaks"]])
+
+    @unittest.skipIf(tracemalloc.is_tracing(), "tracemalloc 已由外部启用")
+    def test_tracemalloc_allocations(self):
+        monitor = ResourceMonitor(interval=3600, tracemalloc_top=5).start()
+        self.assertTrue(tracemalloc.is_tracing())
+        leaked = [bytearray(64 * 1024) for _ in range(32)]
+        monitor.sample()
+        monitor.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+
+        summary = monitor.summary()
+        self.assertIn("traced_bytes", summary["latest"])
+        top = summary["top_allocations"][0]
+        self.assertIn(os.path.basename(__file__), top["location"])
+        self.assertGreaterEqual(top["size_diff_bytes"], len(leaked) * 64 * 1024)
+
+
+class TestAgingRunnerResources(unittest.TestCase):
+    """老化测试运行器中的客户端资源"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_report_and_metrics(self):
+        from aging_test_simple import AgingTestConfig, AgingTestRunner
+
+        config = AgingTestConfig()
+        config.workload = {}
+        runner = AgingTestRunner(config)
+        runner.start_time = datetime.now()
+        runner.resource_monitor = ResourceMonitor()
+        samples = synthetic_samples(48)
+        with mock.patch.object(
+            resource_monitor, "sample_resources", side_effect=samples
+        ):
+            for _ in samples:
+                runner.resource_monitor.sample()
+        stable = ResourceMonitor()
+        with mock.patch.object(
+            resource_monitor,
+            "sample_resources",
+            side_effect=synthetic_samples(48, leak=False),
+        ):
+            for _ in range(48):
+                stable.sample()
+        runner._on_process_message(
+            "snapshot",
+            0,
+            {"statistics": {}, "histograms": {}, "resources": stable.summary()},
+        )
+
+        with self.assertLogs("aging_test_simple", "WARNING") as logs:
+            metrics = runner._record_metrics()["metrics"]
+        self.assertTrue(any("SessionRefresh" in line for line in logs.output))
+        self.assertEqual(sorted(metrics["client_resources"]), ["main", "process-0"])
+        leaks = metrics["client_resource_leaks"]
+        self.assertTrue(leaks)
+        self.assertEqual({trend["process"] for trend in leaks}, {"main"})
+
+        text = parse_samples(runner.collect_metrics())
+        self.assertEqual(text['vmi_aging_client_threads{process="main"}'], 35)
+        self.assertEqual(
+            text['vmi_aging_client_sockets{process="main",state="CLOSE_WAIT"}'], 23
+        )
+        self.assertGreater(
+            text['vmi_aging_client_growing_resources{process="main"}'], 0
+        )
+        self.assertEqual(
+            text['vmi_aging_client_growing_resources{process="process-0"}'], 0
+        )
+
+        report = runner._generate_report()
+        self.assertEqual(report["summary"]["client_resource_leaks"], leaks)
+        self.assertIn("process-0", report["client_resources"])
+        recommendations = report["analysis"]["recommendations"]
+        self.assertTrue(any("客户端" in item for item in recommendations))
+        filename = os.path.join(self.directory, "summary.txt")
+        runner._generate_text_report(report, filename)
+        with open(filename, encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("客户端资源:", content)
+        self.assertIn("持续增长: threads.SessionRefresh", content)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+结果汇测试
+验证三种后端的按秒聚合、原始事件抽样、内存上限以及并发测试和老化测试运行器从结果汇
+读回报告，使用本地测试服务器
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from latency_histogram import ALL_KEY
+from local_test_server import LocalTestServer
+from result_sink import (EVENT_BATCH_SIZE, CsvResultSink, JsonlResultSink,
+                         SqliteResultSink, open_sink, process_sink_path)
+from session_pool import SessionPool
+
+START = 1_700_000_000
+
+
+class SinkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+
+class TestResultSinkBackends(SinkTestCase):
+    """各后端写入和读回测试"""
+
+    def check_backend(self, name, backend):
+        sink = open_sink(self.path(name), sample_rate=0, max_errors_per_second=2)
+        self.assertIsInstance(sink, backend)
+        for i in range(10):
+            sink.record("partner.create", True, 0.1 + i / 100, timestamp=START + 0.1)
+        sink.record("partner.read", True, 0.5, timestamp=START + 1.5)
+        for i in range(5):
+            sink.record(
+                "partner.read",
+                False,
+                1.0,
+                f"超时 {i}",
+                timestamp=START + 2.5,
+                worker_id=i,
+            )
+        sink.close()
+        # 关闭后的记录被忽略，仍可读取
+        sink.record("partner.read", True, 0.1, timestamp=START + 3)
+        self.assertEqual(sink.summary()[ALL_KEY]["count"], 16)
+
+        reopened = open_sink(self.path(name))
+        self.addCleanup(reopened.close)
+        summary = reopened.summary()
+        create = summary["partner.create"]
+        self.assertEqual(create["count"], 10)
+        self.assertEqual(create["failed"], 0)
+        self.assertAlmostEqual(create["avg_duration"], 0.145)
+        self.assertAlmostEqual(create["min_duration"], 0.1)
+        self.assertAlmostEqual(create["max_duration"], 0.19)
+        self.assertEqual(create["peak_per_second"], 10)
+        read = summary["partner.read"]
+        self.assertEqual((read["successful"], read["failed"]), (1, 5))
+        self.assertAlmostEqual(read["error_rate"], 500 / 6)
+        self.assertEqual(summary[ALL_KEY]["count"], 16)
+        self.assertEqual(summary[ALL_KEY]["first_second"], START)
+        self.assertEqual(summary[ALL_KEY]["last_second"], START + 2)
+
+        series = reopened.time_series()
+        self.assertEqual([p["count"] for p in series], [10, 1, 5])
+        read_series = reopened.time_series("partner.read")
+        self.assertEqual([p["failed"] for p in read_series], [0, 5])
+
+        # 成功事件不抽样，失败事件每秒最多保存 2 条
+        events = list(reopened.read_events())
+        self.assertEqual(len(events), 2)
+        self.assertEqual([e["error"] for e in events], ["超时 0", "超时 1"])
+        self.assertEqual(events[1]["fields"], {"worker_id": 1})
+        self.assertFalse(events[0]["success"])
+        self.assertEqual(list(reopened.read_events(success=True)), [])
+
+    def test_jsonl(self):
+        self.check_backend("results.jsonl", JsonlResultSink)
+
+    def test_csv(self):
+        self.check_backend("results.csv", CsvResultSink)
+        self.assertTrue(os.path.exists(self.path("results.events.csv")))
+
+    def test_sqlite(self):
+        self.check_backend("results.db", SqliteResultSink)
+
+    def test_sqlite_close_releases_connection(self):
+        sink = open_sink(self.path("results.db"))
+        sink.record("partner.read", True, 0.1, timestamp=START)
+        connection = sink._conn
+        sink.close()
+        self.assertIsNone(sink._conn)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            open_sink(self.path("results.txt"))
+
+    def test_process_path(self):
+        self.assertEqual(process_sink_path("out/results.db", 2), "out/results.p2.db")
+
+
+class TestResultSinkMemory(SinkTestCase):
+    """内存上限测试"""
+
+    def test_completed_seconds_are_written(self):
+        sink = open_sink(self.path("results.jsonl"), sample_rate=0.5, seed=1)
+        for i in range(20000):
+            sink.record("op", i % 10 != 0, 0.01, "错误", timestamp=START + i / 100)
+            # 只保留当前和上一秒的聚合，待写入事件不超过一批
+            self.assertLessEqual(len(sink._buckets), 2)
+            self.assertLessEqual(len(sink._events), EVENT_BATCH_SIZE)
+        sink.close()
+
+        summary = sink.summary()["op"]
+        self.assertEqual(summary["count"], 20000)
+        self.assertEqual(summary["failed"], 2000)
+        self.assertEqual(summary["peak_per_second"], 100)
+        sampled = sum(1 for _ in sink.read_events(success=True))
+        self.assertGreater(sampled, 8000)
+        self.assertLess(sampled, 10000)
+
+
+class TestRunnerIntegration(SinkTestCase):
+    """运行器写入结果汇并从中读回报告"""
+
+    def test_concurrent_runner(self):
+        from concurrent_test_v2 import MAX_ERROR_DETAILS, ConcurrentTestRunner
+
+        def operation(worker_id, session_manager):
+            if worker_id % 4 == 0:
+                raise RuntimeError(f"失败 {worker_id}")
+
+        sink = open_sink(
+            self.path("concurrent.db"), sample_rate=1, max_errors_per_second=100
+        )
+        self.addCleanup(sink.close)
+        with LocalTestServer() as server:
+            with SessionPool(server.url, "", "user", "pwd", size=4) as pool:
+                runner = ConcurrentTestRunner(
+                    max_workers=4, session_pool=pool, result_sink=sink
+                )
+                runner.run_concurrent_test(operation, "sink_closed", 40)
+                runner.run_open_loop_test(
+                    operation, "sink_open", rate=100, duration=0.2
+                )
+
+        report = runner.generate_report()["result_sink"]
+        self.assertEqual(report["summary"]["sink_closed"]["count"], 40)
+        self.assertEqual(report["summary"]["sink_closed"]["failed"], 10)
+        self.assertEqual(report["summary"]["sink_open"]["count"], 20)
+        self.assertEqual(report["summary"][ALL_KEY]["count"], 60)
+        self.assertEqual(len(report["sampled_errors"]), 15)
+        self.assertIn("失败", report["sampled_errors"][0]["error"])
+        self.assertLessEqual(len(runner.results[0].error_details), MAX_ERROR_DETAILS)
+        json.dumps(report)
+
+    def test_aging_worker_and_report(self):
+        from aging_test_simple import (AgingTestConfig, AgingTestRunner,
+                                       AgingTestWorker)
+
+        config = AgingTestConfig()
+        config.result_sink = self.path("aging.jsonl")
+        runner = AgingTestRunner(config)
+        runner.result_sink = open_sink(config.result_sink, sample_rate=0)
+        # 另一个进程写入的结果汇，读取报告时打开
+        with open_sink(self.path("aging.p1.db")) as other:
+            other.record("partner.read", True, 0.3)
+        runner._sink_paths = [config.result_sink, other.path]
+        worker = AgingTestWorker(0, config, runner.result_sink)
+        worker._record_result("partner", "create", True, 0.2, None)
+        worker._record_result("partner", "read", True, 0.4, None)
+        worker._record_result("partner", "read", False, 1.2, RuntimeError("超时"))
+
+        stats = worker.get_statistics()
+        self.assertEqual(stats["total_operations"], 3)
+        self.assertEqual(stats["failed_operations"], 1)
+        self.assertAlmostEqual(stats["avg_duration"], 0.6)
+        self.assertAlmostEqual(stats["max_duration"], 1.2)
+
+        opened = []
+
+        def track(path):
+            opened.append(open_sink(path))
+            return opened[-1]
+
+        with mock.patch("aging_test_simple.open_sink", side_effect=track):
+            report = runner._read_result_sinks()
+        runner.result_sink.close()
+        self.assertEqual(report["summary"]["partner.read"]["count"], 3)
+        self.assertEqual(report["summary"][ALL_KEY]["count"], 4)
+        # 为读取打开的结果汇已关闭，运行器自己的结果汇不受影响
+        self.assertEqual([sink.closed for sink in opened], [True])
+        self.assertIsNone(opened[0]._conn)
+        self.assertEqual(report["sampled_errors"][0]["error"], "超时")
+        self.assertEqual(report["sampled_errors"][0]["fields"], {"worker_id": 0})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SDK 差量更新测试
+验证只发送变化字段、无变化时跳过请求，无需网络连接
+"""
+
+import unittest
+from unittest.mock import Mock
+
+
+def _make_sdk():
+    """创建使用模拟实体的SDK"""
+    from sdk.base import VMISDKBase
+
+    stored = {
+        7: {
+            "id": 7,
+            "name": "积分策略",
+            "description": "很长的描述" * 100,
+            "status": {"id": 1},
+        }
+    }
+
+    def update(entity_id, param):
+        stored[entity_id] = {**stored[entity_id], **param}
+        return dict(stored[entity_id])
+
+    sdk = VMISDKBase(Mock(), "/vmi/credit/rewardPolicy")
+    sdk.entity = Mock()
+    sdk.entity.query.side_effect = lambda entity_id: dict(stored[entity_id])
+    sdk.entity.update.side_effect = update
+    return sdk
+
+
+class TestDiffUpdate(unittest.TestCase):
+    """差量更新测试"""
+
+    def test_full_update_without_diff_mode(self):
+        """未启用差量更新时发送完整参数"""
+        sdk = _make_sdk()
+        entity = sdk.query(7)
+        entity["description"] = "更新后的描述"
+
+        sdk.update(7, entity)
+
+        sent = sdk.entity.update.call_args.args[1]
+        self.assertEqual(set(sent), {"id", "name", "description", "status"})
+
+    def test_only_changed_fields_sent(self):
+        """启用差量更新后只发送变化字段"""
+        sdk = _make_sdk()
+        sdk.enable_diff_updates()
+        entity = sdk.query(7)
+        entity["description"] = "更新后的描述"
+
+        result = sdk.update(7, entity)
+
+        sdk.entity.update.assert_called_once_with(
+            7, {"description": "更新后的描述", "id": 7}
+        )
+        self.assertEqual(result["description"], "更新后的描述")
+        self.assertEqual(result["name"], "积分策略")
+
+    def test_noop_update_skipped(self):
+        """无变化的更新不发送请求"""
+        sdk = _make_sdk()
+        sdk.enable_diff_updates()
+        entity = sdk.query(7)
+
+        result = sdk.update(7, entity)
+
+        sdk.entity.update.assert_not_called()
+        self.assertEqual(result, entity)
+        self.assertEqual(sdk.diff_stats["skipped"], 1)
+
+    def test_version_follows_server_response(self):
+        """更新成功后以服务端返回的版本作为新的已知版本"""
+        sdk = _make_sdk()
+        sdk.enable_diff_updates()
+        entity = sdk.query(7)
+        entity["description"] = "第一次"
+        sdk.update(7, entity)
+
+        sdk.update(7, {"description": "第一次"})
+        self.assertEqual(sdk.entity.update.call_count, 1)
+
+        sdk.update(7, {"description": "第二次", "status": {"id": 1}})
+        sdk.entity.update.assert_called_with(7, {"description": "第二次", "id": 7})
+
+    def test_caller_supplied_base(self):
+        """调用方提供已知版本时无需启用版本记录"""
+        sdk = _make_sdk()
+        base = {"id": 7, "name": "积分策略", "status": {"id": 1}}
+
+        sdk.update(7, {"name": "积分策略", "status": {"id": 2}}, base=base)
+
+        sdk.entity.update.assert_called_once_with(7, {"status": {"id": 2}, "id": 7})
+
+    def test_unknown_entity_sends_full_param(self):
+        """没有已知版本时发送完整参数"""
+        sdk = _make_sdk()
+        sdk.enable_diff_updates()
+
+        sdk.update(7, {"name": "新名称", "description": "新描述"})
+
+        sdk.entity.update.assert_called_once_with(
+            7, {"name": "新名称", "description": "新描述", "id": 7}
+        )
+
+    def test_version_tracker_is_bounded(self):
+        """版本记录数量有上限"""
+        from sdk.version_tracker import VersionTracker
+
+        tracker = VersionTracker(max_entries=3)
+        for entity_id in range(5):
+            tracker.record({"id": entity_id, "name": str(entity_id)})
+
+        self.assertEqual(len(tracker), 3)
+        self.assertIsNone(tracker.get(0))
+        self.assertEqual(tracker.get("4")["name"], "4")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+SDK 幂等创建测试
+使用本地测试服务器验证创建重试不会产生重复数据，无需外部服务器
+"""
+
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+from local_test_server import LocalTestServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_module(name, relative_path):
+    """按文件路径加载模块，避免受 sys.path 中同名 session/common 模块影响"""
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(PROJECT_ROOT, relative_path)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_session_module = _load_module("_idempotency_test_session", "session/session.py")
+_common_module = _load_module("_idempotency_test_common", "session/common.py")
+
+
+def _make_partner_sdk(server):
+    """创建连接本地测试服务器的合作伙伴SDK"""
+    from sdk import PartnerSDK
+
+    work_session = _session_module.MagicSession(server.url, "")
+    sdk = PartnerSDK(work_session)
+    sdk.entity = _common_module.MagicEntity("/api/v1/vmi/partner", work_session)
+    return sdk
+
+
+def _partner_param():
+    return {"name": "幂等测试会员", "status": {"id": 1}}
+
+
+class TestIdempotentCreate(unittest.TestCase):
+    """幂等创建测试"""
+
+    def test_retry_without_key_duplicates(self):
+        """不使用幂等键时，响应丢失后的重试会产生重复数据"""
+        with LocalTestServer() as server:
+            sdk = _make_partner_sdk(server)
+            server.drop_responses(1)
+
+            self.assertIsNone(sdk.create_partner(_partner_param()))
+            self.assertIsNotNone(sdk.create_partner(_partner_param()))
+
+            self.assertEqual(server.entity_count("/vmi/partner"), 2)
+
+    def test_server_honors_key(self):
+        """服务端按幂等键去重，重试返回首次创建的实体"""
+        with LocalTestServer() as server:
+            sdk = _make_partner_sdk(server)
+            sdk.enable_idempotent_creates()
+            server.drop_responses(1)
+
+            first = sdk.create_partner(_partner_param(), idempotency_key="k1")
+            self.assertIsNone(first)
+            partner = sdk.create_partner(_partner_param(), idempotency_key="k1")
+
+            self.assertIsNotNone(partner)
+            self.assertEqual(server.entity_count("/vmi/partner"), 1)
+            self.assertEqual(server.stats["idempotent_replays"], 1)
+            self.assertEqual(sdk.idempotency_stats["resent"], 1)
+
+    def test_lookup_resolves_ambiguous_outcome(self):
+        """服务端不支持幂等键时，按唯一字段查询确认已创建的实体"""
+        with LocalTestServer(honor_idempotency=False) as server:
+            sdk = _make_partner_sdk(server)
+            sdk.enable_idempotent_creates(lookup_field="name")
+            server.drop_responses(1)
+
+            first = sdk.create_partner(_partner_param(), idempotency_key="k1")
+            self.assertIsNone(first)
+            partner = sdk.create_partner(_partner_param(), idempotency_key="k1")
+
+            self.assertEqual(partner["name"], "幂等测试会员")
+            self.assertEqual(server.entity_count("/vmi/partner"), 1)
+            self.assertEqual(server.stats["by_method"]["POST"], 1)
+            self.assertEqual(sdk.idempotency_stats["resolved_by_lookup"], 1)
+
+    def test_completed_key_is_deduplicated_locally(self):
+        """已成功的幂等键再次创建时直接返回首次结果，不发送请求"""
+        with LocalTestServer() as server:
+            sdk = _make_partner_sdk(server)
+            sdk.enable_idempotent_creates()
+
+            first = sdk.create_partner(_partner_param(), idempotency_key="k1")
+            second = sdk.create_partner(_partner_param(), idempotency_key="k1")
+
+            self.assertEqual(first["id"], second["id"])
+            self.assertEqual(server.stats["by_method"]["POST"], 1)
+            self.assertEqual(sdk.idempotency_stats["deduplicated"], 1)
+
+    def test_distinct_keys_create_distinct_entities(self):
+        """不同幂等键的创建互不影响"""
+        with LocalTestServer() as server:
+            sdk = _make_partner_sdk(server)
+            sdk.enable_idempotent_creates()
+
+            sdk.create_partner(_partner_param(), idempotency_key="k1")
+            sdk.create_partner(_partner_param(), idempotency_key="k2")
+
+            self.assertEqual(server.entity_count("/vmi/partner"), 2)
+
+    def test_aging_default_sends_no_key(self):
+        """老化测试默认不启用幂等创建，创建重试不携带幂等键、不额外查询"""
+        from aging_test_simple import AgingTestConfig, AgingTestWorker
+
+        with mock.patch("config_helper.get_aging_params", return_value={}):
+            config = AgingTestConfig()
+        self.assertFalse(config.idempotent_creates)
+
+        worker = AgingTestWorker(0, config)
+        data, key = worker._create_request("partner", _partner_param)
+        self.assertEqual(data, _partner_param())
+        self.assertIsNone(key)
+        self.assertIsNone(worker._get_idempotency_statistics())
+
+    def test_table_is_bounded(self):
+        """幂等记录数量有上限"""
+        from sdk.idempotency import IdempotencyTable
+
+        table = IdempotencyTable(max_entries=2)
+        for key in ("a", "b", "c"):
+            table.mark_done(key, {"id": key})
+
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(table.get("a"))
+        self.assertEqual(table.get("c")["result"], {"id": "c"})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+SDK 声明式定义测试
+验证生成的 SDK 类方法名、实体路径与按需加载，无需网络连接
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import Mock
+
+
+class TestGeneratedSDK(unittest.TestCase):
+    """生成的 SDK 类测试"""
+
+    def test_all_specs_exported(self):
+        """全部实体都可以从 sdk 包导入"""
+        import sdk
+        from sdk.base import VMISDKBase
+        from sdk.spec import SDK_SPECS
+
+        self.assertEqual(len(SDK_SPECS), 18)
+        for spec in SDK_SPECS:
+            sdk_class = getattr(sdk, spec.class_name)
+            self.assertTrue(issubclass(sdk_class, VMISDKBase))
+            self.assertIn(spec.class_name, sdk.__all__)
+
+    def test_generated_methods_delegate(self):
+        """生成的方法委托到基类标准操作"""
+        from sdk import ShelfSDK, StoreSDK
+
+        store_sdk = StoreSDK(Mock())
+        self.assertEqual(store_sdk.entity_path, "/vmi/store")
+        store_sdk.entity = Mock()
+        store_sdk.entity.insert.return_value = {"id": 1, "name": "店铺"}
+
+        self.assertEqual(store_sdk.create_store({"name": "店铺"})["id"], 1)
+        store_sdk.entity.insert.assert_called_once_with({"name": "店铺"})
+
+        shelf_sdk = ShelfSDK(Mock())
+        self.assertEqual(shelf_sdk.entity_path, "/vmi/warehouse/shelf")
+        shelf_sdk.entity = Mock()
+        shelf_sdk.entity.update.side_effect = lambda entity_id, param: dict(param)
+
+        base = {"id": 3, "description": "旧描述", "used": 1}
+        shelf_sdk.update_shelf(3, {"description": "旧描述", "used": 2}, base=base)
+        shelf_sdk.entity.update.assert_called_once_with(3, {"used": 2, "id": 3})
+
+    def test_method_names_and_docs(self):
+        """方法名、限定名和文档与实体定义一致"""
+        from sdk import CreditReportSDK, GoodsSDK
+
+        for op in ("filter", "query", "create", "update", "delete", "count"):
+            method = getattr(GoodsSDK, f"{op}_goods")
+            self.assertEqual(method.__name__, f"{op}_goods")
+            self.assertEqual(method.__qualname__, f"GoodsSDK.{op}_goods")
+            self.assertIn("商品信息", method.__doc__)
+
+        self.assertTrue(hasattr(CreditReportSDK, "count_credit_report"))
+        self.assertIn("count", GoodsSDK.required_fields)
+
+    def test_class_generated_once(self):
+        """SDK 类首次访问后缓存在模块命名空间"""
+        import sdk
+
+        first = sdk.WarehouseSDK
+        self.assertIs(sdk.WarehouseSDK, first)
+        self.assertIs(vars(sdk)["WarehouseSDK"], first)
+
+    def test_aliases(self):
+        """实体定义中的别名生成对应方法"""
+        from sdk.builder import build_sdk_class
+        from sdk.spec import EntitySpec
+
+        spec = EntitySpec(
+            "demo_item", "/vmi/demo", "示例", aliases={"list_demo_items": "filter"}
+        )
+        demo_class = build_sdk_class(spec)
+        self.assertEqual(demo_class.__name__, "DemoItemSDK")
+
+        demo_sdk = demo_class(Mock())
+        demo_sdk.entity = Mock()
+        demo_sdk.entity.filter.return_value = [{"id": 1}]
+        self.assertEqual(demo_sdk.list_demo_items({}), [{"id": 1}])
+
+        with self.assertRaises(ValueError):
+            build_sdk_class(EntitySpec("bad", "/vmi/bad", "错误", aliases={"x": "y"}))
+
+    def test_unknown_attribute(self):
+        """未定义的名称抛出 AttributeError"""
+        import sdk
+
+        with self.assertRaises(AttributeError):
+            sdk.UnknownSDK
+
+    def test_import_is_lazy(self):
+        """import sdk 不加载基类及会话依赖"""
+        code = (
+            "import sys, sdk\n"
+            "assert 'sdk.base' not in sys.modules\n"
+            "sdk.StoreSDK\n"
+            "assert 'sdk.base' in sys.modules\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+SDK 参数校验测试
+验证 create/update 前的本地必填字段和类型检查，无需网络连接
+"""
+
+import unittest
+from unittest import mock
+from unittest.mock import Mock
+
+
+def _make_shelf_sdk():
+    """创建使用模拟实体的货架SDK"""
+    from sdk import ShelfSDK
+
+    sdk = ShelfSDK(Mock())
+    sdk.enable_payload_validation()
+    sdk.entity = Mock()
+    sdk.entity.insert.side_effect = lambda param: {"id": 1, **param}
+    sdk.entity.update.side_effect = lambda entity_id, param: dict(param)
+    return sdk
+
+
+class TestPayloadValidator(unittest.TestCase):
+    """参数校验测试"""
+
+    def test_valid_create_is_sent(self):
+        """合法参数正常发送"""
+        sdk = _make_shelf_sdk()
+        shelf = sdk.create_shelf(
+            {"capacity": 100, "warehouse": {"id": 3}, "status": {"id": 1}}
+        )
+
+        self.assertEqual(shelf["id"], 1)
+        sdk.entity.insert.assert_called_once()
+        self.assertEqual(sdk.validation_stats, {"checked": 1, "rejected": 0})
+
+    def test_reference_field_requires_object(self):
+        """引用字段传ID而不是对象时本地拒绝（服务端为 illegal value type）"""
+        sdk = _make_shelf_sdk()
+        shelf = sdk.create_shelf({"warehouse": 3, "status": {"id": 1}})
+
+        self.assertIsNone(shelf)
+        sdk.entity.insert.assert_not_called()
+        self.assertEqual(sdk.validation_stats["rejected"], 1)
+
+    def test_missing_required_field(self):
+        """缺少必填字段时本地拒绝"""
+        sdk = _make_shelf_sdk()
+
+        self.assertIsNone(sdk.create_shelf({"capacity": 10, "status": {"id": 1}}))
+        sdk.entity.insert.assert_not_called()
+
+    def test_update_is_partial(self):
+        """更新不要求必填字段，但仍检查类型"""
+        sdk = _make_shelf_sdk()
+
+        self.assertIsNotNone(sdk.update_shelf(1, {"capacity": 20}))
+        self.assertIsNone(sdk.update_shelf(1, {"capacity": "20"}))
+        sdk.entity.update.assert_called_once_with(1, {"capacity": 20, "id": 1})
+
+    def test_validation_is_opt_in(self):
+        """默认不校验；关闭校验后参数原样发送，便于测试服务端行为"""
+        from sdk import ShelfSDK
+
+        self.assertFalse(ShelfSDK(Mock()).validate_payloads)
+
+        sdk = _make_shelf_sdk()
+        sdk.disable_payload_validation()
+        sdk.create_shelf({"warehouse": 3})
+        sdk.entity.insert.assert_called_once_with({"warehouse": 3})
+        self.assertEqual(sdk.validation_stats["checked"], 0)
+
+    def test_type_declarations(self):
+        """各类字段声明的检查规则"""
+        from sdk.validator import compile_validator
+
+        validate = compile_validator(
+            {
+                "count": "int",
+                "price": "float64",
+                "image": "string[]",
+                "shelf": "shelf[]",
+                "memo": "string",
+            }
+        )
+
+        self.assertIsNone(validate({"count": 1, "price": 10, "memo": None}))
+        self.assertIsNone(validate({"image": ["a.jpg"], "shelf": [{"id": 1}]}))
+        self.assertIsNone(validate({"unknown": object()}))
+        self.assertIsNotNone(validate({"count": True}))
+        self.assertIsNotNone(validate({"count": 1.5}))
+        self.assertIsNotNone(validate({"image": ["a.jpg", 1]}))
+        self.assertIsNotNone(validate({"shelf": [1, 2]}))
+        self.assertIsNotNone(validate(["not", "a", "dict"]))
+
+        with self.assertRaises(ValueError):
+            compile_validator({"x": "decimal"})
+
+    def test_remote_entity_definition(self):
+        """从平台实体定义加载字段类型"""
+        from sdk.base import VMISDKBase
+
+        definition = {
+            "fields": [
+                {"name": "id", "spec": {"primaryKey": True}, "type": {"value": 104}},
+                {"name": "name", "type": {"value": 113}},
+                {"name": "capacity", "type": {"value": 105}},
+                {"name": "warehouse", "type": {"value": 115, "name": "warehouse"}},
+                {
+                    "name": "tags",
+                    "type": {"value": 116, "elemType": {"value": 113}},
+                },
+            ]
+        }
+        session = Mock()
+        session.get.return_value = {"value": definition}
+        sdk = VMISDKBase(session, "/vmi/demo")
+        sdk.enable_payload_validation()
+        sdk.entity = Mock()
+
+        self.assertTrue(sdk.load_remote_schema(12, required=("name",)))
+        session.get.assert_called_once_with("/api/v1/core/entity/query/12")
+
+        self.assertIsNone(sdk.create({"capacity": 1}))
+        self.assertIsNone(sdk.create({"name": "x", "warehouse": 2}))
+        sdk.entity.insert.assert_not_called()
+
+        sdk.create({"name": "x", "warehouse": {"id": 2}, "tags": ["a"]})
+        sdk.entity.insert.assert_called_once()
+
+
+class TestAgingValidation(unittest.TestCase):
+    """老化测试按配置启用参数校验"""
+
+    def _make_worker(self, validate_payloads):
+        from aging_test_simple import AgingTestConfig, AgingTestWorker
+        from sdk import (GoodsSDK, PartnerSDK, ProductSDK, StockinSDK,
+                         StockoutSDK)
+
+        aging = {"validate_payloads": validate_payloads, "idempotent_creates": False}
+        with mock.patch("config_helper.get_aging_params", return_value=aging):
+            config = AgingTestConfig()
+        worker = AgingTestWorker(0, config)
+        for name, sdk_class in (
+            ("partner", PartnerSDK),
+            ("product", ProductSDK),
+            ("goods", GoodsSDK),
+            ("stockin", StockinSDK),
+            ("stockout", StockoutSDK),
+        ):
+            sdk = sdk_class(Mock())
+            sdk.entity = Mock()
+            setattr(worker, f"{name}_sdk", sdk)
+        worker._configure_sdks()
+        return worker
+
+    def test_config_enables_worker_validation(self):
+        """配置 validate_payloads 后工作线程的SDK拒绝不合法参数"""
+        worker = self._make_worker(True)
+        for sdk in worker._entity_sdks().values():
+            self.assertTrue(sdk.validate_payloads)
+
+        self.assertIsNone(worker.partner_sdk.create_partner({"name": "p"}))
+        worker.partner_sdk.entity.insert.assert_not_called()
+        self.assertEqual(worker.partner_sdk.validation_stats["rejected"], 1)
+
+    def test_validation_off_by_default(self):
+        """未配置时参数原样发送"""
+        worker = self._make_worker(False)
+        worker.partner_sdk.create_partner({"name": "p"})
+        worker.partner_sdk.entity.insert.assert_called_once_with({"name": "p"})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
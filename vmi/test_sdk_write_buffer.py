@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+SDK 更新合并缓冲区测试
+验证同一实体的多次更新合并为一次 PUT，无需网络连接
+"""
+
+import gc
+import threading
+import time
+import unittest
+import weakref
+from unittest.mock import Mock
+
+
+def _make_sdk():
+    """创建使用模拟实体的SDK"""
+    from sdk.base import VMISDKBase
+
+    sdk = VMISDKBase(Mock(), "/vmi/warehouse/shelf")
+    sdk.entity = Mock()
+    sdk.entity.update.side_effect = lambda entity_id, param: dict(param)
+    sdk.entity.query.side_effect = lambda entity_id: {"id": entity_id}
+    sdk.entity.delete.side_effect = lambda entity_id: {"id": entity_id}
+    return sdk
+
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    """更新合并缓冲区测试"""
+
+    def test_update_without_buffer_sends_immediately(self):
+        """未启用缓冲区时每次更新直接发送"""
+        sdk = _make_sdk()
+
+        sdk.update(1, {"used": 1})
+        sdk.update(1, {"used": 2})
+
+        self.assertEqual(sdk.entity.update.call_count, 2)
+
+    def test_updates_coalesced_within_window(self):
+        """窗口内同一ID的多次更新合并为一次PUT"""
+        sdk = _make_sdk()
+        sdk.enable_write_buffer(window=0.1)
+        try:
+            for used in range(1, 6):
+                merged = sdk.update(1, {"used": used})
+            sdk.update(1, {"description": "hot"})
+            sdk.update(2, {"used": 9})
+
+            self.assertEqual(merged["used"], 5)
+            sdk.entity.update.assert_not_called()
+
+            deadline = time.time() + 2
+            while sdk.entity.update.call_count < 2 and time.time() < deadline:
+                time.sleep(0.02)
+
+            self.assertEqual(sdk.entity.update.call_count, 2)
+            sent = {c.args[0]: c.args[1] for c in sdk.entity.update.call_args_list}
+            self.assertEqual(sent[1], {"used": 5, "description": "hot", "id": 1})
+            self.assertEqual(sent[2], {"used": 9, "id": 2})
+
+            stats = sdk.write_buffer.get_stats()
+            self.assertEqual(stats["updates_received"], 7)
+            self.assertEqual(stats["updates_coalesced"], 5)
+            self.assertEqual(stats["puts_sent"], 2)
+        finally:
+            sdk.disable_write_buffer()
+
+    def test_query_flushes_pending_update(self):
+        """查询前刷新该ID的待发送更新（读己之写）"""
+        sdk = _make_sdk()
+        sdk.enable_write_buffer(window=60)
+        try:
+            sdk.update(1, {"count": 3})
+            sdk.update(2, {"count": 4})
+
+            sdk.query(1)
+
+            sdk.entity.update.assert_called_once_with(1, {"count": 3, "id": 1})
+            self.assertIsNotNone(sdk.write_buffer.pending(2))
+
+            sdk.filter({})
+            self.assertEqual(sdk.entity.update.call_count, 2)
+            self.assertEqual(sdk.write_buffer.pending_count(), 0)
+        finally:
+            sdk.disable_write_buffer()
+
+    def test_delete_discards_pending_update(self):
+        """删除实体时丢弃待发送的更新"""
+        sdk = _make_sdk()
+        sdk.enable_write_buffer(window=60)
+
+        sdk.update(1, {"count": 3})
+        sdk.delete(1)
+        sdk.disable_write_buffer()
+
+        sdk.entity.update.assert_not_called()
+        sdk.entity.delete.assert_called_once_with(1)
+
+    def test_disable_flushes_pending_updates(self):
+        """关闭缓冲区时刷新全部待发送更新"""
+        sdk = _make_sdk()
+        sdk.enable_write_buffer(window=60)
+
+        sdk.update(1, {"count": 1})
+        sdk.update(1, {"count": 2})
+        sdk.disable_write_buffer()
+
+        sdk.entity.update.assert_called_once_with(1, {"count": 2, "id": 1})
+        self.assertIsNone(sdk.write_buffer)
+
+    def test_flush_callback_and_closed_buffer(self):
+        """每次实际发送更新后回调耗时；关闭后不再接收更新"""
+        sdk = _make_sdk()
+        flushed = []
+        sdk.enable_write_buffer(window=60, on_flush=lambda *args: flushed.append(args))
+        buffer = sdk.write_buffer
+
+        sdk.update(1, {"count": 1})
+        sdk.update(2, {"count": 2})
+        sdk.disable_write_buffer()
+
+        self.assertEqual(sorted(entity_id for entity_id, _, _ in flushed), [1, 2])
+        for _, duration, success in flushed:
+            self.assertTrue(success)
+            self.assertGreaterEqual(duration, 0)
+        with self.assertRaises(RuntimeError):
+            buffer.put(3, {"count": 3})
+
+    def test_query_waits_for_inflight_timer_flush(self):
+        """定时刷新进行中时，查询等待该PUT完成"""
+        sdk = _make_sdk()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_update(entity_id, param):
+            started.set()
+            release.wait(2)
+            return dict(param)
+
+        sdk.entity.update.side_effect = slow_update
+        sdk.enable_write_buffer(window=0.01)
+        try:
+            sdk.update(1, {"count": 1})
+            self.assertTrue(started.wait(2))
+
+            reader = threading.Thread(target=sdk.query, args=(1,))
+            reader.start()
+            time.sleep(0.05)
+            sdk.entity.query.assert_not_called()
+
+            release.set()
+            reader.join(2)
+            sdk.entity.query.assert_called_once_with(1)
+        finally:
+            release.set()
+            sdk.disable_write_buffer()
+
+    def test_delete_waits_for_inflight_update(self):
+        """定时刷新进行中时，删除等待该PUT返回后再发送"""
+        sdk = _make_sdk()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_update(entity_id, param):
+            started.set()
+            release.wait(2)
+            calls.append("update")
+            return dict(param)
+
+        sdk.entity.update.side_effect = slow_update
+        sdk.entity.delete.side_effect = lambda entity_id: calls.append("delete")
+        sdk.enable_write_buffer(window=0.01)
+        try:
+            sdk.update(1, {"count": 1})
+            self.assertTrue(started.wait(2))
+
+            deleter = threading.Thread(target=sdk.delete, args=(1,))
+            deleter.start()
+            time.sleep(0.05)
+            self.assertEqual(calls, [])
+
+            release.set()
+            deleter.join(2)
+            self.assertEqual(calls, ["update", "delete"])
+        finally:
+            release.set()
+            sdk.disable_write_buffer()
+
+    def test_unclosed_buffer_is_collected(self):
+        """未关闭缓冲区的SDK被回收后，缓冲区和刷新线程随之释放"""
+        sdk = _make_sdk()
+        sdk.enable_write_buffer(window=0.01)
+        sdk.update(1, {"count": 1})
+        entity = sdk.entity
+        thread = sdk.write_buffer._thread
+        buffer_ref = weakref.ref(sdk.write_buffer)
+
+        # 待发送的更新在回收前仍会发送
+        del sdk
+        deadline = time.time() + 2
+        while buffer_ref() is not None and time.time() < deadline:
+            gc.collect()
+            time.sleep(0.01)
+
+        self.assertIsNone(buffer_ref())
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
+        entity.update.assert_called_once_with(1, {"count": 1, "id": 1})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
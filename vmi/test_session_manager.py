@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+会话管理器刷新策略测试
+验证刷新时间抖动、按令牌过期时间主动刷新以及登录/刷新单飞，无需外部服务器
+"""
+
+import base64
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+from local_test_server import LocalTestServer
+from session_manager import REFRESH_RETRY_DELAY, SessionManager, token_expire_time
+
+
+def _jwt(claims):
+    """构造未签名的 JWT 令牌"""
+
+    def encode(data):
+        raw = base64.urlsafe_b64encode(json.dumps(data).encode("utf-8"))
+        return raw.decode("ascii").rstrip("=")
+
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.sig"
+
+
+def _run_concurrently(func, count):
+    """多个线程同时调用 func，返回各自的结果"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+class TestTokenExpireTime(unittest.TestCase):
+    """令牌过期时间解析测试"""
+
+    def test_entity_expire_time(self):
+        """优先使用会话实体中的 expireTime（毫秒）"""
+        self.assertEqual(token_expire_time("opaque", {"expireTime": 1500}), 1.5)
+
+    def test_jwt_exp(self):
+        """解析 JWT 令牌的 exp"""
+        self.assertEqual(token_expire_time(_jwt({"exp": 1700000000})), 1700000000)
+
+    def test_unknown(self):
+        """无法确定过期时间时返回 None"""
+        self.assertIsNone(token_expire_time("opaque-token", {"account": "a"}))
+        self.assertIsNone(token_expire_time(_jwt({"sub": "a"})))
+        self.assertIsNone(token_expire_time("a.not-base64!.c"))
+        self.assertIsNone(token_expire_time(None))
+
+
+class TestRefreshDeadline(unittest.TestCase):
+    """刷新时间计算测试"""
+
+    def test_jitter_spreads_refresh(self):
+        """同时登录的会话刷新时间分散在 [间隔*(1-抖动), 间隔] 内"""
+        with LocalTestServer() as server:
+            managers = [
+                SessionManager(server.url, "", f"user{i}", "pwd", refresh_interval=100)
+                for i in range(20)
+            ]
+            for manager in managers:
+                self.assertTrue(manager.create_session())
+
+            leads = [m.next_refresh_time - m.last_refresh_time for m in managers]
+            for manager in managers:
+                manager.close_session()
+
+        self.assertGreater(len({round(lead, 3) for lead in leads}), 10)
+        self.assertTrue(all(90 <= lead <= 100 for lead in leads))
+
+    def test_no_jitter(self):
+        """抖动为 0 时按固定间隔刷新"""
+        with LocalTestServer() as server:
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=100, refresh_jitter=0
+            )
+            self.assertTrue(manager.create_session())
+            lead = manager.next_refresh_time - manager.last_refresh_time
+            manager.close_session()
+
+        self.assertAlmostEqual(lead, 100, places=3)
+
+    def test_refresh_before_token_expires(self):
+        """令牌有效期短于刷新间隔时，在过期前主动刷新"""
+        with LocalTestServer(session_ttl=10) as server:
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=540
+            )
+            self.assertTrue(manager.create_session())
+            self.assertIsNotNone(manager.token_expire_time)
+            lead = manager.next_refresh_time - manager.last_refresh_time
+            manager.close_session()
+
+        self.assertLessEqual(lead, 8.01)
+
+    def test_expiry_driven_auto_refresh(self):
+        """自动刷新按令牌过期时间触发"""
+        with LocalTestServer(session_ttl=0.2) as server:
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=540
+            )
+            try:
+                self.assertTrue(manager.create_session())
+                manager.start_auto_refresh()
+                time.sleep(0.6)
+                self.assertGreaterEqual(server.stats["refreshes"], 2)
+                self.assertEqual(server.stats["logins"], 1)
+            finally:
+                manager.close_session()
+
+    def test_expired_token_waits_retry_delay(self):
+        """令牌已过期时按重试间隔刷新，不立即重复刷新"""
+        with LocalTestServer(session_ttl=-10) as server:
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=540, refresh_jitter=0
+            )
+            self.assertTrue(manager.create_session())
+            lead = manager.next_refresh_time - manager.last_refresh_time
+            manager.close_session()
+
+        self.assertAlmostEqual(lead, REFRESH_RETRY_DELAY, places=3)
+
+    def test_refresh_not_extending_expiry_waits_retry_delay(self):
+        """刷新没有延长令牌有效期时按重试间隔再刷新"""
+        expire_at = time.time() + 10
+        with LocalTestServer() as server, mock.patch(
+            "session_manager.token_expire_time", return_value=expire_at
+        ):
+            manager = SessionManager(
+                server.url, "", "user", "pwd", refresh_interval=540, refresh_jitter=0
+            )
+            self.assertTrue(manager.create_session())
+            first = manager.next_refresh_time - manager.last_refresh_time
+            self.assertTrue(manager.refresh_session())
+            second = manager.next_refresh_time - manager.last_refresh_time
+            manager.close_session()
+
+        self.assertLessEqual(first, 8.01)
+        self.assertAlmostEqual(second, REFRESH_RETRY_DELAY, places=3)
+
+
+class TestSingleFlight(unittest.TestCase):
+    """登录/刷新单飞测试"""
+
+    def test_concurrent_reconnect_logs_in_once(self):
+        """并发重新登录只请求一次，其他调用方复用结果"""
+        with LocalTestServer() as server:
+            manager = SessionManager(server.url, "", "user", "pwd")
+            self.assertTrue(manager.create_session())
+            server.latency = 0.2
+
+            results = _run_concurrently(manager.reconnect, 8)
+            manager.close_session()
+
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(server.stats["logins"], 2)
+        self.assertEqual(manager.auth_stats["joined"], 7)
+
+    def test_refresh_and_reconnect_are_not_joined(self):
+        """刷新与重新登录并发时依次执行，只复用同一操作的结果"""
+        with LocalTestServer() as server:
+            manager = SessionManager(server.url, "", "user", "pwd")
+            self.assertTrue(manager.create_session())
+            server.latency = 0.2
+
+            calls = [manager.refresh_session, manager.reconnect] * 3
+            results = _run_concurrently(lambda: calls.pop()(), len(calls))
+            manager.close_session()
+
+        self.assertTrue(all(results))
+        # 首次登录 + 一次刷新 + 一次重新登录，其余调用方复用同一操作的结果
+        self.assertEqual(server.stats["refreshes"], 1)
+        self.assertEqual(server.stats["logins"], 2)
+        self.assertEqual(manager.auth_stats["joined"], 4)
+
+    def test_sequential_calls_are_not_joined(self):
+        """顺序调用各自执行"""
+        with LocalTestServer() as server:
+            manager = SessionManager(server.url, "", "user", "pwd")
+            self.assertTrue(manager.create_session())
+            self.assertTrue(manager.refresh_session())
+            self.assertTrue(manager.refresh_session())
+            manager.close_session()
+
+        self.assertEqual(server.stats["refreshes"], 2)
+        self.assertEqual(manager.auth_stats["joined"], 0)
+
+    def test_managers_with_same_identity_take_turns(self):
+        """同一身份的不同会话管理器依次刷新，各自完成自己的刷新"""
+        with LocalTestServer() as server:
+            managers = [SessionManager(server.url, "", "user", "pwd") for _ in range(2)]
+            for manager in managers:
+                self.assertTrue(manager.create_session())
+            server.latency = 0.2
+
+            start = time.time()
+            results = _run_concurrently(lambda: managers.pop().refresh_session(), 2)
+            elapsed = time.time() - start
+
+        self.assertEqual(results, [True, True])
+        self.assertEqual(server.stats["refreshes"], 2)
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    def test_separate_scopes_run_in_parallel(self):
+        """单飞范围不同的会话管理器可以并行登录"""
+        with LocalTestServer() as server:
+            server.latency = 0.2
+            managers = [
+                SessionManager(server.url, "", "user", "pwd", auth_scope=str(i))
+                for i in range(4)
+            ]
+            start = time.time()
+            results = _run_concurrently(lambda: managers.pop().create_session(), 4)
+            elapsed = time.time() - start
+
+        self.assertEqual(results, [True] * 4)
+        self.assertLess(elapsed, 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+会话池测试
+验证并行登录、借出/归还以及并发测试运行器的登录耗时与操作耗时分离，无需外部服务器
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from local_test_server import LocalTestServer
+from refresh_scheduler import RefreshScheduler
+from session_pool import SessionPool
+
+
+def _make_pool(server, size, **kwargs):
+    return SessionPool(server.url, "", "user", "pwd", size=size, **kwargs)
+
+
+class TestSessionPool(unittest.TestCase):
+    """会话池测试"""
+
+    def test_parallel_login(self):
+        """启动时并行登录全部会话"""
+        with LocalTestServer() as server:
+            server.latency = 0.2
+            with _make_pool(server, 8) as pool:
+                stats = pool.get_stats()
+
+        self.assertEqual(server.stats["logins"], 8)
+        self.assertEqual(stats["ready"], 8)
+        self.assertEqual(stats["login_failures"], 0)
+        # 串行登录需要 1.6 秒
+        self.assertLess(stats["startup_time"], 1.0)
+        self.assertGreaterEqual(stats["avg_login_time"], 0.2)
+
+    def test_checkout_and_checkin(self):
+        """借出的会话归还后可以再次借出，会话用尽时等待超时返回 None"""
+        with LocalTestServer() as server:
+            with _make_pool(server, 2) as pool:
+                first = pool.checkout()
+                second = pool.checkout()
+                self.assertIsNot(first, second)
+                self.assertTrue(first.is_logged_in and second.is_logged_in)
+                self.assertIsNone(pool.checkout(timeout=0.05))
+
+                pool.checkin(first)
+                self.assertIs(pool.checkout(timeout=0.05), first)
+                stats = pool.get_stats()
+
+        self.assertEqual(server.stats["logins"], 2)
+        self.assertEqual(stats["checkouts"], 3)
+        self.assertEqual(stats["checkout_timeouts"], 1)
+
+    def test_invalid_session_reconnects_on_checkout(self):
+        """借出已失效的会话时先重新登录"""
+        with LocalTestServer() as server:
+            with _make_pool(server, 1) as pool:
+                with pool.session() as manager:
+                    manager.is_logged_in = False
+                with pool.session() as manager:
+                    self.assertTrue(manager.is_logged_in)
+                stats = pool.get_stats()
+
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertEqual(server.stats["logins"], 2)
+
+    def test_login_failures_are_counted(self):
+        """服务器不可用时会话池为空，借出返回 None"""
+        with LocalTestServer() as server:
+            url = server.url
+        pool = SessionPool(url, "", "user", "pwd", size=2, login_timeout=5)
+        self.assertEqual(pool.start(), 0)
+        self.assertEqual(pool.get_stats()["login_failures"], 2)
+        self.assertIsNone(pool.checkout(timeout=0.05))
+        pool.close()
+
+    def test_late_logins_are_closed(self):
+        """启动超时后才完成的登录不放入会话池，完成后立即关闭"""
+        with LocalTestServer() as server:
+            server.latency = 0.3
+            pool = _make_pool(server, 2, login_timeout=0.05)
+            self.assertEqual(pool.start(), 0)
+            deadline = time.time() + 2
+            while pool.get_stats()["late_logins"] < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(pool.get_stats()["late_logins"], 2)
+            self.assertFalse(any(m.is_logged_in for m in pool._managers))
+            self.assertIsNone(pool.checkout(timeout=0.05))
+            pool.close()
+
+    def test_failed_reconnect_retires_session(self):
+        """重新登录失败的会话从池中移除，借出其他会话；全部移除后返回 None"""
+        with LocalTestServer() as server:
+            with _make_pool(server, 2) as pool:
+                broken = pool.checkout()
+                healthy = pool.checkout()
+                pool.checkin(broken)
+                pool.checkin(healthy)
+                broken.is_logged_in = False
+                with mock.patch.object(broken, "reconnect", return_value=False):
+                    self.assertIs(pool.checkout(timeout=0.05), healthy)
+                self.assertEqual(pool.get_stats()["ready"], 1)
+                self.assertNotIn(broken, pool._managers)
+
+                healthy.is_logged_in = False
+                pool.checkin(healthy)
+                with mock.patch.object(healthy, "reconnect", return_value=False):
+                    self.assertIsNone(pool.checkout())
+                stats = pool.get_stats()
+
+        self.assertEqual(stats["retired"], 2)
+        self.assertEqual(stats["ready"], 0)
+
+    def test_single_refresher_for_pool(self):
+        """池中会话由同一个调度器刷新"""
+        scheduler = RefreshScheduler(name="test-pool-scheduler")
+        with LocalTestServer() as server:
+            threads_before = threading.active_count()
+            with _make_pool(
+                server, 6, refresh_interval=0.1, scheduler=scheduler
+            ) as pool:
+                deadline = time.time() + 2
+                while server.stats["refreshes"] < 12 and time.time() < deadline:
+                    time.sleep(0.01)
+                self.assertGreaterEqual(server.stats["refreshes"], 12)
+                self.assertEqual(len(scheduler), 6)
+                self.assertEqual(pool.get_stats()["ready"], 6)
+            scheduler.shutdown()
+            self.assertLessEqual(threading.active_count(), threads_before + 1)
+
+
+class TestConcurrentRunnerWithPool(unittest.TestCase):
+    """并发测试运行器使用会话池测试"""
+
+    def test_login_not_counted_in_response_time(self):
+        """每个工作线程不再单独登录，响应时间不包含登录耗时"""
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        with LocalTestServer() as server:
+            server.latency = 0.3
+            with _make_pool(server, 4) as pool:
+                runner = ConcurrentTestRunner(max_workers=4, session_pool=pool)
+
+                def operation(worker_id, session_manager):
+                    self.assertTrue(session_manager.is_logged_in)
+                    time.sleep(0.01)
+
+                result = runner.run_concurrent_test(operation, "pool_test", 20)
+
+        self.assertEqual(result.successful_requests, 20)
+        self.assertEqual(server.stats["logins"], 4)
+        self.assertLess(result.max_response_time, 0.2)
+        self.assertGreaterEqual(result.session_setup_time, 0.3)
+        detail = runner.generate_report()["detailed_results"][0]
+        self.assertEqual(detail["session_setup_time"], result.session_setup_time)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+流式统计测试
+验证运行统计、环形窗口、衰减速率以及老化测试工作线程的常量内存统计，不访问服务器
+"""
+
+import random
+import statistics
+import threading
+import unittest
+
+from streaming_stats import DecayedRate, RollingWindow, RunningStats
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRunningStats(unittest.TestCase):
+    """运行统计测试"""
+
+    def test_matches_statistics_module(self):
+        rng = random.Random(1)
+        values = [rng.uniform(0.01, 2.0) for _ in range(1000)]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(values))
+        self.assertEqual(stats.min, min(values))
+        self.assertEqual(stats.max, max(values))
+
+    def test_empty(self):
+        stats = RunningStats()
+        self.assertEqual(stats.to_dict()["mean"], 0.0)
+        self.assertEqual(stats.stdev, 0.0)
+
+
+class TestRollingWindow(unittest.TestCase):
+    """环形窗口测试"""
+
+    def test_keeps_last_values(self):
+        window = RollingWindow(100)
+        for value in range(1, 1001):
+            window.add(float(value))
+        self.assertTrue(window.full)
+        self.assertEqual(len(window), 100)
+        self.assertEqual(list(window)[0], 901.0)
+        self.assertAlmostEqual(window.mean, statistics.mean(range(901, 1001)))
+
+    def test_partial_and_invalid(self):
+        window = RollingWindow(10)
+        self.assertEqual(window.mean, 0.0)
+        window.add(2.0)
+        window.add(4.0)
+        self.assertFalse(window.full)
+        self.assertEqual(window.mean, 3.0)
+        with self.assertRaises(ValueError):
+            RollingWindow(0)
+
+
+class TestDecayedRate(unittest.TestCase):
+    """衰减速率测试"""
+
+    def test_tracks_current_rate(self):
+        clock = FakeClock()
+        rate = DecayedRate(half_life=10, clock=clock)
+        # 刚开始时按已运行时间修正
+        for _ in range(20):
+            clock.now += 0.1
+            rate.mark()
+        self.assertAlmostEqual(rate.rate(), 10, delta=1)
+
+        for _ in range(600):
+            clock.now += 0.1
+            rate.mark()
+        self.assertAlmostEqual(rate.rate(), 10, delta=0.5)
+
+        # 速率下降后很快反映出来，而不是全程平均
+        for _ in range(60):
+            clock.now += 1.0
+            rate.mark()
+        self.assertAlmostEqual(rate.rate(), 1, delta=0.3)
+
+        clock.now += 100
+        self.assertLess(rate.rate(), 0.01)
+
+    def test_rate_does_not_change_state(self):
+        """rate() 只读：其他线程频繁读取不会重复衰减或丢失记录"""
+        clock = FakeClock()
+        read, unread = (DecayedRate(half_life=10, clock=clock) for _ in range(2))
+        for _ in range(50):
+            clock.now += 0.3
+            for rate in (read, unread):
+                rate.mark()
+            for _ in range(3):
+                read.rate()
+        self.assertAlmostEqual(read.rate(), unread.rate(), places=12)
+
+        rate = DecayedRate(half_life=1e9)
+        stop = threading.Event()
+
+        def read_until_stopped():
+            while not stop.is_set():
+                rate.rate()
+
+        reader = threading.Thread(target=read_until_stopped)
+        reader.start()
+        for _ in range(20000):
+            rate.mark()
+        stop.set()
+        reader.join()
+        self.assertAlmostEqual(rate._state[0], 20000, delta=0.01)
+
+    def test_invalid_half_life(self):
+        with self.assertRaises(ValueError):
+            DecayedRate(half_life=0)
+
+
+class TestAgingWorkerStatistics(unittest.TestCase):
+    """老化测试工作线程统计"""
+
+    def test_constant_memory_statistics(self):
+        from aging_test_simple import AgingTestConfig, AgingTestWorker
+
+        config = AgingTestConfig()
+        config.workload = {}
+        config.performance_degradation_threshold = 20.0
+        worker = AgingTestWorker(0, config)
+        for i in range(5000):
+            duration = 0.1 if i < 4900 else 0.2
+            worker._record_result("partner", "read", i % 50 != 0, duration, None)
+            worker._update_performance_window(duration)
+            worker._detect_degradation("partner.read", duration)
+
+        self.assertEqual(len(worker.performance_window), 100)
+        self.assertAlmostEqual(worker.baseline_performance, 0.1)
+        self.assertAlmostEqual(worker.check_performance_degradation(), 100.0)
+
+        stats = worker.get_statistics()
+        self.assertEqual(stats["total_operations"], 5000)
+        self.assertEqual(stats["failed_operations"], 100)
+        self.assertAlmostEqual(stats["avg_duration"], 0.102)
+        self.assertAlmostEqual(stats["current_performance"], 0.2)
+        self.assertGreater(stats["recent_operations_per_second"], 0)
+        self.assertAlmostEqual(stats["recent_error_rate"], 2.0, delta=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
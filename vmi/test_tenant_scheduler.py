@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+多租户公平调度器测试
+验证各租户并发执行、并发配额、轮询与加权公平调度，无需外部服务器
+"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+from unittest.mock import Mock
+
+import tenant_scheduler
+from tenant_scheduler import ROUND_ROBIN, WEIGHTED_FAIR, TenantScheduler
+
+
+class SchedulerTestCase(unittest.TestCase):
+    """调度器测试基类"""
+
+    def make_scheduler(self, **kwargs):
+        scheduler = TenantScheduler(**kwargs)
+        self.addCleanup(scheduler.shutdown)
+        return scheduler
+
+    def block_worker(self, scheduler):
+        """占住唯一的工作线程，便于先提交全部任务再开始调度"""
+        gate = threading.Event()
+        scheduler.submit("gate", lambda tenant_id: gate.wait(5))
+        time.sleep(0.05)
+        return gate
+
+
+class TestTenantScheduler(SchedulerTestCase):
+    """多租户调度器测试"""
+
+    def test_all_tenants_run_at_once(self):
+        """所有租户同时执行而不是依次执行"""
+        scheduler = self.make_scheduler(max_workers=8)
+
+        start_time = time.time()
+        results = scheduler.run_for_all_tenants(
+            lambda tenant_id: time.sleep(0.2) or tenant_id,
+            tenant_ids=["t1", "t2", "t3", "t4"],
+        )
+
+        self.assertLess(time.time() - start_time, 0.5)
+        self.assertEqual(results["t3"], {"status": "passed", "result": "t3"})
+
+    def test_failures_are_isolated(self):
+        """单个租户失败不影响其他租户"""
+        scheduler = self.make_scheduler(max_workers=2)
+
+        def task(tenant_id):
+            if tenant_id == "bad":
+                raise ValueError("boom")
+            return "ok"
+
+        results = scheduler.run_for_all_tenants(task, tenant_ids=["good", "bad"])
+
+        self.assertEqual(results["good"]["status"], "passed")
+        self.assertEqual(results["bad"], {"status": "failed", "error": "boom"})
+        stats = scheduler.get_stats()
+        self.assertEqual(stats["tenants"]["bad"]["failed"], 1)
+        self.assertEqual(stats["total_completed"], 1)
+
+    def test_per_tenant_concurrency_quota(self):
+        """单个租户的并发数不超过配额，其他租户不受其积压影响"""
+        scheduler = self.make_scheduler(
+            max_workers=8, per_tenant_concurrency=2, concurrency={"quiet": 1}
+        )
+        lock = threading.Lock()
+        active = {"busy": [0, 0], "quiet": [0, 0]}
+
+        def task(tenant_id):
+            with lock:
+                active[tenant_id][0] += 1
+                active[tenant_id][1] = max(active[tenant_id][1], active[tenant_id][0])
+            time.sleep(0.02)
+            with lock:
+                active[tenant_id][0] -= 1
+
+        for _ in range(10):
+            scheduler.submit("busy", task)
+        quiet = scheduler.submit("quiet", task)
+
+        quiet.result(timeout=1)
+        self.assertLess(scheduler.get_stats()["tenants"]["busy"]["completed"], 10)
+        self.assertTrue(scheduler.wait_all(timeout=2))
+        self.assertEqual(active["busy"][1], 2)
+        self.assertEqual(active["quiet"][1], 1)
+
+    def test_round_robin(self):
+        """轮询策略依次从各租户取任务"""
+        scheduler = self.make_scheduler(max_workers=1, policy=ROUND_ROBIN)
+        order = []
+        gate = self.block_worker(scheduler)
+        for tenant_id in ("a", "b", "c"):
+            for _ in range(3):
+                scheduler.submit(tenant_id, order.append)
+        gate.set()
+
+        self.assertTrue(scheduler.wait_all(timeout=2))
+        self.assertEqual(order, ["a", "b", "c"] * 3)
+
+    def test_weighted_fair_share(self):
+        """加权公平策略按权重分配执行时间"""
+        scheduler = self.make_scheduler(
+            max_workers=1, policy=WEIGHTED_FAIR, weights={"heavy": 3, "light": 1}
+        )
+        order = []
+
+        def task(tenant_id):
+            order.append(tenant_id)
+            time.sleep(0.005)
+
+        gate = self.block_worker(scheduler)
+        for _ in range(40):
+            scheduler.submit("heavy", task)
+            scheduler.submit("light", task)
+        gate.set()
+
+        self.assertTrue(scheduler.wait_all(timeout=5))
+        first = order[:40]
+        self.assertGreaterEqual(first.count("heavy"), 26)
+        self.assertLessEqual(first.count("heavy"), 34)
+
+    def test_slow_tenant_does_not_starve_others(self):
+        """加权公平按执行时间计费，慢租户不会占满工作线程"""
+        scheduler = self.make_scheduler(max_workers=1, policy=WEIGHTED_FAIR)
+        order = []
+
+        def task(tenant_id):
+            order.append(tenant_id)
+            time.sleep(0.02 if tenant_id == "noisy" else 0.002)
+
+        gate = self.block_worker(scheduler)
+        for _ in range(20):
+            scheduler.submit("noisy", task)
+            scheduler.submit("victim", task)
+        gate.set()
+
+        self.assertTrue(scheduler.wait_all(timeout=5))
+        first = order[:20]
+        self.assertGreater(first.count("victim"), 2 * first.count("noisy"))
+
+    def test_session_checked_before_each_task(self):
+        """执行任务前确保租户会话有效，无效时任务失败"""
+        manager = Mock()
+        manager.get_enabled_tenant_ids.return_value = ["t1", "t2"]
+        manager.ensure_session_valid.side_effect = lambda tenant_id: tenant_id == "t1"
+        scheduler = self.make_scheduler(multi_tenant_mgr=manager, max_workers=2)
+
+        results = scheduler.run_for_all_tenants(lambda tenant_id: tenant_id)
+
+        self.assertEqual(results["t1"]["status"], "passed")
+        self.assertEqual(results["t2"]["status"], "failed")
+
+    def test_platform_stats(self):
+        """统计平台总吞吐量和各租户排队时间"""
+        scheduler = self.make_scheduler(max_workers=4)
+        for _ in range(8):
+            for tenant_id in ("a", "b"):
+                scheduler.submit(tenant_id, lambda tenant_id: time.sleep(0.01))
+        self.assertTrue(scheduler.wait_all(timeout=2))
+
+        stats = scheduler.get_stats()
+        self.assertEqual(stats["total_completed"], 16)
+        self.assertGreater(stats["throughput"], 0)
+        self.assertEqual(len(stats["tenants"]["a"]["service_times"]), 8)
+        self.assertGreaterEqual(stats["tenants"]["b"]["avg_service_time"], 0.01)
+
+    def test_samples_are_bounded(self):
+        """只保留最近的耗时样本，平均值和最大值按全部任务统计"""
+        with mock.patch.object(tenant_scheduler, "SAMPLE_WINDOW", 5):
+            scheduler = self.make_scheduler(max_workers=1)
+            scheduler.submit("a", lambda tenant_id: time.sleep(0.05))
+            for _ in range(20):
+                scheduler.submit("a", lambda tenant_id: None)
+            self.assertTrue(scheduler.wait_all(timeout=2))
+
+        stats = scheduler.get_stats()["tenants"]["a"]
+        self.assertEqual(len(stats["service_times"]), 5)
+        self.assertGreaterEqual(stats["max_service_time"], 0.05)
+        self.assertGreater(stats["avg_service_time"], 0.05 / 21)
+        self.assertGreaterEqual(stats["max_queue_wait"], 0.05)
+
+    def test_unknown_policy(self):
+        """未知调度策略报错"""
+        with self.assertRaises(ValueError):
+            TenantScheduler(policy="fifo")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
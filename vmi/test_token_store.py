@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+会话令牌缓存测试
+验证令牌加密保存、失效处理以及会话管理器复用缓存令牌，无需外部服务器
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import token_store
+from local_test_server import LocalTestServer
+from session_manager import SessionManager
+from session_pool import SessionPool
+from token_store import TokenCipher, TokenStore, token_store_from_config
+
+IDENTITY = ("http://127.0.0.1:1", "autotest", "administrator")
+
+
+class TokenStoreTestCase(unittest.TestCase):
+    """使用临时目录的令牌缓存测试基类"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "tokens.json")
+        self.key = TokenCipher.generate_key()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_store(self, **kwargs):
+        kwargs.setdefault("key", self.key)
+        return TokenStore(self.path, **kwargs)
+
+
+class TestTokenStore(TokenStoreTestCase):
+    """令牌缓存读写测试"""
+
+    def test_round_trip_is_encrypted(self):
+        """保存后可读出，文件中没有明文令牌和身份"""
+        store = self.make_store()
+        store.put(IDENTITY, "secret-token", {"account": "administrator"})
+
+        cached = self.make_store().get(IDENTITY)
+        self.assertEqual(cached["token"], "secret-token")
+        self.assertEqual(cached["entity"], {"account": "administrator"})
+
+        with open(self.path, encoding="utf-8") as f:
+            content = f.read()
+        self.assertNotIn("secret-token", content)
+        self.assertNotIn("administrator", content)
+
+    def test_wrong_key_or_tampered_data_is_ignored(self):
+        """密钥不匹配或数据被篡改时视为未命中"""
+        self.make_store().put(IDENTITY, "secret-token")
+        other = TokenStore(self.path, key=TokenCipher.generate_key())
+        self.assertIsNone(other.get(IDENTITY))
+
+        store = self.make_store()
+        store.put(IDENTITY, "secret-token")
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        record = next(iter(data["entries"].values()))
+        record["data"] = record["data"][:-6] + "AAAAAA"
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        self.assertIsNone(store.get(IDENTITY))
+
+    def test_expired_tokens_are_not_reused(self):
+        """超过最长使用时间或已过 expireTime 的令牌不再复用"""
+        store = self.make_store(max_age=0.05)
+        store.put(IDENTITY, "t1")
+        time.sleep(0.1)
+        self.assertIsNone(store.get(IDENTITY))
+
+        store = self.make_store()
+        store.put(IDENTITY, "t2", {"expireTime": int((time.time() - 1) * 1000)})
+        self.assertIsNone(store.get(IDENTITY))
+
+    def test_identities_are_separate(self):
+        """不同身份互不影响"""
+        store = self.make_store()
+        store.put(IDENTITY, "t1")
+        store.put(IDENTITY[:2] + ("other",), "t2")
+        store.delete(IDENTITY)
+
+        self.assertIsNone(store.get(IDENTITY))
+        self.assertEqual(store.get(IDENTITY[:2] + ("other",))["token"], "t2")
+
+    def test_key_file_created_once(self):
+        """未指定密钥时生成密钥文件并在后续实例中复用"""
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("VMI_TOKEN_CACHE_KEY", None)
+            TokenStore(self.path).put(IDENTITY, "t1")
+            self.assertEqual(TokenStore(self.path).get(IDENTITY)["token"], "t1")
+        self.assertEqual(os.stat(self.path + ".key").st_mode & 0o777, 0o600)
+
+    def test_from_config(self):
+        """按配置和环境变量启用"""
+        config = {"token_cache": True, "token_cache_file": self.path}
+        with mock.patch.dict(os.environ, {"VMI_TOKEN_CACHE_KEY": self.key.decode()}):
+            os.environ.pop("VMI_TOKEN_CACHE", None)
+            self.assertIsInstance(token_store_from_config(config), TokenStore)
+            self.assertIsNone(token_store_from_config({"token_cache": False}))
+            os.environ["VMI_TOKEN_CACHE"] = "0"
+            self.assertIsNone(token_store_from_config(config))
+            os.environ["VMI_TOKEN_CACHE"] = "1"
+            self.assertIsNotNone(
+                token_store_from_config({"token_cache_file": self.path})
+            )
+
+
+class TestSessionManagerTokenCache(TokenStoreTestCase):
+    """会话管理器复用缓存令牌测试"""
+
+    def _manager(self, server, store):
+        return SessionManager(server.url, "", "administrator", "pwd", token_store=store)
+
+    def test_second_process_skips_login(self):
+        """后续会话使用缓存令牌，只发一次刷新请求"""
+        with LocalTestServer(require_auth=True) as server:
+            first = self._manager(server, self.make_store())
+            self.assertTrue(first.create_session())
+            first.close_session()
+
+            second = self._manager(server, self.make_store())
+            self.assertTrue(second.create_session())
+            self.assertEqual(server.stats["logins"], 1)
+            self.assertEqual(server.stats["refreshes"], 1)
+
+            # 复用的令牌可以正常访问接口
+            result = second.get_session().get("/api/v1/vmi/partners/")
+            self.assertEqual(result, {"values": []})
+            second.close_session()
+
+    def test_stale_token_falls_back_to_login(self):
+        """缓存令牌已失效时执行完整登录并更新缓存"""
+        with LocalTestServer() as server:
+            store = self.make_store()
+            store.put((server.url, "", "administrator"), "stale-token")
+
+            manager = self._manager(server, store)
+            self.assertTrue(manager.create_session())
+            self.assertEqual(server.stats["logins"], 1)
+            self.assertEqual(
+                store.get((server.url, "", "administrator"))["token"],
+                manager.cas_session.get_session_token(),
+            )
+            manager.close_session()
+
+    def test_refresh_and_reconnect_update_cache(self):
+        """刷新后缓存新令牌，重新登录不复用旧令牌"""
+        with LocalTestServer() as server:
+            store = self.make_store()
+            identity = (server.url, "", "administrator")
+            manager = self._manager(server, store)
+            self.assertTrue(manager.create_session())
+
+            self.assertTrue(manager.refresh_session())
+            token = manager.cas_session.get_session_token()
+            self.assertEqual(store.get(identity)["token"], token)
+
+            self.assertTrue(manager.reconnect())
+            self.assertEqual(server.stats["logins"], 2)
+            self.assertNotEqual(store.get(identity)["token"], token)
+            manager.close_session()
+
+
+class TestDefaultTokenStore(TokenStoreTestCase):
+    """进程级默认令牌缓存测试"""
+
+    def setUp(self):
+        super().setUp()
+        token_store.reset_default_token_store()
+        self.addCleanup(token_store.reset_default_token_store)
+
+    def test_default_from_session_config(self):
+        """按会话配置创建一次并复用"""
+        config = {"token_cache": True, "token_cache_file": self.path}
+        env = {"VMI_TOKEN_CACHE_KEY": self.key.decode(), "VMI_TOKEN_CACHE": ""}
+        with mock.patch.dict(os.environ, env), mock.patch(
+            "config_helper.get_session_config", return_value=config
+        ):
+            store = token_store.default_token_store()
+            self.assertIsInstance(store, TokenStore)
+            self.assertIs(token_store.default_token_store(), store)
+
+        token_store.set_default_token_store(None)
+        self.assertIsNone(token_store.default_token_store())
+
+    def test_pool_sessions_do_not_share_default(self):
+        """会话池不使用默认缓存，同一身份的会话不会互相吊销令牌"""
+        store = self.make_store()
+        token_store.set_default_token_store(store)
+        with LocalTestServer(require_auth=True) as server:
+            single = SessionManager(
+                server.url, "", "administrator", "pwd", token_store=store
+            )
+            self.assertTrue(single.create_session())
+            self.assertIsNotNone(store.get(single._identity()))
+
+            with SessionPool(
+                server.url, "", "administrator", "pwd", size=4, login_workers=1
+            ) as pool:
+                managers = [pool.checkout(timeout=1) for _ in range(4)]
+                tokens = [m.cas_session.get_session_token() for m in managers]
+                for token in tokens:
+                    headers = {"Authorization": f"Bearer {token}"}
+                    self.assertTrue(server._authorized(headers))
+
+            self.assertEqual(server.stats["logins"], 5)
+            self.assertEqual(server.stats["refreshes"], 0)
+            single.close_session()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+虚拟用户引擎测试
+验证上万协程用户并发、思考时间、同步场景的会话调度和运行器集成，使用本地测试服务器
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import unittest
+from unittest import mock
+
+from local_test_server import LocalTestServer
+from session_pool import SessionPool
+from virtual_users import CONSTANT, VirtualUserEngine
+
+
+class TestVirtualUserEngine(unittest.TestCase):
+    """虚拟用户引擎测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalTestServer()
+        cls.server.start()
+        cls.pool = SessionPool(cls.server.url, "", "user", "pwd", size=4)
+        cls.pool.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.server.stop()
+
+    def test_ten_thousand_concurrent_users(self):
+        """单个进程中 10000 个协程用户同时进行操作"""
+        sessions = set()
+
+        async def operation(worker_id, session_manager):
+            sessions.add(id(session_manager))
+            await asyncio.sleep(0.2)
+
+        engine = VirtualUserEngine(
+            self.pool, users=10000, think_time=0.05, iterations=2, seed=1
+        )
+        start = time.time()
+        result = engine.run(operation, "vu_10k")
+
+        self.assertLess(time.time() - start, 10)
+        self.assertEqual(engine.peak_active, 10000)
+        self.assertEqual(result.mode, "virtual_users")
+        self.assertEqual(result.virtual_users, 10000)
+        self.assertEqual(result.total_requests, 20000)
+        self.assertEqual(result.successful_requests, 20000)
+        self.assertEqual(result.latency_histogram.count, 20000)
+        self.assertGreaterEqual(result.min_response_time, 0.2)
+        # 协程场景按用户共享池中的会话
+        self.assertEqual(len(sessions), 4)
+        self.assertEqual(self.pool.get_stats()["available"], 4)
+
+    def test_per_user_think_time(self):
+        """每个用户使用自己的思考时间，持续时间结束后不再发起操作"""
+        calls = {}
+
+        async def operation(worker_id, session_manager):
+            # 每个用户在自己的任务中执行
+            user = asyncio.current_task().get_name()
+            calls.setdefault(user, []).append(worker_id)
+
+        def think_time(user_id):
+            return 0.05 if user_id == 0 else 0.25
+
+        engine = VirtualUserEngine(
+            self.pool,
+            users=2,
+            think_time=think_time,
+            think_distribution=CONSTANT,
+            duration=0.5,
+        )
+        result = engine.run(operation, "vu_think")
+
+        counts = sorted(len(worker_ids) for worker_ids in calls.values())
+        self.assertEqual(len(counts), 2)
+        self.assertIn(counts[0], (2, 3))
+        self.assertGreaterEqual(counts[1], 8)
+        worker_ids = [i for ids in calls.values() for i in ids]
+        self.assertEqual(result.total_requests, len(worker_ids))
+        self.assertEqual(len(set(worker_ids)), len(worker_ids))
+
+    def test_blocking_scenario_borrows_sessions(self):
+        """同步场景在线程池中执行，同时进行的请求不超过会话数，每次独占会话"""
+        lock = threading.Lock()
+        in_use = set()
+        active = {"now": 0, "peak": 0}
+
+        def operation(worker_id, session_manager):
+            self.assertTrue(session_manager.is_logged_in)
+            with lock:
+                self.assertNotIn(id(session_manager), in_use)
+                in_use.add(id(session_manager))
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                in_use.discard(id(session_manager))
+                active["now"] -= 1
+            if worker_id % 10 == 0:
+                raise RuntimeError("模拟失败")
+
+        engine = VirtualUserEngine(self.pool, users=50, think_time=0, iterations=2)
+        result = engine.run(operation, "vu_blocking")
+
+        self.assertEqual(active["peak"], 4)
+        self.assertEqual(result.total_requests, 100)
+        self.assertEqual(result.failed_requests, 10)
+        self.assertEqual(result.successful_requests, 90)
+        self.assertIn("模拟失败", result.error_details[0]["error"])
+        self.assertGreater(result.avg_response_time, result.avg_service_time)
+        self.assertEqual(self.pool.get_stats()["available"], 4)
+
+    def test_timeout_drops_unfinished_operations(self):
+        async def operation(worker_id, session_manager):
+            await asyncio.sleep(30)
+
+        engine = VirtualUserEngine(self.pool, users=5, duration=0.1, timeout=0.2)
+        start = time.time()
+        result = engine.run(operation, "vu_timeout")
+
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual(result.dropped_requests, 5)
+        self.assertEqual(result.successful_requests, 0)
+
+    def test_blocking_timeout_without_cancel_futures(self):
+        """同步场景超时后不依赖 shutdown(cancel_futures=...)（Python 3.8）"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        shutdown = concurrent.futures.ThreadPoolExecutor.shutdown
+
+        def shutdown_38(executor, wait=True):
+            shutdown(executor, wait=wait)
+
+        engine = VirtualUserEngine(self.pool, users=8, duration=0.1, timeout=0.2)
+        with mock.patch.object(
+            concurrent.futures.ThreadPoolExecutor, "shutdown", shutdown_38
+        ):
+            result = engine.run(
+                lambda worker_id, session_manager: release.wait(5), "vu_blocking_38"
+            )
+
+        self.assertEqual(result.dropped_requests, 8)
+        # 未开始的操作已取消，只剩仍在执行的
+        self.assertTrue(all(future.running() for future in engine._submitted))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            VirtualUserEngine(self.pool, users=10)
+        with self.assertRaises(ValueError):
+            VirtualUserEngine(self.pool, users=10, iterations=1, think_distribution="x")
+
+
+class TestRunnerVirtualUsers(unittest.TestCase):
+    """并发测试运行器的虚拟用户模式测试"""
+
+    def test_run_virtual_user_test(self):
+        from concurrent_test_v2 import ConcurrentTestRunner
+
+        listened = []
+        with LocalTestServer() as server:
+            with SessionPool(server.url, "", "user", "pwd", size=2) as pool:
+                runner = ConcurrentTestRunner(
+                    max_workers=2,
+                    session_pool=pool,
+                    result_listener=lambda ok, t: listened.append(ok),
+                )
+
+                def operation(worker_id, session_manager):
+                    time.sleep(0.005)
+
+                result = runner.run_virtual_user_test(
+                    operation, "vu_runner", users=20, iterations=3, think_time=0.01
+                )
+
+        self.assertEqual(result.successful_requests, 60)
+        self.assertEqual(len(listened), 60)
+        detail = runner.generate_report()["detailed_results"][0]
+        self.assertEqual(detail["mode"], "virtual_users")
+        self.assertEqual(detail["virtual_users"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+负载模型测试
+验证操作权重、思考时间、热点键和数据大小分布以及老化测试和混合操作测试对负载模型
+的使用，不访问服务器
+"""
+
+import statistics
+import unittest
+from collections import Counter
+from unittest import mock
+
+from workload import LATEST, UNIFORM, ZIPFIAN, Workload, zipf_rank
+
+OPERATIONS = {"partner.read": 6, "partner.list": 3, "goods.create": 1}
+
+
+class TestWorkload(unittest.TestCase):
+    """负载模型测试"""
+
+    def test_operation_weights(self):
+        workload = Workload({"operations": OPERATIONS}, seed=1)
+        counts = Counter(workload.choose_operation() for _ in range(20000))
+        self.assertAlmostEqual(counts[("partner", "read")] / 20000, 0.6, delta=0.02)
+        self.assertAlmostEqual(counts[("partner", "list")] / 20000, 0.3, delta=0.02)
+        self.assertAlmostEqual(counts[("goods", "create")] / 20000, 0.1, delta=0.02)
+        self.assertEqual(workload.mix()["partner.read"], 0.6)
+
+    def test_seed_reproduces_sequence(self):
+        spec = {"operations": OPERATIONS, "seed": 7}
+        first = [Workload(spec).choose_operation() for _ in range(50)]
+        second = [Workload(spec).choose_operation() for _ in range(50)]
+        self.assertEqual(first, second)
+
+    def test_defaults(self):
+        workload = Workload(
+            None, default_operations={"partner.read": 1}, default_think_time=0.5
+        )
+        self.assertEqual(workload.choose_operation(), ("partner", "read"))
+        self.assertEqual(workload.think_time(), 0.5)
+        self.assertIsNone(workload.payload_size())
+        self.assertEqual(workload.payload_text("描述"), "描述")
+
+    def test_think_time_distributions(self):
+        for distribution in ("uniform", "exponential"):
+            workload = Workload(
+                {
+                    "operations": OPERATIONS,
+                    "think_time": {"distribution": distribution, "mean": 2.0},
+                },
+                seed=3,
+            )
+            samples = [workload.think_time() for _ in range(20000)]
+            self.assertAlmostEqual(statistics.mean(samples), 2.0, delta=0.1)
+        self.assertGreaterEqual(min(samples), 0)
+
+    def test_zipfian_hot_keys(self):
+        keys = list(range(1000))
+        workload = Workload(
+            {"operations": OPERATIONS, "keys": {"distribution": ZIPFIAN}}, seed=5
+        )
+        counts = Counter(workload.choose_key(keys) for _ in range(20000))
+        # 前 1% 的数据承担约 40% 的访问
+        hot = sum(counts[k] for k in range(10))
+        self.assertGreater(hot / 20000, 0.35)
+        self.assertGreater(counts[0], counts[10] * 5)
+
+        uniform = Workload({"operations": OPERATIONS}, seed=5)
+        counts = Counter(uniform.choose_key(keys) for _ in range(20000))
+        self.assertLess(sum(counts[k] for k in range(10)) / 20000, 0.03)
+
+    def test_latest_by_entity(self):
+        keys = list(range(100))
+        workload = Workload(
+            {
+                "operations": OPERATIONS,
+                "keys": {
+                    "distribution": UNIFORM,
+                    "by_entity": {"stockin": {"distribution": LATEST, "exponent": 1.5}},
+                },
+            },
+            seed=2,
+        )
+        latest = Counter(workload.choose_key(keys, "stockin") for _ in range(5000))
+        self.assertEqual(latest.most_common(1)[0][0], 99)
+        self.assertIsNone(workload.choose_key([], "stockin"))
+
+    def test_zipf_rank_bounds(self):
+        import random
+
+        rng = random.Random(0)
+        for exponent in (0.5, 1.0, 2.0):
+            ranks = [zipf_rank(rng, 3, exponent) for _ in range(1000)]
+            self.assertEqual(set(ranks), {0, 1, 2})
+        self.assertEqual(zipf_rank(rng, 1, 0.99), 0)
+
+    def test_payload_sizes(self):
+        workload = Workload(
+            {
+                "operations": OPERATIONS,
+                "payload": {"distribution": "uniform", "min": 10, "max": 20},
+            },
+            seed=4,
+        )
+        sizes = {len(workload.payload_text("描述")) for _ in range(500)}
+        self.assertEqual(sizes, set(range(10, 21)))
+
+        workload = Workload(
+            {
+                "operations": OPERATIONS,
+                "payload": {
+                    "distribution": "lognormal",
+                    "median": 100,
+                    "sigma": 1.0,
+                    "max": 400,
+                },
+            },
+            seed=4,
+        )
+        sizes = [workload.payload_size() for _ in range(5000)]
+        self.assertAlmostEqual(statistics.median(sizes), 100, delta=10)
+        self.assertEqual(max(sizes), 400)
+
+    def test_invalid_specs(self):
+        invalid = [
+            {"operations": {"partner.read": 0}},
+            {"operations": {"partner": 1}},
+            {"operations": {"partner.read": -1}},
+            {"operations": OPERATIONS, "keys": {"distribution": "pareto"}},
+            {"operations": OPERATIONS, "think_time": {"distribution": "normal"}},
+            {"operations": OPERATIONS, "payload": {"distribution": "uniform"}},
+            {
+                "operations": OPERATIONS,
+                "keys": {"distribution": ZIPFIAN, "exponent": -1},
+            },
+        ]
+        for spec in invalid:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                Workload(spec)
+
+        workload = Workload({"operations": {"stockin.update": 1}})
+        with self.assertRaises(ValueError):
+            workload.validate({"stockin": ("create", "read")})
+
+
+class TestWorkloadUsers(unittest.TestCase):
+    """老化测试和混合操作测试使用负载模型"""
+
+    def test_aging_worker(self):
+        from aging_test_simple import (AGING_OPERATIONS, AgingTestConfig,
+                                       AgingTestWorker)
+
+        config = AgingTestConfig()
+        config.operation_interval = 0.25
+        config.workload = {}
+        worker = AgingTestWorker(0, config)
+        self.assertEqual(worker.workload.think_time(), 0.25)
+        # 默认均匀选择实体，再选择该实体支持的操作
+        counts = Counter(worker.workload.choose_operation() for _ in range(10000))
+        for entity, actions in AGING_OPERATIONS.items():
+            share = sum(counts[(entity, a)] for a in actions) / 10000
+            self.assertAlmostEqual(share, 0.2, delta=0.02)
+        self.assertNotIn(("stockin", "update"), counts)
+
+        config.workload = {
+            "operations": {"partner.read": 1},
+            "keys": {"distribution": LATEST},
+            "seed": 10,
+        }
+        first = AgingTestWorker(1, config)
+        self.assertEqual(first.workload.choose_operation(), ("partner", "read"))
+        # 每个工作线程使用 seed + 工作线程ID
+        second = AgingTestWorker(2, config)
+        keys = list(range(50))
+        self.assertNotEqual(
+            [first.workload.choose_key(keys) for _ in range(20)],
+            [second.workload.choose_key(keys) for _ in range(20)],
+        )
+
+        config.workload = {"operations": {"stockout.update": 1}}
+        with self.assertRaises(ValueError):
+            AgingTestWorker(3, config)
+
+    def test_mixed_operation(self):
+        from concurrent_test_v2 import ConcurrentTestFactory
+
+        calls = Counter()
+
+        def recorder(name):
+            return lambda: lambda worker_id, session_manager: calls.update([name])
+
+        with mock.patch.multiple(
+            ConcurrentTestFactory,
+            create_store_creation_test=recorder("store"),
+            create_product_creation_test=recorder("product"),
+            create_warehouse_creation_test=recorder("warehouse"),
+        ):
+            operation = ConcurrentTestFactory.create_mixed_operation_test(
+                {"operations": {"store.create": 3, "warehouse.create": 1}}, seed=1
+            )
+            for i in range(4000):
+                operation(i, None)
+            with self.assertRaises(ValueError):
+                ConcurrentTestFactory.create_mixed_operation_test(
+                    {"operations": {"store.delete": 1}}
+                )
+
+        self.assertEqual(calls["product"], 0)
+        self.assertAlmostEqual(calls["store"] / 4000, 0.75, delta=0.03)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+会话令牌缓存 - 在磁盘上加密保存登录令牌，供后续进程复用
+
+run_tests.py 会依次启动多个 pytest/unittest 子进程，每个进程都重新登录 CAS。
+启用令牌缓存后，登录前先取出同一身份（服务器地址、命名空间、用户名）缓存的令牌，
+用一次 /cas/session/refresh/ 验证并换取新令牌，验证失败才执行完整登录。
+
+加密方式：
+- 安装了 cryptography 时使用 Fernet
+- 否则使用标准库实现的 HMAC-SHA256 计数器模式流加密 + HMAC 校验（先加密后认证）
+
+密钥优先从环境变量 VMI_TOKEN_CACHE_KEY 读取（urlsafe base64 编码的 32 字节），
+否则使用缓存文件旁的 .key 文件，首次使用时生成（权限 0600）。
+
+注意：刷新会使旧令牌失效时，同一身份的多个会话不能同时使用缓存，
+因此缓存只用于每个进程一个会话的场景（pytest fixture、测试基类）。
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+
+    FERNET_AVAILABLE = True
+    _DECRYPT_ERRORS: tuple = (ValueError, TypeError, InvalidToken)
+except ImportError:
+    FERNET_AVAILABLE = False
+    _DECRYPT_ERRORS = (ValueError, TypeError)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "vmi", "session_tokens.json"
+)
+KEY_ENV = "VMI_TOKEN_CACHE_KEY"
+# 设置为 1/0 时覆盖配置中的 token_cache（run_tests.py --token-cache 对子进程设置）
+ENABLE_ENV = "VMI_TOKEN_CACHE"
+
+# 身份：(服务器地址, 命名空间, 用户名)
+Identity = Tuple[str, str, str]
+
+
+class TokenCipher:
+    """令牌加解密（Fernet 或标准库 HMAC 流加密）"""
+
+    NONCE_SIZE = 16
+    TAG_SIZE = 32
+
+    def __init__(self, key: bytes):
+        """初始化加解密器
+
+        Args:
+            key: urlsafe base64 编码的 32 字节密钥（与 Fernet 密钥格式相同）
+        """
+        raw = base64.urlsafe_b64decode(key)
+        if len(raw) != 32:
+            raise ValueError("令牌缓存密钥必须是 32 字节")
+        self._fernet = Fernet(key) if FERNET_AVAILABLE else None
+        self._enc_key = hmac.new(raw, b"vmi-token-enc", hashlib.sha256).digest()
+        self._mac_key = hmac.new(raw, b"vmi-token-mac", hashlib.sha256).digest()
+
+    @staticmethod
+    def generate_key() -> bytes:
+        """生成新密钥"""
+        return base64.urlsafe_b64encode(os.urandom(32))
+
+    def encrypt(self, data: bytes) -> str:
+        if self._fernet is not None:
+            return "fernet:" + self._fernet.encrypt(data).decode("ascii")
+        nonce = os.urandom(self.NONCE_SIZE)
+        body = nonce + self._xor(nonce, data)
+        tag = hmac.new(self._mac_key, body, hashlib.sha256).digest()
+        return "hmac:" + base64.urlsafe_b64encode(body + tag).decode("ascii")
+
+    def decrypt(self, text: str) -> Optional[bytes]:
+        """解密，密钥不匹配或数据被篡改时返回 None"""
+        scheme, _, payload = text.partition(":")
+        try:
+            if scheme == "fernet" and self._fernet is not None:
+                return self._fernet.decrypt(payload.encode("ascii"))
+            if scheme == "hmac":
+                blob = base64.urlsafe_b64decode(payload.encode("ascii"))
+                body, tag = blob[: -self.TAG_SIZE], blob[-self.TAG_SIZE :]
+                expected = hmac.new(self._mac_key, body, hashlib.sha256).digest()
+                if len(body) < self.NONCE_SIZE or not hmac.compare_digest(
+                    tag, expected
+                ):
+                    return None
+                nonce = body[: self.NONCE_SIZE]
+                return self._xor(nonce, body[self.NONCE_SIZE :])
+        except _DECRYPT_ERRORS:
+            return None
+        return None
+
+    def _xor(self, nonce: bytes, data: bytes) -> bytes:
+        stream = bytearray()
+        counter = 0
+        while len(stream) < len(data):
+            block = nonce + counter.to_bytes(8, "big")
+            stream += hmac.new(self._enc_key, block, hashlib.sha256).digest()
+            counter += 1
+        return bytes(a ^ b for a, b in zip(data, stream))
+
+
+class TokenStore:
+    """按身份保存的加密令牌缓存（JSON 文件）"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        key: Optional[bytes] = None,
+        max_age: float = 1800,
+    ):
+        """初始化令牌缓存
+
+        Args:
+            path: 缓存文件路径，默认 ~/.cache/vmi/session_tokens.json
+            key: 加密密钥，默认读取环境变量 VMI_TOKEN_CACHE_KEY 或密钥文件
+            max_age: 缓存令牌的最长使用时间（秒），超过后不再尝试复用
+        """
+        self.path = path or DEFAULT_CACHE_FILE
+        self.max_age = max_age
+        self._cipher = TokenCipher(key or self._load_key())
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "saved": 0, "evicted": 0}
+
+    def get(self, identity: Identity) -> Optional[Dict[str, Any]]:
+        """获取缓存的令牌
+
+        Returns:
+            {"token": ..., "entity": ..., "saved_at": ...}，没有可用令牌时返回 None
+        """
+        with self._lock:
+            entries = self._read()
+            record = entries.get(self._entry_key(identity))
+            value = self._open(record) if record else None
+            if value is None:
+                self.stats["misses"] += 1
+                if record:
+                    # 过期、密钥不匹配或数据损坏，删除
+                    del entries[self._entry_key(identity)]
+                    self._write(entries)
+                return None
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, identity: Identity, token: str, entity: Any = None):
+        """保存令牌"""
+        if not token:
+            return
+        data = json.dumps({"token": token, "entity": entity}).encode("utf-8")
+        with self._lock:
+            entries = self._read()
+            entries[self._entry_key(identity)] = {
+                "data": self._cipher.encrypt(data),
+                "saved_at": time.time(),
+            }
+            self._write(entries)
+            self.stats["saved"] += 1
+
+    def delete(self, identity: Identity):
+        """删除令牌（令牌已失效）"""
+        with self._lock:
+            entries = self._read()
+            if entries.pop(self._entry_key(identity), None) is not None:
+                self._write(entries)
+                self.stats["evicted"] += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._write({})
+
+    def _open(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        saved_at = record.get("saved_at", 0)
+        if time.time() - saved_at > self.max_age:
+            return None
+        plain = self._cipher.decrypt(record.get("data", ""))
+        if plain is None:
+            logger.warning("令牌缓存: 解密失败，忽略缓存")
+            return None
+        try:
+            value = json.loads(plain)
+        except ValueError:
+            return None
+        entity = value.get("entity")
+        if isinstance(entity, dict) and entity.get("expireTime"):
+            if float(entity["expireTime"]) / 1000 <= time.time():
+                return None
+        value["saved_at"] = saved_at
+        return value
+
+    @staticmethod
+    def _entry_key(identity: Identity) -> str:
+        # 文件中不出现明文的服务器地址和用户名
+        text = "\0".join(str(part or "") for part in identity)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"令牌缓存: 读取缓存文件失败 - {e}")
+            return {}
+
+    def _write(self, entries: Dict[str, Any]):
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # 写临时文件后替换，其他进程不会读到写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"令牌缓存: 写入缓存文件失败 - {e}")
+
+    def _load_key(self) -> bytes:
+        env_key = os.environ.get(KEY_ENV)
+        if env_key:
+            return env_key.encode("ascii")
+
+        key_path = self.path + ".key"
+        try:
+            with open(key_path, "rb") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            pass
+
+        key = TokenCipher.generate_key()
+        os.makedirs(os.path.dirname(key_path) or ".", exist_ok=True)
+        try:
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # 其他进程刚刚创建了密钥
+            with open(key_path, "rb") as f:
+                return f.read().strip()
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+
+def token_store_from_config(session_config: Dict[str, Any]) -> Optional[TokenStore]:
+    """按会话配置创建令牌缓存
+
+    Args:
+        session_config: test_config.json 中的 session 配置，
+            token_cache 为 true 时启用，token_cache_file 指定缓存文件；
+            环境变量 VMI_TOKEN_CACHE 优先于 token_cache
+
+    Returns:
+        令牌缓存，未启用或创建失败时返回 None
+    """
+    enabled = session_config.get("token_cache", False)
+    env_value = os.environ.get(ENABLE_ENV)
+    if env_value:
+        enabled = env_value.lower() in ("1", "true", "yes", "on")
+    if not enabled:
+        return None
+    try:
+        return TokenStore(
+            session_config.get("token_cache_file"),
+            max_age=session_config.get("timeout", 1800),
+        )
+    except Exception as e:
+        logger.warning(f"令牌缓存: 初始化失败，不使用缓存 - {e}")
+        return None
+
+
+_default_store: Optional[TokenStore] = None
+_default_loaded = False
+_default_lock = threading.Lock()
+
+
+def default_token_store() -> Optional[TokenStore]:
+    """进程级默认令牌缓存
+
+    首次调用时按 config_helper 的会话配置创建，之后复用同一实例；
+    仅供 conftest 和测试基类的单会话显式传入，会话池和并发管理器不使用
+
+    Returns:
+        令牌缓存，未启用时返回 None
+    """
+    global _default_store, _default_loaded
+    with _default_lock:
+        if not _default_loaded:
+            from config_helper import get_session_config
+
+            _default_store = token_store_from_config(get_session_config())
+            _default_loaded = True
+        return _default_store
+
+
+def set_default_token_store(store: Optional[TokenStore]) -> None:
+    """替换进程级默认令牌缓存，传入 None 时禁用"""
+    global _default_store, _default_loaded
+    with _default_lock:
+        _default_store = store
+        _default_loaded = True
+
+
+def reset_default_token_store() -> None:
+    """清除默认令牌缓存，下次调用时重新按配置创建"""
+    global _default_store, _default_loaded
+    with _default_lock:
+        _default_store = None
+        _default_loaded = False
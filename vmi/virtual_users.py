@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+虚拟用户引擎 - 用 asyncio 协程模拟大量并发用户
+
+每个线程模拟一个用户时，ThreadPoolExecutor 到几百个线程就被内存和上下文切换拖垮。
+VirtualUserEngine 把每个虚拟用户实现为一个协程：用户循环执行场景，两次操作之间按
+自己的思考时间 asyncio.sleep，单个进程可以维持上万个并发用户。
+
+场景函数与 ConcurrentTestFactory 的测试函数签名相同
+scenario(worker_id, session_manager, **kwargs)：
+- 协程函数（async def）直接在事件循环中执行，用户按序号共享池中的会话
+- 同步函数（现有 SDK 基于 requests，是阻塞调用）在有界线程池中执行，每次操作
+  独占借用一个会话；同时进行的请求数等于会话数，其余用户在思考或等待会话
+
+响应时间从用户发起操作开始计算（包含等待会话的时间），服务时间只计算场景函数本身。
+
+使用示例：
+    with SessionPool(server_url, namespace, username, password, size=50) as pool:
+        engine = VirtualUserEngine(pool, users=10000, think_time=5, duration=300)
+        result = engine.run(ConcurrentTestFactory.create_mixed_operation_test(), "vu")
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import itertools
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from concurrent_test_v2 import MAX_ERROR_DETAILS, ConcurrentTestResult
+from latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# 思考时间分布：固定值、均值附近均匀分布（0.5 到 1.5 倍）、指数分布
+CONSTANT = "constant"
+UNIFORM = "uniform"
+EXPONENTIAL = "exponential"
+THINK_DISTRIBUTIONS = (CONSTANT, UNIFORM, EXPONENTIAL)
+
+
+class VirtualUserEngine:
+    """基于 asyncio 的虚拟用户负载引擎"""
+
+    def __init__(
+        self,
+        session_pool,
+        users: int,
+        think_time: Union[float, Callable[[int], float]] = 1.0,
+        think_distribution: str = EXPONENTIAL,
+        duration: Optional[float] = None,
+        iterations: Optional[int] = None,
+        ramp_up: float = 0.0,
+        seed: Optional[int] = None,
+        timeout: float = 30,
+        result_listener: Optional[Callable[[bool, float], None]] = None,
+        result_sink=None,
+    ):
+        """初始化虚拟用户引擎
+
+        Args:
+            session_pool: 已登录的会话池（session_pool.SessionPool），由调用方关闭
+            users: 虚拟用户数
+            think_time: 平均思考时间（秒），或按用户序号返回该用户平均思考时间的函数
+            think_distribution: 思考时间分布，constant、uniform 或 exponential
+            duration: 持续时间（秒，不含加压时间），到时后用户不再发起新操作
+            iterations: 每个用户执行的操作次数，与 duration 至少指定一个
+            ramp_up: 加压时间（秒），用户在此期间均匀启动
+            seed: 思考时间的随机种子（每个用户使用 seed + 用户序号）
+            timeout: 结束后等待进行中操作完成的时间（秒），超时的操作计为丢弃
+            result_listener: 每次操作完成时的回调 listener(成功与否, 响应时间)
+            result_sink: 结果汇（result_sink.ResultSink），按测试名称写入每次操作的
+                结果，由调用方关闭
+
+        Raises:
+            ValueError: 参数不合法
+        """
+        if users <= 0:
+            raise ValueError("users 必须大于 0")
+        if duration is None and iterations is None:
+            raise ValueError("必须指定 duration 或 iterations")
+        if think_distribution not in THINK_DISTRIBUTIONS:
+            raise ValueError(
+                f"未知的思考时间分布: {think_distribution}，"
+                f"可选 {', '.join(THINK_DISTRIBUTIONS)}"
+            )
+        self.session_pool = session_pool
+        self.users = users
+        self.think_time = think_time
+        self.think_distribution = think_distribution
+        self.duration = duration
+        self.iterations = iterations
+        self.ramp_up = ramp_up
+        self.seed = seed
+        self.timeout = timeout
+        self.result_listener = result_listener
+        self.result_sink = result_sink
+
+        # 最近一次运行中同时进行操作的最大用户数
+        self.peak_active = 0
+        self._reset()
+
+    @property
+    def in_flight(self) -> int:
+        """正在进行操作的用户数（可以在其他线程中读取）"""
+        return self._active
+
+    def run(
+        self, test_func: Callable, test_name: str, **kwargs
+    ) -> ConcurrentTestResult:
+        """运行虚拟用户测试（在新的事件循环中）
+
+        Args:
+            test_func: 场景函数（同步或协程函数），接受worker_id参数
+            test_name: 测试名称
+            **kwargs: 传递给场景函数的额外参数
+
+        Returns:
+            测试结果
+        """
+        return asyncio.run(self.run_async(test_func, test_name, **kwargs))
+
+    async def run_async(
+        self, test_func: Callable, test_name: str, **kwargs
+    ) -> ConcurrentTestResult:
+        """在当前事件循环中运行虚拟用户测试，参数同 run"""
+        self._reset()
+        self._test_name = test_name
+        managers = self._borrow_sessions()
+        if not managers:
+            raise RuntimeError("无法从会话池获取会话")
+
+        is_async = inspect.iscoroutinefunction(test_func)
+        sessions: "asyncio.Queue" = asyncio.Queue()
+        for manager in managers:
+            sessions.put_nowait(manager)
+        executor = None
+        if not is_async:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(managers), thread_name_prefix="VirtualUser"
+            )
+
+        logger.info(
+            f"开始虚拟用户测试: {test_name}, 用户数: {self.users}, "
+            f"会话数: {len(managers)}, 场景: {'协程' if is_async else '线程池'}"
+        )
+        start_time = time.time()
+        deadline = None
+        if self.duration is not None:
+            deadline = time.monotonic() + self.ramp_up + self.duration
+
+        run = functools.partial(
+            self._execute, test_func, is_async, managers, sessions, executor, kwargs
+        )
+        tasks = [
+            asyncio.ensure_future(self._user(user_id, run, deadline))
+            for user_id in range(self.users)
+        ]
+        try:
+            wait_timeout = None
+            if deadline is not None:
+                wait_timeout = deadline - time.monotonic() + self.timeout
+            _, pending = await asyncio.wait(tasks, timeout=wait_timeout)
+            if pending:
+                logger.warning(
+                    f"虚拟用户测试超时: {test_name} - {len(pending)} 个用户的操作未完成"
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            if executor is not None:
+                # 手动取消未开始的操作（shutdown 的 cancel_futures 参数需要 3.9）
+                for future in list(self._submitted):
+                    future.cancel()
+                executor.shutdown(wait=False)
+            for manager in managers:
+                self.session_pool.checkin(manager)
+
+        total_time = time.time() - start_time
+        return self._build_result(test_name, total_time)
+
+    # ---- 虚拟用户 ----
+
+    async def _user(self, user_id: int, run: Callable, deadline: Optional[float]):
+        """单个虚拟用户：执行操作、思考，直到达到次数或持续时间"""
+        rng = random.Random(None if self.seed is None else self.seed + user_id)
+        mean = self._mean_think_time(user_id)
+        if self.ramp_up > 0:
+            await asyncio.sleep(self.ramp_up * user_id / self.users)
+
+        iteration = 0
+        while self.iterations is None or iteration < self.iterations:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            await run(user_id)
+            iteration += 1
+
+            pause = self._sample_think_time(rng, mean)
+            if deadline is not None:
+                pause = min(pause, deadline - time.monotonic())
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+    async def _execute(
+        self,
+        test_func: Callable,
+        is_async: bool,
+        managers: List[Any],
+        sessions: "asyncio.Queue",
+        executor: Optional[concurrent.futures.ThreadPoolExecutor],
+        kwargs: Dict[str, Any],
+        user_id: int,
+    ):
+        """执行一次操作并记录结果"""
+        worker_id = next(self._worker_ids)
+        start = time.perf_counter()
+        service_start = start
+        self._active += 1
+        self.peak_active = max(self.peak_active, self._active)
+        try:
+            if is_async:
+                manager = managers[user_id % len(managers)]
+                service_start = time.perf_counter()
+                await test_func(worker_id=worker_id, session_manager=manager, **kwargs)
+            else:
+                manager = await sessions.get()
+                try:
+                    if not manager.is_session_valid():
+                        await self._submit(executor, manager.reconnect)
+                    service_start = time.perf_counter()
+                    await self._submit(
+                        executor,
+                        functools.partial(
+                            test_func,
+                            worker_id=worker_id,
+                            session_manager=manager,
+                            **kwargs,
+                        ),
+                    )
+                finally:
+                    sessions.put_nowait(manager)
+            end = time.perf_counter()
+            self._record_success(end - start, end - service_start, worker_id)
+
+        except asyncio.CancelledError:
+            self._counts["dropped"] += 1
+            raise
+        except Exception as e:
+            response_time = time.perf_counter() - start
+            self._counts["failed"] += 1
+            if len(self._errors) < MAX_ERROR_DETAILS:
+                self._errors.append(
+                    {
+                        "worker_id": worker_id,
+                        "user_id": user_id,
+                        "error": str(e),
+                        "timestamp": datetime.now().isoformat(),
+                        "response_time": response_time,
+                    }
+                )
+            self._notify(False, response_time, worker_id, str(e))
+            logger.error(f"虚拟用户 {user_id}: 操作 {worker_id} 失败 - {e}")
+        finally:
+            self._active -= 1
+
+    # ---- 思考时间 ----
+
+    def _mean_think_time(self, user_id: int) -> float:
+        if callable(self.think_time):
+            return max(0.0, float(self.think_time(user_id)))
+        return max(0.0, float(self.think_time))
+
+    def _sample_think_time(self, rng: random.Random, mean: float) -> float:
+        if mean <= 0 or self.think_distribution == CONSTANT:
+            return mean
+        if self.think_distribution == UNIFORM:
+            return rng.uniform(0.5 * mean, 1.5 * mean)
+        return rng.expovariate(1.0 / mean)
+
+    # ---- 统计 ----
+
+    def _submit(
+        self, executor: concurrent.futures.ThreadPoolExecutor, func: Callable
+    ) -> "asyncio.Future":
+        """提交到线程池并记录未完成的 Future，结束时取消未开始的操作"""
+        future = executor.submit(func)
+        self._submitted.add(future)
+        future.add_done_callback(self._submitted.discard)
+        return asyncio.wrap_future(future)
+
+    def _reset(self):
+        self._submitted: Set[concurrent.futures.Future] = set()
+        self.peak_active = 0
+        self._active = 0
+        self._worker_ids = itertools.count()
+        self._counts = {"successful": 0, "failed": 0, "dropped": 0}
+        self._response = {"total": 0.0, "min": None, "max": 0.0, "service": 0.0}
+        self._errors: List[Dict[str, Any]] = []
+        self._histogram = LatencyHistogram()
+        self._test_name = ""
+
+    def _record_success(
+        self, response_time: float, service_time: float, worker_id: int
+    ):
+        # 只在事件循环线程中调用，不需要加锁
+        self._counts["successful"] += 1
+        stats = self._response
+        stats["total"] += response_time
+        stats["service"] += service_time
+        stats["max"] = max(stats["max"], response_time)
+        if stats["min"] is None or response_time < stats["min"]:
+            stats["min"] = response_time
+        self._histogram.record(response_time)
+        self._notify(True, response_time, worker_id)
+
+    def _notify(
+        self,
+        success: bool,
+        response_time: float,
+        worker_id: int,
+        error: Optional[str] = None,
+    ):
+        if self.result_listener is not None:
+            try:
+                self.result_listener(success, response_time)
+            except Exception as e:
+                logger.error(f"请求结果回调异常: {e}")
+        if self.result_sink is not None:
+            self.result_sink.record(
+                self._test_name, success, response_time, error, worker_id=worker_id
+            )
+
+    def _borrow_sessions(self) -> List[Any]:
+        """借出会话池中全部已登录的会话，测试期间由引擎调度"""
+        self.session_pool.start()
+        managers = []
+        for _ in range(self.session_pool.get_stats()["ready"]):
+            manager = self.session_pool.checkout(timeout=10)
+            if manager is None:
+                break
+            managers.append(manager)
+        return managers
+
+    def _build_result(self, test_name: str, total_time: float) -> ConcurrentTestResult:
+        successful = self._counts["successful"]
+        stats = self._response
+        return ConcurrentTestResult(
+            test_name=test_name,
+            total_requests=sum(self._counts.values()),
+            successful_requests=successful,
+            failed_requests=self._counts["failed"],
+            total_time=total_time,
+            avg_response_time=stats["total"] / successful if successful else 0,
+            min_response_time=stats["min"] or 0,
+            max_response_time=stats["max"],
+            throughput=successful / total_time if total_time > 0 else 0,
+            error_details=self._errors,
+            session_setup_time=self.session_pool.get_stats()["startup_time"],
+            mode="virtual_users",
+            dropped_requests=self._counts["dropped"],
+            avg_service_time=stats["service"] / successful if successful else 0,
+            virtual_users=self.users,
+            latency_histogram=self._histogram,
+        )
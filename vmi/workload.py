@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+声明式负载模型 - 按配置的权重、思考时间、键分布和数据大小生成操作
+
+均匀随机地选择实体和操作无法重现生产环境的访问模式：少数热点数据承担大部分读写、
+列表查询占比高，这些决定了服务端缓存的表现。负载模型在 test_config.json 的
+workload 部分声明（键为 "实体.操作"，与耗时直方图和结果汇的键一致）：
+
+    "workload": {
+      "aging": {
+        "operations": {"partner.read": 30, "partner.list": 20, "goods.create": 5},
+        "think_time": {"distribution": "exponential", "mean": 1.0},
+        "keys": {
+          "distribution": "zipfian", "exponent": 0.99,
+          "by_entity": {"stockin": {"distribution": "latest", "exponent": 1.2}}
+        },
+        "payload": {"distribution": "lognormal", "median": 64, "sigma": 1.0,
+                    "max": 4096},
+        "seed": 42
+      }
+    }
+
+- operations：操作权重（不需要归一化），权重为 0 的操作不会被选中
+- think_time：两次操作之间的等待时间（秒），constant、uniform（均值的 0.5-1.5 倍）
+  或 exponential
+- keys：从已有数据中选择操作对象，uniform、zipfian（最早的数据最热）或 latest
+  （最新的数据最热），by_entity 按实体类型覆盖
+- payload：文本字段的长度（字符），constant、uniform（min-max）或 lognormal
+  （中位数 median、对数标准差 sigma，不超过 max）
+- seed：随机种子，同一个种子得到相同的操作序列
+
+Zipf 分布用连续幂律的逆变换近似，每次抽样 O(1)，数据量变化时不需要重新计算。
+"""
+
+import bisect
+import math
+import random
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+CONSTANT = "constant"
+UNIFORM = "uniform"
+EXPONENTIAL = "exponential"
+ZIPFIAN = "zipfian"
+LATEST = "latest"
+LOGNORMAL = "lognormal"
+
+THINK_TIME_DISTRIBUTIONS = (CONSTANT, UNIFORM, EXPONENTIAL)
+KEY_DISTRIBUTIONS = (UNIFORM, ZIPFIAN, LATEST)
+PAYLOAD_DISTRIBUTIONS = (CONSTANT, UNIFORM, LOGNORMAL)
+
+# Zipf 分布的默认指数（YCSB 的默认值）
+DEFAULT_EXPONENT = 0.99
+
+
+def split_operation(operation: str) -> Tuple[str, str]:
+    """把 "实体.操作" 拆分为 (实体, 操作)"""
+    entity, _, action = operation.partition(".")
+    return entity, action
+
+
+def zipf_rank(rng: random.Random, count: int, exponent: float) -> int:
+    """按 Zipf 分布抽取排名 0..count-1，排名 0 的概率最高
+
+    用 [0.5, count + 0.5) 上密度正比于 x^-exponent 的连续分布做逆变换后四舍五入，
+    排名 k 对应区间 [k + 0.5, k + 1.5)，与离散 Zipf 分布的概率接近。
+    """
+    u = rng.random()
+    low, high = 0.5, count + 0.5
+    if abs(exponent - 1.0) < 1e-9:
+        x = low * (high / low) ** u
+    else:
+        power = 1.0 - exponent
+        x = (low**power + (high**power - low**power) * u) ** (1.0 / power)
+    return max(0, min(int(x + 0.5) - 1, count - 1))
+
+
+class Workload:
+    """负载模型：按配置选择操作、操作对象、思考时间和数据大小（每个工作线程一个）"""
+
+    def __init__(
+        self,
+        spec: Optional[Mapping[str, Any]] = None,
+        default_operations: Optional[Mapping[str, float]] = None,
+        default_think_time: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """初始化负载模型
+
+        Args:
+            spec: 负载配置（见模块说明），未配置的部分使用默认值
+            default_operations: 未配置 operations 时的操作权重
+            default_think_time: 未配置 think_time 时的固定思考时间（秒）
+            seed: 随机种子，默认使用配置中的 seed
+
+        Raises:
+            ValueError: 配置不合法
+        """
+        spec = dict(spec or {})
+        operations = spec.get("operations") or default_operations or {}
+        self.operations = {name: float(w) for name, w in operations.items()}
+        if any(weight < 0 for weight in self.operations.values()):
+            raise ValueError("操作权重不能为负数")
+        names = [name for name, weight in self.operations.items() if weight > 0]
+        if not names:
+            raise ValueError("至少需要一个权重大于 0 的操作")
+        for name in names:
+            if not all(split_operation(name)):
+                raise ValueError(f"操作必须写成 \"实体.操作\": {name}")
+        self._names = names
+        self._cumulative = []
+        total = 0.0
+        for name in names:
+            total += self.operations[name]
+            self._cumulative.append(total)
+
+        self.think_time_spec = dict(
+            spec.get("think_time")
+            or {"distribution": CONSTANT, "mean": default_think_time}
+        )
+        _check_distribution(
+            "think_time", self.think_time_spec, THINK_TIME_DISTRIBUTIONS
+        )
+
+        keys = dict(spec.get("keys") or {"distribution": UNIFORM})
+        by_entity = keys.pop("by_entity", {})
+        self.key_spec = keys
+        self.key_specs_by_entity = {e: dict(s) for e, s in by_entity.items()}
+        for key_spec in (self.key_spec, *self.key_specs_by_entity.values()):
+            _check_distribution("keys", key_spec, KEY_DISTRIBUTIONS)
+
+        self.payload_spec = spec.get("payload")
+        if self.payload_spec is not None:
+            self.payload_spec = dict(self.payload_spec)
+            _check_distribution("payload", self.payload_spec, PAYLOAD_DISTRIBUTIONS)
+
+        self.rng = random.Random(spec.get("seed") if seed is None else seed)
+
+    def validate(self, allowed: Mapping[str, Iterable[str]]):
+        """检查配置的操作都受支持
+
+        Args:
+            allowed: {实体: 支持的操作}
+
+        Raises:
+            ValueError: 配置了不支持的实体或操作
+        """
+        for name in self._names:
+            entity, action = split_operation(name)
+            if action not in allowed.get(entity, ()):
+                raise ValueError(f"不支持的操作: {name}")
+
+    def choose_operation(self) -> Tuple[str, str]:
+        """按权重选择下一个操作，返回 (实体, 操作)"""
+        point = self.rng.random() * self._cumulative[-1]
+        index = bisect.bisect_right(self._cumulative, point)
+        return split_operation(self._names[min(index, len(self._names) - 1)])
+
+    def think_time(self) -> float:
+        """抽取下一次操作前的等待时间（秒）"""
+        spec = self.think_time_spec
+        mean = max(0.0, float(spec.get("mean", 0.0)))
+        distribution = spec.get("distribution", CONSTANT)
+        if mean <= 0 or distribution == CONSTANT:
+            return mean
+        if distribution == UNIFORM:
+            return self.rng.uniform(0.5 * mean, 1.5 * mean)
+        return self.rng.expovariate(1.0 / mean)
+
+    def choose_key(self, keys: Sequence[Any], entity: Optional[str] = None) -> Any:
+        """按键分布从已有数据中选择一个（keys 按创建先后排列），keys 为空时返回 None"""
+        if not keys:
+            return None
+        spec = self.key_specs_by_entity.get(entity, self.key_spec)
+        distribution = spec.get("distribution", UNIFORM)
+        if distribution == UNIFORM:
+            return keys[self.rng.randrange(len(keys))]
+        rank = zipf_rank(
+            self.rng, len(keys), float(spec.get("exponent", DEFAULT_EXPONENT))
+        )
+        return keys[rank] if distribution == ZIPFIAN else keys[-1 - rank]
+
+    def payload_size(self) -> Optional[int]:
+        """抽取文本字段的长度（字符），未配置 payload 时返回 None"""
+        spec = self.payload_spec
+        if spec is None:
+            return None
+        distribution = spec.get("distribution", CONSTANT)
+        if distribution == CONSTANT:
+            size = spec.get("size", 0)
+        elif distribution == UNIFORM:
+            size = self.rng.randint(int(spec.get("min", 0)), int(spec["max"]))
+        else:
+            size = self.rng.lognormvariate(
+                math.log(max(1.0, float(spec.get("median", 64)))),
+                float(spec.get("sigma", 1.0)),
+            )
+            if "max" in spec:
+                size = min(size, spec["max"])
+        return max(0, int(size))
+
+    def payload_text(self, prefix: str) -> str:
+        """生成文本字段：prefix 补齐到抽取的长度（不截断），未配置 payload 时返回 prefix"""
+        size = self.payload_size()
+        if size is None or len(prefix) >= size:
+            return prefix
+        return prefix + "x" * (size - len(prefix))
+
+    def mix(self) -> Dict[str, float]:
+        """各操作的比例（总和为 1）"""
+        total = self._cumulative[-1]
+        return {name: self.operations[name] / total for name in self._names}
+
+
+def _check_distribution(
+    section: str, spec: Mapping[str, Any], distributions: Sequence[str]
+):
+    distribution = spec.get("distribution", distributions[0])
+    if distribution not in distributions:
+        raise ValueError(
+            f"{section} 不支持的分布: {distribution}，可选 {', '.join(distributions)}"
+        )
+    if distribution == UNIFORM and section == "payload" and "max" not in spec:
+        raise ValueError("payload 的 uniform 分布需要指定 max")
+    for field in ("exponent", "sigma"):
+        if field in spec and float(spec[field]) <= 0:
+            raise ValueError(f"{section} 的 {field} 必须大于 0")